@@ -1,9 +1,13 @@
+import os
 import sys
 import pkg_resources
 
 from capnpy.compiler.compiler import DynamicCompiler
 from capnpy.compiler.distutils import capnpify
 from capnpy.message import load, loads, load_all, dumps, dump
+from capnpy.message import (load_packed, loads_packed, load_all_packed,
+                            dumps_packed, dump_packed)
+from capnpy.message import load_mmap, load_all_mmap, load_lazy, MessageWriter
 from capnpy.reflection import get_reflection_data
 
 
@@ -12,6 +16,10 @@ try:
 except Exception:
     __version__ = 'unknown'
 
-_compiler = DynamicCompiler(sys.path)
+# set CAPNPY_CACHE_DIR to keep the compiled schemas across processes, and
+# CAPNPY_PARSER=python to parse them without the capnp executable
+_compiler = DynamicCompiler(sys.path,
+                            cache_dir=os.environ.get('CAPNPY_CACHE_DIR'),
+                            parser=os.environ.get('CAPNPY_PARSER', 'capnp'))
 load_schema = _compiler.load_schema
 parse_schema = _compiler.parse_schema
@@ -9,6 +9,14 @@ Options:
   --no-pyx             Always produce a .py file, even if Cython is available
   --no-version-check   Don't check for version discrepancy
   --no-reflection      Don't include reflection data in the generated schema
+  --mutable            Generate set_*() methods to modify primitive fields
+                       in place
+  --cache              Cache the objects returned by struct, list and text
+                       fields after the first access
+  --lazy               Create the classes of the generated module on first
+                       access instead of at import time
+  --parser=PARSER      How to parse the schema [Default: capnp]
+                       Can be capnp (run the capnp executable) or python
 """
 from __future__ import print_function
 
@@ -28,6 +36,11 @@ def parse_argv(argv):
         print()
         print('ERROR: --text-type can be only bytes or unicode')
         raise SystemExit(1)
+    if args['--parser'] not in ('capnp', 'python'):
+        print(__doc__)
+        print()
+        print('ERROR: --parser can be only capnp or python')
+        raise SystemExit(1)
     #
     args['--pyx'] = 'auto'
     if args['--no-pyx']:
@@ -39,6 +52,9 @@ def parse_argv(argv):
         convert_case = not args['--no-convert-case'],
         text_type = args['--text-type'],
         include_reflection_data = not args['--no-reflection'],
+        mutable = args['--mutable'],
+        cache = args['--cache'],
+        lazy = args['--lazy'],
     )
     return args, Options.from_dict(kwargs)
 
@@ -67,7 +83,7 @@ def decode(args, options):
     print('\nstream decoded in %.2f secs' % (c-b), file=sys.stderr)
 
 def compile(args, options):
-    comp = StandaloneCompiler(sys.path)
+    comp = StandaloneCompiler(sys.path, parser=args['--parser'])
     comp.compile(filename=args['FILE'],
                  pyx=args['--pyx'],
                  options=options)
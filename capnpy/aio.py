@@ -0,0 +1,99 @@
+"""
+asyncio support: read and write capnproto messages from/to asyncio streams.
+
+This module requires Python 3.5 or later.
+"""
+
+import asyncio
+import struct
+from capnpy.segment.base import unpack_uint32
+from capnpy.struct_ import Struct, struct_from_buffer
+from capnpy import message
+from capnpy.message import _make_segment
+
+
+async def load(reader, payload_type):
+    """
+    Load a message of type ``payload_type`` from the given
+    ``asyncio.StreamReader``. See capnpy.message.load for the details of the
+    format.
+
+    Raise EOFError if the stream is at EOF.
+    """
+    try:
+        buf = await reader.readexactly(4)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            raise EOFError("No message to load")
+        raise ValueError("Malformed header: expected 4 bytes, got %d" %
+                         len(e.partial))
+    n = unpack_uint32(buf, 0) + 1
+    #
+    # read the size of each segment, plus enough padding so that the message
+    # starts at word boundary
+    size = n*4
+    if (4 + size) & 7 != 0:
+        size += 4
+    try:
+        buf = await reader.readexactly(size)
+    except asyncio.IncompleteReadError:
+        raise ValueError("Unexpected EOF when reading the header")
+    segments = struct.unpack_from('<%dI' % n, buf)
+    #
+    # read the body of the message
+    message_length = sum(segments)*8
+    try:
+        buf = await reader.readexactly(message_length)
+    except asyncio.IncompleteReadError as e:
+        raise ValueError("Unexpected EOF: expected %d bytes, got only %d. "
+                         "Segments size: %s" % (message_length, len(e.partial),
+                                                list(segments)))
+    seg = _make_segment(buf, segments)
+    msg = struct_from_buffer(Struct, seg, 0, data_size=0, ptrs_size=1)
+    return msg._read_struct(0, payload_type)
+
+
+class load_all(object):
+    """
+    Asynchronous iterator which yields all the messages of type
+    ``payload_type`` from the given ``asyncio.StreamReader``, until EOF::
+
+        async for obj in capnpy.aio.load_all(reader, MyStruct):
+            ...
+    """
+
+    def __init__(self, reader, payload_type):
+        self.reader = reader
+        self.payload_type = payload_type
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await load(self.reader, self.payload_type)
+        except EOFError:
+            raise StopAsyncIteration
+
+
+class MessageWriter(message.MessageWriter):
+    """
+    Write messages to an ``asyncio.StreamWriter``.
+
+    Like capnpy.message.MessageWriter, write() accumulates the messages in a
+    buffer, which is passed to the underlying transport when it becomes
+    larger than ``bufsize`` bytes or when you call drain(). Remember to call
+    drain() regularly, to respect the flow control of the transport.
+    """
+
+    async def drain(self):
+        """
+        Flush the buffered messages and wait until it is appropriate to
+        resume writing to the stream
+        """
+        self.flush()
+        await self.f.drain()
+
+    async def close(self):
+        await self.drain()
+        self.f.close()
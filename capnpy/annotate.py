@@ -10,7 +10,10 @@ from capnpy.struct_ import undefined as _undefined
 from capnpy.enum import enum as _enum, fill_enum as _fill_enum
 from capnpy.enum import BaseEnum as _BaseEnum
 from capnpy.type import Types as _Types
+from capnpy.segment.segment import Segment as _Segment
+from capnpy.segment.segment import MultiSegment as _MultiSegment
 from capnpy.segment.builder import SegmentBuilder as _SegmentBuilder
+from capnpy.segment.builder import size_hint as _size_hint
 from capnpy.list import List as _List
 from capnpy.list import PrimitiveItemType as _PrimitiveItemType
 from capnpy.list import BoolItemType as _BoolItemType
@@ -28,6 +31,16 @@ from capnpy.util import float64_repr as _float64_repr
 from capnpy.util import extend_module_maybe as _extend_module_maybe
 from capnpy.util import check_version as _check_version
 from capnpy.util import encode_maybe as _encode_maybe
+from capnpy.json import dump_float32 as _json_dump_float32
+from capnpy.json import dump_float64 as _json_dump_float64
+from capnpy.json import dump_text as _json_dump_text
+from capnpy.json import dump_data as _json_dump_data
+from capnpy.json import dump_enum as _json_dump_enum
+from capnpy.json import dump_list as _json_dump_list
+from capnpy.json import load_enum as _json_load_enum
+from capnpy.json import load_text as _json_load_text
+from capnpy.json import load_data as _json_load_data
+from capnpy.json import copy_list as _json_copy_list
 __capnpy_id__ = 0xbc24c21845631520
 __capnpy_version__ = '0.7.1.dev8+g4a9c343'
 __capnproto_version__ = '0.7.0'
@@ -119,8 +132,9 @@ class options(object):
 @Options.__extend__
 class Options(_Struct):
     __capnpy_id__ = 0xd393b3843dc6b5f3
-    __static_data_size__ = 1
+    __static_data_size__ = 2
     __static_ptrs_size__ = 0
+    __data_fields__ = (('version_check', 0, 'h', 2), ('convert_case', 2, 'h', 2), ('text_type', 4, 'h', 0), ('include_reflection_data', 6, 'h', 2), ('mutable', 8, 'h', 2), ('cache', 10, 'h', 2), ('lazy', 12, 'h', 2))
     
     
     @property
@@ -155,10 +169,34 @@ class Options(_Struct):
             value = (value ^ 2)
         return BoolOption._new(value)
     
+    @property
+    def mutable(self):
+        # no union check
+        value = self._read_int16(8)
+        if 2 != 0:
+            value = (value ^ 2)
+        return BoolOption._new(value)
+    
+    @property
+    def cache(self):
+        # no union check
+        value = self._read_int16(10)
+        if 2 != 0:
+            value = (value ^ 2)
+        return BoolOption._new(value)
+    
+    @property
+    def lazy(self):
+        # no union check
+        value = self._read_int16(12)
+        if 2 != 0:
+            value = (value ^ 2)
+        return BoolOption._new(value)
+    
     @staticmethod
-    def __new(version_check=2, convert_case=2, text_type=0, include_reflection_data=2):
-        builder = _SegmentBuilder()
-        pos = builder.allocate(8)
+    def __new(version_check=2, convert_case=2, text_type=0, include_reflection_data=2, mutable=2, cache=2, lazy=2):
+        builder = _SegmentBuilder(16)
+        pos = builder.allocate(16)
         version_check ^= 2
         builder.write_int16(pos + 0, version_check)
         convert_case ^= 2
@@ -167,11 +205,79 @@ class Options(_Struct):
         builder.write_int16(pos + 4, text_type)
         include_reflection_data ^= 2
         builder.write_int16(pos + 6, include_reflection_data)
+        mutable ^= 2
+        builder.write_int16(pos + 8, mutable)
+        cache ^= 2
+        builder.write_int16(pos + 10, cache)
+        lazy ^= 2
+        builder.write_int16(pos + 12, lazy)
         return builder.as_string()
     
-    def __init__(self, version_check=2, convert_case=2, text_type=0, include_reflection_data=2):
-        _buf = Options.__new(version_check, convert_case, text_type, include_reflection_data)
-        self._init_from_buffer(_buf, 0, 1, 0)
+    def __init__(self, version_check=2, convert_case=2, text_type=0, include_reflection_data=2, mutable=2, cache=2, lazy=2):
+        _buf = Options.__new(version_check, convert_case, text_type, include_reflection_data, mutable, cache, lazy)
+        self._init_from_buffer(_buf, 0, 2, 0)
+    
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        _v_version_check = _d.get('version_check', 2)
+        _v_version_check ^= 2
+        builder.write_int16(pos + 0, _v_version_check)
+        _v_convert_case = _d.get('convert_case', 2)
+        _v_convert_case ^= 2
+        builder.write_int16(pos + 2, _v_convert_case)
+        _v_text_type = _d.get('text_type', 0)
+        _v_text_type ^= 0
+        builder.write_int16(pos + 4, _v_text_type)
+        _v_include_reflection_data = _d.get('include_reflection_data', 2)
+        _v_include_reflection_data ^= 2
+        builder.write_int16(pos + 6, _v_include_reflection_data)
+        _v_mutable = _d.get('mutable', 2)
+        _v_mutable ^= 2
+        builder.write_int16(pos + 8, _v_mutable)
+        _v_cache = _d.get('cache', 2)
+        _v_cache ^= 2
+        builder.write_int16(pos + 10, _v_cache)
+        _v_lazy = _d.get('lazy', 2)
+        _v_lazy ^= 2
+        builder.write_int16(pos + 12, _v_lazy)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        _v_version_check = _d.get('versionCheck', 2)
+        _v_version_check = _json_load_enum(BoolOption, _v_version_check)
+        _v_version_check ^= 2
+        builder.write_int16(pos + 0, _v_version_check)
+        _v_convert_case = _d.get('convertCase', 2)
+        _v_convert_case = _json_load_enum(BoolOption, _v_convert_case)
+        _v_convert_case ^= 2
+        builder.write_int16(pos + 2, _v_convert_case)
+        _v_text_type = _d.get('textType', 0)
+        _v_text_type = _json_load_enum(TextType, _v_text_type)
+        _v_text_type ^= 0
+        builder.write_int16(pos + 4, _v_text_type)
+        _v_include_reflection_data = _d.get('includeReflectionData', 2)
+        _v_include_reflection_data = _json_load_enum(BoolOption, _v_include_reflection_data)
+        _v_include_reflection_data ^= 2
+        builder.write_int16(pos + 6, _v_include_reflection_data)
+        _v_mutable = _d.get('mutable', 2)
+        _v_mutable = _json_load_enum(BoolOption, _v_mutable)
+        _v_mutable ^= 2
+        builder.write_int16(pos + 8, _v_mutable)
+        _v_cache = _d.get('cache', 2)
+        _v_cache = _json_load_enum(BoolOption, _v_cache)
+        _v_cache ^= 2
+        builder.write_int16(pos + 10, _v_cache)
+        _v_lazy = _d.get('lazy', 2)
+        _v_lazy = _json_load_enum(BoolOption, _v_lazy)
+        _v_lazy ^= 2
+        builder.write_int16(pos + 12, _v_lazy)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(16)
+        Options._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 2, 0)
     
     def shortrepr(self):
         parts = []
@@ -179,7 +285,33 @@ class Options(_Struct):
         parts.append("convertCase = %s" % self.convert_case)
         parts.append("textType = %s" % self.text_type)
         parts.append("includeReflectionData = %s" % self.include_reflection_data)
+        parts.append("mutable = %s" % self.mutable)
+        parts.append("cache = %s" % self.cache)
+        parts.append("lazy = %s" % self.lazy)
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['version_check'] = self.version_check
+        d['convert_case'] = self.convert_case
+        d['text_type'] = self.text_type
+        d['include_reflection_data'] = self.include_reflection_data
+        d['mutable'] = self.mutable
+        d['cache'] = self.cache
+        d['lazy'] = self.lazy
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"versionCheck":' + _json_dump_enum(self.version_check))
+        parts.append('"convertCase":' + _json_dump_enum(self.convert_case))
+        parts.append('"textType":' + _json_dump_enum(self.text_type))
+        parts.append('"includeReflectionData":' + _json_dump_enum(self.include_reflection_data))
+        parts.append('"mutable":' + _json_dump_enum(self.mutable))
+        parts.append('"cache":' + _json_dump_enum(self.cache))
+        parts.append('"lazy":' + _json_dump_enum(self.lazy))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        return None
 
 _Options_list_item_type = _StructItemType(Options)
 
@@ -59,7 +59,8 @@ class TextType:
 @Options.__extend__
 class Options:
 
-    FIELDS = ('version_check', 'convert_case', 'text_type', 'include_reflection_data')
+    FIELDS = ('version_check', 'convert_case', 'text_type', 'include_reflection_data',
+              'mutable', 'cache', 'lazy')
 
     @classmethod
     def from_dict(cls, d):
@@ -71,7 +72,8 @@ class Options:
         """
         kwargs = {}
         for key, value in d.items():
-            if key in ('version_check', 'convert_case', 'include_reflection_data'):
+            if key in ('version_check', 'convert_case', 'include_reflection_data',
+                       'mutable', 'cache', 'lazy'):
                 kwargs[key] = value
             elif key == 'text_type':
                 kwargs[key] = TextType.parse(value)
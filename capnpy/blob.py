@@ -40,7 +40,8 @@ class Blob(object):
 
     def _init_blob(self, seg):
         assert seg is not None
-        if isinstance(seg, bytes):
+        if not isinstance(seg, Segment):
+            # bytes, or any other object which supports the buffer protocol
             seg = Segment(seg)
         self._seg = seg
 
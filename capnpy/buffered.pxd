@@ -1,5 +1,6 @@
 import cython
 from capnpy.filelike cimport FileLike
+from capnpy.packing cimport unpack_words
 
 cdef class BufferedStream(FileLike):
     cdef readonly bytes buf
@@ -23,6 +24,15 @@ cdef class BufferedSocket(BufferedStream):
     cpdef bytes _readchunk(self)
 
 
+cdef class PackedStream(BufferedStream):
+    cdef readonly object f
+    cdef readonly int bufsize
+    cdef bytes packed
+
+    @cython.locals(data=bytes, chunk=bytes, end=Py_ssize_t)
+    cpdef bytes _readchunk(self)
+
+
 cdef class StringBuffer(FileLike):
     cdef readonly bytes s
     cdef readonly int i
@@ -1,4 +1,5 @@
 from capnpy.filelike import FileLike
+from capnpy.packing import unpack_words
 
 class BufferedStream(FileLike):
     """
@@ -123,6 +124,40 @@ class BufferedSocket(BufferedStream):
         self.sock.close()
 
 
+class PackedStream(BufferedStream):
+    """
+    file-like interface to read data which was encoded using the capnproto
+    packed encoding: the data read from the underlying file-like object is
+    unpacked on the fly.
+
+    Note that the underlying file is read in chunks of ``bufsize`` bytes, so
+    it is likely to be consumed beyond the end of the current message. If
+    you want to read many messages from the same file, you need to keep using
+    the same PackedStream.
+    """
+
+    def __init__(self, f, bufsize=8192):
+        super(PackedStream, self).__init__()
+        self.f = f
+        self.bufsize = bufsize
+        self.packed = b''
+
+    def _readchunk(self):
+        while True:
+            data = self.f.read(self.bufsize)
+            if not data:
+                if self.packed:
+                    raise ValueError("Unexpected EOF: the packed stream ends "
+                                     "in the middle of a word")
+                return b''
+            if self.packed:
+                data = self.packed + data
+            chunk, end = unpack_words(data, 0)
+            self.packed = data[end:]
+            if chunk:
+                return chunk
+
+
 class StringBuffer(FileLike):
     """
     file-like interface to read data out of a string. Like StringIO, but since
@@ -0,0 +1,121 @@
+"""
+Persistent on-disk cache for the schemas compiled by DynamicCompiler.
+
+Each entry lives in its own directory, whose name is a hash of everything
+which can influence the generated code: the path and the content of the
+schema, the search path, the versions of capnpy and Python, the pyx mode and
+the options. capnp is identified by the path, size and modification time of
+its executable rather than by its version, so that a cache hit does not need
+to run it. The directory contains:
+
+  - manifest.json: the name of the module and the list of the files which
+    the schema depends on (the schema itself and its imports, recursively),
+    with the hash of their content
+
+  - the CodeGeneratorRequest produced by ``capnp compile``
+
+  - the generated .py source, or the .so built by Cython in pyx mode
+
+The imported schemas are not part of the key because we know them only
+after running ``capnp compile``: instead, the entry is valid only if the
+content of all the dependencies listed in the manifest is unchanged. Else,
+the schema is recompiled and the entry is updated.
+
+The artifacts are written to temporary files and atomically renamed, and
+their name contains a hash of the dependencies: this way, many processes
+can safely share the same cache directory.
+"""
+
+from __future__ import absolute_import
+import os
+import sys
+import json
+import hashlib
+import py
+import capnpy
+
+
+def hash_file(path):
+    """
+    Return the sha256 of the content of the file, or None if it does not
+    exist
+    """
+    try:
+        data = py.path.local(path).read_binary()
+    except py.error.ENOENT:
+        return None
+    return hashlib.sha256(data).hexdigest()
+
+
+class CacheEntry(object):
+
+    def __init__(self, modname, tmpname, module, request):
+        self.modname = modname
+        self.tmpname = tmpname
+        self.module = module    # py.path.local of the .py or .so
+        self.request = request  # py.path.local of the CodeGeneratorRequest
+
+
+class SchemaCache(object):
+
+    def __init__(self, cache_dir):
+        self.cache_dir = py.path.local(cache_dir)
+
+    def get_key(self, filename, pyx, options, capnp_stamp, path):
+        filename = py.path.local(filename)
+        h = hashlib.sha256()
+        parts = [str(filename), hash_file(filename), [str(p) for p in path],
+                 capnpy.__version__, capnp_stamp, sys.version,
+                 bool(pyx), options.shortrepr()]
+        h.update(repr(parts).encode('utf-8'))
+        return h.hexdigest()
+
+    def lookup(self, key):
+        """
+        Return the CacheEntry for the given key, or None if there is no entry
+        or some of its dependencies have changed
+        """
+        entrydir = self.cache_dir.join(key)
+        try:
+            manifest = json.loads(entrydir.join('manifest.json').read())
+        except (py.error.ENOENT, ValueError):
+            return None
+        for path, digest in manifest['deps']:
+            if hash_file(path) != digest:
+                return None
+        module = entrydir.join(manifest['module'])
+        request = entrydir.join(manifest['request'])
+        if not module.check(file=True):
+            return None
+        return CacheEntry(manifest['modname'], manifest['tmpname'],
+                          module, request)
+
+    def store(self, key, modname, tmpname, deps, request_data,
+              module_data, module_ext):
+        """
+        Store the compiled module in the cache and return its CacheEntry.
+        ``deps`` is the list of files which the schema depends on.
+        """
+        entrydir = self.cache_dir.join(key).ensure(dir=True)
+        deps = [(str(path), hash_file(path)) for path in deps]
+        depshash = hashlib.sha256(repr(deps).encode('utf-8')).hexdigest()[:16]
+        basename = '%s-%s' % (modname, depshash)
+        module = self._write(entrydir, basename + module_ext, module_data)
+        request = self._write(entrydir, basename + '.request', request_data)
+        manifest = dict(modname=modname,
+                        tmpname=tmpname,
+                        deps=deps,
+                        module=module.basename,
+                        request=request.basename)
+        # the manifest is written last, so that it never points to
+        # incomplete artifacts
+        self._write(entrydir, 'manifest.json',
+                    json.dumps(manifest, indent=4).encode('utf-8'))
+        return CacheEntry(modname, tmpname, module, request)
+
+    def _write(self, entrydir, basename, data):
+        target = entrydir.join(basename)
+        tmp = entrydir.join('%s.tmp%d' % (basename, os.getpid()))
+        tmp.write_binary(data)
+        tmp.rename(target)
+        return target
@@ -3,16 +3,19 @@ import py
 import sys
 import os
 import types
+import json
 import subprocess
+import multiprocessing
 from six import PY3
 from distutils.version import LooseVersion
 
 import capnpy
 from capnpy import schema
-from capnpy.message import loads
+from capnpy.message import loads, dumps
 from capnpy.blob import PYX
 from capnpy import annotate
 from capnpy.compiler.module import ModuleGenerator
+from capnpy.compiler.cache import SchemaCache, hash_file
 from capnpy.compiler.util import as_identifier
 
 # these are the default compiler options
@@ -21,6 +24,9 @@ DEFAULT_OPTIONS = annotate.Options(
     convert_case = True,
     text_type = annotate.TextType.bytes,
     include_reflection_data = True,
+    mutable = False,
+    cache = False,
+    lazy = False,
     )
 
 PKGDIR = py.path.local(capnpy.__file__).dirpath()
@@ -34,8 +40,12 @@ class BaseCompiler(object):
     annotate = False
     include_dirs = [str(PKGDIR)] # include "ptr.h"
 
-    def __init__(self, path):
+    def __init__(self, path, parser='capnp'):
+        if parser not in ('capnp', 'python'):
+            raise ValueError("parser can be only 'capnp' or 'python', not %r"
+                             % parser)
         self.path = [py.path.local(dirname) for dirname in path]
+        self.parser = parser
         self.capnproto_version = None
         self._tmpdir = None
 
@@ -55,20 +65,115 @@ class BaseCompiler(object):
         return pyx
 
     def _parse_schema_file(self, filename):
+        if self.parser == 'python':
+            return self._python_parse(filename)
         data = self._capnp_compile(filename)
         request = loads(data, schema.CodeGeneratorRequest)
         return request
 
-    def generate_py_source(self, filename, pyx, options):
-        request = self._parse_schema_file(filename)
-        default_options = DEFAULT_OPTIONS
-        if options is not None:
-            default_options = default_options.combine(options)
+    def _parse_schema_files(self, filenames):
+        """
+        Return a list of CodeGeneratorRequests, one for each of the given
+        schemas. With the capnp parser, all the schemas are compiled by a
+        single invocation of ``capnp compile``.
+        """
+        if self.parser == 'python' or len(filenames) == 1:
+            return [self._parse_schema_file(f) for f in filenames]
+        try:
+            data = self._capnp_compile(*filenames)
+        except CompilerError:
+            # schemas which can be compiled separately cannot always be
+            # compiled together (e.g., if two of them have the same ID):
+            # compile them one by one, which also reports the errors for
+            # the right file
+            return [self._parse_schema_file(f) for f in filenames]
+        request = loads(data, schema.CodeGeneratorRequest)
+        return request.split()
+
+    def _compile_schema_file(self, filename):
+        """
+        Return the CodeGeneratorRequest for the given schema, serialized as
+        it is emitted by ``capnp compile -o-``
+        """
+        if self.parser == 'python':
+            return dumps(self._python_parse(filename))
+        return self._capnp_compile(filename)
+
+    def _python_parse(self, filename):
+        # imported lazily, because it is not needed by the default parser
+        from capnpy.compiler.parser import SchemaParser
+        return SchemaParser(self.path).parse(filename)
+
+    def _combine_options(self, options):
+        if options is None:
+            return DEFAULT_OPTIONS
+        return DEFAULT_OPTIONS.combine(options)
+
+    def generate_py_source(self, filename, pyx, options, request=None):
+        if request is None:
+            request = self._parse_schema_file(filename)
+        default_options = self._combine_options(options)
         m = ModuleGenerator(request, pyx, self.standalone, default_options,
                             self.capnproto_version)
         src = m.generate()
         return m, py.code.Source(src)
 
+    def _get_dependencies(self, filename, request):
+        """
+        Return the files which the given schema depends on: the schema itself
+        and all the files which it imports, recursively. The files shipped
+        with capnp (in the capnp/ directory) are covered by the identity of
+        the capnp executable, so they are skipped if we cannot find them.
+
+        Raise ValueError if any other dependency cannot be found: in that
+        case, we cannot tell whether the schema needs to be recompiled.
+        """
+        deps = [filename]
+        names = []
+        for f in request.requestedFiles:
+            for imp in f.imports:
+                name = as_identifier(imp.name)
+                if name.startswith('/'):
+                    names.append(name.lstrip('/'))
+                else:
+                    dep = filename.dirpath().join(name)
+                    if dep.check(file=True) and dep not in deps:
+                        deps.append(dep)
+        #
+        # the files which capnp loaded are named relative to the directory
+        # from which the requested file was given (the current directory, or
+        # the root for absolute paths), or to the import path
+        requested = as_identifier(request.requestedFiles[0].filename)
+        if str(filename).endswith(requested):
+            root = py.path.local(str(filename)[:-len(requested)] or '/')
+        else:
+            root = py.path.local()
+        for node in request.nodes:
+            if node.is_file():
+                names.append(as_identifier(node.displayName))
+        for name in names:
+            dep = None
+            for dirpath in [root] + self.path:
+                f = dirpath.join(name)
+                if f.check(file=True):
+                    dep = f
+                    break
+            if dep is None:
+                if name.startswith('capnp/'):
+                    continue
+                raise ValueError("Cannot find %s, imported by %s" %
+                                 (name, filename))
+            if dep not in deps:
+                deps.append(dep)
+        return deps
+
+    def _find_file(self, importname):
+        for dirpath in self.path:
+            f = dirpath.join(importname)
+            if f.check(file=True):
+                return f
+        raise ValueError("Cannot find %s in the given path" % importname)
+
     def _pyx_to_dll(self, filename, m, src):
         from pyximport.pyxbuild import pyx_to_dll
         pyxname = filename.new(ext='pyx')
@@ -87,7 +192,7 @@ class BaseCompiler(object):
             os.system('xdg-open %s' % htmlfile)
         return dll
 
-    def _capnp_compile(self, filename):
+    def _capnp_compile(self, *filenames):
         capnp = py.path.local.sysfind('capnp')
         if capnp is None:
             raise CompilerError("Cannot find the capnp executable. Make sure it is "
@@ -98,10 +203,13 @@ class BaseCompiler(object):
         for dirname in self.path:
             if dirname.isdir():
                 cmd.append('-I%s' % dirname)
-        cmd.append(str(filename))
+        cmd += [str(filename) for filename in filenames]
         return self._exec(*cmd)
 
     def _capnp_check_version(self):
+        if self.capnproto_version is not None:
+            # already checked
+            return
         version = self._exec('capnp', '--version')
         version = as_identifier(version.strip())
         if not version.startswith("Cap'n Proto version"):
@@ -115,6 +223,21 @@ class BaseCompiler(object):
             raise CompilerError("The capnp executable is too old: the minimum required "
                                 "version is 0.5.0")
 
+    def _capnp_stamp(self):
+        """
+        Return something which identifies the capnp executable without
+        running it, i.e. its path, size and modification time; None if we
+        don't use capnp.
+        """
+        if self.parser != 'capnp':
+            return None
+        capnp = py.path.local.sysfind('capnp')
+        if capnp is None:
+            return None
+        capnp = capnp.realpath()
+        st = capnp.stat()
+        return (str(capnp), st.size, st.mtime)
+
     def _exec(self, *cmd):
         #print ' '.join(cmd)
         proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
@@ -128,13 +251,21 @@ class BaseCompiler(object):
 
 class DynamicCompiler(BaseCompiler):
     """
-    A compiler to compile and load schemas on the fly
+    A compiler to compile and load schemas on the fly.
+
+    If ``cache_dir`` is given, the compiled modules are stored there and
+    reused by the next processes, as long as neither the schema nor its
+    imports change: see capnpy.compiler.cache.
+
+    If ``parser`` is ``'python'``, the schemas are parsed in-process by
+    capnpy.compiler.parser instead of running the capnp executable.
     """
 
     standalone = False
 
-    def __init__(self, path):
-        BaseCompiler.__init__(self, path)
+    def __init__(self, path, cache_dir=None, parser='capnp'):
+        BaseCompiler.__init__(self, path, parser)
+        self.cache_dir = cache_dir
         self.modules = {}
         self.add_module(annotate)
 
@@ -185,17 +316,58 @@ class DynamicCompiler(BaseCompiler):
             return mod
 
     def _compile_file(self, filename, pyx, options):
+        if self.cache_dir is not None:
+            return self._compile_file_cached(filename, pyx, options)
         m, src = self.generate_py_source(filename, pyx, options)
         if pyx:
             return self._compile_pyx(filename, m, src)
         else:
             return self._compile_py(filename, m, src)
 
+    def _compile_file_cached(self, filename, pyx, options):
+        cache = SchemaCache(self.cache_dir)
+        # we identify capnp by its executable instead of its version, so that
+        # we run it only on a cache miss
+        key = cache.get_key(filename, pyx, self._combine_options(options),
+                            self._capnp_stamp(), self.path)
+        entry = cache.lookup(key)
+        if entry is None:
+            data = self._compile_schema_file(filename)
+            request = loads(data, schema.CodeGeneratorRequest)
+            m, src = self.generate_py_source(filename, pyx, options, request)
+            try:
+                deps = self._get_dependencies(filename, request)
+            except ValueError:
+                # we cannot tell when the entry becomes stale: don't store it
+                if pyx:
+                    return self._compile_pyx(filename, m, src)
+                else:
+                    return self._compile_py(filename, m, src)
+            if pyx:
+                dll = py.path.local(self._pyx_to_dll(filename, m, src))
+                module_data = dll.read_binary()
+                # keep the whole extension suffix, e.g. .cpython-38-x86_64-linux-gnu.so
+                module_ext = dll.basename[dll.basename.index('.'):]
+            else:
+                module_data = str(src).encode('utf-8')
+                module_ext = '.py'
+            entry = cache.store(key, m.modname, m.tmpname, deps, data,
+                                module_data, module_ext)
+        if pyx:
+            return self._load_dll(filename, entry.modname, entry.tmpname,
+                                  entry.module)
+        else:
+            src = py.code.Source(entry.module.read_binary().decode('utf-8'))
+            return self._load_py(filename, entry.modname, src)
+
     def _compile_py(self, filename, m, src):
         """
         Compile and load the schema as pure python
         """
-        mod = types.ModuleType(m.modname)
+        return self._load_py(filename, m.modname, src)
+
+    def _load_py(self, filename, modname, src):
+        mod = types.ModuleType(modname)
         mod.__file__ = str(filename)
         mod.__schema__ = str(filename)
         mod.__source__ = str(src)
@@ -207,8 +379,6 @@ class DynamicCompiler(BaseCompiler):
         """
         Use Cython to compile the schema
         """
-        import capnpy.ext # the package which we will load the .so in
-        import imp
         #
         # the generated file needs a reference to __compiler to be able to
         # import other schemas. In pure-python mode, we simply inject
@@ -223,11 +393,16 @@ class DynamicCompiler(BaseCompiler):
         #     from foo_tmp import __compiler
         #
         dll = self._pyx_to_dll(filename, m, src)
-        tmpmod = types.ModuleType(m.tmpname)
+        return self._load_dll(filename, m.modname, m.tmpname, dll)
+
+    def _load_dll(self, filename, modname, tmpname, dll):
+        import capnpy.ext # the package which we will load the .so in
+        import imp
+        tmpmod = types.ModuleType(tmpname)
         tmpmod.__dict__['__compiler'] = self
         tmpmod.__dict__['__schema__'] = str(filename)
-        sys.modules[m.tmpname] = tmpmod
-        modname = 'capnpy.ext.%s' % m.modname
+        sys.modules[tmpname] = tmpmod
+        modname = 'capnpy.ext.%s' % modname
         mod = imp.load_dynamic(modname, str(dll))
         #
         # clean-up the cluttered sys.modules
@@ -250,13 +425,6 @@ class DynamicCompiler(BaseCompiler):
         else:
             return py.path.local(filename)
 
-    def _find_file(self, importname):
-        for dirpath in self.path:
-            f = dirpath.join(importname)
-            if f.check(file=True):
-                return f
-        raise ValueError("Cannot find %s in the given path" % importname)
-
 
 class StandaloneCompiler(BaseCompiler):
     """
@@ -289,23 +457,130 @@ class StandaloneCompiler(BaseCompiler):
 class DistutilsCompiler(BaseCompiler):
     """
     Compiler for integration with distutils: it generates .py/.pyx files,
-    which (in case of pyx files) are then handled by cythonize
+    which (in case of pyx files) are then handled by cythonize.
+
+    Next to each generated file, it writes a manifest (e.g.
+    example.py.deps.json) which records the files the schema depends on, with
+    the hash of their content, and everything else which influences the
+    generated code: the schema is recompiled only if any of them changes.
     """
     standalone = True
 
     def compile(self, filename, pyx='auto', options=None):
+        return self.compile_many([filename], pyx, options)[0]
+
+    def compile_many(self, filenames, pyx='auto', options=None, workers=1):
+        """
+        Compile the given schemas and return the list of the generated
+        files. The schemas which are already up to date are not recompiled.
+
+        If ``workers`` is greater than 1, the schemas are split into chunks
+        which are compiled in parallel by a pool of processes. Each chunk is
+        compiled by a single invocation of ``capnp compile``.
+        """
         pyx = self.getpyx(pyx)
-        infile = py.path.local(filename)
-        if pyx:
-            outfile = infile.new(ext='pyx')
-        else:
-            outfile = infile.new(ext='py')
+        infiles = [py.path.local(filename) for filename in filenames]
+        outfiles = [self._get_outfile(infile, pyx) for infile in infiles]
+        key = self._get_manifest_key(pyx, options)
+        hashes = {}
+        todo = []
+        for infile, outfile in zip(infiles, outfiles):
+            if self._is_up_to_date(outfile, key, hashes):
+                # already compiled
+                continue
+            todo.append(infile)
         #
-        if outfile.exists() and outfile.mtime() > infile.mtime():
-            # already compiled
-            return outfile
         cwd = py.path.local('.')
-        print('[capnpy] Compiling', infile.relto(cwd))
-        m, src = self.generate_py_source(infile, pyx, options)
-        outfile.write(src)
-        return outfile
+        for infile in todo:
+            print('[capnpy] Compiling', infile.relto(cwd))
+        workers = min(workers, len(todo))
+        if workers > 1:
+            path = [str(dirname) for dirname in self.path]
+            tasks = [(path, self.parser, todo[i::workers], pyx, options)
+                     for i in range(workers)]
+            pool = _make_pool(workers)
+            try:
+                pool.map(_compile_chunk, tasks)
+                pool.close()
+            finally:
+                pool.terminate()
+                pool.join()
+        elif todo:
+            self._compile_chunk(todo, pyx, options)
+        return outfiles
+
+    def _get_outfile(self, infile, pyx):
+        if pyx:
+            return infile.new(ext='pyx')
+        else:
+            return infile.new(ext='py')
+
+    def _get_manifest(self, outfile):
+        return outfile.new(basename=outfile.basename + '.deps.json')
+
+    def _get_manifest_key(self, pyx, options):
+        # everything which influences the generated code, apart from the
+        # content of the schema and of its dependencies
+        return dict(capnpy_version=capnpy.__version__,
+                    pyx=bool(pyx),
+                    parser=self.parser,
+                    options=self._combine_options(options).shortrepr())
+
+    def _is_up_to_date(self, outfile, key, hashes):
+        """
+        Check whether outfile was generated with the given key and none of
+        its dependencies has changed. ``hashes`` caches the hashes of the
+        files, which are often shared by many schemas.
+        """
+        if not outfile.check(file=True):
+            return False
+        try:
+            manifest = json.loads(self._get_manifest(outfile).read())
+        except (py.error.ENOENT, ValueError):
+            return False
+        if manifest.get('key') != key:
+            return False
+        for path, digest in manifest['deps']:
+            if path not in hashes:
+                hashes[path] = hash_file(path)
+            if hashes[path] != digest:
+                return False
+        return True
+
+    def _compile_chunk(self, infiles, pyx, options):
+        key = self._get_manifest_key(pyx, options)
+        requests = self._parse_schema_files(infiles)
+        for infile, request in zip(infiles, requests):
+            m, src = self.generate_py_source(infile, pyx, options, request)
+            outfile = self._get_outfile(infile, pyx)
+            outfile.write(src)
+            # the manifest is written last: if we are interrupted before,
+            # the file will be compiled again
+            manifest_file = self._get_manifest(outfile)
+            try:
+                deps = self._get_dependencies(infile, request)
+            except ValueError:
+                # we cannot tell when outfile becomes stale: without a
+                # manifest, it is compiled again every time
+                if manifest_file.check():
+                    manifest_file.remove()
+                continue
+            manifest = dict(key=key,
+                            deps=[(str(path), hash_file(path))
+                                  for path in deps])
+            manifest_file.write(json.dumps(manifest, indent=4))
+
+
+def _make_pool(workers):
+    if PY3 and sys.platform != 'win32':
+        # use fork even where it is not the default (e.g. on macOS): with
+        # spawn, each worker would re-execute the setup.py which called
+        # capnpify
+        return multiprocessing.get_context('fork').Pool(workers)
+    return multiprocessing.Pool(workers)
+
+def _compile_chunk(args):
+    # executed by the workers of DistutilsCompiler.compile_many
+    path, parser, infiles, pyx, options = args
+    compiler = DistutilsCompiler(path, parser=parser)
+    compiler._compile_chunk(infiles, pyx, options)
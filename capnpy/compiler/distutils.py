@@ -3,6 +3,7 @@ import py
 import sys
 import glob
 import warnings
+import multiprocessing
 from distutils.core import Extension
 from capnpy.compiler.compiler import DistutilsCompiler
 from capnpy import annotate
@@ -14,26 +15,36 @@ except ImportError:
 # setuptools entry-points
 def capnpy_options(dist, attr, value):
     for opt in value:
-        if opt != 'pyx' and opt not in annotate.Options.FIELDS:
+        if opt not in ('pyx', 'parser', 'workers') and opt not in annotate.Options.FIELDS:
             warnings.warn('Unknown capnpy option: %s' % opt)
 
 def capnpy_schemas(dist, attr, schemas):
     assert attr == 'capnpy_schemas'
     option_dict = dist.capnpy_options or {}
     pyx = option_dict.pop('pyx', 'auto')
+    parser = option_dict.pop('parser', 'capnp')
+    workers = option_dict.pop('workers', None)
     options = annotate.Options.from_dict(option_dict)
     if dist.ext_modules is None:
         dist.ext_modules = []
-    dist.ext_modules += capnpify(schemas, pyx, options)
+    dist.ext_modules += capnpify(schemas, pyx, options, parser, workers)
 
-def capnpify(files, pyx='auto', options=None):
+def capnpify(files, pyx='auto', options=None, parser='capnp', workers=None):
+    """
+    Compile the given schemas and return the list of Extensions to pass to
+    setup(). The schemas are compiled in parallel by a pool of ``workers``
+    processes (by default, one for each CPU), which is also used by
+    cythonize.
+    """
     cwd = py.path.local('.')
     if isinstance(files, str):
         files = glob.glob(files)
         if files == []:
             raise ValueError("'%s' did not match any files" % files)
-    compiler = DistutilsCompiler(sys.path)
-    outfiles = [compiler.compile(f, pyx, options) for f in files]
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    compiler = DistutilsCompiler(sys.path, parser=parser)
+    outfiles = compiler.compile_many(files, pyx, options, workers)
     outfiles = [outf.relto(cwd) for outf in outfiles]
     #
     if compiler.getpyx(pyx):
@@ -42,7 +53,9 @@ def capnpify(files, pyx='auto', options=None):
             ext = Extension('*', [str(f)],
                             include_dirs=compiler.include_dirs)
             exts.append(ext)
-        exts = cythonize(exts)
+        # cythonize creates a pool even if nthreads == 1
+        nthreads = workers if workers > 1 else 0
+        exts = cythonize(exts, nthreads=nthreads)
         return exts
     else:
         return []
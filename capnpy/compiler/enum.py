@@ -13,8 +13,10 @@ class Node__Enum:
 
     def emit_declaration(self, m):
         name =  self.compile_name(m)
-        items = [m.py_field_name(item) for item in self.get_enum_enumerants()]
-        m.declare_enum(name, self.shortname(m), self.id, items)
+        enumerants = self.get_enum_enumerants()
+        items = [m.py_field_name(item) for item in enumerants]
+        capnp_items = [m.capnp_field_name(item) for item in enumerants]
+        m.declare_enum(name, self.shortname(m), self.id, items, capnp_items)
         m.w('_{name}_list_item_type = _EnumItemType({name})', name=name)
         m.w()
 
@@ -17,8 +17,34 @@ class Field:
             ns.ensure_union = 'self._ensure_union(%s)' % self.discriminantValue
         else:
             ns.ensure_union = '# no union check'
+        # we compute it here because fields overridden by $Py.group don't
+        # have their own options
+        ns.cache = m.options(self).cache
         self._emit(m, ns, name)
 
+    def _def_cached_property(self, m, ns, name, src):
+        """
+        Like m.def_property, but if the "cache" option is enabled the result
+        is computed only once and stored in a per-instance slot. Note that
+        None is never cached, but computing it is cheap anyway.
+        """
+        if not ns.cache:
+            m.def_property(ns, name, src)
+            return
+        ns.cachename = '_cache_' + name
+        if m.pyx:
+            ns.w('cdef object {cachename}')
+        else:
+            ns.w('{cachename} = None')
+        with ns.block('{cpdef} _uncached_{name}(self):', name=name):
+            ns.ww(src)
+        ns.w()
+        m.def_property(ns, name, """
+            if self.{cachename} is None:
+                self.{cachename} = self._uncached_{name}()
+            return self.{cachename}
+        """)
+
 
 @schema.Field__Slot.__extend__
 class Field__Slot:
@@ -77,6 +103,12 @@ class Field__Slot:
                 value = value ^ {default_}
             return value
         """)
+        if m.options(self).mutable:
+            self._emit_setter(m, ns, name, """
+                if {default_} != 0:
+                    value = value ^ {default_}
+                self._write_primitive({offset}, {ifmt}, value)
+            """)
 
     def _emit_bool(self, m, ns, name):
         byteoffset, bitoffset = divmod(self.slot.offset, 8)
@@ -90,6 +122,10 @@ class Field__Slot:
                 value = value ^ {default_}
             return value
         """)
+        if m.options(self).mutable:
+            self._emit_setter(m, ns, name, """
+                self._write_bit({offset}, {bitmask}, bool(value) != {default_})
+            """)
 
     def _emit_enum(self, m, ns, name):
         ns.enumcls = self.slot.type.compile_name(m)
@@ -104,10 +140,25 @@ class Field__Slot:
                 value = (value ^ {default_})
             return {enumcls}.{newf}(value)
         """)
+        if m.options(self).mutable:
+            self._emit_setter(m, ns, name, """
+                value = int(value)
+                if {default_} != 0:
+                    value = (value ^ {default_})
+                self._write_primitive({offset}, ord('H'), value)
+            """)
+
+    def _emit_setter(self, m, ns, name, body):
+        # emit a set_{name} method which writes the value directly into the
+        # buffer; this is enabled by the "mutable" option
+        with ns.block('{cpdef} set_{name}(self, value):', name=name):
+            ns.w('{ensure_union}')
+            ns.ww(body)
+        ns.w()
 
     def _emit_text_bytes(self, m, ns, name):
         ns.name = name
-        m.def_property(ns, name, """
+        self._def_cached_property(m, ns, name, """
             {ensure_union}
             return self._read_text_bytes({offset})
         """)
@@ -120,7 +171,7 @@ class Field__Slot:
 
     def _emit_text_unicode(self, m, ns, name):
         ns.name = name
-        m.def_property(ns, name, """
+        self._def_cached_property(m, ns, name, """
             {ensure_union}
             return self._read_text_unicode({offset})
         """)
@@ -133,7 +184,7 @@ class Field__Slot:
 
     def _emit_data(self, m, ns, name):
         ns.name = name
-        m.def_property(ns, name, """
+        self._def_cached_property(m, ns, name, """
             {ensure_union}
             return self._read_data({offset})
         """)
@@ -158,7 +209,7 @@ class Field__Slot:
             ns.cdef_offset = 'offset'
             ns.cdef_p = 'p'
             ns.cdef_obj = 'obj'
-        m.def_property(ns, name, """
+        self._def_cached_property(m, ns, name, """
             {ensure_union}
             {cdef_offset} = {offset}
             {cdef_p} = self._read_fast_ptr(offset)
@@ -187,7 +238,7 @@ class Field__Slot:
         ns.name = name
         t = self.slot.type.list.elementType
         ns.list_item_type = t.list_item_type(m, options)
-        m.def_property(ns, name, """
+        self._def_cached_property(m, ns, name, """
             {ensure_union}
             return self._read_list({offset}, {list_item_type})
         """)
@@ -239,7 +290,7 @@ class Field__Group:
             """)
             name = ns.privname
         #
-        m.def_property(ns, name, """
+        self._def_cached_property(m, ns, name, """
             {ensure_union}
             obj = {groupcls}.__new__({groupcls})
             _Struct._init_from_buffer(obj, self._seg, self._data_offset,
@@ -0,0 +1,151 @@
+"""
+Support for the ``lazy`` option.
+
+Normally, all the classes of a module are created at import time. When
+``lazy`` is enabled, the code of each top-level node is emitted inside its own
+``_define_*`` function, which is called only when one of the names it defines
+is accessed for the first time (see capnpy.util.LazyDefinitions).
+
+Since the generated methods look up the other classes as globals, a function
+can be called only together with the functions defining all the names which
+it uses (transitively). To compute these dependencies, we look at the AST of
+the generated code.
+"""
+
+import ast
+
+
+class LazyGroup(object):
+
+    def __init__(self, funcname):
+        self.funcname = funcname
+        self.names = []             # the global names defined by the group
+        self.uses = set()           # the names used anywhere in the group
+        self.deftime_uses = set()   # the names used while defining the group
+        self.deps = ()              # indexes of the groups which we need
+
+
+class NameCollector(ast.NodeVisitor):
+
+    def __init__(self):
+        self.uses = set()
+        self.deftime_uses = set()
+        self.in_function = 0
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load):
+            self.uses.add(node.id)
+            if not self.in_function:
+                self.deftime_uses.add(node.id)
+
+    def visit_FunctionDef(self, node):
+        # the decorators and the default values of the arguments are
+        # evaluated when the function is defined, the body only when it is
+        # called
+        for expr in node.decorator_list:
+            self.visit(expr)
+        self.visit(node.args)
+        self.in_function += 1
+        for stmt in node.body:
+            self.visit(stmt)
+        self.in_function -= 1
+
+    def visit_Lambda(self, node):
+        self.visit(node.args)
+        self.in_function += 1
+        self.visit(node.body)
+        self.in_function -= 1
+
+
+def get_defined_names(stmt):
+    if isinstance(stmt, (ast.ClassDef, ast.FunctionDef)):
+        return [stmt.name]
+    elif isinstance(stmt, ast.Assign):
+        return [target.id for target in stmt.targets
+                if isinstance(target, ast.Name)]
+    elif isinstance(stmt, (ast.Import, ast.ImportFrom)):
+        return [alias.asname or alias.name for alias in stmt.names]
+    return []
+
+
+def emit_group(m, funcname, emit):
+    """
+    Call ``emit()`` to write the code of the group inside the function
+    ``funcname``, and return the corresponding LazyGroup (or None, if emit()
+    did not write anything).
+    """
+    lines = m.code._lines
+    start = len(lines)
+    with m.block('def {funcname}():', funcname=funcname):
+        emit()
+    funcdef = ast.parse('\n'.join(lines[start:])).body[0]
+    group = LazyGroup(funcname)
+    for stmt in funcdef.body:
+        for name in get_defined_names(stmt):
+            if name not in group.names:
+                group.names.append(name)
+    if not group.names:
+        del lines[start:]
+        return None
+    collector = NameCollector()
+    for stmt in funcdef.body:
+        collector.visit(stmt)
+    group.uses = collector.uses
+    group.deftime_uses = collector.deftime_uses
+    #
+    # the names are defined directly in the module: by declaring them global
+    # we also get the same __qualname__ as in the non-lazy case, which is
+    # needed e.g. by pickle
+    indent = lines[start][:len(lines[start]) - len(lines[start].lstrip())]
+    lines.insert(start+1, '%s    global %s' % (indent, ', '.join(group.names)))
+    return group
+
+
+def sort_groups(groups):
+    """
+    Compute the dependencies of each group, and sort them so that each group
+    comes after all the groups whose names it uses at definition time (e.g.,
+    consts need their struct). Return the sorted list.
+    """
+    owner = {}
+    for group in groups:
+        for name in group.names:
+            owner.setdefault(name, group)
+    #
+    def get_deps(group, names):
+        deps = set(owner[name] for name in names if name in owner)
+        deps.discard(group)
+        return deps
+    #
+    deftime_deps = dict((group, get_deps(group, group.deftime_uses))
+                        for group in groups)
+    result = []
+    done = set()
+    todo = list(groups)
+    while todo:
+        for group in todo:
+            if deftime_deps[group].issubset(done):
+                break
+        else:
+            raise ValueError('Circular dependency between the lazy definitions '
+                             'of: %s' % ', '.join(g.funcname for g in todo))
+        todo.remove(group)
+        result.append(group)
+        done.add(group)
+    #
+    index = dict((group, i) for i, group in enumerate(result))
+    for group in result:
+        group.deps = tuple(sorted(index[dep]
+                                  for dep in get_deps(group, group.uses)))
+    return result
+
+
+def emit_lazy_definitions(m, groups):
+    groups = sort_groups(groups)
+    m.w('_lazy = _LazyDefinitions(globals(), [')
+    for group in groups:
+        m.w('    ({funcname}, {names}, {deps}),', funcname=group.funcname,
+            names=tuple(group.names), deps=group.deps)
+    m.w('])')
+    m.w('__getattr__ = _lazy.getattr')
+    m.w('__dir__ = _lazy.dir')
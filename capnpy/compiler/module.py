@@ -169,13 +169,19 @@ class ModuleGenerator(object):
             return name + '_'
         return name
 
-    def declare_enum(self, compile_name, name, capnpy_id, items):
+    def declare_enum(self, compile_name, name, capnpy_id, items,
+                     capnp_items=None):
         # this method cannot go on Node__Enum because it's also called by
         # Node__Struct (for __tag__)
-        items = list(map(repr, items))
         ns = self.code.new_scope()
         ns.name = compile_name
         ns.capnpy_id = capnpy_id
+        if capnp_items is not None and capnp_items != items:
+            # the schema names are needed by capnpy.json
+            ns.capnp_members = "(%s,)" % (', '.join(map(repr, capnp_items)))
+        else:
+            ns.capnp_members = None
+        items = list(map(repr, items))
         ns.members = "(%s,)" % (', '.join(items))
         ns.prebuilt = [ns.format('{name}({i})', i=i)
                        for i in range(len(items))]
@@ -184,6 +190,8 @@ class ModuleGenerator(object):
         with ns.block("{cdef class} {name}(_BaseEnum):"):
             ns.w("__capnpy_id__ = {capnpy_id}")
             ns.w("__members__ = {members}")
+            if ns.capnp_members:
+                ns.w("__capnp_members__ = {capnp_members}")
             #
             # define the _new staticmethod, to create new instances.
             if self.pyx:
@@ -0,0 +1,1512 @@
+"""
+A pure-Python parser for the capnproto schema language.
+
+SchemaParser.parse() produces the same schema.CodeGeneratorRequest which is
+emitted by ``capnp compile -o-``, so that schemas can be compiled without the
+capnp executable. It supports the subset of the language which capnpy can
+compile: structs, groups, unions, enums, constants, annotations and imports.
+Interfaces and generics are not supported.
+
+The ids and the layout of the structs follow exactly the rules of the
+reference implementation (see compiler/node-translator.c++ in capnproto):
+
+  - the id of a nested declaration without an explicit id is computed from
+    the id of its parent and its name; the id of a group from the id of its
+    parent and its index in the list of fields
+
+  - the fields are allocated in ordinal order, filling the holes left by
+    the smaller fields; the members of a union share the space, which is
+    expanded when needed
+
+Like capnp, the request contains all the nodes of the requested file, but
+only the nodes of the imported files which are used (transitively), together
+with their parents.
+"""
+
+from __future__ import absolute_import
+import re
+import struct
+import hashlib
+import py
+import six
+
+from capnpy import ptr
+from capnpy import schema
+from capnpy.type import Types
+from capnpy.list import PrimitiveItemType, BoolItemType, VoidItemType
+from capnpy.segment.builder import SegmentBuilder
+from capnpy.compiler.compiler import CompilerError
+
+
+# ============================================================
+# lexer
+# ============================================================
+
+_TOKEN_RE = re.compile(r'''
+    (?P<space>  [ \t\r\n]+ | \#[^\n]* )
+  | (?P<data>   0x"[0-9a-fA-F \t\r\n]*" )
+  | (?P<number> 0[xX][0-9a-fA-F]+ | [0-9]+(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)? )
+  | (?P<string> "(?:[^"\\\n]|\\.)*" )
+  | (?P<name>   [A-Za-z_][A-Za-z0-9_]* )
+  | (?P<punct>  [@:;=(){}\[\],.$*-] )
+''', re.VERBOSE)
+
+_ESCAPES = {'a': b'\a', 'b': b'\b', 'f': b'\f', 'n': b'\n', 'r': b'\r',
+            't': b'\t', 'v': b'\v', '\\': b'\\', "'": b"'", '"': b'"',
+            '?': b'?'}
+
+class Token(object):
+
+    def __init__(self, kind, value, lineno):
+        self.kind = kind
+        self.value = value
+        self.lineno = lineno
+
+    def __repr__(self):
+        return '<Token %s %r>' % (self.kind, self.value)
+
+
+def tokenize(src, filename):
+    tokens = []
+    pos = 0
+    lineno = 1
+    while pos < len(src):
+        match = _TOKEN_RE.match(src, pos)
+        if match is None:
+            raise CompilerError('%s:%d: error: Parse error at %r' %
+                                (filename, lineno, src[pos:pos+10]))
+        kind = match.lastgroup
+        text = match.group()
+        if kind != 'space':
+            tokens.append(Token(kind, text, lineno))
+        lineno += text.count('\n')
+        pos = match.end()
+    tokens.append(Token('eof', None, lineno))
+    return tokens
+
+def _unescape(s):
+    # s is the body of a string literal, without the quotes
+    res = []
+    i = 0
+    while i < len(s):
+        ch = s[i]
+        if ch != '\\':
+            res.append(ch.encode('utf-8'))
+            i += 1
+            continue
+        ch = s[i+1]
+        if ch in _ESCAPES:
+            res.append(_ESCAPES[ch])
+            i += 2
+        elif ch == 'x':
+            m = re.match('[0-9a-fA-F]{1,2}', s[i+2:])
+            res.append(six.int2byte(int(m.group(), 16)))
+            i += 2 + len(m.group())
+        else:
+            m = re.match('[0-7]{1,3}', s[i+1:])
+            if m is None:
+                raise ValueError('invalid escape sequence: \\%s' % ch)
+            res.append(six.int2byte(int(m.group(), 8) & 0xff))
+            i += 1 + len(m.group())
+    return b''.join(res)
+
+
+# ============================================================
+# declarations
+# ============================================================
+
+class Decl(object):
+    """
+    A declaration of the schema: kind is one of 'file', 'struct', 'enum',
+    'const', 'annotation'. The nested declarations and the aliases
+    introduced by ``using`` are stored in self.names.
+    """
+
+    def __init__(self, kind, name, parent, lineno):
+        self.kind = kind
+        self.name = name
+        self.parent = parent
+        self.lineno = lineno
+        self.id = None
+        self.annotations = []
+        self.nested = []
+        self.names = {} # name -> Decl or Alias
+        self.members = []     # struct only: Field and Group, in code order
+        self.enumerants = []  # enum only: (name, ordinal, annotations)
+        self.type_expr = None # const and annotation only
+        self.value = None     # const only
+        self.targets = None   # annotation only
+        self.layout = None    # struct only, see StructTranslator
+
+    def get_file(self):
+        decl = self
+        while decl.kind != 'file':
+            decl = decl.parent
+        return decl
+
+    def add(self, decl):
+        self._check_name(decl.name, decl.lineno)
+        self.nested.append(decl)
+        self.names[decl.name] = decl
+
+    def add_alias(self, name, expr, lineno):
+        self._check_name(name, lineno)
+        self.names[name] = Alias(expr, self)
+
+    def _check_name(self, name, lineno):
+        if name in self.names:
+            raise self.get_file().error(lineno, "'%s' is already defined" % name)
+
+    def get_display_name(self):
+        if self.kind == 'file':
+            return self.display_name
+        parent = self.parent.get_display_name()
+        sep = ':' if self.parent.kind == 'file' else '.'
+        return parent + sep + self.name
+
+
+class FileDecl(Decl):
+
+    def __init__(self, path, display_name):
+        Decl.__init__(self, 'file', display_name, None, 0)
+        self.path = path
+        self.display_name = display_name
+        self.imports = [] # (name, lineno), in order of appearance
+        self.resolved_imports = {} # name -> FileDecl
+        self.used = False
+
+    def error(self, lineno, message):
+        return CompilerError('%s:%d: error: %s' % (self.path, lineno, message))
+
+
+class Alias(object):
+
+    def __init__(self, expr, scope):
+        self.expr = expr
+        self.scope = scope
+
+
+class Field(object):
+
+    def __init__(self, name, ordinal, type_expr, default, annotations, lineno):
+        self.name = name
+        self.ordinal = ordinal
+        self.type_expr = type_expr
+        self.default = default
+        self.annotations = annotations
+        self.lineno = lineno
+
+
+class Group(object):
+    """
+    A group or a union. Unnamed unions have name == None
+    """
+
+    def __init__(self, name, is_union, annotations, lineno):
+        self.name = name
+        self.is_union = is_union
+        self.annotations = annotations
+        self.lineno = lineno
+        self.members = []
+
+
+# ============================================================
+# parser
+# ============================================================
+
+class Parser(object):
+
+    def __init__(self, filedecl, src):
+        self.file = filedecl
+        self.tokens = tokenize(src, filedecl.path)
+        self.i = 0
+
+    def error(self, message, token=None):
+        if token is None:
+            token = self.peek()
+        return self.file.error(token.lineno, message)
+
+    def peek(self, n=0):
+        return self.tokens[min(self.i + n, len(self.tokens) - 1)]
+
+    def next(self):
+        tok = self.tokens[self.i]
+        if tok.kind != 'eof':
+            self.i += 1
+        return tok
+
+    def accept(self, value):
+        tok = self.peek()
+        if tok.kind in ('punct', 'name') and tok.value == value:
+            return self.next()
+        return None
+
+    def expect(self, value):
+        tok = self.accept(value)
+        if tok is None:
+            raise self.error("Parse error: expected '%s', got %r" %
+                             (value, self.peek().value))
+        return tok
+
+    def expect_kind(self, kind):
+        tok = self.peek()
+        if tok.kind != kind:
+            raise self.error("Parse error: expected %s, got %r" %
+                             (kind, tok.value))
+        return self.next()
+
+    def at_decl(self):
+        # keywords can be used as names of fields and enumerants, e.g.
+        # "struct :group { ... }" or "struct @1;"
+        return (self.peek().value in DECL_KEYWORDS and
+                self.peek(1).kind == 'name')
+
+    def parse_file(self):
+        f = self.file
+        while self.peek().kind != 'eof':
+            if self.accept('@'):
+                f.id = self.parse_id_number()
+                self.expect(';')
+            elif self.peek().value == '$':
+                f.annotations += self.parse_annotations()
+                self.expect(';')
+            else:
+                self.parse_decl(f)
+        if f.id is None:
+            raise f.error(1, "File does not declare an ID")
+
+    def parse_id_number(self):
+        tok = self.expect_kind('number')
+        if not tok.value.lower().startswith('0x'):
+            raise self.error("Invalid ID: %s" % tok.value, tok)
+        n = int(tok.value, 16)
+        if not n & (1 << 63):
+            raise self.error("Invalid ID.  Please generate a new one with "
+                             "'capnpy id'.", tok)
+        return n
+
+    def parse_id(self):
+        if self.accept('@'):
+            return self.parse_id_number()
+        return None
+
+    def parse_decl(self, scope):
+        tok = self.peek()
+        if tok.value == 'using':
+            self.parse_using(scope)
+        elif tok.value in ('struct', 'enum', 'const', 'annotation'):
+            kind = self.next().value
+            name = self.expect_kind('name').value
+            decl = Decl(kind, name, scope, tok.lineno)
+            decl.id = self.parse_id()
+            getattr(self, 'parse_' + kind)(decl)
+            scope.add(decl)
+        elif tok.value == 'interface':
+            raise self.error("interfaces are not supported by the pure-Python "
+                             "schema parser")
+        else:
+            raise self.error("Parse error: unexpected %r" % tok.value)
+
+    def parse_using(self, scope):
+        # using Name = expr;  or  using expr;
+        tok = self.expect('using')
+        if self.peek(1).value == '=':
+            name = self.expect_kind('name').value
+            self.expect('=')
+            expr = self.parse_name_expr()
+        else:
+            expr = self.parse_name_expr()
+            if not expr[2]:
+                raise self.error("Parse error: 'using' needs a name", tok)
+            name = expr[2][-1]
+        self.expect(';')
+        scope.add_alias(name, expr, tok.lineno)
+
+    def parse_struct(self, decl):
+        decl.annotations = self.parse_annotations()
+        self.expect('{')
+        decl.members = self.parse_members(decl, allow_decls=True)
+
+    def parse_members(self, decl, allow_decls):
+        members = []
+        while not self.accept('}'):
+            tok = self.peek()
+            if self.at_decl():
+                if not allow_decls:
+                    raise self.error("Groups and unions can contain only fields")
+                self.parse_decl(decl)
+            elif tok.value == 'union' and self.peek(1).value == '{':
+                self.next()
+                self.next()
+                group = Group(None, True, [], tok.lineno)
+                group.members = self.parse_members(decl, allow_decls=False)
+                members.append(group)
+            else:
+                members.append(self.parse_member(decl))
+        return members
+
+    def parse_member(self, decl):
+        tok = self.expect_kind('name')
+        name = tok.value
+        if self.accept('@'):
+            ordinal = int(self.expect_kind('number').value)
+            self.expect(':')
+            type_expr = self.parse_type()
+            default = None
+            if self.accept('='):
+                default = self.parse_value()
+            annotations = self.parse_annotations()
+            self.expect(';')
+            return Field(name, ordinal, type_expr, default, annotations,
+                         tok.lineno)
+        self.expect(':')
+        kind = self.expect_kind('name').value
+        if kind not in ('group', 'union'):
+            raise self.error("Parse error: expected field ordinal, group or "
+                             "union")
+        group = Group(name, kind == 'union', self.parse_annotations(), tok.lineno)
+        self.expect('{')
+        group.members = self.parse_members(decl, allow_decls=False)
+        return group
+
+    def parse_enum(self, decl):
+        decl.annotations = self.parse_annotations()
+        self.expect('{')
+        while not self.accept('}'):
+            if self.at_decl():
+                raise self.error("Enums can contain only enumerants")
+            name = self.expect_kind('name').value
+            self.expect('@')
+            ordinal = int(self.expect_kind('number').value)
+            annotations = self.parse_annotations()
+            self.expect(';')
+            decl.enumerants.append((name, ordinal, annotations))
+
+    def parse_const(self, decl):
+        self.expect(':')
+        decl.type_expr = self.parse_type()
+        self.expect('=')
+        decl.value = self.parse_value()
+        decl.annotations = self.parse_annotations()
+        self.expect(';')
+
+    def parse_annotation(self, decl):
+        self.expect('(')
+        targets = []
+        while True:
+            tok = self.next()
+            if tok.value not in ANNOTATION_TARGETS and tok.value != '*':
+                raise self.error("Unknown annotation target: %s" % tok.value, tok)
+            targets.append(tok.value)
+            if not self.accept(','):
+                break
+        self.expect(')')
+        if '*' in targets:
+            targets = list(ANNOTATION_TARGETS)
+        decl.targets = targets
+        self.expect(':')
+        decl.type_expr = self.parse_type()
+        decl.annotations = self.parse_annotations()
+        self.expect(';')
+
+    def parse_annotations(self):
+        annotations = []
+        while self.peek().value == '$':
+            tok = self.next()
+            expr = self.parse_name_expr()
+            value = None
+            if self.accept('('):
+                if self.accept(')'):
+                    value = ('name', False, ['void'])
+                elif self.peek().kind == 'name' and self.peek(1).value == '=':
+                    value = self.parse_struct_items(')')
+                else:
+                    value = self.parse_value()
+                    self.expect(')')
+            annotations.append((expr, value, tok.lineno))
+        return annotations
+
+    def parse_name_expr(self):
+        """
+        Return a name expression, in one of the following forms:
+            ('name', absolute, [parts])
+            ('import', filename, [parts])
+        """
+        if self.accept('import'):
+            tok = self.expect_kind('string')
+            filename = _unescape(tok.value[1:-1]).decode('utf-8')
+            self.file.imports.append((filename, tok.lineno))
+            parts = []
+            while self.accept('.'):
+                parts.append(self.expect_kind('name').value)
+            return ('import', filename, parts)
+        absolute = bool(self.accept('.'))
+        parts = [self.expect_kind('name').value]
+        while self.accept('.'):
+            parts.append(self.expect_kind('name').value)
+        return ('name', absolute, parts)
+
+    def parse_type(self):
+        expr = self.parse_name_expr()
+        if self.accept('('):
+            if expr != ('name', False, ['List']):
+                raise self.error("generics are not supported by the "
+                                 "pure-Python schema parser")
+            item = self.parse_type()
+            self.expect(')')
+            return ('list', item)
+        return expr
+
+    def parse_value(self):
+        """
+        Return a value expression, in one of the following forms:
+            ('int', n), ('float', x), ('text', bytes), ('data', bytes),
+            ('name', absolute, parts), ('struct', [(name, value)]),
+            ('list', [values])
+        """
+        tok = self.peek()
+        if tok.value == '-':
+            self.next()
+            value = self.parse_value()
+            if value[0] in ('int', 'float'):
+                return (value[0], -value[1])
+            elif value == ('name', False, ['inf']):
+                return ('float', float('-inf'))
+            raise self.error("Parse error: invalid negative value", tok)
+        elif tok.kind == 'number':
+            self.next()
+            s = tok.value
+            if s.lower().startswith('0x'):
+                return ('int', int(s, 16))
+            elif '.' in s or 'e' in s or 'E' in s:
+                return ('float', float(s))
+            elif len(s) > 1 and s.startswith('0'):
+                return ('int', int(s, 8))
+            return ('int', int(s))
+        elif tok.kind == 'string':
+            data = b''
+            while self.peek().kind == 'string':
+                data += _unescape(self.next().value[1:-1])
+            return ('text', data)
+        elif tok.kind == 'data':
+            self.next()
+            hexdigits = re.sub(r'\s', '', tok.value[3:-1])
+            return ('data', bytes(bytearray.fromhex(hexdigits)))
+        elif tok.value == '(':
+            self.next()
+            return self.parse_struct_items(')')
+        elif tok.value == '[':
+            self.next()
+            items = []
+            while not self.accept(']'):
+                items.append(self.parse_value())
+                if not self.accept(','):
+                    self.expect(']')
+                    break
+            return ('list', items)
+        elif tok.kind == 'name' or tok.value == '.':
+            return self.parse_name_expr()
+        raise self.error("Parse error: unexpected %r" % tok.value)
+
+    def parse_struct_items(self, end):
+        items = []
+        while not self.accept(end):
+            name = self.expect_kind('name').value
+            self.expect('=')
+            items.append((name, self.parse_value()))
+            if not self.accept(','):
+                self.expect(end)
+                break
+        return ('struct', items)
+
+
+DECL_KEYWORDS = ('using', 'struct', 'enum', 'const', 'annotation', 'interface')
+
+ANNOTATION_TARGETS = ('file', 'struct', 'field', 'enum', 'enumerant', 'const',
+                      'union', 'group', 'interface', 'method', 'param',
+                      'annotation')
+
+ANNOTATION_TARGET_FLAGS = dict(
+    (target, 'targets' + target[0].upper() + target[1:])
+    for target in ANNOTATION_TARGETS)
+
+
+# ============================================================
+# types
+# ============================================================
+
+BUILTIN_TYPES = {
+    'Void': 'void', 'Bool': 'bool',
+    'Int8': 'int8', 'Int16': 'int16', 'Int32': 'int32', 'Int64': 'int64',
+    'UInt8': 'uint8', 'UInt16': 'uint16', 'UInt32': 'uint32',
+    'UInt64': 'uint64', 'Float32': 'float32', 'Float64': 'float64',
+    'Text': 'text', 'Data': 'data', 'AnyPointer': 'anyPointer',
+}
+
+# log2 of the size in bits of each data type
+LG_SIZE = {
+    'bool': 0, 'int8': 3, 'uint8': 3, 'int16': 4, 'uint16': 4, 'enum': 4,
+    'int32': 5, 'uint32': 5, 'float32': 5,
+    'int64': 6, 'uint64': 6, 'float64': 6,
+}
+
+INT_RANGES = {
+    'int8': (-2**7, 2**7), 'int16': (-2**15, 2**15),
+    'int32': (-2**31, 2**31), 'int64': (-2**63, 2**63),
+    'uint8': (0, 2**8), 'uint16': (0, 2**16),
+    'uint32': (0, 2**32), 'uint64': (0, 2**64),
+}
+
+FLOAT_FORMATS = {'float32': ('<f', '<I'), 'float64': ('<d', '<Q')}
+
+
+class Type(object):
+    """
+    A resolved type: kind is the name of the corresponding member of
+    schema.Type
+    """
+
+    def __init__(self, kind, element=None, decl=None):
+        self.kind = kind
+        self.element = element # for lists
+        self.decl = decl       # for structs and enums
+
+    def is_data(self):
+        return self.kind in LG_SIZE
+
+    def is_pointer(self):
+        return self.kind in ('text', 'data', 'list', 'struct', 'anyPointer')
+
+    def as_dict(self):
+        if self.kind == 'list':
+            return {'list': {'elementType': self.element.as_dict()}}
+        elif self.kind in ('struct', 'enum'):
+            return {self.kind: {'typeId': self.decl.id}}
+        elif self.kind == 'anyPointer':
+            return {'anyPointer': {'unconstrained': {'anyKind': None}}}
+        return {self.kind: None}
+
+
+def child_id(parent_id, name):
+    data = struct.pack('<Q', parent_id) + name.encode('utf-8')
+    digest = hashlib.md5(data).digest()
+    return struct.unpack('>Q', digest[:8])[0] | (1 << 63)
+
+def group_id(parent_id, index):
+    digest = hashlib.md5(struct.pack('<QH', parent_id, index)).digest()
+    return struct.unpack('>Q', digest[:8])[0] | (1 << 63)
+
+
+# ============================================================
+# struct layout, see StructLayout in node-translator.c++
+# ============================================================
+
+class HoleSet(object):
+    """
+    holes[lg] is the offset (in units of 2**lg bits) of a free slot of that
+    size, or 0 if there is none
+    """
+
+    def __init__(self):
+        self.holes = [0] * 6
+
+    def try_allocate(self, lg_size):
+        if lg_size >= len(self.holes):
+            return None
+        if self.holes[lg_size] != 0:
+            result = self.holes[lg_size]
+            self.holes[lg_size] = 0
+            return result
+        bigger = self.try_allocate(lg_size + 1)
+        if bigger is None:
+            return None
+        result = bigger * 2
+        self.holes[lg_size] = result + 1
+        return result
+
+    def add_holes_at_end(self, lg_size, offset, limit_lg_size=6):
+        while lg_size < limit_lg_size:
+            self.holes[lg_size] = offset
+            lg_size += 1
+            offset = (offset + 1) // 2
+
+    def try_expand(self, old_lg_size, old_offset, expansion_factor):
+        if expansion_factor == 0:
+            return True
+        if old_lg_size == len(self.holes):
+            return False
+        if self.holes[old_lg_size] != old_offset + 1:
+            return False
+        if self.try_expand(old_lg_size + 1, old_offset >> 1,
+                           expansion_factor - 1):
+            self.holes[old_lg_size] = 0
+            return True
+        return False
+
+    def smallest_at_least(self, size):
+        for i in range(size, len(self.holes)):
+            if self.holes[i] != 0:
+                return i
+        return None
+
+
+class TopLayout(object):
+
+    def __init__(self):
+        self.data_word_count = 0
+        self.pointer_count = 0
+        self.holes = HoleSet()
+
+    def add_data(self, lg_size):
+        hole = self.holes.try_allocate(lg_size)
+        if hole is not None:
+            return hole
+        offset = self.data_word_count << (6 - lg_size)
+        self.data_word_count += 1
+        self.holes.add_holes_at_end(lg_size, offset + 1)
+        return offset
+
+    def try_expand_data(self, old_lg_size, old_offset, expansion_factor):
+        return self.holes.try_expand(old_lg_size, old_offset, expansion_factor)
+
+    def add_pointer(self):
+        self.pointer_count += 1
+        return self.pointer_count - 1
+
+    def add_void(self):
+        pass
+
+
+class DataLocation(object):
+
+    def __init__(self, lg_size, offset):
+        self.lg_size = lg_size
+        self.offset = offset
+
+    def try_expand_to(self, union, new_lg_size):
+        if new_lg_size <= self.lg_size:
+            return True
+        if union.parent.try_expand_data(self.lg_size, self.offset,
+                                        new_lg_size - self.lg_size):
+            self.offset >>= new_lg_size - self.lg_size
+            self.lg_size = new_lg_size
+            return True
+        return False
+
+
+class UnionLayout(object):
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.group_count = 0
+        self.discriminant_offset = None
+        self.data_locations = []
+        self.pointer_locations = []
+
+    def add_new_data_location(self, lg_size):
+        offset = self.parent.add_data(lg_size)
+        self.data_locations.append(DataLocation(lg_size, offset))
+        return offset
+
+    def add_new_pointer_location(self):
+        offset = self.parent.add_pointer()
+        self.pointer_locations.append(offset)
+        return offset
+
+    def new_group_adding_first_member(self):
+        self.group_count += 1
+        if self.group_count == 2:
+            self.add_discriminant()
+
+    def add_discriminant(self):
+        if self.discriminant_offset is None:
+            self.discriminant_offset = self.parent.add_data(4)
+            return True
+        return False
+
+
+class DataLocationUsage(object):
+
+    def __init__(self, lg_size=None):
+        self.is_used = lg_size is not None
+        self.lg_size_used = lg_size
+        self.holes = HoleSet()
+
+    def smallest_hole_at_least(self, location, lg_size):
+        if not self.is_used:
+            if lg_size <= location.lg_size:
+                return location.lg_size
+            return None
+        elif lg_size >= self.lg_size_used:
+            if lg_size < location.lg_size:
+                return lg_size
+            return None
+        result = self.holes.smallest_at_least(lg_size)
+        if result is not None:
+            return result
+        if self.lg_size_used < location.lg_size:
+            return self.lg_size_used
+        return None
+
+    def allocate_from_hole(self, group, location, lg_size):
+        if not self.is_used:
+            result = 0
+            self.is_used = True
+            self.lg_size_used = lg_size
+        elif lg_size >= self.lg_size_used:
+            self.holes.add_holes_at_end(self.lg_size_used, 1, lg_size)
+            self.lg_size_used = lg_size + 1
+            result = 1
+        else:
+            result = self.holes.try_allocate(lg_size)
+            if result is None:
+                result = 1 << (self.lg_size_used - lg_size)
+                self.holes.add_holes_at_end(lg_size, result + 1,
+                                            self.lg_size_used)
+                self.lg_size_used += 1
+        return (location.offset << (location.lg_size - lg_size)) + result
+
+    def try_allocate_by_expanding(self, group, location, lg_size):
+        if not self.is_used:
+            if location.try_expand_to(group.parent, lg_size):
+                self.is_used = True
+                self.lg_size_used = lg_size
+                return location.offset << (location.lg_size - lg_size)
+            return None
+        new_size = max(self.lg_size_used, lg_size) + 1
+        if self.try_expand_usage(group, location, new_size, True):
+            result = self.holes.try_allocate(lg_size)
+            return (location.offset << (location.lg_size - lg_size)) + result
+        return None
+
+    def try_expand(self, group, location, old_lg_size, old_offset,
+                   expansion_factor):
+        if old_offset == 0 and self.lg_size_used == old_lg_size:
+            return self.try_expand_usage(group, location,
+                                         old_lg_size + expansion_factor, False)
+        return self.holes.try_expand(old_lg_size, old_offset, expansion_factor)
+
+    def try_expand_usage(self, group, location, desired_usage, new_holes):
+        if desired_usage > location.lg_size:
+            if not location.try_expand_to(group.parent, desired_usage):
+                return False
+        if new_holes:
+            self.holes.add_holes_at_end(self.lg_size_used, 1, desired_usage)
+        self.lg_size_used = desired_usage
+        return True
+
+
+class GroupLayout(object):
+    """
+    The layout of a member of a union
+    """
+
+    def __init__(self, parent):
+        self.parent = parent # UnionLayout
+        self.parent_data_location_usage = []
+        self.parent_pointer_location_usage = 0
+        self.has_members = False
+
+    def add_member(self):
+        if not self.has_members:
+            self.has_members = True
+            self.parent.new_group_adding_first_member()
+
+    def add_data(self, lg_size):
+        self.add_member()
+        locations = self.parent.data_locations
+        usages = self.parent_data_location_usage
+        best_size = None
+        best_location = None
+        for i, location in enumerate(locations):
+            if len(usages) == i:
+                usages.append(DataLocationUsage())
+            hole = usages[i].smallest_hole_at_least(location, lg_size)
+            if hole is not None and (best_size is None or hole < best_size):
+                best_size = hole
+                best_location = i
+        if best_location is not None:
+            return usages[best_location].allocate_from_hole(
+                self, locations[best_location], lg_size)
+        for i, location in enumerate(locations):
+            result = usages[i].try_allocate_by_expanding(self, location, lg_size)
+            if result is not None:
+                return result
+        result = self.parent.add_new_data_location(lg_size)
+        usages.append(DataLocationUsage(lg_size))
+        return result
+
+    def add_pointer(self):
+        self.add_member()
+        locations = self.parent.pointer_locations
+        if self.parent_pointer_location_usage < len(locations):
+            result = locations[self.parent_pointer_location_usage]
+            self.parent_pointer_location_usage += 1
+            return result
+        self.parent_pointer_location_usage += 1
+        return self.parent.add_new_pointer_location()
+
+    def add_void(self):
+        self.add_member()
+        # the outer union (if any) must know that a member is being added,
+        # to allocate its discriminant at the right moment
+        self.parent.parent.add_void()
+
+    def try_expand_data(self, old_lg_size, old_offset, expansion_factor):
+        if (old_lg_size + expansion_factor > 6 or
+            (old_offset & ((1 << expansion_factor) - 1)) != 0):
+            return False
+        locations = self.parent.data_locations
+        for i, usage in enumerate(self.parent_data_location_usage):
+            location = locations[i]
+            if (location.lg_size >= old_lg_size and
+                old_offset >> (location.lg_size - old_lg_size) == location.offset):
+                local_offset = old_offset - (location.offset <<
+                                             (location.lg_size - old_lg_size))
+                return usage.try_expand(self, location, old_lg_size,
+                                        local_offset, expansion_factor)
+        assert False, 'Tried to expand field that was never allocated'
+
+
+# ============================================================
+# struct translation
+# ============================================================
+
+class Member(object):
+    """
+    A field or a group of a struct, or the struct itself (in that case,
+    parent is None). See MemberInfo in node-translator.c++
+    """
+
+    def __init__(self, parent, code_order, decl, is_in_union, scope):
+        self.parent = parent
+        self.code_order = code_order
+        self.decl = decl
+        self.is_in_union = is_in_union
+        self.scope = scope       # the layout in which the fields are allocated
+        self.union_scope = None  # the layout of the union owned by this member
+        self.index = None
+        self.schema = None       # the dict describing the schema.Field
+        self.fields = []         # for groups: the schema of the children
+        self.children = {}       # for groups: name -> Member
+        self.next_code_order = 0
+        self.union_discriminant_count = 0
+        self.node_id = None
+        self.display_name = None
+        # for slots
+        self.type = None
+        self.offset = None
+        self.default = None
+
+    def is_group(self):
+        return not isinstance(self.decl, Field)
+
+    def get_schema(self):
+        if self.schema is None:
+            parent = self.parent
+            if parent.parent is not None:
+                parent.get_schema()
+            self.index = len(parent.fields)
+            self.schema = {'name': self.decl.name.encode('utf-8'),
+                           'codeOrder': self.code_order,
+                           'discriminantValue': 0xffff}
+            if self.is_in_union:
+                self.schema['discriminantValue'] = parent.union_discriminant_count
+                parent.union_discriminant_count += 1
+            parent.fields.append(self.schema)
+        return self.schema
+
+
+class StructTranslator(object):
+
+    def __init__(self, compiler, decl):
+        self.compiler = compiler
+        self.decl = decl
+        self.top = TopLayout()
+        self.root = Member(None, 0, decl, False, self.top)
+        self.root.node_id = decl.id
+        self.root.display_name = decl.get_display_name()
+        self.all_members = []
+        self.members_by_ordinal = []
+
+    def translate(self):
+        self.traverse(self.root, self.decl.members, self.top, None)
+        self.members_by_ordinal.sort(key=lambda item: item[0])
+        ordinals = [ordinal for ordinal, _ in self.members_by_ordinal]
+        for i, ordinal in enumerate(ordinals):
+            if ordinal != i:
+                member = self.members_by_ordinal[i][1]
+                raise self.error(member.decl, "Skipped or duplicate ordinal "
+                                 "@%d" % i)
+        for ordinal, member in self.members_by_ordinal:
+            self.translate_field(member, ordinal)
+        self.finish_group(self.root)
+        for member in self.all_members:
+            if member.is_group():
+                self.finish_group(member)
+        #
+        # the default values and the annotations are computed only after the
+        # layout, because they might contain values of this same struct
+        self.decl.layout = self
+        for member in self.all_members:
+            if member.is_group():
+                target = 'union' if member.decl.is_union else 'group'
+            else:
+                target = 'field'
+                self.translate_default(member)
+            member.schema['annotations'] = self.compiler.compile_annotations(
+                member.decl.annotations, self.decl, target)
+        for member in self.all_members:
+            if not member.is_group():
+                member.schema['slot']['defaultValue'] = self.compiler.make_value(
+                    member.type, member.default, self.decl.get_file(),
+                    member.decl.lineno)
+
+    def error(self, decl, message):
+        return self.decl.get_file().error(decl.lineno, message)
+
+    def traverse(self, parent, decls, scope, union):
+        for decl in decls:
+            if isinstance(decl, Group) and decl.name is None:
+                # unnamed union: its members belong to parent
+                if parent.union_scope is not None:
+                    raise self.error(decl, "An unnamed union is already "
+                                     "defined in this scope")
+                parent.union_scope = UnionLayout(scope)
+                self.traverse(parent, decl.members, scope, parent.union_scope)
+                continue
+            if decl.name in parent.children:
+                raise self.error(decl, "'%s' is already defined" % decl.name)
+            member_scope = scope
+            if union is not None:
+                member_scope = GroupLayout(union)
+            member = Member(parent, parent.next_code_order, decl,
+                            union is not None, member_scope)
+            parent.next_code_order += 1
+            parent.children[decl.name] = member
+            self.all_members.append(member)
+            if isinstance(decl, Field):
+                self.members_by_ordinal.append((decl.ordinal, member))
+            elif decl.is_union:
+                member.union_scope = UnionLayout(member_scope)
+                self.traverse(member, decl.members, member_scope,
+                              member.union_scope)
+            else:
+                self.traverse(member, decl.members, member_scope, None)
+
+    def translate_field(self, member, ordinal):
+        schema = member.get_schema()
+        schema['ordinal'] = {'explicit': ordinal}
+        decl = member.decl
+        t = self.compiler.resolve_type(decl.type_expr, self.decl, decl.lineno)
+        member.type = t
+        if t.kind == 'void':
+            member.scope.add_void()
+            member.offset = 0
+        elif t.is_data():
+            member.offset = member.scope.add_data(LG_SIZE[t.kind])
+        else:
+            member.offset = member.scope.add_pointer()
+        schema['slot'] = {
+            'offset': member.offset,
+            'type': t.as_dict(),
+            'hadExplicitDefault': decl.default is not None,
+        }
+
+    def translate_default(self, member):
+        decl = member.decl
+        if decl.default is not None:
+            member.default = self.compiler.convert_value(
+                member.type, decl.default, self.decl, decl.lineno)
+
+    def finish_group(self, member):
+        if member.union_scope is not None:
+            member.union_scope.add_discriminant()
+        if member.parent is not None:
+            member.node_id = group_id(member.parent.node_id, member.index)
+            member.display_name = '%s.%s' % (member.parent.display_name,
+                                             member.decl.name)
+            member.schema['group'] = {'typeId': member.node_id}
+            member.schema['ordinal'] = {'implicit': None}
+
+    def get_nodes(self, annotations, nested):
+        """
+        Return the dicts describing the node of the struct and of all its
+        groups
+        """
+        nodes = [self._node(self.root, self.decl.parent.id, annotations,
+                            nested)]
+        for member in self.all_members:
+            if member.is_group():
+                nodes.append(self._node(member, member.parent.node_id, None,
+                                        None))
+        return nodes
+
+    def _node(self, member, scope_id, annotations, nested):
+        display_name = member.display_name
+        if member.parent is None:
+            name = self.decl.name
+        else:
+            name = member.decl.name
+        union = member.union_scope
+        return {
+            'id': member.node_id,
+            'displayName': display_name.encode('utf-8'),
+            'displayNamePrefixLength': len(display_name) - len(name),
+            'scopeId': scope_id,
+            'nestedNodes': nested,
+            'annotations': annotations,
+            'struct': {
+                'dataWordCount': self.top.data_word_count,
+                'pointerCount': self.top.pointer_count,
+                'preferredListEncoding': schema.ElementSize.inlineComposite,
+                'isGroup': member.parent is not None,
+                'discriminantCount': member.union_discriminant_count,
+                'discriminantOffset': (union.discriminant_offset
+                                       if union is not None else 0),
+                'fields': member.fields,
+            }
+        }
+
+
+# ============================================================
+# the compiler
+# ============================================================
+
+# the tags of the pointer members of schema.Value
+VALUE_TAGS = {'list': 14, 'struct': 16, 'anyPointer': 18}
+
+# where to look for /capnp/*.capnp, in addition to the given path
+DEFAULT_INCLUDE_DIRS = ['/usr/local/include', '/usr/include']
+
+
+class SchemaParser(object):
+
+    def __init__(self, path):
+        self.path = [py.path.local(dirname) for dirname in path]
+        self.files = {} # str(path) -> FileDecl
+
+    def parse(self, filename):
+        """
+        Parse the given schema file and return the corresponding
+        schema.CodeGeneratorRequest
+        """
+        filename = py.path.local(filename)
+        # like capnp, the name of the file is relative to the current
+        # directory, if possible
+        display_name = filename.relto(py.path.local()) or str(filename)
+        root = self.load_file(filename, display_name.lstrip('/'))
+        root.used = True
+        #
+        # compiling the files might mark more imports as used, so we iterate
+        # until we reach a fixed point
+        compiled = []
+        nodes = []
+        while True:
+            todo = [f for f in self.files.values()
+                    if f.used and f not in compiled]
+            if not todo:
+                break
+            for f in todo:
+                compiled.append(f)
+                nodes += self.compile_file(f)
+        imports = [{'id': f.id, 'name': name.encode('utf-8')}
+                   for name, f in self.get_imports(root)]
+        request = {
+            'nodes': nodes,
+            'requestedFiles': [{'id': root.id,
+                                'filename': root.display_name.encode('utf-8'),
+                                'imports': imports}],
+        }
+        # like capnp, keep only the nodes of the imported files which are used
+        return schema.CodeGeneratorRequest.from_dict(request).prune()
+
+    # files and imports
+    # -----------------
+
+    def load_file(self, path, display_name):
+        key = str(path)
+        if key in self.files:
+            return self.files[key]
+        try:
+            src = path.read_binary().decode('utf-8')
+        except py.error.ENOENT:
+            raise CompilerError("%s: error: No such file or directory" % path)
+        f = FileDecl(path, display_name)
+        Parser(f, src).parse_file()
+        self.assign_ids(f, f.id)
+        self.files[key] = f
+        # load the imports eagerly: we need their ids for the request
+        for name, lineno in f.imports:
+            if name not in f.resolved_imports:
+                f.resolved_imports[name] = self.import_file(f, name, lineno)
+        return f
+
+    def import_file(self, f, name, lineno):
+        if name.startswith('/'):
+            dirs = self.path + [py.path.local(d) for d in DEFAULT_INCLUDE_DIRS]
+            for dirname in dirs:
+                path = dirname.join(name)
+                if dirname.check(dir=True) and path.check(file=True):
+                    return self.load_file(path, name.lstrip('/'))
+            raise f.error(lineno, "Import failed: %s" % name)
+        path = f.path.dirpath().join(name)
+        if not path.check(file=True):
+            raise f.error(lineno, "Import failed: %s" % name)
+        display_name = py.path.local('/' + f.display_name).dirpath().join(name)
+        return self.load_file(path, str(display_name).lstrip('/'))
+
+    def get_imports(self, f):
+        return sorted(f.resolved_imports.items())
+
+    # name resolution
+    # ---------------
+
+    def lookup(self, expr, scope, lineno):
+        """
+        Resolve a name expression to a Decl, or to the name of a builtin
+        type
+        """
+        f = scope.get_file()
+        kind, first, parts = expr
+        if kind == 'import':
+            target = f.resolved_imports[first]
+        elif first:
+            # absolute name, e.g. .Foo.Bar
+            target = self._lookup_member(f, parts[0], f, lineno)
+            parts = parts[1:]
+        else:
+            name = parts[0]
+            parts = parts[1:]
+            target = None
+            s = scope
+            while s is not None:
+                if name in s.names:
+                    target = self._resolve_alias(s.names[name], lineno)
+                    break
+                s = s.parent
+            if target is None:
+                if name in BUILTIN_TYPES or name == 'List':
+                    if parts:
+                        raise f.error(lineno, "'%s' has no member named '%s'" %
+                                      (name, parts[0]))
+                    return name
+                raise f.error(lineno, "Not defined: %s" % name)
+        for name in parts:
+            target = self._lookup_member(target, name, f, lineno)
+        return target
+
+    def _lookup_member(self, decl, name, f, lineno):
+        if name not in decl.names:
+            raise f.error(lineno, "'%s' has no member named '%s'" %
+                          (decl.name, name))
+        return self._resolve_alias(decl.names[name], lineno)
+
+    def _resolve_alias(self, target, lineno):
+        if isinstance(target, Alias):
+            target = self.lookup(target.expr, target.scope, lineno)
+        if isinstance(target, Decl):
+            target.get_file().used = True
+        return target
+
+    def resolve_type(self, expr, scope, lineno):
+        if expr[0] == 'list':
+            return Type('list', element=self.resolve_type(expr[1], scope, lineno))
+        target = self.lookup(expr, scope, lineno)
+        if target in BUILTIN_TYPES:
+            return Type(BUILTIN_TYPES[target])
+        elif isinstance(target, Decl) and target.kind in ('struct', 'enum'):
+            return Type(target.kind, decl=target)
+        f = scope.get_file()
+        raise f.error(lineno, "'%s' is not a type" % '.'.join(expr[2]))
+
+    # nodes
+    # -----
+
+    def compile_file(self, f):
+        node = {
+            'id': f.id,
+            'displayName': f.display_name.encode('utf-8'),
+            'displayNamePrefixLength': f.display_name.rfind('.') + 1,
+            'scopeId': 0,
+            'nestedNodes': self._nested_nodes(f),
+            'annotations': self.compile_annotations(f.annotations, f, 'file'),
+            'file': None,
+        }
+        nodes = [node]
+        for decl in f.nested:
+            nodes += self.compile_decl(decl)
+        return nodes
+
+    def assign_ids(self, decl, decl_id):
+        decl.id = decl_id
+        for child in decl.nested:
+            if child.id is None:
+                child_decl_id = child_id(decl_id, child.name)
+            else:
+                child_decl_id = child.id
+            self.assign_ids(child, child_decl_id)
+
+    def _nested_nodes(self, decl):
+        return [{'name': child.name.encode('utf-8'), 'id': child.id}
+                for child in decl.nested]
+
+    def compile_decl(self, decl):
+        display_name = decl.get_display_name()
+        annotations = self.compile_annotations(decl.annotations, decl.parent,
+                                               decl.kind)
+        nested = self._nested_nodes(decl)
+        if decl.kind == 'struct':
+            self.get_layout(decl)
+            nodes = decl.layout.get_nodes(annotations, nested)
+        else:
+            node = {
+                'id': decl.id,
+                'displayName': display_name.encode('utf-8'),
+                'displayNamePrefixLength': len(display_name) - len(decl.name),
+                'scopeId': decl.parent.id,
+                'nestedNodes': nested,
+                'annotations': annotations,
+            }
+            node[decl.kind] = getattr(self, 'compile_' + decl.kind)(decl)
+            nodes = [node]
+        for child in decl.nested:
+            nodes += self.compile_decl(child)
+        return nodes
+
+    def get_layout(self, decl):
+        if decl.layout is None:
+            StructTranslator(self, decl).translate()
+        return decl.layout
+
+    def compile_enum(self, decl):
+        f = decl.get_file()
+        enumerants = sorted(enumerate(decl.enumerants),
+                            key=lambda item: item[1][1])
+        result = []
+        for i, (code_order, (name, ordinal, annotations)) in enumerate(enumerants):
+            if ordinal != i:
+                raise f.error(decl.lineno, "Skipped or duplicate ordinal @%d "
+                              "in enum %s" % (i, decl.name))
+            result.append({
+                'name': name.encode('utf-8'),
+                'codeOrder': code_order,
+                'annotations': self.compile_annotations(annotations, decl,
+                                                        'enumerant'),
+            })
+        return {'enumerants': result}
+
+    def compile_const(self, decl):
+        t = self.resolve_type(decl.type_expr, decl.parent, decl.lineno)
+        value = self.convert_value(t, decl.value, decl.parent, decl.lineno)
+        return {'type': t.as_dict(),
+                'value': self.make_value(t, value, decl.get_file(),
+                                         decl.lineno)}
+
+    def compile_annotation(self, decl):
+        t = self.resolve_type(decl.type_expr, decl.parent, decl.lineno)
+        result = {'type': t.as_dict()}
+        for target, flag in ANNOTATION_TARGET_FLAGS.items():
+            result[flag] = target in decl.targets
+        return result
+
+    def compile_annotations(self, annotations, scope, target):
+        result = []
+        for expr, value, lineno in annotations:
+            f = scope.get_file()
+            decl = self.lookup(expr, scope, lineno)
+            if not isinstance(decl, Decl) or decl.kind != 'annotation':
+                raise f.error(lineno, "'%s' is not an annotation" %
+                              '.'.join(expr[2]))
+            if target not in decl.targets:
+                raise f.error(lineno, "'%s' cannot be applied to this kind of "
+                              "declaration." % '.'.join(expr[2]))
+            t = self.resolve_type(decl.type_expr, decl.parent, decl.lineno)
+            if value is None:
+                if t.kind != 'void':
+                    raise f.error(lineno, "'%s' requires a value." %
+                                  '.'.join(expr[2]))
+                value = ('name', False, ['void'])
+            pyvalue = self.convert_value(t, value, scope, lineno)
+            result.append({'id': decl.id,
+                           'value': self.make_value(t, pyvalue, f, lineno),
+                           'brand': {}})
+        # like capnp, we use a null pointer for an empty list of annotations
+        return result or None
+
+    # values
+    # ------
+
+    def convert_value(self, t, value, scope, lineno):
+        """
+        Convert a value expression to the Python value of type t. Struct
+        values are returned as a list of (name, value expression): they are
+        converted when they are written, see write_struct.
+        """
+        f = scope.get_file()
+        kind = value[0]
+        if kind == 'name' and not (t.kind == 'enum' and len(value[2]) == 1):
+            if value == ('name', False, ['void']) and t.kind == 'void':
+                return None
+            if t.kind == 'bool' and value in (('name', False, ['true']),
+                                              ('name', False, ['false'])):
+                return value[2][0] == 'true'
+            if t.kind in FLOAT_FORMATS and value in (('name', False, ['inf']),
+                                                     ('name', False, ['nan'])):
+                return float(value[2][0])
+            target = self.lookup(value, scope, lineno)
+            if isinstance(target, Decl) and target.kind == 'const':
+                const_type = self.resolve_type(target.type_expr, target.parent,
+                                               target.lineno)
+                return self.convert_value(const_type, target.value,
+                                          target.parent, target.lineno)
+            raise f.error(lineno, "Type mismatch: %s is not a valid %s value" %
+                          ('.'.join(value[2]), t.kind))
+        if t.kind in INT_RANGES and kind == 'int':
+            low, high = INT_RANGES[t.kind]
+            if not low <= value[1] < high:
+                raise f.error(lineno, "Integer value out of range: %d" % value[1])
+            return value[1]
+        elif t.kind in FLOAT_FORMATS and kind in ('int', 'float'):
+            return float(value[1])
+        elif t.kind == 'text' and kind == 'text':
+            return value[1]
+        elif t.kind == 'data' and kind in ('text', 'data'):
+            return value[1]
+        elif t.kind == 'enum' and kind == 'name':
+            name = value[2][0]
+            for enumerant, ordinal, _ in t.decl.enumerants:
+                if enumerant == name:
+                    return ordinal
+            raise f.error(lineno, "Enum '%s' has no member named '%s'" %
+                          (t.decl.name, name))
+        elif t.kind == 'struct' and kind == 'struct':
+            return value[1]
+        elif t.kind == 'list' and kind == 'list':
+            return [self.convert_value(t.element, item, scope, lineno)
+                    for item in value[1]]
+        raise f.error(lineno, "Type mismatch: expected a %s value" % t.kind)
+
+    def make_value(self, t, pyvalue, f, lineno):
+        """
+        Return the dict or the schema.Value which represents pyvalue. f and
+        lineno are the location of the value, used to report errors.
+        """
+        if t.kind == 'void':
+            return {'void': None}
+        elif t.is_data():
+            if pyvalue is None:
+                pyvalue = 0.0 if t.kind in FLOAT_FORMATS else 0
+            if t.kind == 'bool':
+                pyvalue = bool(pyvalue)
+            return {t.kind: pyvalue}
+        elif t.kind in ('text', 'data'):
+            return {t.kind: pyvalue}
+        #
+        # the generated constructor of Value cannot write pointers to
+        # arbitrary objects, so we build the Value by hand
+        builder = SegmentBuilder()
+        pos = builder.allocate(24)
+        builder.write_int16(pos, VALUE_TAGS[t.kind])
+        if pyvalue is not None:
+            self.write_pointer(builder, pos + 16, t, pyvalue, f, lineno)
+        return schema.Value.from_buffer(builder.as_string(), 0, 2, 1)
+
+    def write_pointer(self, builder, pos, t, pyvalue, f, lineno):
+        if pyvalue is None:
+            builder.write_int64(pos, 0)
+        elif t.kind == 'text':
+            builder.alloc_text(pos, pyvalue)
+        elif t.kind == 'data':
+            builder.alloc_data(pos, pyvalue)
+        elif t.kind == 'struct':
+            layout = self.get_layout(t.decl)
+            top = layout.top
+            pos = builder.alloc_struct(pos, top.data_word_count,
+                                       top.pointer_count)
+            self.write_struct(builder, pos, layout, layout.root, pyvalue)
+        elif t.kind == 'list':
+            self.write_list(builder, pos, t.element, pyvalue, f, lineno)
+        else:
+            raise f.error(lineno, "values of type %s are not supported by the "
+                          "pure-Python schema parser" % t.kind)
+
+    def write_list(self, builder, pos, t, items, f, lineno):
+        count = len(items)
+        if t.kind == 'struct':
+            layout = self.get_layout(t.decl)
+            data_size = layout.top.data_word_count
+            ptrs_size = layout.top.pointer_count
+            item_length = (data_size + ptrs_size) * 8
+            pos = builder.alloc_list(pos, ptr.LIST_SIZE_COMPOSITE,
+                                     (data_size + ptrs_size) * count,
+                                     item_length * count + 8)
+            builder.write_int64(pos, ptr.new_struct(count, data_size, ptrs_size))
+            pos += 8
+            for item in items:
+                self.write_struct(builder, pos, layout, layout.root, item)
+                pos += item_length
+        elif t.is_pointer():
+            pos = builder.alloc_list(pos, ptr.LIST_SIZE_PTR, count, 8 * count)
+            for item in items:
+                self.write_pointer(builder, pos, t, item, f, lineno)
+                pos += 8
+        else:
+            if t.kind == 'void':
+                item_type = VoidItemType()
+            elif t.kind == 'bool':
+                item_type = BoolItemType()
+            elif t.kind == 'enum':
+                item_type = PrimitiveItemType(Types.uint16)
+            else:
+                item_type = PrimitiveItemType(getattr(Types, t.kind))
+            builder.copy_from_list(pos, item_type, items)
+
+    def write_struct(self, builder, pos, layout, group, items):
+        decl = layout.decl
+        data_size = layout.top.data_word_count
+        for name, value in items:
+            try:
+                member = group.children[name]
+            except KeyError:
+                raise decl.get_file().error(
+                    decl.lineno, "Struct %s has no field named '%s'" %
+                    (decl.name, name))
+            if member.is_in_union:
+                offset = member.parent.union_scope.discriminant_offset
+                builder.write_uint16(pos + offset * 2,
+                                     member.schema['discriminantValue'])
+            if member.is_group():
+                if value[0] != 'struct':
+                    raise decl.get_file().error(
+                        decl.lineno, "Type mismatch: expected a group value "
+                        "for '%s'" % name)
+                self.write_struct(builder, pos, layout, member, value[1])
+                continue
+            t = member.type
+            pyvalue = self.convert_value(t, value, decl, member.decl.lineno)
+            if t.kind == 'void':
+                pass
+            elif t.kind == 'bool':
+                if bool(pyvalue) != bool(member.default):
+                    builder.write_bool(pos + member.offset // 8,
+                                       member.offset % 8, 1)
+            elif t.kind in FLOAT_FORMATS:
+                ffmt, ifmt = FLOAT_FORMATS[t.kind]
+                bits = struct.unpack(ifmt, struct.pack(ffmt, pyvalue))[0]
+                default = member.default or 0.0
+                bits ^= struct.unpack(ifmt, struct.pack(ffmt, default))[0]
+                if t.kind == 'float32':
+                    builder.write_uint32(pos + member.offset * 4, bits)
+                else:
+                    builder.write_uint64(pos + member.offset * 8, bits)
+            elif t.is_data():
+                kind = 'uint16' if t.kind == 'enum' else t.kind
+                pyvalue ^= member.default or 0
+                size = 1 << (LG_SIZE[t.kind] - 3)
+                getattr(builder, 'write_' + kind)(pos + member.offset * size,
+                                                  pyvalue)
+            else:
+                ptrpos = pos + (data_size + member.offset) * 8
+                self.write_pointer(builder, ptrpos, t, pyvalue,
+                                   decl.get_file(), member.decl.lineno)
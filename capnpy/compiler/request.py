@@ -6,6 +6,7 @@ from capnpy import schema
 from capnpy.type import Types
 from capnpy.compiler.util import as_identifier
 from capnpy import annotate
+from capnpy.compiler import lazy
 
 
 @schema.CodeGeneratorRequest.__extend__
@@ -15,6 +16,98 @@ class CodeGeneratorRequest:
         assert len(self.requestedFiles) == 1
         self.requestedFiles[0].emit(m)
 
+    def split(self):
+        """
+        Split a request which contains several requestedFiles (as emitted by
+        ``capnp compile`` when it is called on many files at once) into a
+        list of requests, one for each requested file.
+
+        Like ``capnp compile`` does for a single file, each request contains
+        all the nodes of its file, plus the nodes of the other files which
+        they use (transitively).
+        """
+        if len(self.requestedFiles) == 1:
+            return [self]
+        allnodes = dict((node.id, node) for node in self.nodes)
+        return [self._request_for_file(f, allnodes)
+                for f in self.requestedFiles]
+
+    def prune(self):
+        """
+        Return a request which contains only the nodes which ``capnp
+        compile`` emits for the (single) requested file: the nodes of the
+        file, plus the nodes of the other files which they use (transitively).
+        """
+        assert len(self.requestedFiles) == 1
+        allnodes = dict((node.id, node) for node in self.nodes)
+        return self._request_for_file(self.requestedFiles[0], allnodes)
+
+    def _request_for_file(self, f, allnodes):
+        filename = allnodes[f.id].displayName
+        todo = [node.id for node in self.nodes
+                if _get_filename(node) == filename]
+        node_ids = set()
+        while todo:
+            node_id = todo.pop()
+            if node_id in node_ids or node_id not in allnodes:
+                continue
+            node_ids.add(node_id)
+            todo += _get_references(allnodes[node_id])
+        nodes = [node for node in self.nodes if node.id in node_ids]
+        sourceInfo = None
+        if self.sourceInfo is not None:
+            sourceInfo = [info for info in self.sourceInfo
+                          if info.id in node_ids]
+        return schema.CodeGeneratorRequest(nodes=nodes,
+                                           requestedFiles=[f],
+                                           capnpVersion=self.capnpVersion,
+                                           sourceInfo=sourceInfo)
+
+
+def _get_filename(node):
+    # the displayName of the nodes is "filename:Path.To.Node"
+    if node.is_file():
+        return node.displayName
+    return node.displayName[:node.displayName.rfind(b':')]
+
+def _get_references(node):
+    """
+    Return the ids of the nodes which are used by the given node
+    """
+    refs = [node.scopeId]
+    refs += _get_annotation_ids(node.annotations)
+    if node.is_struct():
+        for f in node.struct.fields:
+            refs += _get_annotation_ids(f.annotations)
+            if f.is_group():
+                refs.append(f.group.typeId)
+            else:
+                refs += _get_type_ids(f.slot.type)
+    elif node.is_enum():
+        for enumerant in node.enum.enumerants:
+            refs += _get_annotation_ids(enumerant.annotations)
+    elif node.is_const():
+        refs += _get_type_ids(node.const.type)
+    elif node.is_annotation():
+        refs += _get_type_ids(node.annotation.type)
+    return refs
+
+def _get_annotation_ids(annotations):
+    if annotations is None:
+        return []
+    return [ann.id for ann in annotations]
+
+def _get_type_ids(t):
+    while t.is_list():
+        t = t.list.elementType
+    if t.is_struct():
+        return [t.struct.typeId]
+    elif t.is_enum():
+        return [t.enum.typeId]
+    elif t.is_interface():
+        return [t.interface.typeId]
+    return []
+
 
 @schema.CodeGeneratorRequest.RequestedFile.__extend__
 class RequestedFile:
@@ -56,6 +149,7 @@ class RequestedFile:
         m.w("from capnpy.segment.segment {cimport} Segment as _Segment")
         m.w("from capnpy.segment.segment {cimport} MultiSegment as _MultiSegment")
         m.w("from capnpy.segment.builder {cimport} SegmentBuilder as _SegmentBuilder")
+        m.w("from capnpy.segment.builder {cimport} size_hint as _size_hint")
         m.w("from capnpy.list {cimport} List as _List")
         m.w("from capnpy.list {cimport} PrimitiveItemType as _PrimitiveItemType")
         m.w("from capnpy.list {cimport} BoolItemType as _BoolItemType")
@@ -73,6 +167,22 @@ class RequestedFile:
         m.w("from capnpy.util import extend_module_maybe as _extend_module_maybe")
         m.w("from capnpy.util import check_version as _check_version")
         m.w("from capnpy.util import encode_maybe as _encode_maybe")
+        m.w("from capnpy.json import dump_float32 as _json_dump_float32")
+        m.w("from capnpy.json import dump_float64 as _json_dump_float64")
+        m.w("from capnpy.json import dump_text as _json_dump_text")
+        m.w("from capnpy.json import dump_data as _json_dump_data")
+        m.w("from capnpy.json import dump_enum as _json_dump_enum")
+        m.w("from capnpy.json import dump_list as _json_dump_list")
+        m.w("from capnpy.json import load_enum as _json_load_enum")
+        m.w("from capnpy.json import load_text as _json_load_text")
+        m.w("from capnpy.json import load_data as _json_load_data")
+        m.w("from capnpy.json import copy_list as _json_copy_list")
+        #
+        # lazy definitions are not supported in pyx mode, because cdef
+        # classes must be at module level
+        is_lazy = m.options(filenode).lazy and not m.pyx
+        if is_lazy:
+            m.w("from capnpy.util import LazyDefinitions as _LazyDefinitions")
         #
         if m.pyx:
             m.w("from capnpy cimport _hash")
@@ -95,6 +205,12 @@ class RequestedFile:
             m.w('# schema compiled with --no-version-check, skipping the call to _check_version')
 
         self._declare_imports(m)
+        if is_lazy:
+            self._emit_lazy_definitions(m, filenode)
+        else:
+            self._emit_definitions(m, filenode)
+
+    def _emit_definitions(self, m, filenode):
         if m.options(filenode).include_reflection_data:
             self._emit_reflection_data(m)
         else:
@@ -118,10 +234,42 @@ class RequestedFile:
             child.emit_reference_as_child(m)
         #
         m.w()
+        self._emit_extend_module(m)
+        m.w()
+
+    def _emit_extend_module(self, m, extra=''):
         if m.standalone:
-            m.w('_extend_module_maybe(globals(), modname=__name__)')
+            m.w('_extend_module_maybe(globals(), modname=__name__{extra})',
+                extra=extra)
+        else:
+            m.w('_extend_module_maybe(globals(), filename=__schema__{extra})',
+                extra=extra)
+
+    def _emit_lazy_definitions(self, m, filenode):
+        # like _emit_definitions(), but each top-level node is defined by its
+        # own function, see capnpy.compiler.lazy
+        def emit_child(child):
+            child.emit_declaration(m)
+            child.emit_definition(m)
+            child.emit_reference_as_child(m)
+        #
+        groups = []
+        if m.options(filenode).include_reflection_data:
+            groups.append(lazy.emit_group(m, '_define__reflection_data',
+                                          lambda: self._emit_reflection_data(m)))
         else:
-            m.w('_extend_module_maybe(globals(), filename=__schema__)')
+            m.w('# not including reflection data')
+        m.w("")
+        m.w("#### LAZY DEFINITIONS ####")
+        m.w()
+        for child in m.children[filenode.id]:
+            funcname = '_define_%s' % child.shortname(m)
+            groups.append(lazy.emit_group(m, funcname,
+                                          lambda: emit_child(child)))
+        m.w()
+        lazy.emit_lazy_definitions(m, [g for g in groups if g is not None])
+        m.w()
+        self._emit_extend_module(m, extra=', lazy=_lazy')
         m.w()
 
     def _declare_imports(self, m):
@@ -1,7 +1,7 @@
 from capnpy import annotate
 from capnpy import schema
 from capnpy.type import Types
-from capnpy.compiler.structor import Structor
+from capnpy.compiler.structor import Structor, DictStructor, JsonStructor
 from capnpy.compiler.fieldtree import FieldTree
 
 try:
@@ -62,6 +62,7 @@ class Node__Struct:
         ns.dotname = self.runtime_name(m)
         ns.data_size = self.struct.dataWordCount
         ns.ptrs_size = self.struct.pointerCount
+        ns.data_fields = self._get_data_fields(m)
         #
         if not m.pyx:
             # use the @extend decorator only in Pure Python mode: in pyx mode
@@ -74,6 +75,7 @@ class Node__Struct:
                 __capnpy_id__ = {id:#x}
                 __static_data_size__ = {data_size}
                 __static_ptrs_size__ = {ptrs_size}
+                __data_fields__ = {data_fields}
 
             """)
             for child in m.children[self.id]:
@@ -86,6 +88,9 @@ class Node__Struct:
                     field.emit(m, self)
                 self._emit_ctors(m)
             self._emit_repr(m)
+            self._emit_to_dict(m)
+            self._emit_to_json(m)
+            self._emit_builder_type(m)
             self._emit_key_maybe(m)
         ns.w()
         if m.pyx:
@@ -94,6 +99,34 @@ class Node__Struct:
             ns.w("_{name}_list_item_type = _StructItemType({name})")
         ns.w()
 
+    def _get_data_fields(self, m):
+        """
+        Return the layout of the fields which are stored inline in the data
+        section, as a tuple of (name, offset, fmt, default). The offset is in
+        bytes, except for bools where it is in bits and fmt is '?'. This is
+        used by List.to_columns().
+
+        Fields which are part of a union are not included, since their value
+        is meaningful only if the corresponding tag is set.
+        """
+        fields = []
+        for f in self.get_struct_fields() or []:
+            if f.is_part_of_union():
+                continue
+            if f.is_bool():
+                offset = f.slot.offset
+                fmt = '?'
+            elif f.is_primitive() or f.is_enum():
+                offset = f.slot.offset * f.slot.get_size()
+                fmt = f.slot.get_fmt()
+                if not isinstance(fmt, str):
+                    fmt = fmt.decode('ascii') # bytes on Python 3
+            else:
+                continue
+            default = f.slot.defaultValue.as_pyobj()
+            fields.append((m.py_field_name(f), offset, fmt, default))
+        return tuple(fields)
+
     def emit_reference_as_child(self, m):
         if self.is_nested(m) and not self.struct.isGroup:
             m.w('{shortname} = {name}', shortname=self.shortname(m),
@@ -156,6 +189,7 @@ class Node__Struct:
         ns.ptrs_size = self.struct.pointerCount
         self._emit_init(m, ns)
         self._emit_ctors_union(m, ns)
+        self._emit_from_dict(m, ns)
 
     def _emit_init(self, m, ns):
         ctor = Structor(m, self, self.struct.fields)
@@ -203,6 +237,31 @@ class Node__Struct:
             ns.w('return cls.from_buffer(buf, 0, {data_size}, {ptrs_size})')
         ns.w()
 
+    def _emit_from_dict(self, m, ns):
+        ## @classmethod
+        ## def from_dict(cls, d):
+        ##     builder = _SegmentBuilder()
+        ##     pos = builder.allocate(16)
+        ##     MyStruct._write_dict(builder, pos, d)
+        ##     return cls.from_buffer(builder.as_string(), 0, ..., ...)
+        DictStructor(m, self, self.struct.fields).emit()
+        ns.w()
+        JsonStructor(m, self, self.struct.fields).emit()
+        ns.w()
+        ns.clsname = self.compile_name(m)
+        ns.length = (self.struct.dataWordCount + self.struct.pointerCount)*8
+        ns.w('@classmethod')
+        with ns.block('def from_dict(cls, d):'):
+            ns.cdef_var('_SegmentBuilder', 'builder')
+            ns.cdef_var('long', 'pos')
+            ns.ww("""
+                builder = _SegmentBuilder()
+                pos = builder.allocate({length})
+                {clsname}._write_dict(builder, pos, d)
+                return cls.from_buffer(builder.as_string(), 0, {data_size}, {ptrs_size})
+            """)
+        ns.w()
+
     def _emit_repr(self, m):
         # def shortrepr(self):
         #     parts = []
@@ -269,6 +328,169 @@ class Node__Struct:
         else:
             return '"???"'
 
+    def _emit_to_dict(self, m):
+        # def to_dict(self):
+        #     d = {}
+        #     d['x'] = self._read_primitive(0, ord('q'))
+        #     tag = self.__which__()
+        #     if tag == 0: d['circle'] = self.circle
+        #     ...
+        #     return d
+        #
+        # the keys are the same as the arguments of the ctor: in particular,
+        # non-union void fields are not included, and for unions only the
+        # currently-tagged field is included
+        with m.block('{cpdef} to_dict(self):') as ns:
+            fields = self.get_struct_fields() or []
+            if m.pyx:
+                ns.w('cdef dict d = {{}}')
+            else:
+                ns.w('d = {{}}')
+            if self.struct.discriminantCount:
+                if m.pyx:
+                    ns.w('cdef long tag = self.__which__()')
+                else:
+                    ns.w('tag = self.__which__()')
+            for f in fields:
+                if f.is_void() and not f.is_part_of_union():
+                    continue
+                if f.is_slot() and f.slot.type.is_anyPointer():
+                    # there is no sensible way to convert it
+                    continue
+                ns.pyname = m.py_field_name(f)
+                ns.tag = f.discriminantValue
+                if f.is_part_of_union():
+                    with ns.block("if tag == {tag}:"):
+                        self._emit_to_dict_for_field(m, ns, f)
+                else:
+                    self._emit_to_dict_for_field(m, ns, f)
+            ns.w('return d')
+
+    def _emit_to_dict_for_field(self, m, ns, f):
+        if f.is_struct() or f.is_list():
+            ns.method = 'to_dict' if f.is_struct() else 'to_list'
+            ns.w("value = self.{pyname}")
+            ns.w("d['{pyname}'] = None if value is None else value.{method}()")
+        elif f.is_group() and not f.is_nullable(m):
+            ns.w("d['{pyname}'] = self.{pyname}.to_dict()")
+        else:
+            ns.value = self._to_dict_for_field(m, ns, f)
+            ns.w("d['{pyname}'] = {value}")
+
+    def _to_dict_for_field(self, m, ns, f):
+        if f.is_primitive() or f.is_bool():
+            # read the value directly at the known offset, without going
+            # through the property
+            default_ = f.slot.defaultValue.as_pyobj()
+            if f.is_bool():
+                byteoffset, bitoffset = divmod(f.slot.offset, 8)
+                value = 'self._read_bit(%d, %d)' % (byteoffset, 1 << bitoffset)
+            else:
+                offset = f.slot.offset * f.slot.get_size()
+                value = 'self._read_primitive(%d, ord(%r))' % (offset,
+                                                               f.slot.get_fmt())
+            if default_ != 0:
+                value = '(%s ^ %r)' % (value, default_)
+            return value
+        elif f.is_void():
+            return 'None'
+        else:
+            # enums, texts, data and nullable groups
+            return ns.format('self.{pyname}')
+
+    def _emit_to_json(self, m):
+        # def _to_json(self):
+        #     parts = []
+        #     parts.append('"x":%d' % self._read_primitive(0, ord('i')))
+        #     if self.has_name(): parts.append('"name":' + _json_dump_text(self.name))
+        #     return '{%s}' % ','.join(parts)
+        #
+        # the field order and the rules to omit fields are the same as
+        # shortrepr(), see capnpy.json for the conventions
+        with m.block('{cpdef} _to_json(self):') as ns:
+            fields = self.get_struct_fields() or []
+            ns.w('parts = []')
+            for f in fields:
+                if f.is_slot() and f.slot.type.is_anyPointer():
+                    continue
+                ns.pyname = m.py_field_name(f)
+                ns.append = 'parts.append(%s)' % self._to_json_for_field(m, ns, f)
+                if f.is_part_of_union() and f.is_pointer():
+                    # the currently-tagged field is always included, to
+                    # preserve the tag
+                    ns.key = '"%s":null' % m.capnp_field_name(f)
+                    ns.ww("""
+                        if self.is_{pyname}():
+                            if self.has_{pyname}(): {append}
+                            else: parts.append({key!r})
+                    """)
+                elif f.is_part_of_union():
+                    ns.w("if self.is_{pyname}(): {append}")
+                elif f.is_pointer():
+                    ns.w("if self.has_{pyname}(): {append}")
+                else:
+                    ns.w("{append}")
+            ns.w("return '{{%s}}' % ','.join(parts)")
+
+    def _to_json_for_field(self, m, ns, f):
+        key = '"%s":' % m.capnp_field_name(f)
+        if f.is_float32() or f.is_float64():
+            return '%r + _json_dump_%s(self.%s)' % (key, f.slot.get_typename(),
+                                                    ns.pyname)
+        elif f.is_primitive() or f.is_bool():
+            value = self._to_dict_for_field(m, ns, f)
+            if f.is_bool():
+                return "%r + ('true' if %s else 'false')" % (key, value)
+            elif f.slot.get_typename() in ('int64', 'uint64'):
+                # 64-bit integers are encoded as strings
+                return '%r %% %s' % (key + '"%d"', value)
+            else:
+                return '%r %% %s' % (key + '%d', value)
+        elif f.is_enum():
+            return '%r + _json_dump_enum(self.%s)' % (key, ns.pyname)
+        elif f.is_void():
+            return repr(key + 'null')
+        elif f.is_text_any():
+            return '%r + _json_dump_text(self.%s)' % (key, ns.pyname)
+        elif f.is_data():
+            return '%r + _json_dump_data(self.%s)' % (key, ns.pyname)
+        elif f.is_struct():
+            return '%r + self.%s._to_json()' % (key, ns.pyname)
+        elif f.is_list():
+            return '%r + _json_dump_list(self.%s)' % (key, ns.pyname)
+        elif f.is_nullable(m):
+            # in JSON, nullable groups are plain groups
+            return '%r + self._%s._to_json()' % (key, ns.pyname)
+        else:
+            assert f.is_group()
+            return '%r + self.%s._to_json()' % (key, ns.pyname)
+
+    def _emit_builder_type(self, m):
+        # @staticmethod
+        # def _builder_type(name):
+        #     if name == 'p': return Point
+        #     if name == 'points': return _Point_list_item_type
+        #
+        # return the type of the children which can be created by
+        # StructBuilder.init()
+        m.w('@staticmethod')
+        with m.block('def _builder_type(name):') as ns:
+            for f in self.get_struct_fields() or []:
+                if f.is_nullable(m):
+                    continue
+                elif f.is_group():
+                    ns.t = f.group.get_node(m).compile_name(m)
+                elif f.is_struct():
+                    ns.t = f.slot.type.runtime_name(m)
+                elif f.is_list() and f.slot.type.list.elementType.is_struct():
+                    t = f.slot.type.list.elementType
+                    ns.t = t.list_item_type(m, m.options(f))
+                else:
+                    continue
+                ns.pyname = m.py_field_name(f)
+                ns.w("if name == {pyname!r}: return {t}")
+            ns.w('return None')
+
     def _emit_key_maybe(self, m):
         ann = m.has_annotation(self, annotate.key)
         if ann is None:
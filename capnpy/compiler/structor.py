@@ -34,7 +34,7 @@ class Structor(object):
         ## generate a constructor which looks like this
         ## @staticmethod
         ## def __new(x=0, y=0, z=None):
-        ##     builder = _SegmentBuilder()
+        ##     builder = _SegmentBuilder(24 + _size_hint(z, 1))
         ##     pos = builder.allocate(24)
         ##     builder.write_int64(pos + 0, x)
         ##     builder.write_int64(pos + 8, y)
@@ -52,7 +52,8 @@ class Structor(object):
             ns.length = (self.data_size + self.ptrs_size)*8
             ns.cdef_var('_SegmentBuilder', 'builder')
             ns.cdef_var('long', 'pos')
-            ns.w('builder = _SegmentBuilder()')
+            ns.size_hint = self.size_hint()
+            ns.w('builder = _SegmentBuilder({size_hint})')
             ns.w('pos = builder.allocate({length})')
             for union in self.fieldtree.all_unions():
                 ns.w('{union}__curtag = None', union=union.varname)
@@ -60,6 +61,44 @@ class Structor(object):
                 self.handle_node(node)
             ns.w('return builder.as_string()')
 
+    def size_hint(self):
+        """
+        Return an expression which estimates the size of the resulting
+        buffer, so that the builder can preallocate it instead of growing
+        many times: the static size of the struct plus the size of the
+        text/data/list arguments. Nested structs and the fields inside
+        groups and unions are not taken into account.
+        """
+        terms = [str((self.data_size + self.ptrs_size)*8)]
+        for node in self.fieldtree.children:
+            f = node.f
+            if f.is_part_of_union() or f.is_group() or f.is_nullable(self.m):
+                continue
+            if f.is_text_any() or f.is_data():
+                item_length = 1
+            elif f.is_list():
+                item_length = self._list_item_length(f.slot.type.list.elementType)
+            else:
+                continue
+            if item_length:
+                terms.append('_size_hint(%s, %d)' % (node.varname, item_length))
+        return ' + '.join(terms)
+
+    def _list_item_length(self, t):
+        if t.is_void():
+            return 0
+        elif t.is_bool():
+            return 1 # overestimated, but it is just a hint
+        elif t.is_primitive():
+            return t.as_type().calcsize()
+        elif t.is_enum():
+            return 2
+        elif t.is_struct():
+            node = t.get_node(self.m)
+            return (node.struct.dataWordCount + node.struct.pointerCount)*8
+        else:
+            return 8 # a pointer
+
     def handle_node(self, node):
         if node.f.is_part_of_union():
             ns = self.m.code.new_scope()
@@ -71,7 +110,7 @@ class Structor(object):
             ns.ifmt  = 'ord(%r)' % Types.int16.fmt
             with ns.block('if {varname} is not _undefined:'):
                 ns.w('{union}__curtag = _check_tag({union}__curtag, {tagname!r})')
-                ns.w('builder.write_int16({offset}, {tagval})')
+                ns.w('builder.write_int16(pos + {offset}, {tagval})')
                 self._handle_node(node)
         else:
             self._handle_node(node)
@@ -202,4 +241,155 @@ class Structor(object):
         if node.f.slot.hadExplicitDefault:
             ns.default_ = node.f.slot.defaultValue.as_pyobj()
             ns.w('{arg} ^= {default_}')
-        ns.w('builder.write_bool({byteoffset}, {bitoffset}, {arg})')
+        ns.w('builder.write_bool(pos + {byteoffset}, {bitoffset}, {arg})')
+
+
+class DictStructor(Structor):
+    """
+    Create a function which writes the content of a dict (in the format
+    returned by to_dict()) into an already allocated struct.
+
+    The values are looked up in the dict and stored in the same variables
+    used by the ctor, so that the Structor.handle_* methods can be reused
+    as-is. Nested dicts are written directly into the same builder, without
+    creating intermediate struct objects.
+    """
+
+    funcname = '_write_dict'
+
+    def __init__(self, m, structnode, fields):
+        Structor.__init__(self, m, structnode, fields)
+        # the values are stored in local variables: prefix their names to
+        # avoid clashing with builtins (e.g. a field called "int") and with C
+        # types in pyx mode
+        for node in self.fieldtree.allnodes():
+            node.varname = '_v_' + node.varname
+
+    def emit(self):
+        ## @staticmethod
+        ## def _write_dict(builder, pos, _d):
+        ##     x = _d.get('x', 0)
+        ##     builder.write_int64(pos + 0, x)
+        ##     p = _d.get('p', None)
+        ##     if isinstance(p, dict):
+        ##         Point._write_dict(builder, builder.alloc_struct(pos + 8, 2, 0), p)
+        ##     else:
+        ##         builder.copy_from_struct(pos + 8, Point, p)
+        code = self.m.code
+        code.w('@staticmethod')
+        if self.m.pyx:
+            block = code.block('def {funcname}(_SegmentBuilder builder, long pos, _d):',
+                               funcname=self.funcname)
+        else:
+            block = code.block('def {funcname}(builder, pos, _d):',
+                               funcname=self.funcname)
+        with block as ns:
+            for union in self.fieldtree.all_unions():
+                ns.w('{union}__curtag = None', union=union.varname)
+            self.load_children(self.fieldtree, '_d')
+
+    def load_children(self, parent, dictname):
+        ns = self.m.code.new_scope()
+        ns.dictname = dictname
+        for node in parent.children:
+            f = node.f
+            if f.is_slot() and f.slot.type.is_anyPointer():
+                # to_dict() does not include them: leave them null
+                continue
+            ns.varname = node.varname
+            ns.key = self.field_key(f)
+            ns.default_ = self.load_default(node)
+            ns.w('{varname} = {dictname}.get({key!r}, {default_})')
+            self.handle_node(node)
+
+    def field_key(self, f):
+        return self.m.py_field_name(f)
+
+    def load_default(self, node):
+        f = node.f
+        if f.is_part_of_union():
+            return '_undefined'
+        elif f.is_group() and not f.is_nullable(self.m):
+            return '{}'
+        return node.default
+
+    def handle_group(self, node):
+        # the value of a group is a dict
+        self.load_children(node, node.varname)
+
+    def handle_struct(self, node):
+        ns = self.m.code.new_scope()
+        ns.fname = node.varname
+        ns.offset = self.slot_offset(node.f)
+        ns.structname = node.f.slot.type.runtime_name(self.m)
+        struct = node.f.slot.type.get_node(self.m).struct
+        ns.data_size = struct.dataWordCount
+        ns.ptrs_size = struct.pointerCount
+        ns.ww("""
+            if isinstance({fname}, dict):
+                {structname}._write_dict(builder, builder.alloc_struct(pos + {offset}, {data_size}, {ptrs_size}), {fname})
+            else:
+                builder.copy_from_struct(pos + {offset}, {structname}, {fname})
+        """)
+
+
+class JsonStructor(DictStructor):
+    """
+    Like DictStructor, but the dict is in the format returned by
+    json.loads(), following the conventions of capnpy.json: the keys are
+    the capnproto field names, 64-bit integers and non-finite floats can be
+    strings, enums are names and Data is a list of bytes. Nullable groups
+    are treated as plain groups.
+    """
+
+    funcname = '_write_json'
+
+    def field_key(self, f):
+        return self.m.capnp_field_name(f)
+
+    def load_default(self, node):
+        if node.f.is_group() and not node.f.is_part_of_union():
+            return '{}'
+        return DictStructor.load_default(self, node)
+
+    def _handle_node(self, node):
+        f = node.f
+        if f.is_group():
+            self.handle_group(node)
+            return
+        ns = self.m.code.new_scope()
+        ns.arg = node.varname
+        if f.is_float32() or f.is_float64():
+            ns.w('{arg} = float({arg})')
+        elif f.is_primitive():
+            ns.w('{arg} = int({arg})')
+        elif f.is_enum():
+            ns.enumcls = f.slot.type.runtime_name(self.m)
+            ns.w('{arg} = _json_load_enum({enumcls}, {arg})')
+        elif f.is_text_bytes(self.m):
+            ns.w('{arg} = _json_load_text({arg})')
+        elif f.is_data():
+            ns.w('{arg} = _json_load_data({arg})')
+        DictStructor._handle_node(self, node)
+
+    def handle_struct(self, node):
+        ns = self.m.code.new_scope()
+        ns.fname = node.varname
+        ns.offset = self.slot_offset(node.f)
+        ns.structname = node.f.slot.type.runtime_name(self.m)
+        struct = node.f.slot.type.get_node(self.m).struct
+        ns.data_size = struct.dataWordCount
+        ns.ptrs_size = struct.pointerCount
+        ns.ww("""
+            if {fname} is not None:
+                {structname}._write_json(builder, builder.alloc_struct(pos + {offset}, {data_size}, {ptrs_size}), {fname})
+        """)
+
+    def handle_list(self, node):
+        options = self.m.options(node.f)
+        ns = self.m.code.new_scope()
+        ns.fname = node.varname
+        ns.offset = self.slot_offset(node.f)
+        t = node.f.slot.type.list.elementType
+        ns.list_item_type = t.list_item_type(self.m, options)
+        ns.w('_json_copy_list(builder, pos + {offset}, {list_item_type}, {fname})')
@@ -3,6 +3,8 @@ from capnpy.util import magic_setattr
 class BaseEnum(int):
     __slots__ = ()
     __members__ = ()
+    # the names as written in the schema, if they differ from __members__
+    __capnp_members__ = None
 
     @property
     def name(self):
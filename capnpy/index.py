@@ -0,0 +1,174 @@
+"""
+Random access to files containing many capnproto messages.
+
+build_index() scans a file and writes a side file containing the offset and
+the length of each message: only the segment tables are read, while the
+bodies of the messages are skipped. Then, IndexedMessages uses the index to
+load any message in O(1).
+
+The index file is composed by a header (the magic string, and the size and
+the modification time in nanoseconds of the indexed file) followed by an
+(offset, length) pair for each message, all encoded as little-endian uint64.
+"""
+
+import os
+import struct
+from capnpy.segment.base import unpack_uint32
+from capnpy.message import _mmap_file, _load_message_mmap
+
+MAGIC = b'capnpix2'
+HEADER = struct.Struct('<8sQQ')
+ENTRY = struct.Struct('<QQ')
+
+
+def get_file_stamp(f):
+    """
+    Return the (size, mtime) of the given file, as stored in the header of
+    the index: if any of the two changes, the index is out of date.
+    """
+    st = os.fstat(f.fileno())
+    mtime_ns = getattr(st, 'st_mtime_ns', None)
+    if mtime_ns is None:
+        # Python 2
+        mtime_ns = int(st.st_mtime * 1e9)
+    return st.st_size, mtime_ns
+
+
+def scan_messages(f):
+    """
+    Yield the (offset, length) of all the messages in the given file, which
+    must be seekable. Only the segment tables are read.
+    """
+    filesize = os.fstat(f.fileno()).st_size
+    offset = 0
+    while offset < filesize:
+        f.seek(offset)
+        buf = f.read(4)
+        if len(buf) < 4:
+            raise ValueError("Malformed header: expected 4 bytes, got %d" % len(buf))
+        n = unpack_uint32(buf, 0) + 1
+        buf = f.read(n*4)
+        if len(buf) < n*4:
+            raise ValueError("Unexpected EOF when reading the header")
+        segments = struct.unpack('<%dI' % n, buf)
+        header_length = 4 + n*4
+        if header_length & 7 != 0:
+            header_length += 8-(header_length & 7)
+        length = header_length + sum(segments)*8
+        if offset + length > filesize:
+            raise ValueError("Unexpected EOF: the message at offset %d is "
+                             "truncated" % offset)
+        yield offset, length
+        offset += length
+
+
+def build_index(path, index_path=None):
+    """
+    Build the index for the messages contained in the file at ``path``, and
+    write it to ``index_path`` (by default, ``path + '.idx'``). Return
+    ``index_path``.
+    """
+    if index_path is None:
+        index_path = path + '.idx'
+    with open(path, 'rb') as f:
+        filesize, mtime = get_file_stamp(f)
+        out = open(index_path, 'wb')
+        try:
+            with out:
+                # the real header is written only at the end, so that an
+                # index left behind by an interrupted build is never
+                # considered valid
+                out.write(b'\0' * HEADER.size)
+                for offset, length in scan_messages(f):
+                    out.write(ENTRY.pack(offset, length))
+                out.seek(0)
+                out.write(HEADER.pack(MAGIC, filesize, mtime))
+        except (ValueError, IOError, OSError, struct.error):
+            # don't leave around the partial index which we wrote
+            os.remove(index_path)
+            raise
+    return index_path
+
+
+def load_index(index_path):
+    """
+    Load the index written by build_index(). Return a tuple (stamp, buf),
+    where stamp is the (size, mtime) of the indexed file and buf contains the
+    raw entries.
+    """
+    with open(index_path, 'rb') as f:
+        buf = f.read()
+    if len(buf) < HEADER.size:
+        raise ValueError("Invalid index file: %s" % index_path)
+    magic, filesize, mtime = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or (len(buf) - HEADER.size) % ENTRY.size != 0:
+        raise ValueError("Invalid index file: %s" % index_path)
+    return (filesize, mtime), buf[HEADER.size:]
+
+
+def _load_current_index(index_path, stamp):
+    # return the entries of the index, or None if it does not exist, is
+    # invalid (e.g. because its build was interrupted) or is out of date
+    if not os.path.exists(index_path):
+        return None
+    try:
+        index_stamp, entries = load_index(index_path)
+    except ValueError:
+        return None
+    if index_stamp != stamp:
+        return None
+    return entries
+
+
+class IndexedMessages(object):
+    """
+    Sequence-like access to the messages contained in the file at ``path``,
+    which must be of type ``payload_type``.
+
+    If ``index_path`` is not given, it defaults to ``path + '.idx'``; if the
+    index file does not exist, is invalid or is out of date, it is
+    (re)built automatically.
+
+    The file is memory-mapped, so loading a message does not copy any data:
+    see capnpy.message.load_all_mmap.
+    """
+
+    def __init__(self, path, payload_type, index_path=None):
+        if index_path is None:
+            index_path = path + '.idx'
+        self.path = path
+        self.payload_type = payload_type
+        with open(path, 'rb') as f:
+            stamp = get_file_stamp(f)
+            entries = _load_current_index(index_path, stamp)
+            if entries is None:
+                build_index(path, index_path)
+                _, entries = load_index(index_path)
+            self._entries = entries
+            self._buf = _mmap_file(f)
+
+    def __len__(self):
+        return len(self._entries) // ENTRY.size
+
+    def get_entry(self, i):
+        """
+        Return the (offset, length) of the i-th message
+        """
+        n = len(self)
+        if i < 0:
+            i += n
+        if i < 0 or i >= n:
+            raise IndexError('message index out of range: %d' % i)
+        return ENTRY.unpack_from(self._entries, i*ENTRY.size)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        offset, length = self.get_entry(i)
+        msg, end = _load_message_mmap(self._buf, offset)
+        assert end == offset + length
+        return msg._read_struct(0, self.payload_type)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
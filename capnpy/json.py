@@ -0,0 +1,204 @@
+"""
+Encode and decode capnproto structs to and from JSON, following the
+conventions of the JSON codec of the reference implementation:
+
+  - the keys are the field names as written in the schema
+
+  - 64-bit integers are encoded as strings, because most JSON parsers
+    cannot represent them exactly
+
+  - NaN and infinities are encoded as "NaN", "Infinity" and "-Infinity"
+
+  - enums are encoded as the name of the enumerant, and Data as an array of
+    bytes
+
+  - null pointers are omitted; for unions, only the field which is currently
+    set is included
+
+The encoder is generated by the compiler: each struct has a _to_json() method
+which writes the JSON text directly, without going through to_dict(). The
+decoder uses the standard json module to parse the text, then writes the
+values directly into a SegmentBuilder by calling the generated _write_json().
+"""
+
+from __future__ import absolute_import
+import json
+import six
+from capnpy import ptr
+from capnpy.type import Types
+from capnpy.list import (VoidItemType, BoolItemType, PrimitiveItemType,
+                         EnumItemType, StructItemType, TextItemType,
+                         TextUnicodeItemType, ListItemType)
+from capnpy.segment.builder import SegmentBuilder
+from capnpy.util import float32_repr, float64_repr
+
+
+def dumps(obj):
+    """
+    Return the JSON representation of the given struct
+    """
+    return obj._to_json()
+
+def dump(obj, f):
+    f.write(obj._to_json())
+
+def loads(s, payload_type):
+    """
+    Decode the JSON text ``s`` into a struct of type ``payload_type``.
+    Missing keys get the default value of the field, and keys which do not
+    correspond to any field are ignored.
+    """
+    if isinstance(s, bytes):
+        s = s.decode('utf-8')
+    obj = json.loads(s)
+    if not isinstance(obj, dict):
+        raise ValueError("Expected a JSON object, got %s" % type(obj).__name__)
+    data_size = payload_type.__static_data_size__
+    ptrs_size = payload_type.__static_ptrs_size__
+    builder = SegmentBuilder()
+    pos = builder.allocate((data_size + ptrs_size)*8)
+    payload_type._write_json(builder, pos, obj)
+    return payload_type.from_buffer(builder.as_string(), 0, data_size, ptrs_size)
+
+def load(f, payload_type):
+    return loads(f.read(), payload_type)
+
+
+# ============================================================
+# helpers used by the generated code
+# ============================================================
+
+_INF = float('inf')
+
+def _dump_nonfinite(x):
+    if x != x:
+        return '"NaN"'
+    elif x > 0:
+        return '"Infinity"'
+    else:
+        return '"-Infinity"'
+
+def dump_float32(x):
+    if x != x or x == _INF or x == -_INF:
+        return _dump_nonfinite(x)
+    return float32_repr(x)
+
+def dump_float64(x):
+    if x != x or x == _INF or x == -_INF:
+        return _dump_nonfinite(x)
+    return float64_repr(x)
+
+def dump_text(s):
+    if isinstance(s, bytes):
+        s = s.decode('utf-8')
+    return json.dumps(s)
+
+def dump_data(s):
+    return '[%s]' % ','.join([str(ch) for ch in six.iterbytes(s)])
+
+def _capnp_members(enumcls):
+    return enumcls.__capnp_members__ or enumcls.__members__
+
+def dump_enum(value):
+    members = _capnp_members(type(value))
+    if 0 <= value < len(members):
+        return '"%s"' % members[value]
+    # unknown enumerants are encoded as numbers
+    return str(int(value))
+
+def dump_list(lst):
+    item_type = lst._item_type
+    if isinstance(item_type, StructItemType):
+        items = [item._to_json() for item in lst]
+    elif isinstance(item_type, ListItemType):
+        items = ['null' if item is None else dump_list(item) for item in lst]
+    elif isinstance(item_type, EnumItemType):
+        items = [dump_enum(item) for item in lst]
+    elif isinstance(item_type, PrimitiveItemType):
+        t = item_type.t
+        if t is Types.float32:
+            items = [dump_float32(item) for item in lst]
+        elif t is Types.float64:
+            items = [dump_float64(item) for item in lst]
+        elif t is Types.int64 or t is Types.uint64:
+            items = ['"%d"' % item for item in lst]
+        else:
+            items = ['%d' % item for item in lst]
+    elif isinstance(item_type, BoolItemType):
+        items = ['true' if item else 'false' for item in lst]
+    elif isinstance(item_type, TextItemType):
+        if item_type.additional_size == 0:
+            dump_item = dump_data
+        else:
+            dump_item = dump_text
+        items = ['null' if item is None else dump_item(item) for item in lst]
+    elif isinstance(item_type, VoidItemType):
+        items = ['null'] * len(lst)
+    else:
+        raise TypeError("Unsupported list item type: %s" % item_type)
+    return '[%s]' % ','.join(items)
+
+def load_enum(enumcls, value):
+    if isinstance(value, six.string_types):
+        try:
+            return _capnp_members(enumcls).index(value)
+        except ValueError:
+            raise ValueError("Unknown enumerant for %s: %r" %
+                             (enumcls.__name__, value))
+    return int(value)
+
+def load_data(value):
+    if value is None:
+        return None
+    return bytes(bytearray(value))
+
+def load_text(value):
+    if isinstance(value, six.text_type):
+        return value.encode('utf-8')
+    return value
+
+def _load_item(item_type, value):
+    if isinstance(item_type, EnumItemType):
+        return load_enum(item_type.enumcls, value)
+    elif isinstance(item_type, PrimitiveItemType):
+        if item_type.t is Types.float32 or item_type.t is Types.float64:
+            return float(value)
+        return int(value)
+    elif isinstance(item_type, TextUnicodeItemType):
+        return value
+    elif isinstance(item_type, TextItemType):
+        if item_type.additional_size == 0:
+            return load_data(value)
+        return load_text(value)
+    return value
+
+def copy_list(builder, pos, item_type, lst):
+    """
+    Like SegmentBuilder.copy_from_list, but lst is in the format returned by
+    json.loads()
+    """
+    if lst is None:
+        builder.write_int64(pos, 0)
+        return
+    item_count = len(lst)
+    if isinstance(item_type, StructItemType):
+        structcls = item_type.structcls
+        data_size = item_type.static_data_size
+        ptrs_size = item_type.static_ptrs_size
+        item_length = item_type.item_length
+        total_words = (data_size+ptrs_size) * item_count
+        pos = builder.alloc_list(pos, ptr.LIST_SIZE_COMPOSITE, total_words,
+                                 item_length*item_count + 8) # +8 is for the tag
+        builder.write_int64(pos, ptr.new_struct(item_count, data_size, ptrs_size))
+        pos += 8
+        for item in lst:
+            structcls._write_json(builder, pos, item)
+            pos += item_length
+    elif isinstance(item_type, ListItemType):
+        pos = builder.alloc_list(pos, ptr.LIST_SIZE_PTR, item_count, 8*item_count)
+        for item in lst:
+            copy_list(builder, pos, item_type.inner_item_type, item)
+            pos += 8
+    else:
+        lst = [_load_item(item_type, item) for item in lst]
+        builder.copy_from_list(pos, item_type, lst)
@@ -23,6 +23,9 @@ cdef class List(Blob):
     cpdef _set_list_tag(self, long size_tag, long item_count)
     cpdef _getitem_fast(self, long i)
 
+    @cython.locals(n=long)
+    cpdef list to_list(self)
+
 cdef class ItemType(object):
     cdef readonly long item_length
     cdef readonly long size_tag
@@ -1,5 +1,6 @@
 import struct
 import six
+from collections import OrderedDict
 from six.moves import range
 
 import capnpy
@@ -50,6 +51,13 @@ class List(Blob):
             self._item_count = item_count
             self._item_length = ptr.list_item_length(size_tag)
             self._item_offset = 0
+        if (self._item_length == 0 and self._seg.traversal_limit >= 0 and
+            self._item_count > self._seg.traversal_limit):
+            # a list of void or of empty structs does not take any space, so
+            # a malicious message could contain a huge one
+            raise ValueError("Exceeded the traversal limit of %d words: the "
+                             "list contains %d zero-sized items" %
+                             (self._seg.traversal_limit, self._item_count))
 
     def __repr__(self):
         return '<capnpy list [%d items]>' % (len(self),)
@@ -82,7 +90,7 @@ class List(Blob):
         # comparing the memory without doing a full copy
         start = self._offset
         end = self._get_end()
-        return self._seg.buf[start:end]
+        return self._seg.read_bytes(start, end)
 
     def _equals(self, other):
         if not self._item_type.can_compare():
@@ -99,6 +107,127 @@ class List(Blob):
         parts = [self._item_type.item_repr(item) for item in self]
         return '[%s]' % (', '.join(parts))
 
+    def to_list(self):
+        """
+        Return the content of the list as a Python list. Structs and nested
+        lists are converted recursively, by calling to_dict() and to_list().
+        """
+        item_type = self._item_type
+        n = self._item_count
+        if isinstance(item_type, StructItemType):
+            return [self._getitem_fast(i).to_dict() for i in range(n)]
+        elif isinstance(item_type, ListItemType):
+            return [self._getitem_fast(i).to_list() for i in range(n)]
+        return [self._getitem_fast(i) for i in range(n)]
+
+    def as_array(self):
+        """
+        Return the content of the list as a read-only numpy array.
+
+        For lists of primitive types (and enums, which are returned as their
+        int16 value), the array is a view over the memory of the message,
+        without any copy. If the list was encoded with items bigger than the
+        type (e.g., because the schema changed), the view is strided. For
+        lists of bools, the bits are unpacked into a new array.
+
+        numpy is imported only when you call this method.
+        """
+        import numpy
+        item_type = self._item_type
+        if isinstance(item_type, PrimitiveItemType):
+            dtype = numpy.dtype('<' + chr(item_type.ifmt))
+            if self._item_length < dtype.itemsize:
+                raise ValueError("Cannot read a list of items of %d bytes as "
+                                 "an array of %s" % (self._item_length, dtype))
+            # the items of composite lists start after the tag
+            start = self._offset + self._item_offset
+            if self._item_length == dtype.itemsize:
+                arr = numpy.frombuffer(self._seg.buf, dtype, self._item_count,
+                                       start)
+            else:
+                arr = numpy.ndarray((self._item_count,), dtype, self._seg.buf,
+                                    start, (self._item_length,))
+        elif isinstance(item_type, BoolItemType):
+            if self._size_tag != ptr.LIST_SIZE_BIT:
+                raise ValueError("Cannot read a list of items of %d bytes as "
+                                 "an array of bools" % (self._item_length,))
+            nbytes = (self._item_count + 7) // 8
+            bits = numpy.frombuffer(self._seg.buf, numpy.uint8, nbytes,
+                                    self._offset)
+            arr = numpy.unpackbits(bits, bitorder='little')
+            arr = arr[:self._item_count].view(numpy.bool_)
+        else:
+            raise TypeError("as_array() is supported only for lists of "
+                            "primitive types, got %s" % (item_type.get_type(),))
+        arr.flags.writeable = False
+        return arr
+
+    def to_columns(self, names=None):
+        """
+        Return the fields of a list of structs as an OrderedDict mapping each
+        field name to a read-only numpy array, in column-major order.
+
+        ``names`` is the list of fields to extract; by default, all the
+        primitive, enum and bool fields which are not part of a union.
+
+        The arrays of primitive and enum fields are strided views over the
+        memory of the message, without any copy; bools and fields with an
+        explicit default value are computed into new arrays.
+
+        numpy is imported only when you call this method.
+        """
+        import numpy
+        item_type = self._item_type
+        if not isinstance(item_type, StructItemType):
+            raise TypeError("to_columns() is supported only for lists of "
+                            "structs, got %s" % (item_type.get_type(),))
+        structcls = item_type.structcls
+        layout = OrderedDict()
+        for field in getattr(structcls, '__data_fields__', ()):
+            layout[field[0]] = field
+        if names is None:
+            names = list(layout)
+        #
+        n = self._item_count
+        start = self._offset + self._item_offset
+        data_size = ptr.struct_data_size(self._tag) * 8
+        columns = OrderedDict()
+        for name in names:
+            try:
+                _, offset, fmt, default = layout[name]
+            except KeyError:
+                raise ValueError("%s has no primitive field %r" %
+                                 (structcls.__name__, name))
+            if fmt == '?':
+                offset, bitoffset = divmod(offset, 8)
+                dtype = numpy.dtype(numpy.uint8)
+            else:
+                dtype = numpy.dtype('<' + fmt)
+            if n == 0 or offset + dtype.itemsize > data_size:
+                # the field is not in the data section, e.g. because the
+                # message was written with an older schema: all the items
+                # have the default value
+                arr = numpy.zeros(n, dtype)
+            else:
+                arr = numpy.ndarray((n,), dtype, self._seg.buf,
+                                    start + offset, (self._item_length,))
+            #
+            if fmt == '?':
+                arr = (arr & (1 << bitoffset)) != 0
+                if default:
+                    arr = ~arr
+            elif default:
+                # default values are stored XORed with the actual value
+                if dtype.kind == 'f':
+                    udtype = numpy.dtype('<u%d' % dtype.itemsize)
+                    bits = numpy.array(default, dtype).view(udtype)
+                    arr = (arr.view(udtype) ^ bits).view(dtype)
+                else:
+                    arr = arr ^ numpy.array(default, dtype)
+            arr.flags.writeable = False
+            columns[name] = arr
+        return columns
+
 
 class ItemType(object):
 
@@ -243,7 +372,7 @@ class PrimitiveItemType(ItemType):
         return self.t
 
     def read_item(self, lst, i):
-        offset = lst._offset + (i * lst._item_length)
+        offset = lst._offset + lst._item_offset + (i * lst._item_length)
         return lst._seg.read_primitive(offset, self.ifmt)
 
     def item_repr(self, item):
@@ -299,11 +428,17 @@ class StructItemType(ItemType):
 
     def write_item(self, builder, pos, item):
         structcls = self.structcls
+        if isinstance(item, dict):
+            # write the fields in place, see Struct.from_dict
+            structcls._write_dict(builder, pos, item)
+            return
         if not isinstance(item, structcls):
             raise TypeError("Expected an object of type %s, got %s instead" %
                             (self.structcls.__name__, item.__class__.__name__))
         p = item._as_pointer(0)
-        builder.copy_inline_struct(pos, item._seg, p, 0)
+        builder.copy_inline_struct(pos, item._seg, p, 0,
+                                   self.static_data_size,
+                                   self.static_ptrs_size)
 
 
 class TextItemType(ItemType):
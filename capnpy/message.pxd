@@ -1,10 +1,12 @@
 import cython
 from capnpy.segment.base cimport unpack_uint32
-from capnpy.segment.segment cimport Segment
+from capnpy.segment.segment cimport Segment, MultiSegment
 from capnpy.segment.builder cimport SegmentBuilder
 from capnpy.struct_ cimport Struct, struct_from_buffer
 from capnpy cimport ptr
 from capnpy.filelike cimport FileLike, as_filelike
+from capnpy.buffered cimport PackedStream
+from capnpy.packing cimport pack_words, unpack_words
 
 
 @cython.locals(msg=Struct, f2=FileLike)
@@ -13,6 +15,11 @@ cpdef load(object f, object payload_type)
 cpdef loads(bytes buf, object payload_type)
 #cpdef load_all(FileLike f, object payload_type)
 
+cpdef load_packed(object f, object payload_type)
+
+@cython.locals(unpacked=bytes, end=Py_ssize_t)
+cpdef loads_packed(object buf, object payload_type)
+
 
 @cython.locals(buf = bytes, n=int, length=int)
 cpdef Struct _load_message(FileLike f)
@@ -24,6 +31,21 @@ cpdef _load_buffer_single_segment(FileLike f)
                 padding=int, message_lenght=int, offset=int, size=int)
 cpdef _load_buffer_multiple_segments(FileLike f, int n)
 
-@cython.locals(builder=SegmentBuilder, segment_size=long, segment_count=long,
+@cython.locals(builder=SegmentBuilder, segment_count=long,
                p=long, start=long, end=long)
-cpdef dumps(Struct obj, bint fastpath=*)
+cpdef dumps(Struct obj, bint fastpath=*, long segment_size=*)
+
+@cython.locals(builder=SegmentBuilder, n=long)
+cpdef bytes _dumps_segmented(Struct obj, long segment_size)
+
+cdef class MessageWriter(object):
+    cdef readonly object f
+    cdef readonly Py_ssize_t bufsize
+    cdef SegmentBuilder builder
+
+    @cython.locals(builder=SegmentBuilder, pos=Py_ssize_t, start=Py_ssize_t,
+                   end=Py_ssize_t, p=long, segment_count=long, segment_size=long)
+    cpdef write(self, Struct obj, bint fastpath=*)
+    cpdef flush(self)
+
+cpdef bytes dumps_packed(Struct obj, bint fastpath=*)
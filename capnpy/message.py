@@ -1,11 +1,15 @@
+import os
+import mmap
 import struct
+from capnpy.segment import base
 from capnpy.segment.base import unpack_uint32
-from capnpy.segment.segment import Segment, MultiSegment
+from capnpy.segment.segment import Segment, MultiSegment, LazyMultiSegment
 from capnpy.segment.builder import SegmentBuilder
 from capnpy.struct_ import Struct, struct_from_buffer
 from capnpy import ptr
 from capnpy.filelike import as_filelike
-from capnpy.buffered import StringBuffer
+from capnpy.buffered import StringBuffer, PackedStream
+from capnpy.packing import pack_words, unpack_words
 from six.moves import range
 
 
@@ -50,6 +54,186 @@ def load_all(f, payload_type):
     except EOFError:
         pass
 
+def load_packed(f, payload_type):
+    """
+    Same as load(), but load a message which was encoded using the capnproto
+    packed encoding.
+
+    Unless f is already a ``capnpy.buffered.PackedStream``, the file is
+    likely to be consumed beyond the end of the message: use
+    load_all_packed() to load many messages from the same file.
+    """
+    if not isinstance(f, PackedStream):
+        f = PackedStream(f)
+    return load(f, payload_type)
+
+def loads_packed(buf, payload_type):
+    """
+    Same as loads(), but load a message which was encoded using the capnproto
+    packed encoding.
+    """
+    unpacked, end = unpack_words(buf, 0)
+    if end != len(buf):
+        raise ValueError("Unexpected EOF: the packed message ends in the "
+                         "middle of a word")
+    return loads(unpacked, payload_type)
+
+def load_all_packed(f, payload_type):
+    """
+    Load and yield all the messages in the given file-like object, which
+    are encoded using the capnproto packed encoding
+    """
+    return load_all(PackedStream(f), payload_type)
+
+def load_mmap(f, payload_type):
+    """
+    Same as load(), but the file is memory-mapped instead of being read: see
+    load_all_mmap() for details. The file must contain exactly one message.
+    """
+    buf = _mmap_file(f)
+    msg, end = _load_message_mmap(buf, 0)
+    if end != len(buf):
+        remaining = len(buf)-end
+        raise ValueError("Not all bytes were consumed: %d bytes left" % remaining)
+    return msg._read_struct(0, payload_type)
+
+def load_all_mmap(f, payload_type):
+    """
+    Load and yield all the messages in the given file, like load_all().
+
+    The file is memory-mapped and the messages are never copied: the segments
+    point directly into the mapped memory. Thus, loading the messages costs
+    only the parsing of their headers, and the pages are read from the disk
+    only when the fields are actually accessed.
+
+    ``f`` must be a real file opened in binary mode, i.e. it must have a
+    fileno(). The map is kept alive as long as there are objects pointing
+    into it.
+    """
+    buf = _mmap_file(f)
+    offset = 0
+    while offset < len(buf):
+        msg, offset = _load_message_mmap(buf, offset)
+        yield msg._read_struct(0, payload_type)
+
+def load_lazy(f, payload_type):
+    """
+    Same as load(), but the segments of a multi-segment message are read
+    from ``f`` only when they are needed, i.e. the first time that a far
+    pointer targets them. This is useful for big messages of which only a
+    few segments are accessed.
+
+    ``f`` must be a seekable file opened in binary mode, and it must be kept
+    open as long as there are objects pointing into the message. After the
+    call, ``f`` is positioned at the end of the message, so that load_lazy()
+    can be called again to load the next one; reading the segments later
+    does not change the position of the file.
+
+    Single-segment messages are loaded as usual. If ``f`` is a real file,
+    consider load_mmap() too, which leaves the paging to the OS.
+    """
+    msg = _load_message_lazy(f)
+    return msg._read_struct(0, payload_type)
+
+def _load_message_lazy(f):
+    buf = f.read(4)
+    if len(buf) == 0:
+        raise EOFError("No message to load")
+    elif len(buf) < 4:
+        raise ValueError("Malformed header: expected 4 bytes, got %d" % len(buf))
+    n = unpack_uint32(buf, 0) + 1
+    size = n*4
+    if (4 + size) & 7 != 0:
+        size += 4 # padding
+    buf = f.read(size)
+    if len(buf) < size:
+        raise ValueError("Unexpected EOF when reading the header")
+    segments = struct.unpack_from('<%dI' % n, buf)
+    body_start = f.tell()
+    message_length = sum(segments)*8
+    if n == 1 or message_length == 0:
+        seg = _make_segment(f.read(message_length), segments)
+    else:
+        # check that the whole message is there, so that we report
+        # truncated files immediately instead of when accessing the fields
+        file_length = f.seek(0, os.SEEK_END)
+        if file_length is None:
+            # on Python 2, seek() returns None
+            file_length = f.tell()
+        if file_length < body_start + message_length:
+            raise ValueError("Unexpected EOF: expected %d bytes, got only %d. "
+                             "Segments size: %s" % (message_length,
+                                                    file_length - body_start,
+                                                    list(segments)))
+        f.seek(body_start + message_length)
+        segment_offsets = []
+        offset = 0
+        for size in segments:
+            segment_offsets.append(offset)
+            offset += size*8
+        buf = mmap.mmap(-1, message_length)
+        seg = LazyMultiSegment(buf, tuple(segment_offsets), f, body_start)
+        _enforce_limits(seg)
+    if len(seg.buf) < message_length:
+        raise ValueError("Unexpected EOF: expected %d bytes, got only %d. "
+                         "Segments size: %s" % (message_length, len(seg.buf),
+                                                list(segments)))
+    return struct_from_buffer(Struct, seg, 0, data_size=0, ptrs_size=1)
+
+def _mmap_file(f):
+    if os.fstat(f.fileno()).st_size == 0:
+        # mmap() refuses to map empty files
+        return b''
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _load_message_mmap(buf, offset):
+    # Same as _load_message, but the segments are memoryviews over buf,
+    # starting at the given offset. Return the root of the message and the
+    # offset at which it ends. Note that slicing a mmap returns bytes, so we
+    # copy only the header
+    header = buf[offset:offset+4]
+    if len(header) == 0:
+        raise EOFError("No message to load")
+    elif len(header) < 4:
+        raise ValueError("Malformed header: expected 4 bytes, got %d" % len(header))
+    n = unpack_uint32(header, 0) + 1
+    header = buf[offset+4:offset+4+n*4]
+    if len(header) < n*4:
+        raise ValueError("Unexpected EOF when reading the header")
+    segments = struct.unpack('<%dI' % n, header)
+    #
+    # the message starts at the first word boundary after the header
+    bytes_read = 4 + n*4
+    if bytes_read & 7 != 0:
+        bytes_read += 8-(bytes_read & 7)
+    start = offset + bytes_read
+    end = start + sum(segments)*8
+    if end > len(buf):
+        raise ValueError("Unexpected EOF: expected %d bytes, got only %s. "
+                         "Segments size: %s" % (end-start, len(buf)-start,
+                                                list(segments)))
+    seg = _make_segment(memoryview(buf)[start:end], segments)
+    msg = struct_from_buffer(Struct, seg, 0, data_size=0, ptrs_size=1)
+    return msg, end
+
+def _make_segment(buf, segments):
+    # buf contains the body of a message, and segments the size of each
+    # segment in words
+    if len(segments) == 1:
+        return _enforce_limits(Segment(buf))
+    segment_offsets = []
+    offset = 0
+    for size in segments:
+        segment_offsets.append(offset)
+        offset += size*8
+    return _enforce_limits(MultiSegment(buf, tuple(segment_offsets)))
+
+def _enforce_limits(seg):
+    # the messages which we load are untrusted: see capnpy.segment.base
+    seg.traversal_limit = base.TRAVERSAL_LIMIT
+    seg.nesting_limit = base.NESTING_LIMIT
+    return seg
+
 def _load_message(f):
     # read the total number of segments
     buf = f.read(4)
@@ -90,7 +274,7 @@ def _load_buffer_single_segment(f):
     if len(buf) < message_lenght:
         raise ValueError("Unexpected EOF: expected %d bytes, got only %s. " 
                          "Segment size: %s" % (message_lenght, len(buf), message_size))
-    return Segment(buf)
+    return _enforce_limits(Segment(buf))
 
 def _load_buffer_multiple_segments(f, n):
     # slow path for the multiple-segments case
@@ -127,14 +311,18 @@ def _load_buffer_multiple_segments(f, n):
         segment_offsets.append(offset)
     #
     # 5. we are finally done :)
-    return MultiSegment(buf, tuple(segment_offsets))
+    return _enforce_limits(MultiSegment(buf, tuple(segment_offsets)))
 
-def dumps(obj, fastpath=True):
+def dumps(obj, fastpath=True, segment_size=0):
     """
     Dump a struct into a message, returned as a string of bytes.
 
     The message is encoded using the recommended capnp format for serializing
-    messages over a stream. It always uses a single segment.
+    messages over a stream. By default, it uses a single segment. If
+    ``segment_size`` is given, the message is split into segments of at most
+    ``segment_size`` bytes, linked by far pointers: this is needed for huge
+    messages, because the offset of a pointer is limited to 30 bits. Objects
+    bigger than ``segment_size`` get a segment on their own.
 
     By default, it tries to follow a fast path: it checks if the object is
     "compact" (as defined by capnpy/visit.py) and, is so, uses a fast memcpy
@@ -152,6 +340,9 @@ def dumps(obj, fastpath=True):
     else:
         end = -1
     #
+    if end != -1 and segment_size and end - obj._data_offset + 8 > segment_size:
+        end = -1 # the object does not fit in a single segment
+    #
     if end != -1:
         # fast path. On CPython, the real speedup comes from the fact that we
         # do not create a temporary SegmentBuilder. The memcpy vs copy_pointer
@@ -159,6 +350,8 @@ def dumps(obj, fastpath=True):
         start = obj._data_offset
         p = ptr.new_struct(0, obj._data_size, obj._ptrs_size)
         return obj._seg.dump_message(p, start, end)
+    elif segment_size:
+        return _dumps_segmented(obj, segment_size)
     else:
         builder = SegmentBuilder()
         builder.allocate(16) # reserve space for segment header+the root pointer
@@ -170,9 +363,97 @@ def dumps(obj, fastpath=True):
         builder.write_uint32(4, segment_size)
         return builder.as_string()
 
-def dump(obj, f, fastpath=True):
+def _dumps_segmented(obj, segment_size):
+    builder = SegmentBuilder(segment_size=segment_size)
+    builder.allocate(8) # the root pointer
+    builder.copy_from_struct(0, Struct, obj)
+    segments = builder.get_segment_sizes()
+    n = len(segments)
+    header = struct.pack('<%dI' % (n+1), n-1, *segments)
+    if len(header) % 8 != 0:
+        header += b'\x00' * 4 # padding, so that the body is word-aligned
+    return header + builder.as_string()
+
+def dump(obj, f, fastpath=True, segment_size=0):
     """
     Same as dumps, but write to the specified file instead of returning a
     string
     """
-    f.write(dumps(obj, fastpath))
+    f.write(dumps(obj, fastpath, segment_size))
+
+class MessageWriter(object):
+    """
+    Write many messages to the file-like object ``f``.
+
+    The messages are accumulated in a buffer, which is written to ``f`` in a
+    single call when it becomes bigger than ``bufsize`` bytes, or when you
+    call flush(). Compared to calling dump() for each message, this saves
+    many system calls, and the messages are written directly into the buffer
+    without allocating intermediate strings.
+
+    MessageWriter can be used as a context manager, which flushes the buffer
+    on exit.
+    """
+
+    def __init__(self, f, bufsize=64*1024):
+        self.f = f
+        self.bufsize = bufsize
+        self.builder = SegmentBuilder()
+
+    def write(self, obj, fastpath=True):
+        """
+        Write ``obj`` as a single-segment message: see dumps() for the meaning
+        of ``fastpath``.
+        """
+        builder = self.builder
+        # reserve space for segment header+the root pointer. Note that
+        # pointers are relative, so we can build the message at any position
+        pos = builder.allocate(16)
+        if fastpath:
+            end = obj._get_end()
+        else:
+            end = -1
+        #
+        if end != -1:
+            # fast path: copy the whole object with a memcpy
+            start = obj._data_offset
+            p = ptr.new_struct(0, obj._data_size, obj._ptrs_size)
+            builder.write_int64(pos+8, p)
+            builder.write_slice(builder.allocate(end-start), obj._seg, start, end-start)
+        else:
+            builder.copy_from_struct(pos+8, Struct, obj)
+        segment_count = 1
+        segment_size = (builder.get_length()-(pos+8)) // 8
+        builder.write_uint32(pos, segment_count - 1)
+        builder.write_uint32(pos+4, segment_size)
+        if builder.get_length() >= self.bufsize:
+            self.flush()
+
+    def flush(self):
+        """
+        Write all the buffered messages to ``f``
+        """
+        if self.builder.get_length() > 0:
+            self.f.write(self.builder.as_string())
+            self.builder.reset()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, etype, evalue, tb):
+        self.flush()
+
+def dumps_packed(obj, fastpath=True):
+    """
+    Same as dumps(), but the message is encoded using the capnproto packed
+    encoding. The zero bytes of unused fields and null pointers are
+    compressed away, at the cost of some CPU time.
+    """
+    return pack_words(dumps(obj, fastpath))
+
+def dump_packed(obj, f, fastpath=True):
+    """
+    Same as dumps_packed, but write to the specified file instead of
+    returning a string
+    """
+    f.write(dumps_packed(obj, fastpath))
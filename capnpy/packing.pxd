@@ -7,3 +7,5 @@ cpdef bytes pack_message_header(int segment_count, int segment_size, long p)
 cpdef bytes pack_int64(long value)
 cpdef object pack_into(char ifmt, object buf, int offset, object value)
 cpdef object pack_int64_into(object buf, int offset, long value)
+cpdef bytes pack_words(object buf)
+cpdef tuple unpack_words(object buf, Py_ssize_t start=*)
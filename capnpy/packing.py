@@ -1,4 +1,5 @@
 import struct
+from six import indexbytes
 from pypytools import IS_PYPY
 
 if IS_PYPY:
@@ -55,3 +56,110 @@ def pack_into(ifmt, buf, offset, value):
 def pack_int64_into(buf, offset, value):
     return pack_into(ord('q'), buf, offset, value)
 
+
+# ============================================================
+# Packed encoding
+#
+# This is the standard capnproto compression scheme, described here:
+#     https://capnproto.org/encoding.html#packing
+#
+# Each word is reduced to a tag byte, followed by the nonzero bytes of the
+# word: the n-th bit of the tag is set iff the n-th byte of the word is
+# nonzero. Moreover:
+#
+#   - a tag of 0x00 is followed by a byte which counts how many additional
+#     zero words follow
+#
+#   - a tag of 0xff is followed by the 8 bytes of the word, then by a byte
+#     which counts how many uncompressed words follow verbatim
+# ============================================================
+
+def _count_zero_bytes(buf, i):
+    n = 0
+    for j in range(i, i+8):
+        if indexbytes(buf, j) == 0:
+            n += 1
+    return n
+
+def pack_words(buf):
+    """
+    Pack the given buffer using the capnproto packed encoding. The length of
+    the buffer must be a multiple of 8.
+    """
+    n = len(buf)
+    if n % 8 != 0:
+        raise ValueError("The length of the buffer must be a multiple of 8, "
+                         "got %d" % n)
+    out = bytearray()
+    i = 0
+    while i < n:
+        tag = 0
+        tagpos = len(out)
+        out.append(0)
+        for bit in range(8):
+            byte = indexbytes(buf, i+bit)
+            if byte != 0:
+                tag |= (1 << bit)
+                out.append(byte)
+        out[tagpos] = tag
+        i += 8
+        if tag == 0x00:
+            count = 0
+            while i < n and count < 255 and _count_zero_bytes(buf, i) == 8:
+                count += 1
+                i += 8
+            out.append(count)
+        elif tag == 0xff:
+            # emit verbatim all the following words which contain at most one
+            # zero byte: two zeros is the point where the compression becomes a
+            # net win
+            start = i
+            limit = min(n, i + 255*8)
+            while i < limit and _count_zero_bytes(buf, i) < 2:
+                i += 8
+            out.append((i-start) // 8)
+            out += buf[start:i]
+    return bytes(out)
+
+def unpack_words(buf, start=0):
+    """
+    Unpack the data contained in buf[start:], which is encoded using the
+    capnproto packed encoding.
+
+    The data is unpacked up to the last complete tag: return a tuple
+    ``(unpacked, end)``, where ``end`` is the position of the first byte which
+    has not been consumed. If ``end != len(buf)``, the caller must supply
+    more data to unpack the rest.
+    """
+    out = bytearray()
+    n = len(buf)
+    i = start
+    while i < n:
+        tag = indexbytes(buf, i)
+        if tag == 0x00:
+            if i+2 > n:
+                break
+            count = indexbytes(buf, i+1)
+            out += b'\x00' * ((count+1)*8)
+            i += 2
+        elif tag == 0xff:
+            if i+10 > n:
+                break
+            count = indexbytes(buf, i+9)
+            if i + 10 + count*8 > n:
+                break
+            out += buf[i+1:i+9]
+            out += buf[i+10:i+10+count*8]
+            i += 10 + count*8
+        else:
+            nbytes = bin(tag).count('1')
+            if i + 1 + nbytes > n:
+                break
+            i += 1
+            for bit in range(8):
+                if tag & (1 << bit):
+                    out.append(indexbytes(buf, i))
+                    i += 1
+                else:
+                    out.append(0)
+    return bytes(out), i
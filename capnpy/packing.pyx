@@ -1,5 +1,9 @@
 from libc.stdint cimport (int8_t, uint8_t, int16_t, uint16_t,
                           uint32_t, int32_t, int64_t, uint64_t, INT64_MAX)
+from libc.string cimport memcpy, memset
+from cpython.mem cimport PyMem_Malloc, PyMem_Free
+from cpython.buffer cimport (PyObject_GetBuffer, PyBuffer_Release,
+                             PyObject_CheckBuffer, PyBUF_SIMPLE, PyBUF_WRITABLE)
 
 cdef extern from "Python.h":
     int PyByteArray_CheckExact(object o)
@@ -21,6 +25,8 @@ cdef char* as_cbuf(object buf, Py_ssize_t* length, bint rw=0) except NULL:
     # to convert bytes to char*
     cdef bytes bytes_buf
     cdef bytearray ba_buf
+    cdef Py_buffer view
+    cdef char* cbuf
     if not rw and _PyString_CheckExact(buf):
         bytes_buf = buf
         length[0] = _PyString_GET_SIZE(bytes_buf)
@@ -29,11 +35,21 @@ cdef char* as_cbuf(object buf, Py_ssize_t* length, bint rw=0) except NULL:
         ba_buf = buf
         length[0] = PyByteArray_GET_SIZE(ba_buf)
         return PyByteArray_AS_STRING(ba_buf)
+    elif PyObject_CheckBuffer(buf):
+        # slow path, e.g. for memoryviews and mmaps. Note that we release the
+        # buffer immediately: the pointer stays valid as long as the caller
+        # keeps a reference to buf and does not resize it, which is always
+        # the case for the functions in this module
+        PyObject_GetBuffer(buf, &view, PyBUF_WRITABLE if rw else PyBUF_SIMPLE)
+        cbuf = <char*>view.buf
+        length[0] = view.len
+        PyBuffer_Release(&view)
+        return cbuf
     else:
         if rw:
-            raise TypeError("Expected bytearray")
+            raise TypeError("Expected bytearray or a writable buffer")
         else:
-            raise TypeError("Expected str or bytearray")
+            raise TypeError("Expected str, bytearray or a buffer")
 
 cdef checkbound(int size, Py_ssize_t length, int offset):
     if offset < 0 or offset + size > length:
@@ -181,3 +197,146 @@ cpdef object pack_int64_into(object buf, int offset, long value):
     valueaddr = cbuf + offset
     checkbound(8, length, offset)
     (<int64_t*>valueaddr)[0] = value
+
+
+# ============================================================
+# Packed encoding: see packing.py for a description of the format
+# ============================================================
+
+cdef inline int popcount8(uint8_t x):
+    x = x - ((x >> 1) & 0x55)
+    x = (x & 0x33) + ((x >> 2) & 0x33)
+    return (x + (x >> 4)) & 0x0f
+
+cdef inline int count_zero_bytes(const uint8_t* word):
+    cdef int i, n = 0
+    for i in range(8):
+        if word[i] == 0:
+            n += 1
+    return n
+
+cpdef bytes pack_words(object buf):
+    cdef Py_ssize_t n = 0
+    cdef const uint8_t* src = <const uint8_t*>as_cbuf(buf, &n)
+    cdef Py_ssize_t i = 0, start, limit, outlen
+    cdef uint8_t tag, count
+    cdef int bit
+    cdef uint8_t* out
+    cdef uint8_t* p
+    cdef uint8_t* q
+    cdef bytes result
+    if n % 8 != 0:
+        raise ValueError("The length of the buffer must be a multiple of 8, "
+                         "got %d" % n)
+    # worst case: one tag, 8 bytes and one count for each word
+    out = <uint8_t*>PyMem_Malloc(n + (n/8)*2 + 1)
+    if out == NULL:
+        raise MemoryError
+    p = out
+    while i < n:
+        tag = 0
+        q = p+1
+        for bit in range(8):
+            if src[i+bit] != 0:
+                tag |= (1 << bit)
+                q[0] = src[i+bit]
+                q += 1
+        p[0] = tag
+        p = q
+        i += 8
+        if tag == 0x00:
+            count = 0
+            while i < n and count < 255 and (<uint64_t*>(src+i))[0] == 0:
+                count += 1
+                i += 8
+            p[0] = count
+            p += 1
+        elif tag == 0xff:
+            start = i
+            limit = min(n, i + 255*8)
+            while i < limit and count_zero_bytes(src+i) < 2:
+                i += 8
+            p[0] = <uint8_t>((i-start) / 8)
+            p += 1
+            memcpy(p, src+start, i-start)
+            p += i-start
+    outlen = p - out
+    result = _PyString_FromStringAndSize(<char*>out, outlen)
+    PyMem_Free(out)
+    return result
+
+cdef Py_ssize_t scan_packed(const uint8_t* src, Py_ssize_t i, Py_ssize_t n,
+                            Py_ssize_t* outlen):
+    # find the end of the last complete tag and compute the length of the
+    # unpacked data, without unpacking it
+    cdef Py_ssize_t count, nbytes
+    cdef uint8_t tag
+    outlen[0] = 0
+    while i < n:
+        tag = src[i]
+        if tag == 0x00:
+            if i+2 > n:
+                break
+            outlen[0] += (src[i+1]+1) * 8
+            i += 2
+        elif tag == 0xff:
+            if i+10 > n:
+                break
+            count = src[i+9]
+            if i + 10 + count*8 > n:
+                break
+            outlen[0] += 8 + count*8
+            i += 10 + count*8
+        else:
+            nbytes = popcount8(tag)
+            if i + 1 + nbytes > n:
+                break
+            outlen[0] += 8
+            i += 1 + nbytes
+    return i
+
+cpdef tuple unpack_words(object buf, Py_ssize_t start=0):
+    cdef Py_ssize_t n = 0
+    cdef const uint8_t* src = <const uint8_t*>as_cbuf(buf, &n)
+    cdef Py_ssize_t i, end, outlen, count
+    cdef uint8_t tag
+    cdef int bit
+    cdef bytes result
+    cdef uint8_t* p
+    if start < 0 or start > n:
+        raise IndexError('Offset out of bounds: %d' % start)
+    #
+    # first pass: compute the length, so that we can unpack directly inside
+    # the final bytes object
+    end = scan_packed(src, start, n, &outlen)
+    result = _PyString_FromStringAndSize(NULL, outlen)
+    p = <uint8_t*>_PyString_AS_STRING(result)
+    #
+    # second pass: the actual unpacking. We know that all the tags are
+    # complete, so we don't need to do any bound check
+    i = start
+    while i < end:
+        tag = src[i]
+        i += 1
+        if tag == 0x00:
+            count = (src[i]+1) * 8
+            i += 1
+            memset(p, 0, count)
+            p += count
+        elif tag == 0xff:
+            memcpy(p, src+i, 8)
+            p += 8
+            count = src[i+8] * 8
+            i += 9
+            memcpy(p, src+i, count)
+            p += count
+            i += count
+        else:
+            for bit in range(8):
+                if tag & (1 << bit):
+                    p[bit] = src[i]
+                    i += 1
+                else:
+                    p[bit] = 0
+            p += 8
+    return result, end
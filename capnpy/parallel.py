@@ -0,0 +1,88 @@
+"""
+Decode the messages of a file in parallel, using a pool of processes.
+
+The file is split at message boundaries into chunks of roughly equal size;
+each worker maps the file and decodes its own chunks locally, so that only
+the byte ranges are sent to the workers and only the results of ``func`` are
+sent back to the parent.
+"""
+
+import multiprocessing
+from capnpy.index import scan_messages
+from capnpy.message import _mmap_file, _load_message_mmap
+
+# each worker gets on average this number of chunks: a higher number gives a
+# better load balancing, at the cost of more IPC
+CHUNKS_PER_WORKER = 4
+
+
+def split_file(f, n):
+    """
+    Split the messages contained in f into at most n chunks of roughly equal
+    size. Return a list of (start, end) byte ranges; each range contains one
+    or more whole messages.
+    """
+    entries = list(scan_messages(f))
+    if not entries:
+        return []
+    last_offset, last_length = entries[-1]
+    total = last_offset + last_length
+    # the i-th chunk ends at the first message boundary which is at or after
+    # i*total/n: since the last message always ends at total, we get at most
+    # n chunks
+    chunks = []
+    start = 0
+    i = 1
+    for offset, length in entries:
+        end = offset + length
+        if end * n >= i * total:
+            chunks.append((start, end))
+            start = end
+            i = end * n // total + 1
+    return chunks
+
+
+def _map_chunk(args):
+    path, start, end, payload_type, func = args
+    with open(path, 'rb') as f:
+        buf = _mmap_file(f)
+    results = []
+    offset = start
+    while offset < end:
+        msg, offset = _load_message_mmap(buf, offset)
+        results.append(func(msg._read_struct(0, payload_type)))
+    return results
+
+
+def map_messages(path, payload_type, func, workers=None, ordered=True):
+    """
+    Call ``func`` on each message of type ``payload_type`` contained in the
+    file at ``path``, using a pool of ``workers`` processes (by default, one
+    for each CPU). Return an iterator over the results.
+
+    If ``ordered`` is true, the results are in the same order as the
+    messages in the file; else, they are yielded as soon as they are ready.
+
+    ``payload_type`` and ``func`` must be picklable, i.e. they must be
+    importable from the workers. Moreover, ``func`` should return plain
+    Python values instead of capnpy objects, which would pickle the whole
+    segment they point into.
+    """
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    with open(path, 'rb') as f:
+        chunks = split_file(f, workers * CHUNKS_PER_WORKER)
+    tasks = [(path, start, end, payload_type, func) for start, end in chunks]
+    pool = multiprocessing.Pool(workers)
+    try:
+        if ordered:
+            results = pool.imap(_map_chunk, tasks)
+        else:
+            results = pool.imap_unordered(_map_chunk, tasks)
+        for chunk_results in results:
+            for res in chunk_results:
+                yield res
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
@@ -10,7 +10,10 @@ from capnpy.struct_ import undefined as _undefined
 from capnpy.enum import enum as _enum, fill_enum as _fill_enum
 from capnpy.enum import BaseEnum as _BaseEnum
 from capnpy.type import Types as _Types
+from capnpy.segment.segment import Segment as _Segment
+from capnpy.segment.segment import MultiSegment as _MultiSegment
 from capnpy.segment.builder import SegmentBuilder as _SegmentBuilder
+from capnpy.segment.builder import size_hint as _size_hint
 from capnpy.list import List as _List
 from capnpy.list import PrimitiveItemType as _PrimitiveItemType
 from capnpy.list import BoolItemType as _BoolItemType
@@ -28,6 +31,16 @@ from capnpy.util import float64_repr as _float64_repr
 from capnpy.util import extend_module_maybe as _extend_module_maybe
 from capnpy.util import check_version as _check_version
 from capnpy.util import encode_maybe as _encode_maybe
+from capnpy.json import dump_float32 as _json_dump_float32
+from capnpy.json import dump_float64 as _json_dump_float64
+from capnpy.json import dump_text as _json_dump_text
+from capnpy.json import dump_data as _json_dump_data
+from capnpy.json import dump_enum as _json_dump_enum
+from capnpy.json import dump_list as _json_dump_list
+from capnpy.json import load_enum as _json_load_enum
+from capnpy.json import load_text as _json_load_text
+from capnpy.json import load_data as _json_load_data
+from capnpy.json import copy_list as _json_copy_list
 __capnpy_id__ = 0xa93fc509624c72d9
 __capnpy_version__ = '0.7.1.dev8+g4a9c343'
 __capnproto_version__ = '0.7.0'
@@ -221,6 +234,7 @@ class Field_slot(_Struct):
     __capnpy_id__ = 0xc42305476bb4746f
     __static_data_size__ = 3
     __static_ptrs_size__ = 4
+    __data_fields__ = (('offset', 4, 'I', 0), ('hadExplicitDefault', 128, '?', False))
     
     
     @property
@@ -296,6 +310,27 @@ class Field_slot(_Struct):
         if self.has_defaultValue(): parts.append("defaultValue = %s" % self.get_defaultValue().shortrepr())
         parts.append("hadExplicitDefault = %s" % str(self.hadExplicitDefault).lower())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['offset'] = self._read_primitive(4, ord(b'I'))
+        value = self.type
+        d['type'] = None if value is None else value.to_dict()
+        value = self.defaultValue
+        d['defaultValue'] = None if value is None else value.to_dict()
+        d['hadExplicitDefault'] = self._read_bit(16, 1)
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"offset":%d' % self._read_primitive(4, ord(b'I')))
+        if self.has_type(): parts.append('"type":' + self.type._to_json())
+        if self.has_defaultValue(): parts.append('"defaultValue":' + self.defaultValue._to_json())
+        parts.append('"hadExplicitDefault":' + ('true' if self._read_bit(16, 1) else 'false'))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'type': return Type
+        if name == 'defaultValue': return Value
+        return None
 
 _Field_slot_list_item_type = _StructItemType(Field_slot)
 
@@ -304,6 +339,7 @@ class Field_group(_Struct):
     __capnpy_id__ = 0xcafccddb68db1d11
     __static_data_size__ = 3
     __static_ptrs_size__ = 4
+    __data_fields__ = (('typeId', 16, 'Q', 0),)
     
     
     @property
@@ -318,6 +354,17 @@ class Field_group(_Struct):
         parts = []
         parts.append("typeId = %s" % self.typeId)
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['typeId'] = self._read_primitive(16, ord(b'Q'))
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"typeId":"%d"' % self._read_primitive(16, ord(b'Q')))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        return None
 
 _Field_group_list_item_type = _StructItemType(Field_group)
 
@@ -326,6 +373,7 @@ class Field_ordinal(_Struct):
     __capnpy_id__ = 0xbb90d5c287870be6
     __static_data_size__ = 3
     __static_ptrs_size__ = 4
+    __data_fields__ = ()
     
     
     __tag__ = Field_ordinal__tag__
@@ -354,6 +402,22 @@ class Field_ordinal(_Struct):
         if self.is_implicit(): parts.append("implicit = %s" % "void")
         if self.is_explicit(): parts.append("explicit = %s" % self.explicit)
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        tag = self.__which__()
+        if tag == 0:
+            d['implicit'] = None
+        if tag == 1:
+            d['explicit'] = self._read_primitive(12, ord(b'H'))
+        return d
+    def _to_json(self):
+        parts = []
+        if self.is_implicit(): parts.append('"implicit":null')
+        if self.is_explicit(): parts.append('"explicit":%d' % self._read_primitive(12, ord(b'H')))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        return None
 
 _Field_ordinal_list_item_type = _StructItemType(Field_ordinal)
 
@@ -362,6 +426,7 @@ class Field(_Struct):
     __capnpy_id__ = 0x9aad50a41f4af45f
     __static_data_size__ = 3
     __static_ptrs_size__ = 4
+    __data_fields__ = (('codeOrder', 0, 'H', 0), ('discriminantValue', 2, 'H', 65535))
     
     noDiscriminant = 65535
     
@@ -454,7 +519,7 @@ class Field(_Struct):
     
     @staticmethod
     def __new(name=None, codeOrder=0, annotations=None, discriminantValue=65535, slot=_undefined, group=_undefined, ordinal=(_undefined, _undefined,)):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(56 + _size_hint(name, 1) + _size_hint(annotations, 24))
         pos = builder.allocate(56)
         anonymous__curtag = None
         ordinal__curtag = None
@@ -465,24 +530,24 @@ class Field(_Struct):
         builder.write_uint16(pos + 2, discriminantValue)
         if slot is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'slot')
-            builder.write_int16(8, 0)
+            builder.write_int16(pos + 8, 0)
             slot_offset, slot_type, slot_defaultValue, slot_hadExplicitDefault, = slot
             builder.write_uint32(pos + 4, slot_offset)
             builder.copy_from_struct(pos + 40, Type, slot_type)
             builder.copy_from_struct(pos + 48, Value, slot_defaultValue)
-            builder.write_bool(16, 0, slot_hadExplicitDefault)
+            builder.write_bool(pos + 16, 0, slot_hadExplicitDefault)
         if group is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'group')
-            builder.write_int16(8, 1)
+            builder.write_int16(pos + 8, 1)
             group_typeId, = group
             builder.write_uint64(pos + 16, group_typeId)
         ordinal_implicit, ordinal_explicit, = ordinal
         if ordinal_implicit is not _undefined:
             ordinal__curtag = _check_tag(ordinal__curtag, 'implicit')
-            builder.write_int16(10, 0)
+            builder.write_int16(pos + 10, 0)
         if ordinal_explicit is not _undefined:
             ordinal__curtag = _check_tag(ordinal__curtag, 'explicit')
-            builder.write_int16(10, 1)
+            builder.write_int16(pos + 10, 1)
             builder.write_uint16(pos + 12, ordinal_explicit)
         return builder.as_string()
     
@@ -500,6 +565,111 @@ class Field(_Struct):
         buf = Field.__new(name=name, codeOrder=codeOrder, annotations=annotations, discriminantValue=discriminantValue, group=group, ordinal=ordinal, slot=_undefined)
         return cls.from_buffer(buf, 0, 3, 4)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        anonymous__curtag = None
+        ordinal__curtag = None
+        _v_name = _d.get('name', None)
+        builder.alloc_text(pos + 24, _v_name)
+        _v_codeOrder = _d.get('codeOrder', 0)
+        builder.write_uint16(pos + 0, _v_codeOrder)
+        _v_annotations = _d.get('annotations', None)
+        builder.copy_from_list(pos + 32, _Annotation_list_item_type, _v_annotations)
+        _v_discriminantValue = _d.get('discriminantValue', 65535)
+        _v_discriminantValue ^= 65535
+        builder.write_uint16(pos + 2, _v_discriminantValue)
+        _v_slot = _d.get('slot', _undefined)
+        if _v_slot is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'slot')
+            builder.write_int16(pos + 8, 0)
+            _v_slot_offset = _v_slot.get('offset', 0)
+            builder.write_uint32(pos + 4, _v_slot_offset)
+            _v_slot_type = _v_slot.get('type', None)
+            if isinstance(_v_slot_type, dict):
+                Type._write_dict(builder, builder.alloc_struct(pos + 40, 3, 1), _v_slot_type)
+            else:
+                builder.copy_from_struct(pos + 40, Type, _v_slot_type)
+            _v_slot_defaultValue = _v_slot.get('defaultValue', None)
+            if isinstance(_v_slot_defaultValue, dict):
+                Value._write_dict(builder, builder.alloc_struct(pos + 48, 2, 1), _v_slot_defaultValue)
+            else:
+                builder.copy_from_struct(pos + 48, Value, _v_slot_defaultValue)
+            _v_slot_hadExplicitDefault = _v_slot.get('hadExplicitDefault', False)
+            builder.write_bool(pos + 16, 0, _v_slot_hadExplicitDefault)
+        _v_group = _d.get('group', _undefined)
+        if _v_group is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'group')
+            builder.write_int16(pos + 8, 1)
+            _v_group_typeId = _v_group.get('typeId', 0)
+            builder.write_uint64(pos + 16, _v_group_typeId)
+        _v_ordinal = _d.get('ordinal', {})
+        _v_ordinal_implicit = _v_ordinal.get('implicit', _undefined)
+        if _v_ordinal_implicit is not _undefined:
+            ordinal__curtag = _check_tag(ordinal__curtag, 'implicit')
+            builder.write_int16(pos + 10, 0)
+        _v_ordinal_explicit = _v_ordinal.get('explicit', _undefined)
+        if _v_ordinal_explicit is not _undefined:
+            ordinal__curtag = _check_tag(ordinal__curtag, 'explicit')
+            builder.write_int16(pos + 10, 1)
+            builder.write_uint16(pos + 12, _v_ordinal_explicit)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        anonymous__curtag = None
+        ordinal__curtag = None
+        _v_name = _d.get('name', None)
+        _v_name = _json_load_text(_v_name)
+        builder.alloc_text(pos + 24, _v_name)
+        _v_codeOrder = _d.get('codeOrder', 0)
+        _v_codeOrder = int(_v_codeOrder)
+        builder.write_uint16(pos + 0, _v_codeOrder)
+        _v_annotations = _d.get('annotations', None)
+        _json_copy_list(builder, pos + 32, _Annotation_list_item_type, _v_annotations)
+        _v_discriminantValue = _d.get('discriminantValue', 65535)
+        _v_discriminantValue = int(_v_discriminantValue)
+        _v_discriminantValue ^= 65535
+        builder.write_uint16(pos + 2, _v_discriminantValue)
+        _v_slot = _d.get('slot', _undefined)
+        if _v_slot is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'slot')
+            builder.write_int16(pos + 8, 0)
+            _v_slot_offset = _v_slot.get('offset', 0)
+            _v_slot_offset = int(_v_slot_offset)
+            builder.write_uint32(pos + 4, _v_slot_offset)
+            _v_slot_type = _v_slot.get('type', None)
+            if _v_slot_type is not None:
+                Type._write_json(builder, builder.alloc_struct(pos + 40, 3, 1), _v_slot_type)
+            _v_slot_defaultValue = _v_slot.get('defaultValue', None)
+            if _v_slot_defaultValue is not None:
+                Value._write_json(builder, builder.alloc_struct(pos + 48, 2, 1), _v_slot_defaultValue)
+            _v_slot_hadExplicitDefault = _v_slot.get('hadExplicitDefault', False)
+            builder.write_bool(pos + 16, 0, _v_slot_hadExplicitDefault)
+        _v_group = _d.get('group', _undefined)
+        if _v_group is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'group')
+            builder.write_int16(pos + 8, 1)
+            _v_group_typeId = _v_group.get('typeId', 0)
+            _v_group_typeId = int(_v_group_typeId)
+            builder.write_uint64(pos + 16, _v_group_typeId)
+        _v_ordinal = _d.get('ordinal', {})
+        _v_ordinal_implicit = _v_ordinal.get('implicit', _undefined)
+        if _v_ordinal_implicit is not _undefined:
+            ordinal__curtag = _check_tag(ordinal__curtag, 'implicit')
+            builder.write_int16(pos + 10, 0)
+        _v_ordinal_explicit = _v_ordinal.get('explicit', _undefined)
+        if _v_ordinal_explicit is not _undefined:
+            ordinal__curtag = _check_tag(ordinal__curtag, 'explicit')
+            builder.write_int16(pos + 10, 1)
+            _v_ordinal_explicit = int(_v_ordinal_explicit)
+            builder.write_uint16(pos + 12, _v_ordinal_explicit)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(56)
+        Field._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 3, 4)
+    
     def shortrepr(self):
         parts = []
         if self.has_name(): parts.append("name = %s" % _text_bytes_repr(self.get_name()))
@@ -510,6 +680,37 @@ class Field(_Struct):
         if self.is_group(): parts.append("group = %s" % self.group.shortrepr())
         parts.append("ordinal = %s" % self.ordinal.shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        tag = self.__which__()
+        d['name'] = self.name
+        d['codeOrder'] = self._read_primitive(0, ord(b'H'))
+        value = self.annotations
+        d['annotations'] = None if value is None else value.to_list()
+        d['discriminantValue'] = (self._read_primitive(2, ord(b'H')) ^ 65535)
+        if tag == 0:
+            d['slot'] = self.slot.to_dict()
+        if tag == 1:
+            d['group'] = self.group.to_dict()
+        d['ordinal'] = self.ordinal.to_dict()
+        return d
+    def _to_json(self):
+        parts = []
+        if self.has_name(): parts.append('"name":' + _json_dump_text(self.name))
+        parts.append('"codeOrder":%d' % self._read_primitive(0, ord(b'H')))
+        if self.has_annotations(): parts.append('"annotations":' + _json_dump_list(self.annotations))
+        parts.append('"discriminantValue":%d' % (self._read_primitive(2, ord(b'H')) ^ 65535))
+        if self.is_slot(): parts.append('"slot":' + self.slot._to_json())
+        if self.is_group(): parts.append('"group":' + self.group._to_json())
+        parts.append('"ordinal":' + self.ordinal._to_json())
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'annotations': return _Annotation_list_item_type
+        if name == 'slot': return Field_slot
+        if name == 'group': return Field_group
+        if name == 'ordinal': return Field_ordinal
+        return None
 
 _Field_list_item_type = _StructItemType(Field)
 
@@ -518,6 +719,7 @@ class Node_struct(_Struct):
     __capnpy_id__ = 0x9ea0b19b37fb4435
     __static_data_size__ = 5
     __static_ptrs_size__ = 6
+    __data_fields__ = (('dataWordCount', 14, 'H', 0), ('pointerCount', 24, 'H', 0), ('preferredListEncoding', 26, 'h', 0), ('isGroup', 224, '?', False), ('discriminantCount', 30, 'H', 0), ('discriminantOffset', 32, 'I', 0))
     
     
     @property
@@ -593,6 +795,31 @@ class Node_struct(_Struct):
         parts.append("discriminantOffset = %s" % self.discriminantOffset)
         if self.has_fields(): parts.append("fields = %s" % self.get_fields().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['dataWordCount'] = self._read_primitive(14, ord(b'H'))
+        d['pointerCount'] = self._read_primitive(24, ord(b'H'))
+        d['preferredListEncoding'] = self.preferredListEncoding
+        d['isGroup'] = self._read_bit(28, 1)
+        d['discriminantCount'] = self._read_primitive(30, ord(b'H'))
+        d['discriminantOffset'] = self._read_primitive(32, ord(b'I'))
+        value = self.fields
+        d['fields'] = None if value is None else value.to_list()
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"dataWordCount":%d' % self._read_primitive(14, ord(b'H')))
+        parts.append('"pointerCount":%d' % self._read_primitive(24, ord(b'H')))
+        parts.append('"preferredListEncoding":' + _json_dump_enum(self.preferredListEncoding))
+        parts.append('"isGroup":' + ('true' if self._read_bit(28, 1) else 'false'))
+        parts.append('"discriminantCount":%d' % self._read_primitive(30, ord(b'H')))
+        parts.append('"discriminantOffset":%d' % self._read_primitive(32, ord(b'I')))
+        if self.has_fields(): parts.append('"fields":' + _json_dump_list(self.fields))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'fields': return _Field_list_item_type
+        return None
 
 _Node_struct_list_item_type = _StructItemType(Node_struct)
 
@@ -601,6 +828,7 @@ class Node_enum(_Struct):
     __capnpy_id__ = 0xb54ab3364333f598
     __static_data_size__ = 5
     __static_ptrs_size__ = 6
+    __data_fields__ = ()
     
     
     @property
@@ -622,6 +850,19 @@ class Node_enum(_Struct):
         parts = []
         if self.has_enumerants(): parts.append("enumerants = %s" % self.get_enumerants().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        value = self.enumerants
+        d['enumerants'] = None if value is None else value.to_list()
+        return d
+    def _to_json(self):
+        parts = []
+        if self.has_enumerants(): parts.append('"enumerants":' + _json_dump_list(self.enumerants))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'enumerants': return _Enumerant_list_item_type
+        return None
 
 _Node_enum_list_item_type = _StructItemType(Node_enum)
 
@@ -630,6 +871,7 @@ class Node_interface(_Struct):
     __capnpy_id__ = 0xe82753cff0c2218f
     __static_data_size__ = 5
     __static_ptrs_size__ = 6
+    __data_fields__ = ()
     
     
     @property
@@ -667,6 +909,23 @@ class Node_interface(_Struct):
         if self.has_methods(): parts.append("methods = %s" % self.get_methods().shortrepr())
         if self.has_superclasses(): parts.append("superclasses = %s" % self.get_superclasses().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        value = self.methods
+        d['methods'] = None if value is None else value.to_list()
+        value = self.superclasses
+        d['superclasses'] = None if value is None else value.to_list()
+        return d
+    def _to_json(self):
+        parts = []
+        if self.has_methods(): parts.append('"methods":' + _json_dump_list(self.methods))
+        if self.has_superclasses(): parts.append('"superclasses":' + _json_dump_list(self.superclasses))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'methods': return _Method_list_item_type
+        if name == 'superclasses': return _Superclass_list_item_type
+        return None
 
 _Node_interface_list_item_type = _StructItemType(Node_interface)
 
@@ -675,6 +934,7 @@ class Node_const(_Struct):
     __capnpy_id__ = 0xb18aa5ac7a0d9420
     __static_data_size__ = 5
     __static_ptrs_size__ = 6
+    __data_fields__ = ()
     
     
     @property
@@ -732,6 +992,23 @@ class Node_const(_Struct):
         if self.has_type(): parts.append("type = %s" % self.get_type().shortrepr())
         if self.has_value(): parts.append("value = %s" % self.get_value().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        value = self.type
+        d['type'] = None if value is None else value.to_dict()
+        value = self.value
+        d['value'] = None if value is None else value.to_dict()
+        return d
+    def _to_json(self):
+        parts = []
+        if self.has_type(): parts.append('"type":' + self.type._to_json())
+        if self.has_value(): parts.append('"value":' + self.value._to_json())
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'type': return Type
+        if name == 'value': return Value
+        return None
 
 _Node_const_list_item_type = _StructItemType(Node_const)
 
@@ -740,6 +1017,7 @@ class Node_annotation(_Struct):
     __capnpy_id__ = 0xec1619d4400a0290
     __static_data_size__ = 5
     __static_ptrs_size__ = 6
+    __data_fields__ = (('targetsFile', 112, '?', False), ('targetsConst', 113, '?', False), ('targetsEnum', 114, '?', False), ('targetsEnumerant', 115, '?', False), ('targetsStruct', 116, '?', False), ('targetsField', 117, '?', False), ('targetsUnion', 118, '?', False), ('targetsGroup', 119, '?', False), ('targetsInterface', 120, '?', False), ('targetsMethod', 121, '?', False), ('targetsParam', 122, '?', False), ('targetsAnnotation', 123, '?', False))
     
     
     @property
@@ -879,6 +1157,43 @@ class Node_annotation(_Struct):
         parts.append("targetsParam = %s" % str(self.targetsParam).lower())
         parts.append("targetsAnnotation = %s" % str(self.targetsAnnotation).lower())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        value = self.type
+        d['type'] = None if value is None else value.to_dict()
+        d['targetsFile'] = self._read_bit(14, 1)
+        d['targetsConst'] = self._read_bit(14, 2)
+        d['targetsEnum'] = self._read_bit(14, 4)
+        d['targetsEnumerant'] = self._read_bit(14, 8)
+        d['targetsStruct'] = self._read_bit(14, 16)
+        d['targetsField'] = self._read_bit(14, 32)
+        d['targetsUnion'] = self._read_bit(14, 64)
+        d['targetsGroup'] = self._read_bit(14, 128)
+        d['targetsInterface'] = self._read_bit(15, 1)
+        d['targetsMethod'] = self._read_bit(15, 2)
+        d['targetsParam'] = self._read_bit(15, 4)
+        d['targetsAnnotation'] = self._read_bit(15, 8)
+        return d
+    def _to_json(self):
+        parts = []
+        if self.has_type(): parts.append('"type":' + self.type._to_json())
+        parts.append('"targetsFile":' + ('true' if self._read_bit(14, 1) else 'false'))
+        parts.append('"targetsConst":' + ('true' if self._read_bit(14, 2) else 'false'))
+        parts.append('"targetsEnum":' + ('true' if self._read_bit(14, 4) else 'false'))
+        parts.append('"targetsEnumerant":' + ('true' if self._read_bit(14, 8) else 'false'))
+        parts.append('"targetsStruct":' + ('true' if self._read_bit(14, 16) else 'false'))
+        parts.append('"targetsField":' + ('true' if self._read_bit(14, 32) else 'false'))
+        parts.append('"targetsUnion":' + ('true' if self._read_bit(14, 64) else 'false'))
+        parts.append('"targetsGroup":' + ('true' if self._read_bit(14, 128) else 'false'))
+        parts.append('"targetsInterface":' + ('true' if self._read_bit(15, 1) else 'false'))
+        parts.append('"targetsMethod":' + ('true' if self._read_bit(15, 2) else 'false'))
+        parts.append('"targetsParam":' + ('true' if self._read_bit(15, 4) else 'false'))
+        parts.append('"targetsAnnotation":' + ('true' if self._read_bit(15, 8) else 'false'))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'type': return Type
+        return None
 
 _Node_annotation_list_item_type = _StructItemType(Node_annotation)
 
@@ -887,6 +1202,7 @@ class Node_NestedNode(_Struct):
     __capnpy_id__ = 0xdebf55bbfa0fc242
     __static_data_size__ = 1
     __static_ptrs_size__ = 1
+    __data_fields__ = (('id', 0, 'Q', 0),)
     
     
     @property
@@ -911,7 +1227,7 @@ class Node_NestedNode(_Struct):
     
     @staticmethod
     def __new(name=None, id=0):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(16 + _size_hint(name, 1))
         pos = builder.allocate(16)
         builder.alloc_text(pos + 8, name)
         builder.write_uint64(pos + 0, id)
@@ -921,11 +1237,47 @@ class Node_NestedNode(_Struct):
         _buf = Node_NestedNode.__new(name, id)
         self._init_from_buffer(_buf, 0, 1, 1)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        _v_name = _d.get('name', None)
+        builder.alloc_text(pos + 8, _v_name)
+        _v_id = _d.get('id', 0)
+        builder.write_uint64(pos + 0, _v_id)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        _v_name = _d.get('name', None)
+        _v_name = _json_load_text(_v_name)
+        builder.alloc_text(pos + 8, _v_name)
+        _v_id = _d.get('id', 0)
+        _v_id = int(_v_id)
+        builder.write_uint64(pos + 0, _v_id)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(16)
+        Node_NestedNode._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 1, 1)
+    
     def shortrepr(self):
         parts = []
         if self.has_name(): parts.append("name = %s" % _text_bytes_repr(self.get_name()))
         parts.append("id = %s" % self.id)
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['name'] = self.name
+        d['id'] = self._read_primitive(0, ord(b'Q'))
+        return d
+    def _to_json(self):
+        parts = []
+        if self.has_name(): parts.append('"name":' + _json_dump_text(self.name))
+        parts.append('"id":"%d"' % self._read_primitive(0, ord(b'Q')))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        return None
 
 _Node_NestedNode_list_item_type = _StructItemType(Node_NestedNode)
 
@@ -934,6 +1286,7 @@ class Node_Parameter(_Struct):
     __capnpy_id__ = 0xb9521bccf10fa3b1
     __static_data_size__ = 0
     __static_ptrs_size__ = 1
+    __data_fields__ = ()
     
     
     @property
@@ -950,7 +1303,7 @@ class Node_Parameter(_Struct):
     
     @staticmethod
     def __new(name=None):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(8 + _size_hint(name, 1))
         pos = builder.allocate(8)
         builder.alloc_text(pos + 0, name)
         return builder.as_string()
@@ -959,10 +1312,39 @@ class Node_Parameter(_Struct):
         _buf = Node_Parameter.__new(name)
         self._init_from_buffer(_buf, 0, 0, 1)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        _v_name = _d.get('name', None)
+        builder.alloc_text(pos + 0, _v_name)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        _v_name = _d.get('name', None)
+        _v_name = _json_load_text(_v_name)
+        builder.alloc_text(pos + 0, _v_name)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(8)
+        Node_Parameter._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 0, 1)
+    
     def shortrepr(self):
         parts = []
         if self.has_name(): parts.append("name = %s" % _text_bytes_repr(self.get_name()))
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['name'] = self.name
+        return d
+    def _to_json(self):
+        parts = []
+        if self.has_name(): parts.append('"name":' + _json_dump_text(self.name))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        return None
 
 _Node_Parameter_list_item_type = _StructItemType(Node_Parameter)
 
@@ -971,6 +1353,7 @@ class Node_SourceInfo_Member(_Struct):
     __capnpy_id__ = 0xc2ba9038898e1fa2
     __static_data_size__ = 0
     __static_ptrs_size__ = 1
+    __data_fields__ = ()
     
     
     @property
@@ -987,7 +1370,7 @@ class Node_SourceInfo_Member(_Struct):
     
     @staticmethod
     def __new(docComment=None):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(8 + _size_hint(docComment, 1))
         pos = builder.allocate(8)
         builder.alloc_text(pos + 0, docComment)
         return builder.as_string()
@@ -996,10 +1379,39 @@ class Node_SourceInfo_Member(_Struct):
         _buf = Node_SourceInfo_Member.__new(docComment)
         self._init_from_buffer(_buf, 0, 0, 1)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        _v_docComment = _d.get('docComment', None)
+        builder.alloc_text(pos + 0, _v_docComment)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        _v_docComment = _d.get('docComment', None)
+        _v_docComment = _json_load_text(_v_docComment)
+        builder.alloc_text(pos + 0, _v_docComment)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(8)
+        Node_SourceInfo_Member._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 0, 1)
+    
     def shortrepr(self):
         parts = []
         if self.has_docComment(): parts.append("docComment = %s" % _text_bytes_repr(self.get_docComment()))
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['docComment'] = self.docComment
+        return d
+    def _to_json(self):
+        parts = []
+        if self.has_docComment(): parts.append('"docComment":' + _json_dump_text(self.docComment))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        return None
 
 _Node_SourceInfo_Member_list_item_type = _StructItemType(Node_SourceInfo_Member)
 
@@ -1008,6 +1420,7 @@ class Node_SourceInfo(_Struct):
     __capnpy_id__ = 0xf38e1de3041357ae
     __static_data_size__ = 1
     __static_ptrs_size__ = 2
+    __data_fields__ = (('id', 0, 'Q', 0),)
     
     Member = Node_SourceInfo_Member
     
@@ -1048,7 +1461,7 @@ class Node_SourceInfo(_Struct):
     
     @staticmethod
     def __new(id=0, docComment=None, members=None):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(24 + _size_hint(docComment, 1) + _size_hint(members, 8))
         pos = builder.allocate(24)
         builder.write_uint64(pos + 0, id)
         builder.alloc_text(pos + 8, docComment)
@@ -1059,12 +1472,56 @@ class Node_SourceInfo(_Struct):
         _buf = Node_SourceInfo.__new(id, docComment, members)
         self._init_from_buffer(_buf, 0, 1, 2)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        _v_id = _d.get('id', 0)
+        builder.write_uint64(pos + 0, _v_id)
+        _v_docComment = _d.get('docComment', None)
+        builder.alloc_text(pos + 8, _v_docComment)
+        _v_members = _d.get('members', None)
+        builder.copy_from_list(pos + 16, _Node_SourceInfo_Member_list_item_type, _v_members)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        _v_id = _d.get('id', 0)
+        _v_id = int(_v_id)
+        builder.write_uint64(pos + 0, _v_id)
+        _v_docComment = _d.get('docComment', None)
+        _v_docComment = _json_load_text(_v_docComment)
+        builder.alloc_text(pos + 8, _v_docComment)
+        _v_members = _d.get('members', None)
+        _json_copy_list(builder, pos + 16, _Node_SourceInfo_Member_list_item_type, _v_members)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(24)
+        Node_SourceInfo._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 1, 2)
+    
     def shortrepr(self):
         parts = []
         parts.append("id = %s" % self.id)
         if self.has_docComment(): parts.append("docComment = %s" % _text_bytes_repr(self.get_docComment()))
         if self.has_members(): parts.append("members = %s" % self.get_members().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['id'] = self._read_primitive(0, ord(b'Q'))
+        d['docComment'] = self.docComment
+        value = self.members
+        d['members'] = None if value is None else value.to_list()
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"id":"%d"' % self._read_primitive(0, ord(b'Q')))
+        if self.has_docComment(): parts.append('"docComment":' + _json_dump_text(self.docComment))
+        if self.has_members(): parts.append('"members":' + _json_dump_list(self.members))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'members': return _Node_SourceInfo_Member_list_item_type
+        return None
 
 _Node_SourceInfo_list_item_type = _StructItemType(Node_SourceInfo)
 
@@ -1073,6 +1530,7 @@ class Node(_Struct):
     __capnpy_id__ = 0xe682ab4cf923a417
     __static_data_size__ = 5
     __static_ptrs_size__ = 6
+    __data_fields__ = (('id', 0, 'Q', 0), ('displayNamePrefixLength', 8, 'I', 0), ('scopeId', 16, 'Q', 0), ('isGeneric', 288, '?', False))
     
     NestedNode = Node_NestedNode
     Parameter = Node_Parameter
@@ -1250,7 +1708,7 @@ class Node(_Struct):
     
     @staticmethod
     def __new(id=0, displayName=None, displayNamePrefixLength=0, scopeId=0, nestedNodes=None, annotations=None, file=_undefined, struct=_undefined, enum=_undefined, interface=_undefined, const=_undefined, annotation=_undefined, parameters=None, isGeneric=False):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(88 + _size_hint(displayName, 1) + _size_hint(nestedNodes, 16) + _size_hint(annotations, 24) + _size_hint(parameters, 8))
         pos = builder.allocate(88)
         anonymous__curtag = None
         builder.write_uint64(pos + 0, id)
@@ -1261,54 +1719,54 @@ class Node(_Struct):
         builder.copy_from_list(pos + 56, _Annotation_list_item_type, annotations)
         if file is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'file')
-            builder.write_int16(12, 0)
+            builder.write_int16(pos + 12, 0)
         if struct is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'struct')
-            builder.write_int16(12, 1)
+            builder.write_int16(pos + 12, 1)
             struct_dataWordCount, struct_pointerCount, struct_preferredListEncoding, struct_isGroup, struct_discriminantCount, struct_discriminantOffset, struct_fields, = struct
             builder.write_uint16(pos + 14, struct_dataWordCount)
             builder.write_uint16(pos + 24, struct_pointerCount)
             builder.write_int16(pos + 26, struct_preferredListEncoding)
-            builder.write_bool(28, 0, struct_isGroup)
+            builder.write_bool(pos + 28, 0, struct_isGroup)
             builder.write_uint16(pos + 30, struct_discriminantCount)
             builder.write_uint32(pos + 32, struct_discriminantOffset)
             builder.copy_from_list(pos + 64, _Field_list_item_type, struct_fields)
         if enum is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'enum')
-            builder.write_int16(12, 2)
+            builder.write_int16(pos + 12, 2)
             enum_enumerants, = enum
             builder.copy_from_list(pos + 64, _Enumerant_list_item_type, enum_enumerants)
         if interface is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'interface')
-            builder.write_int16(12, 3)
+            builder.write_int16(pos + 12, 3)
             interface_methods, interface_superclasses, = interface
             builder.copy_from_list(pos + 64, _Method_list_item_type, interface_methods)
             builder.copy_from_list(pos + 72, _Superclass_list_item_type, interface_superclasses)
         if const is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'const')
-            builder.write_int16(12, 4)
+            builder.write_int16(pos + 12, 4)
             const_type, const_value, = const
             builder.copy_from_struct(pos + 64, Type, const_type)
             builder.copy_from_struct(pos + 72, Value, const_value)
         if annotation is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'annotation')
-            builder.write_int16(12, 5)
+            builder.write_int16(pos + 12, 5)
             annotation_type, annotation_targetsFile, annotation_targetsConst, annotation_targetsEnum, annotation_targetsEnumerant, annotation_targetsStruct, annotation_targetsField, annotation_targetsUnion, annotation_targetsGroup, annotation_targetsInterface, annotation_targetsMethod, annotation_targetsParam, annotation_targetsAnnotation, = annotation
             builder.copy_from_struct(pos + 64, Type, annotation_type)
-            builder.write_bool(14, 0, annotation_targetsFile)
-            builder.write_bool(14, 1, annotation_targetsConst)
-            builder.write_bool(14, 2, annotation_targetsEnum)
-            builder.write_bool(14, 3, annotation_targetsEnumerant)
-            builder.write_bool(14, 4, annotation_targetsStruct)
-            builder.write_bool(14, 5, annotation_targetsField)
-            builder.write_bool(14, 6, annotation_targetsUnion)
-            builder.write_bool(14, 7, annotation_targetsGroup)
-            builder.write_bool(15, 0, annotation_targetsInterface)
-            builder.write_bool(15, 1, annotation_targetsMethod)
-            builder.write_bool(15, 2, annotation_targetsParam)
-            builder.write_bool(15, 3, annotation_targetsAnnotation)
+            builder.write_bool(pos + 14, 0, annotation_targetsFile)
+            builder.write_bool(pos + 14, 1, annotation_targetsConst)
+            builder.write_bool(pos + 14, 2, annotation_targetsEnum)
+            builder.write_bool(pos + 14, 3, annotation_targetsEnumerant)
+            builder.write_bool(pos + 14, 4, annotation_targetsStruct)
+            builder.write_bool(pos + 14, 5, annotation_targetsField)
+            builder.write_bool(pos + 14, 6, annotation_targetsUnion)
+            builder.write_bool(pos + 14, 7, annotation_targetsGroup)
+            builder.write_bool(pos + 15, 0, annotation_targetsInterface)
+            builder.write_bool(pos + 15, 1, annotation_targetsMethod)
+            builder.write_bool(pos + 15, 2, annotation_targetsParam)
+            builder.write_bool(pos + 15, 3, annotation_targetsAnnotation)
         builder.copy_from_list(pos + 80, _Node_Parameter_list_item_type, parameters)
-        builder.write_bool(36, 0, isGeneric)
+        builder.write_bool(pos + 36, 0, isGeneric)
         return builder.as_string()
     
     def __init__(self, id=0, displayName=None, displayNamePrefixLength=0, scopeId=0, nestedNodes=None, annotations=None, file=_undefined, struct=_undefined, enum=_undefined, interface=_undefined, const=_undefined, annotation=_undefined, parameters=None, isGeneric=False):
@@ -1345,6 +1803,222 @@ class Node(_Struct):
         buf = Node.__new(id=id, displayName=displayName, displayNamePrefixLength=displayNamePrefixLength, scopeId=scopeId, nestedNodes=nestedNodes, annotations=annotations, annotation=annotation, parameters=parameters, isGeneric=isGeneric, file=_undefined, struct=_undefined, enum=_undefined, interface=_undefined, const=_undefined)
         return cls.from_buffer(buf, 0, 5, 6)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        anonymous__curtag = None
+        _v_id = _d.get('id', 0)
+        builder.write_uint64(pos + 0, _v_id)
+        _v_displayName = _d.get('displayName', None)
+        builder.alloc_text(pos + 40, _v_displayName)
+        _v_displayNamePrefixLength = _d.get('displayNamePrefixLength', 0)
+        builder.write_uint32(pos + 8, _v_displayNamePrefixLength)
+        _v_scopeId = _d.get('scopeId', 0)
+        builder.write_uint64(pos + 16, _v_scopeId)
+        _v_nestedNodes = _d.get('nestedNodes', None)
+        builder.copy_from_list(pos + 48, _Node_NestedNode_list_item_type, _v_nestedNodes)
+        _v_annotations = _d.get('annotations', None)
+        builder.copy_from_list(pos + 56, _Annotation_list_item_type, _v_annotations)
+        _v_file = _d.get('file', _undefined)
+        if _v_file is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'file')
+            builder.write_int16(pos + 12, 0)
+        _v_struct = _d.get('struct', _undefined)
+        if _v_struct is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'struct')
+            builder.write_int16(pos + 12, 1)
+            _v_struct_dataWordCount = _v_struct.get('dataWordCount', 0)
+            builder.write_uint16(pos + 14, _v_struct_dataWordCount)
+            _v_struct_pointerCount = _v_struct.get('pointerCount', 0)
+            builder.write_uint16(pos + 24, _v_struct_pointerCount)
+            _v_struct_preferredListEncoding = _v_struct.get('preferredListEncoding', 0)
+            builder.write_int16(pos + 26, _v_struct_preferredListEncoding)
+            _v_struct_isGroup = _v_struct.get('isGroup', False)
+            builder.write_bool(pos + 28, 0, _v_struct_isGroup)
+            _v_struct_discriminantCount = _v_struct.get('discriminantCount', 0)
+            builder.write_uint16(pos + 30, _v_struct_discriminantCount)
+            _v_struct_discriminantOffset = _v_struct.get('discriminantOffset', 0)
+            builder.write_uint32(pos + 32, _v_struct_discriminantOffset)
+            _v_struct_fields = _v_struct.get('fields', None)
+            builder.copy_from_list(pos + 64, _Field_list_item_type, _v_struct_fields)
+        _v_enum = _d.get('enum', _undefined)
+        if _v_enum is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'enum')
+            builder.write_int16(pos + 12, 2)
+            _v_enum_enumerants = _v_enum.get('enumerants', None)
+            builder.copy_from_list(pos + 64, _Enumerant_list_item_type, _v_enum_enumerants)
+        _v_interface = _d.get('interface', _undefined)
+        if _v_interface is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'interface')
+            builder.write_int16(pos + 12, 3)
+            _v_interface_methods = _v_interface.get('methods', None)
+            builder.copy_from_list(pos + 64, _Method_list_item_type, _v_interface_methods)
+            _v_interface_superclasses = _v_interface.get('superclasses', None)
+            builder.copy_from_list(pos + 72, _Superclass_list_item_type, _v_interface_superclasses)
+        _v_const = _d.get('const', _undefined)
+        if _v_const is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'const')
+            builder.write_int16(pos + 12, 4)
+            _v_const_type = _v_const.get('type', None)
+            if isinstance(_v_const_type, dict):
+                Type._write_dict(builder, builder.alloc_struct(pos + 64, 3, 1), _v_const_type)
+            else:
+                builder.copy_from_struct(pos + 64, Type, _v_const_type)
+            _v_const_value = _v_const.get('value', None)
+            if isinstance(_v_const_value, dict):
+                Value._write_dict(builder, builder.alloc_struct(pos + 72, 2, 1), _v_const_value)
+            else:
+                builder.copy_from_struct(pos + 72, Value, _v_const_value)
+        _v_annotation = _d.get('annotation', _undefined)
+        if _v_annotation is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'annotation')
+            builder.write_int16(pos + 12, 5)
+            _v_annotation_type = _v_annotation.get('type', None)
+            if isinstance(_v_annotation_type, dict):
+                Type._write_dict(builder, builder.alloc_struct(pos + 64, 3, 1), _v_annotation_type)
+            else:
+                builder.copy_from_struct(pos + 64, Type, _v_annotation_type)
+            _v_annotation_targetsFile = _v_annotation.get('targetsFile', False)
+            builder.write_bool(pos + 14, 0, _v_annotation_targetsFile)
+            _v_annotation_targetsConst = _v_annotation.get('targetsConst', False)
+            builder.write_bool(pos + 14, 1, _v_annotation_targetsConst)
+            _v_annotation_targetsEnum = _v_annotation.get('targetsEnum', False)
+            builder.write_bool(pos + 14, 2, _v_annotation_targetsEnum)
+            _v_annotation_targetsEnumerant = _v_annotation.get('targetsEnumerant', False)
+            builder.write_bool(pos + 14, 3, _v_annotation_targetsEnumerant)
+            _v_annotation_targetsStruct = _v_annotation.get('targetsStruct', False)
+            builder.write_bool(pos + 14, 4, _v_annotation_targetsStruct)
+            _v_annotation_targetsField = _v_annotation.get('targetsField', False)
+            builder.write_bool(pos + 14, 5, _v_annotation_targetsField)
+            _v_annotation_targetsUnion = _v_annotation.get('targetsUnion', False)
+            builder.write_bool(pos + 14, 6, _v_annotation_targetsUnion)
+            _v_annotation_targetsGroup = _v_annotation.get('targetsGroup', False)
+            builder.write_bool(pos + 14, 7, _v_annotation_targetsGroup)
+            _v_annotation_targetsInterface = _v_annotation.get('targetsInterface', False)
+            builder.write_bool(pos + 15, 0, _v_annotation_targetsInterface)
+            _v_annotation_targetsMethod = _v_annotation.get('targetsMethod', False)
+            builder.write_bool(pos + 15, 1, _v_annotation_targetsMethod)
+            _v_annotation_targetsParam = _v_annotation.get('targetsParam', False)
+            builder.write_bool(pos + 15, 2, _v_annotation_targetsParam)
+            _v_annotation_targetsAnnotation = _v_annotation.get('targetsAnnotation', False)
+            builder.write_bool(pos + 15, 3, _v_annotation_targetsAnnotation)
+        _v_parameters = _d.get('parameters', None)
+        builder.copy_from_list(pos + 80, _Node_Parameter_list_item_type, _v_parameters)
+        _v_isGeneric = _d.get('isGeneric', False)
+        builder.write_bool(pos + 36, 0, _v_isGeneric)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        anonymous__curtag = None
+        _v_id = _d.get('id', 0)
+        _v_id = int(_v_id)
+        builder.write_uint64(pos + 0, _v_id)
+        _v_displayName = _d.get('displayName', None)
+        _v_displayName = _json_load_text(_v_displayName)
+        builder.alloc_text(pos + 40, _v_displayName)
+        _v_displayNamePrefixLength = _d.get('displayNamePrefixLength', 0)
+        _v_displayNamePrefixLength = int(_v_displayNamePrefixLength)
+        builder.write_uint32(pos + 8, _v_displayNamePrefixLength)
+        _v_scopeId = _d.get('scopeId', 0)
+        _v_scopeId = int(_v_scopeId)
+        builder.write_uint64(pos + 16, _v_scopeId)
+        _v_nestedNodes = _d.get('nestedNodes', None)
+        _json_copy_list(builder, pos + 48, _Node_NestedNode_list_item_type, _v_nestedNodes)
+        _v_annotations = _d.get('annotations', None)
+        _json_copy_list(builder, pos + 56, _Annotation_list_item_type, _v_annotations)
+        _v_file = _d.get('file', _undefined)
+        if _v_file is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'file')
+            builder.write_int16(pos + 12, 0)
+        _v_struct = _d.get('struct', _undefined)
+        if _v_struct is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'struct')
+            builder.write_int16(pos + 12, 1)
+            _v_struct_dataWordCount = _v_struct.get('dataWordCount', 0)
+            _v_struct_dataWordCount = int(_v_struct_dataWordCount)
+            builder.write_uint16(pos + 14, _v_struct_dataWordCount)
+            _v_struct_pointerCount = _v_struct.get('pointerCount', 0)
+            _v_struct_pointerCount = int(_v_struct_pointerCount)
+            builder.write_uint16(pos + 24, _v_struct_pointerCount)
+            _v_struct_preferredListEncoding = _v_struct.get('preferredListEncoding', 0)
+            _v_struct_preferredListEncoding = _json_load_enum(ElementSize, _v_struct_preferredListEncoding)
+            builder.write_int16(pos + 26, _v_struct_preferredListEncoding)
+            _v_struct_isGroup = _v_struct.get('isGroup', False)
+            builder.write_bool(pos + 28, 0, _v_struct_isGroup)
+            _v_struct_discriminantCount = _v_struct.get('discriminantCount', 0)
+            _v_struct_discriminantCount = int(_v_struct_discriminantCount)
+            builder.write_uint16(pos + 30, _v_struct_discriminantCount)
+            _v_struct_discriminantOffset = _v_struct.get('discriminantOffset', 0)
+            _v_struct_discriminantOffset = int(_v_struct_discriminantOffset)
+            builder.write_uint32(pos + 32, _v_struct_discriminantOffset)
+            _v_struct_fields = _v_struct.get('fields', None)
+            _json_copy_list(builder, pos + 64, _Field_list_item_type, _v_struct_fields)
+        _v_enum = _d.get('enum', _undefined)
+        if _v_enum is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'enum')
+            builder.write_int16(pos + 12, 2)
+            _v_enum_enumerants = _v_enum.get('enumerants', None)
+            _json_copy_list(builder, pos + 64, _Enumerant_list_item_type, _v_enum_enumerants)
+        _v_interface = _d.get('interface', _undefined)
+        if _v_interface is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'interface')
+            builder.write_int16(pos + 12, 3)
+            _v_interface_methods = _v_interface.get('methods', None)
+            _json_copy_list(builder, pos + 64, _Method_list_item_type, _v_interface_methods)
+            _v_interface_superclasses = _v_interface.get('superclasses', None)
+            _json_copy_list(builder, pos + 72, _Superclass_list_item_type, _v_interface_superclasses)
+        _v_const = _d.get('const', _undefined)
+        if _v_const is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'const')
+            builder.write_int16(pos + 12, 4)
+            _v_const_type = _v_const.get('type', None)
+            if _v_const_type is not None:
+                Type._write_json(builder, builder.alloc_struct(pos + 64, 3, 1), _v_const_type)
+            _v_const_value = _v_const.get('value', None)
+            if _v_const_value is not None:
+                Value._write_json(builder, builder.alloc_struct(pos + 72, 2, 1), _v_const_value)
+        _v_annotation = _d.get('annotation', _undefined)
+        if _v_annotation is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'annotation')
+            builder.write_int16(pos + 12, 5)
+            _v_annotation_type = _v_annotation.get('type', None)
+            if _v_annotation_type is not None:
+                Type._write_json(builder, builder.alloc_struct(pos + 64, 3, 1), _v_annotation_type)
+            _v_annotation_targetsFile = _v_annotation.get('targetsFile', False)
+            builder.write_bool(pos + 14, 0, _v_annotation_targetsFile)
+            _v_annotation_targetsConst = _v_annotation.get('targetsConst', False)
+            builder.write_bool(pos + 14, 1, _v_annotation_targetsConst)
+            _v_annotation_targetsEnum = _v_annotation.get('targetsEnum', False)
+            builder.write_bool(pos + 14, 2, _v_annotation_targetsEnum)
+            _v_annotation_targetsEnumerant = _v_annotation.get('targetsEnumerant', False)
+            builder.write_bool(pos + 14, 3, _v_annotation_targetsEnumerant)
+            _v_annotation_targetsStruct = _v_annotation.get('targetsStruct', False)
+            builder.write_bool(pos + 14, 4, _v_annotation_targetsStruct)
+            _v_annotation_targetsField = _v_annotation.get('targetsField', False)
+            builder.write_bool(pos + 14, 5, _v_annotation_targetsField)
+            _v_annotation_targetsUnion = _v_annotation.get('targetsUnion', False)
+            builder.write_bool(pos + 14, 6, _v_annotation_targetsUnion)
+            _v_annotation_targetsGroup = _v_annotation.get('targetsGroup', False)
+            builder.write_bool(pos + 14, 7, _v_annotation_targetsGroup)
+            _v_annotation_targetsInterface = _v_annotation.get('targetsInterface', False)
+            builder.write_bool(pos + 15, 0, _v_annotation_targetsInterface)
+            _v_annotation_targetsMethod = _v_annotation.get('targetsMethod', False)
+            builder.write_bool(pos + 15, 1, _v_annotation_targetsMethod)
+            _v_annotation_targetsParam = _v_annotation.get('targetsParam', False)
+            builder.write_bool(pos + 15, 2, _v_annotation_targetsParam)
+            _v_annotation_targetsAnnotation = _v_annotation.get('targetsAnnotation', False)
+            builder.write_bool(pos + 15, 3, _v_annotation_targetsAnnotation)
+        _v_parameters = _d.get('parameters', None)
+        _json_copy_list(builder, pos + 80, _Node_Parameter_list_item_type, _v_parameters)
+        _v_isGeneric = _d.get('isGeneric', False)
+        builder.write_bool(pos + 36, 0, _v_isGeneric)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(88)
+        Node._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 5, 6)
+    
     def shortrepr(self):
         parts = []
         parts.append("id = %s" % self.id)
@@ -1362,6 +2036,61 @@ class Node(_Struct):
         if self.has_parameters(): parts.append("parameters = %s" % self.get_parameters().shortrepr())
         parts.append("isGeneric = %s" % str(self.isGeneric).lower())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        tag = self.__which__()
+        d['id'] = self._read_primitive(0, ord(b'Q'))
+        d['displayName'] = self.displayName
+        d['displayNamePrefixLength'] = self._read_primitive(8, ord(b'I'))
+        d['scopeId'] = self._read_primitive(16, ord(b'Q'))
+        value = self.nestedNodes
+        d['nestedNodes'] = None if value is None else value.to_list()
+        value = self.annotations
+        d['annotations'] = None if value is None else value.to_list()
+        if tag == 0:
+            d['file'] = None
+        if tag == 1:
+            d['struct'] = self.struct.to_dict()
+        if tag == 2:
+            d['enum'] = self.enum.to_dict()
+        if tag == 3:
+            d['interface'] = self.interface.to_dict()
+        if tag == 4:
+            d['const'] = self.const.to_dict()
+        if tag == 5:
+            d['annotation'] = self.annotation.to_dict()
+        value = self.parameters
+        d['parameters'] = None if value is None else value.to_list()
+        d['isGeneric'] = self._read_bit(36, 1)
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"id":"%d"' % self._read_primitive(0, ord(b'Q')))
+        if self.has_displayName(): parts.append('"displayName":' + _json_dump_text(self.displayName))
+        parts.append('"displayNamePrefixLength":%d' % self._read_primitive(8, ord(b'I')))
+        parts.append('"scopeId":"%d"' % self._read_primitive(16, ord(b'Q')))
+        if self.has_nestedNodes(): parts.append('"nestedNodes":' + _json_dump_list(self.nestedNodes))
+        if self.has_annotations(): parts.append('"annotations":' + _json_dump_list(self.annotations))
+        if self.is_file(): parts.append('"file":null')
+        if self.is_struct(): parts.append('"struct":' + self.struct._to_json())
+        if self.is_enum(): parts.append('"enum":' + self.enum._to_json())
+        if self.is_interface(): parts.append('"interface":' + self.interface._to_json())
+        if self.is_const(): parts.append('"const":' + self.const._to_json())
+        if self.is_annotation(): parts.append('"annotation":' + self.annotation._to_json())
+        if self.has_parameters(): parts.append('"parameters":' + _json_dump_list(self.parameters))
+        parts.append('"isGeneric":' + ('true' if self._read_bit(36, 1) else 'false'))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'nestedNodes': return _Node_NestedNode_list_item_type
+        if name == 'annotations': return _Annotation_list_item_type
+        if name == 'struct': return Node_struct
+        if name == 'enum': return Node_enum
+        if name == 'interface': return Node_interface
+        if name == 'const': return Node_const
+        if name == 'annotation': return Node_annotation
+        if name == 'parameters': return _Node_Parameter_list_item_type
+        return None
 
 _Node_list_item_type = _StructItemType(Node)
 
@@ -1370,6 +2099,7 @@ class Enumerant(_Struct):
     __capnpy_id__ = 0x978a7cebdc549a4d
     __static_data_size__ = 1
     __static_ptrs_size__ = 2
+    __data_fields__ = (('codeOrder', 0, 'H', 0),)
     
     
     @property
@@ -1409,7 +2139,7 @@ class Enumerant(_Struct):
     
     @staticmethod
     def __new(name=None, codeOrder=0, annotations=None):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(24 + _size_hint(name, 1) + _size_hint(annotations, 24))
         pos = builder.allocate(24)
         builder.alloc_text(pos + 8, name)
         builder.write_uint16(pos + 0, codeOrder)
@@ -1420,12 +2150,56 @@ class Enumerant(_Struct):
         _buf = Enumerant.__new(name, codeOrder, annotations)
         self._init_from_buffer(_buf, 0, 1, 2)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        _v_name = _d.get('name', None)
+        builder.alloc_text(pos + 8, _v_name)
+        _v_codeOrder = _d.get('codeOrder', 0)
+        builder.write_uint16(pos + 0, _v_codeOrder)
+        _v_annotations = _d.get('annotations', None)
+        builder.copy_from_list(pos + 16, _Annotation_list_item_type, _v_annotations)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        _v_name = _d.get('name', None)
+        _v_name = _json_load_text(_v_name)
+        builder.alloc_text(pos + 8, _v_name)
+        _v_codeOrder = _d.get('codeOrder', 0)
+        _v_codeOrder = int(_v_codeOrder)
+        builder.write_uint16(pos + 0, _v_codeOrder)
+        _v_annotations = _d.get('annotations', None)
+        _json_copy_list(builder, pos + 16, _Annotation_list_item_type, _v_annotations)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(24)
+        Enumerant._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 1, 2)
+    
     def shortrepr(self):
         parts = []
         if self.has_name(): parts.append("name = %s" % _text_bytes_repr(self.get_name()))
         parts.append("codeOrder = %s" % self.codeOrder)
         if self.has_annotations(): parts.append("annotations = %s" % self.get_annotations().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['name'] = self.name
+        d['codeOrder'] = self._read_primitive(0, ord(b'H'))
+        value = self.annotations
+        d['annotations'] = None if value is None else value.to_list()
+        return d
+    def _to_json(self):
+        parts = []
+        if self.has_name(): parts.append('"name":' + _json_dump_text(self.name))
+        parts.append('"codeOrder":%d' % self._read_primitive(0, ord(b'H')))
+        if self.has_annotations(): parts.append('"annotations":' + _json_dump_list(self.annotations))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'annotations': return _Annotation_list_item_type
+        return None
 
 _Enumerant_list_item_type = _StructItemType(Enumerant)
 
@@ -1434,6 +2208,7 @@ class Method(_Struct):
     __capnpy_id__ = 0x9500cce23b334d80
     __static_data_size__ = 3
     __static_ptrs_size__ = 5
+    __data_fields__ = (('codeOrder', 0, 'H', 0), ('paramStructType', 8, 'Q', 0), ('resultStructType', 16, 'Q', 0))
     
     
     @property
@@ -1554,7 +2329,7 @@ class Method(_Struct):
     
     @staticmethod
     def __new(name=None, codeOrder=0, paramStructType=0, resultStructType=0, annotations=None, paramBrand=None, resultBrand=None, implicitParameters=None):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(64 + _size_hint(name, 1) + _size_hint(annotations, 24) + _size_hint(implicitParameters, 8))
         pos = builder.allocate(64)
         builder.alloc_text(pos + 24, name)
         builder.write_uint16(pos + 0, codeOrder)
@@ -1570,6 +2345,63 @@ class Method(_Struct):
         _buf = Method.__new(name, codeOrder, paramStructType, resultStructType, annotations, paramBrand, resultBrand, implicitParameters)
         self._init_from_buffer(_buf, 0, 3, 5)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        _v_name = _d.get('name', None)
+        builder.alloc_text(pos + 24, _v_name)
+        _v_codeOrder = _d.get('codeOrder', 0)
+        builder.write_uint16(pos + 0, _v_codeOrder)
+        _v_paramStructType = _d.get('paramStructType', 0)
+        builder.write_uint64(pos + 8, _v_paramStructType)
+        _v_resultStructType = _d.get('resultStructType', 0)
+        builder.write_uint64(pos + 16, _v_resultStructType)
+        _v_annotations = _d.get('annotations', None)
+        builder.copy_from_list(pos + 32, _Annotation_list_item_type, _v_annotations)
+        _v_paramBrand = _d.get('paramBrand', None)
+        if isinstance(_v_paramBrand, dict):
+            Brand._write_dict(builder, builder.alloc_struct(pos + 40, 0, 1), _v_paramBrand)
+        else:
+            builder.copy_from_struct(pos + 40, Brand, _v_paramBrand)
+        _v_resultBrand = _d.get('resultBrand', None)
+        if isinstance(_v_resultBrand, dict):
+            Brand._write_dict(builder, builder.alloc_struct(pos + 48, 0, 1), _v_resultBrand)
+        else:
+            builder.copy_from_struct(pos + 48, Brand, _v_resultBrand)
+        _v_implicitParameters = _d.get('implicitParameters', None)
+        builder.copy_from_list(pos + 56, _Node_Parameter_list_item_type, _v_implicitParameters)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        _v_name = _d.get('name', None)
+        _v_name = _json_load_text(_v_name)
+        builder.alloc_text(pos + 24, _v_name)
+        _v_codeOrder = _d.get('codeOrder', 0)
+        _v_codeOrder = int(_v_codeOrder)
+        builder.write_uint16(pos + 0, _v_codeOrder)
+        _v_paramStructType = _d.get('paramStructType', 0)
+        _v_paramStructType = int(_v_paramStructType)
+        builder.write_uint64(pos + 8, _v_paramStructType)
+        _v_resultStructType = _d.get('resultStructType', 0)
+        _v_resultStructType = int(_v_resultStructType)
+        builder.write_uint64(pos + 16, _v_resultStructType)
+        _v_annotations = _d.get('annotations', None)
+        _json_copy_list(builder, pos + 32, _Annotation_list_item_type, _v_annotations)
+        _v_paramBrand = _d.get('paramBrand', None)
+        if _v_paramBrand is not None:
+            Brand._write_json(builder, builder.alloc_struct(pos + 40, 0, 1), _v_paramBrand)
+        _v_resultBrand = _d.get('resultBrand', None)
+        if _v_resultBrand is not None:
+            Brand._write_json(builder, builder.alloc_struct(pos + 48, 0, 1), _v_resultBrand)
+        _v_implicitParameters = _d.get('implicitParameters', None)
+        _json_copy_list(builder, pos + 56, _Node_Parameter_list_item_type, _v_implicitParameters)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(64)
+        Method._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 3, 5)
+    
     def shortrepr(self):
         parts = []
         if self.has_name(): parts.append("name = %s" % _text_bytes_repr(self.get_name()))
@@ -1581,6 +2413,39 @@ class Method(_Struct):
         if self.has_resultBrand(): parts.append("resultBrand = %s" % self.get_resultBrand().shortrepr())
         if self.has_implicitParameters(): parts.append("implicitParameters = %s" % self.get_implicitParameters().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['name'] = self.name
+        d['codeOrder'] = self._read_primitive(0, ord(b'H'))
+        d['paramStructType'] = self._read_primitive(8, ord(b'Q'))
+        d['resultStructType'] = self._read_primitive(16, ord(b'Q'))
+        value = self.annotations
+        d['annotations'] = None if value is None else value.to_list()
+        value = self.paramBrand
+        d['paramBrand'] = None if value is None else value.to_dict()
+        value = self.resultBrand
+        d['resultBrand'] = None if value is None else value.to_dict()
+        value = self.implicitParameters
+        d['implicitParameters'] = None if value is None else value.to_list()
+        return d
+    def _to_json(self):
+        parts = []
+        if self.has_name(): parts.append('"name":' + _json_dump_text(self.name))
+        parts.append('"codeOrder":%d' % self._read_primitive(0, ord(b'H')))
+        parts.append('"paramStructType":"%d"' % self._read_primitive(8, ord(b'Q')))
+        parts.append('"resultStructType":"%d"' % self._read_primitive(16, ord(b'Q')))
+        if self.has_annotations(): parts.append('"annotations":' + _json_dump_list(self.annotations))
+        if self.has_paramBrand(): parts.append('"paramBrand":' + self.paramBrand._to_json())
+        if self.has_resultBrand(): parts.append('"resultBrand":' + self.resultBrand._to_json())
+        if self.has_implicitParameters(): parts.append('"implicitParameters":' + _json_dump_list(self.implicitParameters))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'annotations': return _Annotation_list_item_type
+        if name == 'paramBrand': return Brand
+        if name == 'resultBrand': return Brand
+        if name == 'implicitParameters': return _Node_Parameter_list_item_type
+        return None
 
 _Method_list_item_type = _StructItemType(Method)
 
@@ -1589,6 +2454,7 @@ class Superclass(_Struct):
     __capnpy_id__ = 0xa9962a9ed0a4d7f8
     __static_data_size__ = 1
     __static_ptrs_size__ = 1
+    __data_fields__ = (('id', 0, 'Q', 0),)
     
     
     @property
@@ -1626,7 +2492,7 @@ class Superclass(_Struct):
     
     @staticmethod
     def __new(id=0, brand=None):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(16)
         pos = builder.allocate(16)
         builder.write_uint64(pos + 0, id)
         builder.copy_from_struct(pos + 8, Brand, brand)
@@ -1636,11 +2502,52 @@ class Superclass(_Struct):
         _buf = Superclass.__new(id, brand)
         self._init_from_buffer(_buf, 0, 1, 1)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        _v_id = _d.get('id', 0)
+        builder.write_uint64(pos + 0, _v_id)
+        _v_brand = _d.get('brand', None)
+        if isinstance(_v_brand, dict):
+            Brand._write_dict(builder, builder.alloc_struct(pos + 8, 0, 1), _v_brand)
+        else:
+            builder.copy_from_struct(pos + 8, Brand, _v_brand)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        _v_id = _d.get('id', 0)
+        _v_id = int(_v_id)
+        builder.write_uint64(pos + 0, _v_id)
+        _v_brand = _d.get('brand', None)
+        if _v_brand is not None:
+            Brand._write_json(builder, builder.alloc_struct(pos + 8, 0, 1), _v_brand)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(16)
+        Superclass._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 1, 1)
+    
     def shortrepr(self):
         parts = []
         parts.append("id = %s" % self.id)
         if self.has_brand(): parts.append("brand = %s" % self.get_brand().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['id'] = self._read_primitive(0, ord(b'Q'))
+        value = self.brand
+        d['brand'] = None if value is None else value.to_dict()
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"id":"%d"' % self._read_primitive(0, ord(b'Q')))
+        if self.has_brand(): parts.append('"brand":' + self.brand._to_json())
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'brand': return Brand
+        return None
 
 _Superclass_list_item_type = _StructItemType(Superclass)
 
@@ -1649,6 +2556,7 @@ class Type_list(_Struct):
     __capnpy_id__ = 0x87e739250a60ea97
     __static_data_size__ = 3
     __static_ptrs_size__ = 1
+    __data_fields__ = ()
     
     
     @property
@@ -1680,6 +2588,19 @@ class Type_list(_Struct):
         parts = []
         if self.has_elementType(): parts.append("elementType = %s" % self.get_elementType().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        value = self.elementType
+        d['elementType'] = None if value is None else value.to_dict()
+        return d
+    def _to_json(self):
+        parts = []
+        if self.has_elementType(): parts.append('"elementType":' + self.elementType._to_json())
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'elementType': return Type
+        return None
 
 _Type_list_list_item_type = _StructItemType(Type_list)
 
@@ -1688,6 +2609,7 @@ class Type_enum(_Struct):
     __capnpy_id__ = 0x9e0e78711a7f87a9
     __static_data_size__ = 3
     __static_ptrs_size__ = 1
+    __data_fields__ = (('typeId', 8, 'Q', 0),)
     
     
     @property
@@ -1728,6 +2650,21 @@ class Type_enum(_Struct):
         parts.append("typeId = %s" % self.typeId)
         if self.has_brand(): parts.append("brand = %s" % self.get_brand().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['typeId'] = self._read_primitive(8, ord(b'Q'))
+        value = self.brand
+        d['brand'] = None if value is None else value.to_dict()
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"typeId":"%d"' % self._read_primitive(8, ord(b'Q')))
+        if self.has_brand(): parts.append('"brand":' + self.brand._to_json())
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'brand': return Brand
+        return None
 
 _Type_enum_list_item_type = _StructItemType(Type_enum)
 
@@ -1736,6 +2673,7 @@ class Type_struct(_Struct):
     __capnpy_id__ = 0xac3a6f60ef4cc6d3
     __static_data_size__ = 3
     __static_ptrs_size__ = 1
+    __data_fields__ = (('typeId', 8, 'Q', 0),)
     
     
     @property
@@ -1776,6 +2714,21 @@ class Type_struct(_Struct):
         parts.append("typeId = %s" % self.typeId)
         if self.has_brand(): parts.append("brand = %s" % self.get_brand().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['typeId'] = self._read_primitive(8, ord(b'Q'))
+        value = self.brand
+        d['brand'] = None if value is None else value.to_dict()
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"typeId":"%d"' % self._read_primitive(8, ord(b'Q')))
+        if self.has_brand(): parts.append('"brand":' + self.brand._to_json())
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'brand': return Brand
+        return None
 
 _Type_struct_list_item_type = _StructItemType(Type_struct)
 
@@ -1784,6 +2737,7 @@ class Type_interface(_Struct):
     __capnpy_id__ = 0xed8bca69f7fb0cbf
     __static_data_size__ = 3
     __static_ptrs_size__ = 1
+    __data_fields__ = (('typeId', 8, 'Q', 0),)
     
     
     @property
@@ -1824,6 +2778,21 @@ class Type_interface(_Struct):
         parts.append("typeId = %s" % self.typeId)
         if self.has_brand(): parts.append("brand = %s" % self.get_brand().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['typeId'] = self._read_primitive(8, ord(b'Q'))
+        value = self.brand
+        d['brand'] = None if value is None else value.to_dict()
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"typeId":"%d"' % self._read_primitive(8, ord(b'Q')))
+        if self.has_brand(): parts.append('"brand":' + self.brand._to_json())
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'brand': return Brand
+        return None
 
 _Type_interface_list_item_type = _StructItemType(Type_interface)
 
@@ -1832,6 +2801,7 @@ class Type_anyPointer_unconstrained(_Struct):
     __capnpy_id__ = 0x8e3b5f79fe593656
     __static_data_size__ = 3
     __static_ptrs_size__ = 1
+    __data_fields__ = ()
     
     
     __tag__ = Type_anyPointer_unconstrained__tag__
@@ -1873,6 +2843,28 @@ class Type_anyPointer_unconstrained(_Struct):
         if self.is_list(): parts.append("list = %s" % "void")
         if self.is_capability(): parts.append("capability = %s" % "void")
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        tag = self.__which__()
+        if tag == 0:
+            d['anyKind'] = None
+        if tag == 1:
+            d['struct'] = None
+        if tag == 2:
+            d['list'] = None
+        if tag == 3:
+            d['capability'] = None
+        return d
+    def _to_json(self):
+        parts = []
+        if self.is_anyKind(): parts.append('"anyKind":null')
+        if self.is_struct(): parts.append('"struct":null')
+        if self.is_list(): parts.append('"list":null')
+        if self.is_capability(): parts.append('"capability":null')
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        return None
 
 _Type_anyPointer_unconstrained_list_item_type = _StructItemType(Type_anyPointer_unconstrained)
 
@@ -1881,6 +2873,7 @@ class Type_anyPointer_parameter(_Struct):
     __capnpy_id__ = 0x9dd1f724f4614a85
     __static_data_size__ = 3
     __static_ptrs_size__ = 1
+    __data_fields__ = (('scopeId', 16, 'Q', 0), ('parameterIndex', 10, 'H', 0))
     
     
     @property
@@ -1904,6 +2897,19 @@ class Type_anyPointer_parameter(_Struct):
         parts.append("scopeId = %s" % self.scopeId)
         parts.append("parameterIndex = %s" % self.parameterIndex)
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['scopeId'] = self._read_primitive(16, ord(b'Q'))
+        d['parameterIndex'] = self._read_primitive(10, ord(b'H'))
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"scopeId":"%d"' % self._read_primitive(16, ord(b'Q')))
+        parts.append('"parameterIndex":%d' % self._read_primitive(10, ord(b'H')))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        return None
 
 _Type_anyPointer_parameter_list_item_type = _StructItemType(Type_anyPointer_parameter)
 
@@ -1912,6 +2918,7 @@ class Type_anyPointer_implicitMethodParameter(_Struct):
     __capnpy_id__ = 0xbaefc9120c56e274
     __static_data_size__ = 3
     __static_ptrs_size__ = 1
+    __data_fields__ = (('parameterIndex', 10, 'H', 0),)
     
     
     @property
@@ -1926,6 +2933,17 @@ class Type_anyPointer_implicitMethodParameter(_Struct):
         parts = []
         parts.append("parameterIndex = %s" % self.parameterIndex)
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['parameterIndex'] = self._read_primitive(10, ord(b'H'))
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"parameterIndex":%d' % self._read_primitive(10, ord(b'H')))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        return None
 
 _Type_anyPointer_implicitMethodParameter_list_item_type = _StructItemType(Type_anyPointer_implicitMethodParameter)
 
@@ -1934,6 +2952,7 @@ class Type_anyPointer(_Struct):
     __capnpy_id__ = 0xc2573fe8a23e49f1
     __static_data_size__ = 3
     __static_ptrs_size__ = 1
+    __data_fields__ = ()
     
     
     __tag__ = Type_anyPointer__tag__
@@ -1988,6 +3007,28 @@ class Type_anyPointer(_Struct):
         if self.is_parameter(): parts.append("parameter = %s" % self.parameter.shortrepr())
         if self.is_implicitMethodParameter(): parts.append("implicitMethodParameter = %s" % self.implicitMethodParameter.shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        tag = self.__which__()
+        if tag == 0:
+            d['unconstrained'] = self.unconstrained.to_dict()
+        if tag == 1:
+            d['parameter'] = self.parameter.to_dict()
+        if tag == 2:
+            d['implicitMethodParameter'] = self.implicitMethodParameter.to_dict()
+        return d
+    def _to_json(self):
+        parts = []
+        if self.is_unconstrained(): parts.append('"unconstrained":' + self.unconstrained._to_json())
+        if self.is_parameter(): parts.append('"parameter":' + self.parameter._to_json())
+        if self.is_implicitMethodParameter(): parts.append('"implicitMethodParameter":' + self.implicitMethodParameter._to_json())
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'unconstrained': return Type_anyPointer_unconstrained
+        if name == 'parameter': return Type_anyPointer_parameter
+        if name == 'implicitMethodParameter': return Type_anyPointer_implicitMethodParameter
+        return None
 
 _Type_anyPointer_list_item_type = _StructItemType(Type_anyPointer)
 
@@ -1996,6 +3037,7 @@ class Type(_Struct):
     __capnpy_id__ = 0xd07378ede1f9cc60
     __static_data_size__ = 3
     __static_ptrs_size__ = 1
+    __data_fields__ = ()
     
     
     __tag__ = Type__tag__
@@ -2172,105 +3214,105 @@ class Type(_Struct):
     
     @staticmethod
     def __new(void=_undefined, bool=_undefined, int8=_undefined, int16=_undefined, int32=_undefined, int64=_undefined, uint8=_undefined, uint16=_undefined, uint32=_undefined, uint64=_undefined, float32=_undefined, float64=_undefined, text=_undefined, data=_undefined, list=_undefined, enum=_undefined, struct=_undefined, interface=_undefined, anyPointer=_undefined):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(32)
         pos = builder.allocate(32)
         anonymous__curtag = None
         anyPointer__curtag = None
         anyPointer_unconstrained__curtag = None
         if void is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'void')
-            builder.write_int16(0, 0)
+            builder.write_int16(pos + 0, 0)
         if bool is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'bool')
-            builder.write_int16(0, 1)
+            builder.write_int16(pos + 0, 1)
         if int8 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'int8')
-            builder.write_int16(0, 2)
+            builder.write_int16(pos + 0, 2)
         if int16 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'int16')
-            builder.write_int16(0, 3)
+            builder.write_int16(pos + 0, 3)
         if int32 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'int32')
-            builder.write_int16(0, 4)
+            builder.write_int16(pos + 0, 4)
         if int64 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'int64')
-            builder.write_int16(0, 5)
+            builder.write_int16(pos + 0, 5)
         if uint8 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'uint8')
-            builder.write_int16(0, 6)
+            builder.write_int16(pos + 0, 6)
         if uint16 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'uint16')
-            builder.write_int16(0, 7)
+            builder.write_int16(pos + 0, 7)
         if uint32 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'uint32')
-            builder.write_int16(0, 8)
+            builder.write_int16(pos + 0, 8)
         if uint64 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'uint64')
-            builder.write_int16(0, 9)
+            builder.write_int16(pos + 0, 9)
         if float32 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'float32')
-            builder.write_int16(0, 10)
+            builder.write_int16(pos + 0, 10)
         if float64 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'float64')
-            builder.write_int16(0, 11)
+            builder.write_int16(pos + 0, 11)
         if text is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'text')
-            builder.write_int16(0, 12)
+            builder.write_int16(pos + 0, 12)
         if data is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'data')
-            builder.write_int16(0, 13)
+            builder.write_int16(pos + 0, 13)
         if list is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'list')
-            builder.write_int16(0, 14)
+            builder.write_int16(pos + 0, 14)
             list_elementType, = list
             builder.copy_from_struct(pos + 24, Type, list_elementType)
         if enum is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'enum')
-            builder.write_int16(0, 15)
+            builder.write_int16(pos + 0, 15)
             enum_typeId, enum_brand, = enum
             builder.write_uint64(pos + 8, enum_typeId)
             builder.copy_from_struct(pos + 24, Brand, enum_brand)
         if struct is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'struct')
-            builder.write_int16(0, 16)
+            builder.write_int16(pos + 0, 16)
             struct_typeId, struct_brand, = struct
             builder.write_uint64(pos + 8, struct_typeId)
             builder.copy_from_struct(pos + 24, Brand, struct_brand)
         if interface is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'interface')
-            builder.write_int16(0, 17)
+            builder.write_int16(pos + 0, 17)
             interface_typeId, interface_brand, = interface
             builder.write_uint64(pos + 8, interface_typeId)
             builder.copy_from_struct(pos + 24, Brand, interface_brand)
         if anyPointer is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'anyPointer')
-            builder.write_int16(0, 18)
+            builder.write_int16(pos + 0, 18)
             anyPointer_unconstrained, anyPointer_parameter, anyPointer_implicitMethodParameter, = anyPointer
             if anyPointer_unconstrained is not _undefined:
                 anyPointer__curtag = _check_tag(anyPointer__curtag, 'unconstrained')
-                builder.write_int16(8, 0)
+                builder.write_int16(pos + 8, 0)
                 anyPointer_unconstrained_anyKind, anyPointer_unconstrained_struct, anyPointer_unconstrained_list, anyPointer_unconstrained_capability, = anyPointer_unconstrained
                 if anyPointer_unconstrained_anyKind is not _undefined:
                     anyPointer_unconstrained__curtag = _check_tag(anyPointer_unconstrained__curtag, 'anyKind')
-                    builder.write_int16(10, 0)
+                    builder.write_int16(pos + 10, 0)
                 if anyPointer_unconstrained_struct is not _undefined:
                     anyPointer_unconstrained__curtag = _check_tag(anyPointer_unconstrained__curtag, 'struct')
-                    builder.write_int16(10, 1)
+                    builder.write_int16(pos + 10, 1)
                 if anyPointer_unconstrained_list is not _undefined:
                     anyPointer_unconstrained__curtag = _check_tag(anyPointer_unconstrained__curtag, 'list')
-                    builder.write_int16(10, 2)
+                    builder.write_int16(pos + 10, 2)
                 if anyPointer_unconstrained_capability is not _undefined:
                     anyPointer_unconstrained__curtag = _check_tag(anyPointer_unconstrained__curtag, 'capability')
-                    builder.write_int16(10, 3)
+                    builder.write_int16(pos + 10, 3)
             if anyPointer_parameter is not _undefined:
                 anyPointer__curtag = _check_tag(anyPointer__curtag, 'parameter')
-                builder.write_int16(8, 1)
+                builder.write_int16(pos + 8, 1)
                 anyPointer_parameter_scopeId, anyPointer_parameter_parameterIndex, = anyPointer_parameter
                 builder.write_uint64(pos + 16, anyPointer_parameter_scopeId)
                 builder.write_uint16(pos + 10, anyPointer_parameter_parameterIndex)
             if anyPointer_implicitMethodParameter is not _undefined:
                 anyPointer__curtag = _check_tag(anyPointer__curtag, 'implicitMethodParameter')
-                builder.write_int16(8, 2)
+                builder.write_int16(pos + 8, 2)
                 anyPointer_implicitMethodParameter_parameterIndex, = anyPointer_implicitMethodParameter
                 builder.write_uint16(pos + 10, anyPointer_implicitMethodParameter_parameterIndex)
         return builder.as_string()
@@ -2374,6 +3416,295 @@ class Type(_Struct):
         buf = Type.__new(anyPointer=anyPointer, void=_undefined, bool=_undefined, int8=_undefined, int16=_undefined, int32=_undefined, int64=_undefined, uint8=_undefined, uint16=_undefined, uint32=_undefined, uint64=_undefined, float32=_undefined, float64=_undefined, text=_undefined, data=_undefined, list=_undefined, enum=_undefined, struct=_undefined, interface=_undefined)
         return cls.from_buffer(buf, 0, 3, 1)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        anonymous__curtag = None
+        anyPointer__curtag = None
+        anyPointer_unconstrained__curtag = None
+        _v_void = _d.get('void', _undefined)
+        if _v_void is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'void')
+            builder.write_int16(pos + 0, 0)
+        _v_bool = _d.get('bool', _undefined)
+        if _v_bool is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'bool')
+            builder.write_int16(pos + 0, 1)
+        _v_int8 = _d.get('int8', _undefined)
+        if _v_int8 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'int8')
+            builder.write_int16(pos + 0, 2)
+        _v_int16 = _d.get('int16', _undefined)
+        if _v_int16 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'int16')
+            builder.write_int16(pos + 0, 3)
+        _v_int32 = _d.get('int32', _undefined)
+        if _v_int32 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'int32')
+            builder.write_int16(pos + 0, 4)
+        _v_int64 = _d.get('int64', _undefined)
+        if _v_int64 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'int64')
+            builder.write_int16(pos + 0, 5)
+        _v_uint8 = _d.get('uint8', _undefined)
+        if _v_uint8 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'uint8')
+            builder.write_int16(pos + 0, 6)
+        _v_uint16 = _d.get('uint16', _undefined)
+        if _v_uint16 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'uint16')
+            builder.write_int16(pos + 0, 7)
+        _v_uint32 = _d.get('uint32', _undefined)
+        if _v_uint32 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'uint32')
+            builder.write_int16(pos + 0, 8)
+        _v_uint64 = _d.get('uint64', _undefined)
+        if _v_uint64 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'uint64')
+            builder.write_int16(pos + 0, 9)
+        _v_float32 = _d.get('float32', _undefined)
+        if _v_float32 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'float32')
+            builder.write_int16(pos + 0, 10)
+        _v_float64 = _d.get('float64', _undefined)
+        if _v_float64 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'float64')
+            builder.write_int16(pos + 0, 11)
+        _v_text = _d.get('text', _undefined)
+        if _v_text is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'text')
+            builder.write_int16(pos + 0, 12)
+        _v_data = _d.get('data', _undefined)
+        if _v_data is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'data')
+            builder.write_int16(pos + 0, 13)
+        _v_list = _d.get('list', _undefined)
+        if _v_list is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'list')
+            builder.write_int16(pos + 0, 14)
+            _v_list_elementType = _v_list.get('elementType', None)
+            if isinstance(_v_list_elementType, dict):
+                Type._write_dict(builder, builder.alloc_struct(pos + 24, 3, 1), _v_list_elementType)
+            else:
+                builder.copy_from_struct(pos + 24, Type, _v_list_elementType)
+        _v_enum = _d.get('enum', _undefined)
+        if _v_enum is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'enum')
+            builder.write_int16(pos + 0, 15)
+            _v_enum_typeId = _v_enum.get('typeId', 0)
+            builder.write_uint64(pos + 8, _v_enum_typeId)
+            _v_enum_brand = _v_enum.get('brand', None)
+            if isinstance(_v_enum_brand, dict):
+                Brand._write_dict(builder, builder.alloc_struct(pos + 24, 0, 1), _v_enum_brand)
+            else:
+                builder.copy_from_struct(pos + 24, Brand, _v_enum_brand)
+        _v_struct = _d.get('struct', _undefined)
+        if _v_struct is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'struct')
+            builder.write_int16(pos + 0, 16)
+            _v_struct_typeId = _v_struct.get('typeId', 0)
+            builder.write_uint64(pos + 8, _v_struct_typeId)
+            _v_struct_brand = _v_struct.get('brand', None)
+            if isinstance(_v_struct_brand, dict):
+                Brand._write_dict(builder, builder.alloc_struct(pos + 24, 0, 1), _v_struct_brand)
+            else:
+                builder.copy_from_struct(pos + 24, Brand, _v_struct_brand)
+        _v_interface = _d.get('interface', _undefined)
+        if _v_interface is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'interface')
+            builder.write_int16(pos + 0, 17)
+            _v_interface_typeId = _v_interface.get('typeId', 0)
+            builder.write_uint64(pos + 8, _v_interface_typeId)
+            _v_interface_brand = _v_interface.get('brand', None)
+            if isinstance(_v_interface_brand, dict):
+                Brand._write_dict(builder, builder.alloc_struct(pos + 24, 0, 1), _v_interface_brand)
+            else:
+                builder.copy_from_struct(pos + 24, Brand, _v_interface_brand)
+        _v_anyPointer = _d.get('anyPointer', _undefined)
+        if _v_anyPointer is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'anyPointer')
+            builder.write_int16(pos + 0, 18)
+            _v_anyPointer_unconstrained = _v_anyPointer.get('unconstrained', _undefined)
+            if _v_anyPointer_unconstrained is not _undefined:
+                anyPointer__curtag = _check_tag(anyPointer__curtag, 'unconstrained')
+                builder.write_int16(pos + 8, 0)
+                _v_anyPointer_unconstrained_anyKind = _v_anyPointer_unconstrained.get('anyKind', _undefined)
+                if _v_anyPointer_unconstrained_anyKind is not _undefined:
+                    anyPointer_unconstrained__curtag = _check_tag(anyPointer_unconstrained__curtag, 'anyKind')
+                    builder.write_int16(pos + 10, 0)
+                _v_anyPointer_unconstrained_struct = _v_anyPointer_unconstrained.get('struct', _undefined)
+                if _v_anyPointer_unconstrained_struct is not _undefined:
+                    anyPointer_unconstrained__curtag = _check_tag(anyPointer_unconstrained__curtag, 'struct')
+                    builder.write_int16(pos + 10, 1)
+                _v_anyPointer_unconstrained_list = _v_anyPointer_unconstrained.get('list', _undefined)
+                if _v_anyPointer_unconstrained_list is not _undefined:
+                    anyPointer_unconstrained__curtag = _check_tag(anyPointer_unconstrained__curtag, 'list')
+                    builder.write_int16(pos + 10, 2)
+                _v_anyPointer_unconstrained_capability = _v_anyPointer_unconstrained.get('capability', _undefined)
+                if _v_anyPointer_unconstrained_capability is not _undefined:
+                    anyPointer_unconstrained__curtag = _check_tag(anyPointer_unconstrained__curtag, 'capability')
+                    builder.write_int16(pos + 10, 3)
+            _v_anyPointer_parameter = _v_anyPointer.get('parameter', _undefined)
+            if _v_anyPointer_parameter is not _undefined:
+                anyPointer__curtag = _check_tag(anyPointer__curtag, 'parameter')
+                builder.write_int16(pos + 8, 1)
+                _v_anyPointer_parameter_scopeId = _v_anyPointer_parameter.get('scopeId', 0)
+                builder.write_uint64(pos + 16, _v_anyPointer_parameter_scopeId)
+                _v_anyPointer_parameter_parameterIndex = _v_anyPointer_parameter.get('parameterIndex', 0)
+                builder.write_uint16(pos + 10, _v_anyPointer_parameter_parameterIndex)
+            _v_anyPointer_implicitMethodParameter = _v_anyPointer.get('implicitMethodParameter', _undefined)
+            if _v_anyPointer_implicitMethodParameter is not _undefined:
+                anyPointer__curtag = _check_tag(anyPointer__curtag, 'implicitMethodParameter')
+                builder.write_int16(pos + 8, 2)
+                _v_anyPointer_implicitMethodParameter_parameterIndex = _v_anyPointer_implicitMethodParameter.get('parameterIndex', 0)
+                builder.write_uint16(pos + 10, _v_anyPointer_implicitMethodParameter_parameterIndex)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        anonymous__curtag = None
+        anyPointer__curtag = None
+        anyPointer_unconstrained__curtag = None
+        _v_void = _d.get('void', _undefined)
+        if _v_void is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'void')
+            builder.write_int16(pos + 0, 0)
+        _v_bool = _d.get('bool', _undefined)
+        if _v_bool is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'bool')
+            builder.write_int16(pos + 0, 1)
+        _v_int8 = _d.get('int8', _undefined)
+        if _v_int8 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'int8')
+            builder.write_int16(pos + 0, 2)
+        _v_int16 = _d.get('int16', _undefined)
+        if _v_int16 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'int16')
+            builder.write_int16(pos + 0, 3)
+        _v_int32 = _d.get('int32', _undefined)
+        if _v_int32 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'int32')
+            builder.write_int16(pos + 0, 4)
+        _v_int64 = _d.get('int64', _undefined)
+        if _v_int64 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'int64')
+            builder.write_int16(pos + 0, 5)
+        _v_uint8 = _d.get('uint8', _undefined)
+        if _v_uint8 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'uint8')
+            builder.write_int16(pos + 0, 6)
+        _v_uint16 = _d.get('uint16', _undefined)
+        if _v_uint16 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'uint16')
+            builder.write_int16(pos + 0, 7)
+        _v_uint32 = _d.get('uint32', _undefined)
+        if _v_uint32 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'uint32')
+            builder.write_int16(pos + 0, 8)
+        _v_uint64 = _d.get('uint64', _undefined)
+        if _v_uint64 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'uint64')
+            builder.write_int16(pos + 0, 9)
+        _v_float32 = _d.get('float32', _undefined)
+        if _v_float32 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'float32')
+            builder.write_int16(pos + 0, 10)
+        _v_float64 = _d.get('float64', _undefined)
+        if _v_float64 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'float64')
+            builder.write_int16(pos + 0, 11)
+        _v_text = _d.get('text', _undefined)
+        if _v_text is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'text')
+            builder.write_int16(pos + 0, 12)
+        _v_data = _d.get('data', _undefined)
+        if _v_data is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'data')
+            builder.write_int16(pos + 0, 13)
+        _v_list = _d.get('list', _undefined)
+        if _v_list is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'list')
+            builder.write_int16(pos + 0, 14)
+            _v_list_elementType = _v_list.get('elementType', None)
+            if _v_list_elementType is not None:
+                Type._write_json(builder, builder.alloc_struct(pos + 24, 3, 1), _v_list_elementType)
+        _v_enum = _d.get('enum', _undefined)
+        if _v_enum is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'enum')
+            builder.write_int16(pos + 0, 15)
+            _v_enum_typeId = _v_enum.get('typeId', 0)
+            _v_enum_typeId = int(_v_enum_typeId)
+            builder.write_uint64(pos + 8, _v_enum_typeId)
+            _v_enum_brand = _v_enum.get('brand', None)
+            if _v_enum_brand is not None:
+                Brand._write_json(builder, builder.alloc_struct(pos + 24, 0, 1), _v_enum_brand)
+        _v_struct = _d.get('struct', _undefined)
+        if _v_struct is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'struct')
+            builder.write_int16(pos + 0, 16)
+            _v_struct_typeId = _v_struct.get('typeId', 0)
+            _v_struct_typeId = int(_v_struct_typeId)
+            builder.write_uint64(pos + 8, _v_struct_typeId)
+            _v_struct_brand = _v_struct.get('brand', None)
+            if _v_struct_brand is not None:
+                Brand._write_json(builder, builder.alloc_struct(pos + 24, 0, 1), _v_struct_brand)
+        _v_interface = _d.get('interface', _undefined)
+        if _v_interface is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'interface')
+            builder.write_int16(pos + 0, 17)
+            _v_interface_typeId = _v_interface.get('typeId', 0)
+            _v_interface_typeId = int(_v_interface_typeId)
+            builder.write_uint64(pos + 8, _v_interface_typeId)
+            _v_interface_brand = _v_interface.get('brand', None)
+            if _v_interface_brand is not None:
+                Brand._write_json(builder, builder.alloc_struct(pos + 24, 0, 1), _v_interface_brand)
+        _v_anyPointer = _d.get('anyPointer', _undefined)
+        if _v_anyPointer is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'anyPointer')
+            builder.write_int16(pos + 0, 18)
+            _v_anyPointer_unconstrained = _v_anyPointer.get('unconstrained', _undefined)
+            if _v_anyPointer_unconstrained is not _undefined:
+                anyPointer__curtag = _check_tag(anyPointer__curtag, 'unconstrained')
+                builder.write_int16(pos + 8, 0)
+                _v_anyPointer_unconstrained_anyKind = _v_anyPointer_unconstrained.get('anyKind', _undefined)
+                if _v_anyPointer_unconstrained_anyKind is not _undefined:
+                    anyPointer_unconstrained__curtag = _check_tag(anyPointer_unconstrained__curtag, 'anyKind')
+                    builder.write_int16(pos + 10, 0)
+                _v_anyPointer_unconstrained_struct = _v_anyPointer_unconstrained.get('struct', _undefined)
+                if _v_anyPointer_unconstrained_struct is not _undefined:
+                    anyPointer_unconstrained__curtag = _check_tag(anyPointer_unconstrained__curtag, 'struct')
+                    builder.write_int16(pos + 10, 1)
+                _v_anyPointer_unconstrained_list = _v_anyPointer_unconstrained.get('list', _undefined)
+                if _v_anyPointer_unconstrained_list is not _undefined:
+                    anyPointer_unconstrained__curtag = _check_tag(anyPointer_unconstrained__curtag, 'list')
+                    builder.write_int16(pos + 10, 2)
+                _v_anyPointer_unconstrained_capability = _v_anyPointer_unconstrained.get('capability', _undefined)
+                if _v_anyPointer_unconstrained_capability is not _undefined:
+                    anyPointer_unconstrained__curtag = _check_tag(anyPointer_unconstrained__curtag, 'capability')
+                    builder.write_int16(pos + 10, 3)
+            _v_anyPointer_parameter = _v_anyPointer.get('parameter', _undefined)
+            if _v_anyPointer_parameter is not _undefined:
+                anyPointer__curtag = _check_tag(anyPointer__curtag, 'parameter')
+                builder.write_int16(pos + 8, 1)
+                _v_anyPointer_parameter_scopeId = _v_anyPointer_parameter.get('scopeId', 0)
+                _v_anyPointer_parameter_scopeId = int(_v_anyPointer_parameter_scopeId)
+                builder.write_uint64(pos + 16, _v_anyPointer_parameter_scopeId)
+                _v_anyPointer_parameter_parameterIndex = _v_anyPointer_parameter.get('parameterIndex', 0)
+                _v_anyPointer_parameter_parameterIndex = int(_v_anyPointer_parameter_parameterIndex)
+                builder.write_uint16(pos + 10, _v_anyPointer_parameter_parameterIndex)
+            _v_anyPointer_implicitMethodParameter = _v_anyPointer.get('implicitMethodParameter', _undefined)
+            if _v_anyPointer_implicitMethodParameter is not _undefined:
+                anyPointer__curtag = _check_tag(anyPointer__curtag, 'implicitMethodParameter')
+                builder.write_int16(pos + 8, 2)
+                _v_anyPointer_implicitMethodParameter_parameterIndex = _v_anyPointer_implicitMethodParameter.get('parameterIndex', 0)
+                _v_anyPointer_implicitMethodParameter_parameterIndex = int(_v_anyPointer_implicitMethodParameter_parameterIndex)
+                builder.write_uint16(pos + 10, _v_anyPointer_implicitMethodParameter_parameterIndex)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(32)
+        Type._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 3, 1)
+    
     def shortrepr(self):
         parts = []
         if self.is_void(): parts.append("void = %s" % "void")
@@ -2396,6 +3727,78 @@ class Type(_Struct):
         if self.is_interface(): parts.append("interface = %s" % self.interface.shortrepr())
         if self.is_anyPointer(): parts.append("anyPointer = %s" % self.anyPointer.shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        tag = self.__which__()
+        if tag == 0:
+            d['void'] = None
+        if tag == 1:
+            d['bool'] = None
+        if tag == 2:
+            d['int8'] = None
+        if tag == 3:
+            d['int16'] = None
+        if tag == 4:
+            d['int32'] = None
+        if tag == 5:
+            d['int64'] = None
+        if tag == 6:
+            d['uint8'] = None
+        if tag == 7:
+            d['uint16'] = None
+        if tag == 8:
+            d['uint32'] = None
+        if tag == 9:
+            d['uint64'] = None
+        if tag == 10:
+            d['float32'] = None
+        if tag == 11:
+            d['float64'] = None
+        if tag == 12:
+            d['text'] = None
+        if tag == 13:
+            d['data'] = None
+        if tag == 14:
+            d['list'] = self.list.to_dict()
+        if tag == 15:
+            d['enum'] = self.enum.to_dict()
+        if tag == 16:
+            d['struct'] = self.struct.to_dict()
+        if tag == 17:
+            d['interface'] = self.interface.to_dict()
+        if tag == 18:
+            d['anyPointer'] = self.anyPointer.to_dict()
+        return d
+    def _to_json(self):
+        parts = []
+        if self.is_void(): parts.append('"void":null')
+        if self.is_bool(): parts.append('"bool":null')
+        if self.is_int8(): parts.append('"int8":null')
+        if self.is_int16(): parts.append('"int16":null')
+        if self.is_int32(): parts.append('"int32":null')
+        if self.is_int64(): parts.append('"int64":null')
+        if self.is_uint8(): parts.append('"uint8":null')
+        if self.is_uint16(): parts.append('"uint16":null')
+        if self.is_uint32(): parts.append('"uint32":null')
+        if self.is_uint64(): parts.append('"uint64":null')
+        if self.is_float32(): parts.append('"float32":null')
+        if self.is_float64(): parts.append('"float64":null')
+        if self.is_text(): parts.append('"text":null')
+        if self.is_data(): parts.append('"data":null')
+        if self.is_list(): parts.append('"list":' + self.list._to_json())
+        if self.is_enum(): parts.append('"enum":' + self.enum._to_json())
+        if self.is_struct(): parts.append('"struct":' + self.struct._to_json())
+        if self.is_interface(): parts.append('"interface":' + self.interface._to_json())
+        if self.is_anyPointer(): parts.append('"anyPointer":' + self.anyPointer._to_json())
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'list': return Type_list
+        if name == 'enum': return Type_enum
+        if name == 'struct': return Type_struct
+        if name == 'interface': return Type_interface
+        if name == 'anyPointer': return Type_anyPointer
+        return None
 
 _Type_list_item_type = _StructItemType(Type)
 
@@ -2404,6 +3807,7 @@ class Value(_Struct):
     __capnpy_id__ = 0xce23dcd2d7b00c9b
     __static_data_size__ = 2
     __static_ptrs_size__ = 1
+    __data_fields__ = ()
     
     
     __tag__ = Value__tag__
@@ -2613,82 +4017,82 @@ class Value(_Struct):
     
     @staticmethod
     def __new(void=_undefined, bool=_undefined, int8=_undefined, int16=_undefined, int32=_undefined, int64=_undefined, uint8=_undefined, uint16=_undefined, uint32=_undefined, uint64=_undefined, float32=_undefined, float64=_undefined, text=_undefined, data=_undefined, list=_undefined, enum=_undefined, struct=_undefined, interface=_undefined, anyPointer=_undefined):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(24)
         pos = builder.allocate(24)
         anonymous__curtag = None
         if void is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'void')
-            builder.write_int16(0, 0)
+            builder.write_int16(pos + 0, 0)
         if bool is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'bool')
-            builder.write_int16(0, 1)
-            builder.write_bool(2, 0, bool)
+            builder.write_int16(pos + 0, 1)
+            builder.write_bool(pos + 2, 0, bool)
         if int8 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'int8')
-            builder.write_int16(0, 2)
+            builder.write_int16(pos + 0, 2)
             builder.write_int8(pos + 2, int8)
         if int16 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'int16')
-            builder.write_int16(0, 3)
+            builder.write_int16(pos + 0, 3)
             builder.write_int16(pos + 2, int16)
         if int32 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'int32')
-            builder.write_int16(0, 4)
+            builder.write_int16(pos + 0, 4)
             builder.write_int32(pos + 4, int32)
         if int64 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'int64')
-            builder.write_int16(0, 5)
+            builder.write_int16(pos + 0, 5)
             builder.write_int64(pos + 8, int64)
         if uint8 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'uint8')
-            builder.write_int16(0, 6)
+            builder.write_int16(pos + 0, 6)
             builder.write_uint8(pos + 2, uint8)
         if uint16 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'uint16')
-            builder.write_int16(0, 7)
+            builder.write_int16(pos + 0, 7)
             builder.write_uint16(pos + 2, uint16)
         if uint32 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'uint32')
-            builder.write_int16(0, 8)
+            builder.write_int16(pos + 0, 8)
             builder.write_uint32(pos + 4, uint32)
         if uint64 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'uint64')
-            builder.write_int16(0, 9)
+            builder.write_int16(pos + 0, 9)
             builder.write_uint64(pos + 8, uint64)
         if float32 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'float32')
-            builder.write_int16(0, 10)
+            builder.write_int16(pos + 0, 10)
             builder.write_float32(pos + 4, float32)
         if float64 is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'float64')
-            builder.write_int16(0, 11)
+            builder.write_int16(pos + 0, 11)
             builder.write_float64(pos + 8, float64)
         if text is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'text')
-            builder.write_int16(0, 12)
+            builder.write_int16(pos + 0, 12)
             builder.alloc_text(pos + 16, text)
         if data is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'data')
-            builder.write_int16(0, 13)
+            builder.write_int16(pos + 0, 13)
             builder.alloc_data(pos + 16, data)
         if list is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'list')
-            builder.write_int16(0, 14)
+            builder.write_int16(pos + 0, 14)
             raise NotImplementedError('Unsupported field type: (name = "list", codeOrder = 14, discriminantValue = 14, slot = (offset = 0, type = (anyPointer = (unconstrained = (anyKind = void))), defaultValue = (anyPointer = ???), hadExplicitDefault = false), ordinal = (explicit = 14))')
         if enum is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'enum')
-            builder.write_int16(0, 15)
+            builder.write_int16(pos + 0, 15)
             builder.write_uint16(pos + 2, enum)
         if struct is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'struct')
-            builder.write_int16(0, 16)
+            builder.write_int16(pos + 0, 16)
             raise NotImplementedError('Unsupported field type: (name = "struct", codeOrder = 16, discriminantValue = 16, slot = (offset = 0, type = (anyPointer = (unconstrained = (anyKind = void))), defaultValue = (anyPointer = ???), hadExplicitDefault = false), ordinal = (explicit = 16))')
         if interface is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'interface')
-            builder.write_int16(0, 17)
+            builder.write_int16(pos + 0, 17)
         if anyPointer is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'anyPointer')
-            builder.write_int16(0, 18)
+            builder.write_int16(pos + 0, 18)
             raise NotImplementedError('Unsupported field type: (name = "anyPointer", codeOrder = 18, discriminantValue = 18, slot = (offset = 0, type = (anyPointer = (unconstrained = (anyKind = void))), defaultValue = (anyPointer = ???), hadExplicitDefault = false), ordinal = (explicit = 18))')
         return builder.as_string()
     
@@ -2791,6 +4195,190 @@ class Value(_Struct):
         buf = Value.__new(anyPointer=anyPointer, void=_undefined, bool=_undefined, int8=_undefined, int16=_undefined, int32=_undefined, int64=_undefined, uint8=_undefined, uint16=_undefined, uint32=_undefined, uint64=_undefined, float32=_undefined, float64=_undefined, text=_undefined, data=_undefined, list=_undefined, enum=_undefined, struct=_undefined, interface=_undefined)
         return cls.from_buffer(buf, 0, 2, 1)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        anonymous__curtag = None
+        _v_void = _d.get('void', _undefined)
+        if _v_void is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'void')
+            builder.write_int16(pos + 0, 0)
+        _v_bool = _d.get('bool', _undefined)
+        if _v_bool is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'bool')
+            builder.write_int16(pos + 0, 1)
+            builder.write_bool(pos + 2, 0, _v_bool)
+        _v_int8 = _d.get('int8', _undefined)
+        if _v_int8 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'int8')
+            builder.write_int16(pos + 0, 2)
+            builder.write_int8(pos + 2, _v_int8)
+        _v_int16 = _d.get('int16', _undefined)
+        if _v_int16 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'int16')
+            builder.write_int16(pos + 0, 3)
+            builder.write_int16(pos + 2, _v_int16)
+        _v_int32 = _d.get('int32', _undefined)
+        if _v_int32 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'int32')
+            builder.write_int16(pos + 0, 4)
+            builder.write_int32(pos + 4, _v_int32)
+        _v_int64 = _d.get('int64', _undefined)
+        if _v_int64 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'int64')
+            builder.write_int16(pos + 0, 5)
+            builder.write_int64(pos + 8, _v_int64)
+        _v_uint8 = _d.get('uint8', _undefined)
+        if _v_uint8 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'uint8')
+            builder.write_int16(pos + 0, 6)
+            builder.write_uint8(pos + 2, _v_uint8)
+        _v_uint16 = _d.get('uint16', _undefined)
+        if _v_uint16 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'uint16')
+            builder.write_int16(pos + 0, 7)
+            builder.write_uint16(pos + 2, _v_uint16)
+        _v_uint32 = _d.get('uint32', _undefined)
+        if _v_uint32 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'uint32')
+            builder.write_int16(pos + 0, 8)
+            builder.write_uint32(pos + 4, _v_uint32)
+        _v_uint64 = _d.get('uint64', _undefined)
+        if _v_uint64 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'uint64')
+            builder.write_int16(pos + 0, 9)
+            builder.write_uint64(pos + 8, _v_uint64)
+        _v_float32 = _d.get('float32', _undefined)
+        if _v_float32 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'float32')
+            builder.write_int16(pos + 0, 10)
+            builder.write_float32(pos + 4, _v_float32)
+        _v_float64 = _d.get('float64', _undefined)
+        if _v_float64 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'float64')
+            builder.write_int16(pos + 0, 11)
+            builder.write_float64(pos + 8, _v_float64)
+        _v_text = _d.get('text', _undefined)
+        if _v_text is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'text')
+            builder.write_int16(pos + 0, 12)
+            builder.alloc_text(pos + 16, _v_text)
+        _v_data = _d.get('data', _undefined)
+        if _v_data is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'data')
+            builder.write_int16(pos + 0, 13)
+            builder.alloc_data(pos + 16, _v_data)
+        _v_enum = _d.get('enum', _undefined)
+        if _v_enum is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'enum')
+            builder.write_int16(pos + 0, 15)
+            builder.write_uint16(pos + 2, _v_enum)
+        _v_interface = _d.get('interface', _undefined)
+        if _v_interface is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'interface')
+            builder.write_int16(pos + 0, 17)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        anonymous__curtag = None
+        _v_void = _d.get('void', _undefined)
+        if _v_void is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'void')
+            builder.write_int16(pos + 0, 0)
+        _v_bool = _d.get('bool', _undefined)
+        if _v_bool is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'bool')
+            builder.write_int16(pos + 0, 1)
+            builder.write_bool(pos + 2, 0, _v_bool)
+        _v_int8 = _d.get('int8', _undefined)
+        if _v_int8 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'int8')
+            builder.write_int16(pos + 0, 2)
+            _v_int8 = int(_v_int8)
+            builder.write_int8(pos + 2, _v_int8)
+        _v_int16 = _d.get('int16', _undefined)
+        if _v_int16 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'int16')
+            builder.write_int16(pos + 0, 3)
+            _v_int16 = int(_v_int16)
+            builder.write_int16(pos + 2, _v_int16)
+        _v_int32 = _d.get('int32', _undefined)
+        if _v_int32 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'int32')
+            builder.write_int16(pos + 0, 4)
+            _v_int32 = int(_v_int32)
+            builder.write_int32(pos + 4, _v_int32)
+        _v_int64 = _d.get('int64', _undefined)
+        if _v_int64 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'int64')
+            builder.write_int16(pos + 0, 5)
+            _v_int64 = int(_v_int64)
+            builder.write_int64(pos + 8, _v_int64)
+        _v_uint8 = _d.get('uint8', _undefined)
+        if _v_uint8 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'uint8')
+            builder.write_int16(pos + 0, 6)
+            _v_uint8 = int(_v_uint8)
+            builder.write_uint8(pos + 2, _v_uint8)
+        _v_uint16 = _d.get('uint16', _undefined)
+        if _v_uint16 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'uint16')
+            builder.write_int16(pos + 0, 7)
+            _v_uint16 = int(_v_uint16)
+            builder.write_uint16(pos + 2, _v_uint16)
+        _v_uint32 = _d.get('uint32', _undefined)
+        if _v_uint32 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'uint32')
+            builder.write_int16(pos + 0, 8)
+            _v_uint32 = int(_v_uint32)
+            builder.write_uint32(pos + 4, _v_uint32)
+        _v_uint64 = _d.get('uint64', _undefined)
+        if _v_uint64 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'uint64')
+            builder.write_int16(pos + 0, 9)
+            _v_uint64 = int(_v_uint64)
+            builder.write_uint64(pos + 8, _v_uint64)
+        _v_float32 = _d.get('float32', _undefined)
+        if _v_float32 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'float32')
+            builder.write_int16(pos + 0, 10)
+            _v_float32 = float(_v_float32)
+            builder.write_float32(pos + 4, _v_float32)
+        _v_float64 = _d.get('float64', _undefined)
+        if _v_float64 is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'float64')
+            builder.write_int16(pos + 0, 11)
+            _v_float64 = float(_v_float64)
+            builder.write_float64(pos + 8, _v_float64)
+        _v_text = _d.get('text', _undefined)
+        if _v_text is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'text')
+            builder.write_int16(pos + 0, 12)
+            _v_text = _json_load_text(_v_text)
+            builder.alloc_text(pos + 16, _v_text)
+        _v_data = _d.get('data', _undefined)
+        if _v_data is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'data')
+            builder.write_int16(pos + 0, 13)
+            _v_data = _json_load_data(_v_data)
+            builder.alloc_data(pos + 16, _v_data)
+        _v_enum = _d.get('enum', _undefined)
+        if _v_enum is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'enum')
+            builder.write_int16(pos + 0, 15)
+            _v_enum = int(_v_enum)
+            builder.write_uint16(pos + 2, _v_enum)
+        _v_interface = _d.get('interface', _undefined)
+        if _v_interface is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'interface')
+            builder.write_int16(pos + 0, 17)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(24)
+        Value._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 2, 1)
+    
     def shortrepr(self):
         parts = []
         if self.is_void(): parts.append("void = %s" % "void")
@@ -2823,6 +4411,68 @@ class Value(_Struct):
                                   not False):
             parts.append("anyPointer = %s" % "???")
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        tag = self.__which__()
+        if tag == 0:
+            d['void'] = None
+        if tag == 1:
+            d['bool'] = self._read_bit(2, 1)
+        if tag == 2:
+            d['int8'] = self._read_primitive(2, ord(b'b'))
+        if tag == 3:
+            d['int16'] = self._read_primitive(2, ord(b'h'))
+        if tag == 4:
+            d['int32'] = self._read_primitive(4, ord(b'i'))
+        if tag == 5:
+            d['int64'] = self._read_primitive(8, ord(b'q'))
+        if tag == 6:
+            d['uint8'] = self._read_primitive(2, ord(b'B'))
+        if tag == 7:
+            d['uint16'] = self._read_primitive(2, ord(b'H'))
+        if tag == 8:
+            d['uint32'] = self._read_primitive(4, ord(b'I'))
+        if tag == 9:
+            d['uint64'] = self._read_primitive(8, ord(b'Q'))
+        if tag == 10:
+            d['float32'] = self._read_primitive(4, ord(b'f'))
+        if tag == 11:
+            d['float64'] = self._read_primitive(8, ord(b'd'))
+        if tag == 12:
+            d['text'] = self.text
+        if tag == 13:
+            d['data'] = self.data
+        if tag == 15:
+            d['enum'] = self._read_primitive(2, ord(b'H'))
+        if tag == 17:
+            d['interface'] = None
+        return d
+    def _to_json(self):
+        parts = []
+        if self.is_void(): parts.append('"void":null')
+        if self.is_bool(): parts.append('"bool":' + ('true' if self._read_bit(2, 1) else 'false'))
+        if self.is_int8(): parts.append('"int8":%d' % self._read_primitive(2, ord(b'b')))
+        if self.is_int16(): parts.append('"int16":%d' % self._read_primitive(2, ord(b'h')))
+        if self.is_int32(): parts.append('"int32":%d' % self._read_primitive(4, ord(b'i')))
+        if self.is_int64(): parts.append('"int64":"%d"' % self._read_primitive(8, ord(b'q')))
+        if self.is_uint8(): parts.append('"uint8":%d' % self._read_primitive(2, ord(b'B')))
+        if self.is_uint16(): parts.append('"uint16":%d' % self._read_primitive(2, ord(b'H')))
+        if self.is_uint32(): parts.append('"uint32":%d' % self._read_primitive(4, ord(b'I')))
+        if self.is_uint64(): parts.append('"uint64":"%d"' % self._read_primitive(8, ord(b'Q')))
+        if self.is_float32(): parts.append('"float32":' + _json_dump_float32(self.float32))
+        if self.is_float64(): parts.append('"float64":' + _json_dump_float64(self.float64))
+        if self.is_text():
+            if self.has_text(): parts.append('"text":' + _json_dump_text(self.text))
+            else: parts.append('"text":null')
+        if self.is_data():
+            if self.has_data(): parts.append('"data":' + _json_dump_data(self.data))
+            else: parts.append('"data":null')
+        if self.is_enum(): parts.append('"enum":%d' % self._read_primitive(2, ord(b'H')))
+        if self.is_interface(): parts.append('"interface":null')
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        return None
 
 _Value_list_item_type = _StructItemType(Value)
 
@@ -2831,6 +4481,7 @@ class Annotation(_Struct):
     __capnpy_id__ = 0xf1c8950dab257542
     __static_data_size__ = 1
     __static_ptrs_size__ = 2
+    __data_fields__ = (('id', 0, 'Q', 0),)
     
     
     @property
@@ -2893,7 +4544,7 @@ class Annotation(_Struct):
     
     @staticmethod
     def __new(id=0, value=None, brand=None):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(24)
         pos = builder.allocate(24)
         builder.write_uint64(pos + 0, id)
         builder.copy_from_struct(pos + 8, Value, value)
@@ -2904,12 +4555,65 @@ class Annotation(_Struct):
         _buf = Annotation.__new(id, value, brand)
         self._init_from_buffer(_buf, 0, 1, 2)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        _v_id = _d.get('id', 0)
+        builder.write_uint64(pos + 0, _v_id)
+        _v_value = _d.get('value', None)
+        if isinstance(_v_value, dict):
+            Value._write_dict(builder, builder.alloc_struct(pos + 8, 2, 1), _v_value)
+        else:
+            builder.copy_from_struct(pos + 8, Value, _v_value)
+        _v_brand = _d.get('brand', None)
+        if isinstance(_v_brand, dict):
+            Brand._write_dict(builder, builder.alloc_struct(pos + 16, 0, 1), _v_brand)
+        else:
+            builder.copy_from_struct(pos + 16, Brand, _v_brand)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        _v_id = _d.get('id', 0)
+        _v_id = int(_v_id)
+        builder.write_uint64(pos + 0, _v_id)
+        _v_value = _d.get('value', None)
+        if _v_value is not None:
+            Value._write_json(builder, builder.alloc_struct(pos + 8, 2, 1), _v_value)
+        _v_brand = _d.get('brand', None)
+        if _v_brand is not None:
+            Brand._write_json(builder, builder.alloc_struct(pos + 16, 0, 1), _v_brand)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(24)
+        Annotation._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 1, 2)
+    
     def shortrepr(self):
         parts = []
         parts.append("id = %s" % self.id)
         if self.has_value(): parts.append("value = %s" % self.get_value().shortrepr())
         if self.has_brand(): parts.append("brand = %s" % self.get_brand().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['id'] = self._read_primitive(0, ord(b'Q'))
+        value = self.value
+        d['value'] = None if value is None else value.to_dict()
+        value = self.brand
+        d['brand'] = None if value is None else value.to_dict()
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"id":"%d"' % self._read_primitive(0, ord(b'Q')))
+        if self.has_value(): parts.append('"value":' + self.value._to_json())
+        if self.has_brand(): parts.append('"brand":' + self.brand._to_json())
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'value': return Value
+        if name == 'brand': return Brand
+        return None
 
 _Annotation_list_item_type = _StructItemType(Annotation)
 
@@ -2918,6 +4622,7 @@ class Brand_Scope(_Struct):
     __capnpy_id__ = 0xabd73485a9636bc9
     __static_data_size__ = 2
     __static_ptrs_size__ = 1
+    __data_fields__ = (('scopeId', 0, 'Q', 0),)
     
     
     __tag__ = Brand_Scope__tag__
@@ -2958,17 +4663,17 @@ class Brand_Scope(_Struct):
     
     @staticmethod
     def __new(scopeId=0, bind=_undefined, inherit=_undefined):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(24)
         pos = builder.allocate(24)
         anonymous__curtag = None
         builder.write_uint64(pos + 0, scopeId)
         if bind is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'bind')
-            builder.write_int16(8, 0)
+            builder.write_int16(pos + 8, 0)
             builder.copy_from_list(pos + 16, _Brand_Binding_list_item_type, bind)
         if inherit is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'inherit')
-            builder.write_int16(8, 1)
+            builder.write_int16(pos + 8, 1)
         return builder.as_string()
     
     def __init__(self, scopeId=0, bind=_undefined, inherit=_undefined):
@@ -2985,6 +4690,44 @@ class Brand_Scope(_Struct):
         buf = Brand_Scope.__new(scopeId=scopeId, inherit=inherit, bind=_undefined)
         return cls.from_buffer(buf, 0, 2, 1)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        anonymous__curtag = None
+        _v_scopeId = _d.get('scopeId', 0)
+        builder.write_uint64(pos + 0, _v_scopeId)
+        _v_bind = _d.get('bind', _undefined)
+        if _v_bind is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'bind')
+            builder.write_int16(pos + 8, 0)
+            builder.copy_from_list(pos + 16, _Brand_Binding_list_item_type, _v_bind)
+        _v_inherit = _d.get('inherit', _undefined)
+        if _v_inherit is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'inherit')
+            builder.write_int16(pos + 8, 1)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        anonymous__curtag = None
+        _v_scopeId = _d.get('scopeId', 0)
+        _v_scopeId = int(_v_scopeId)
+        builder.write_uint64(pos + 0, _v_scopeId)
+        _v_bind = _d.get('bind', _undefined)
+        if _v_bind is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'bind')
+            builder.write_int16(pos + 8, 0)
+            _json_copy_list(builder, pos + 16, _Brand_Binding_list_item_type, _v_bind)
+        _v_inherit = _d.get('inherit', _undefined)
+        if _v_inherit is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'inherit')
+            builder.write_int16(pos + 8, 1)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(24)
+        Brand_Scope._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 2, 1)
+    
     def shortrepr(self):
         parts = []
         parts.append("scopeId = %s" % self.scopeId)
@@ -2993,6 +4736,28 @@ class Brand_Scope(_Struct):
             parts.append("bind = %s" % self.get_bind().shortrepr())
         if self.is_inherit(): parts.append("inherit = %s" % "void")
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        tag = self.__which__()
+        d['scopeId'] = self._read_primitive(0, ord(b'Q'))
+        if tag == 0:
+            value = self.bind
+            d['bind'] = None if value is None else value.to_list()
+        if tag == 1:
+            d['inherit'] = None
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"scopeId":"%d"' % self._read_primitive(0, ord(b'Q')))
+        if self.is_bind():
+            if self.has_bind(): parts.append('"bind":' + _json_dump_list(self.bind))
+            else: parts.append('"bind":null')
+        if self.is_inherit(): parts.append('"inherit":null')
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'bind': return _Brand_Binding_list_item_type
+        return None
 
 _Brand_Scope_list_item_type = _StructItemType(Brand_Scope)
 
@@ -3001,6 +4766,7 @@ class Brand_Binding(_Struct):
     __capnpy_id__ = 0xc863cd16969ee7fc
     __static_data_size__ = 1
     __static_ptrs_size__ = 1
+    __data_fields__ = ()
     
     
     __tag__ = Brand_Binding__tag__
@@ -3043,15 +4809,15 @@ class Brand_Binding(_Struct):
     
     @staticmethod
     def __new(unbound=_undefined, type=_undefined):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(16)
         pos = builder.allocate(16)
         anonymous__curtag = None
         if unbound is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'unbound')
-            builder.write_int16(0, 0)
+            builder.write_int16(pos + 0, 0)
         if type is not _undefined:
             anonymous__curtag = _check_tag(anonymous__curtag, 'type')
-            builder.write_int16(0, 1)
+            builder.write_int16(pos + 0, 1)
             builder.copy_from_struct(pos + 8, Type, type)
         return builder.as_string()
     
@@ -3069,6 +4835,43 @@ class Brand_Binding(_Struct):
         buf = Brand_Binding.__new(type=type, unbound=_undefined)
         return cls.from_buffer(buf, 0, 1, 1)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        anonymous__curtag = None
+        _v_unbound = _d.get('unbound', _undefined)
+        if _v_unbound is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'unbound')
+            builder.write_int16(pos + 0, 0)
+        _v_type = _d.get('type', _undefined)
+        if _v_type is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'type')
+            builder.write_int16(pos + 0, 1)
+            if isinstance(_v_type, dict):
+                Type._write_dict(builder, builder.alloc_struct(pos + 8, 3, 1), _v_type)
+            else:
+                builder.copy_from_struct(pos + 8, Type, _v_type)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        anonymous__curtag = None
+        _v_unbound = _d.get('unbound', _undefined)
+        if _v_unbound is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'unbound')
+            builder.write_int16(pos + 0, 0)
+        _v_type = _d.get('type', _undefined)
+        if _v_type is not _undefined:
+            anonymous__curtag = _check_tag(anonymous__curtag, 'type')
+            builder.write_int16(pos + 0, 1)
+            if _v_type is not None:
+                Type._write_json(builder, builder.alloc_struct(pos + 8, 3, 1), _v_type)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(16)
+        Brand_Binding._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 1, 1)
+    
     def shortrepr(self):
         parts = []
         if self.is_unbound(): parts.append("unbound = %s" % "void")
@@ -3076,6 +4879,26 @@ class Brand_Binding(_Struct):
                                   not False):
             parts.append("type = %s" % self.get_type().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        tag = self.__which__()
+        if tag == 0:
+            d['unbound'] = None
+        if tag == 1:
+            value = self.type
+            d['type'] = None if value is None else value.to_dict()
+        return d
+    def _to_json(self):
+        parts = []
+        if self.is_unbound(): parts.append('"unbound":null')
+        if self.is_type():
+            if self.has_type(): parts.append('"type":' + self.type._to_json())
+            else: parts.append('"type":null')
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'type': return Type
+        return None
 
 _Brand_Binding_list_item_type = _StructItemType(Brand_Binding)
 
@@ -3084,6 +4907,7 @@ class Brand(_Struct):
     __capnpy_id__ = 0x903455f06065422b
     __static_data_size__ = 0
     __static_ptrs_size__ = 1
+    __data_fields__ = ()
     
     Scope = Brand_Scope
     Binding = Brand_Binding
@@ -3105,7 +4929,7 @@ class Brand(_Struct):
     
     @staticmethod
     def __new(scopes=None):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(8 + _size_hint(scopes, 24))
         pos = builder.allocate(8)
         builder.copy_from_list(pos + 0, _Brand_Scope_list_item_type, scopes)
         return builder.as_string()
@@ -3114,10 +4938,40 @@ class Brand(_Struct):
         _buf = Brand.__new(scopes)
         self._init_from_buffer(_buf, 0, 0, 1)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        _v_scopes = _d.get('scopes', None)
+        builder.copy_from_list(pos + 0, _Brand_Scope_list_item_type, _v_scopes)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        _v_scopes = _d.get('scopes', None)
+        _json_copy_list(builder, pos + 0, _Brand_Scope_list_item_type, _v_scopes)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(8)
+        Brand._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 0, 1)
+    
     def shortrepr(self):
         parts = []
         if self.has_scopes(): parts.append("scopes = %s" % self.get_scopes().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        value = self.scopes
+        d['scopes'] = None if value is None else value.to_list()
+        return d
+    def _to_json(self):
+        parts = []
+        if self.has_scopes(): parts.append('"scopes":' + _json_dump_list(self.scopes))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'scopes': return _Brand_Scope_list_item_type
+        return None
 
 _Brand_list_item_type = _StructItemType(Brand)
 
@@ -3126,6 +4980,7 @@ class CapnpVersion(_Struct):
     __capnpy_id__ = 0xd85d305b7d839963
     __static_data_size__ = 1
     __static_ptrs_size__ = 0
+    __data_fields__ = (('major', 0, 'H', 0), ('minor', 2, 'B', 0), ('micro', 3, 'B', 0))
     
     
     @property
@@ -3154,7 +5009,7 @@ class CapnpVersion(_Struct):
     
     @staticmethod
     def __new(major=0, minor=0, micro=0):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(8)
         pos = builder.allocate(8)
         builder.write_uint16(pos + 0, major)
         builder.write_uint8(pos + 2, minor)
@@ -3165,12 +5020,55 @@ class CapnpVersion(_Struct):
         _buf = CapnpVersion.__new(major, minor, micro)
         self._init_from_buffer(_buf, 0, 1, 0)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        _v_major = _d.get('major', 0)
+        builder.write_uint16(pos + 0, _v_major)
+        _v_minor = _d.get('minor', 0)
+        builder.write_uint8(pos + 2, _v_minor)
+        _v_micro = _d.get('micro', 0)
+        builder.write_uint8(pos + 3, _v_micro)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        _v_major = _d.get('major', 0)
+        _v_major = int(_v_major)
+        builder.write_uint16(pos + 0, _v_major)
+        _v_minor = _d.get('minor', 0)
+        _v_minor = int(_v_minor)
+        builder.write_uint8(pos + 2, _v_minor)
+        _v_micro = _d.get('micro', 0)
+        _v_micro = int(_v_micro)
+        builder.write_uint8(pos + 3, _v_micro)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(8)
+        CapnpVersion._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 1, 0)
+    
     def shortrepr(self):
         parts = []
         parts.append("major = %s" % self.major)
         parts.append("minor = %s" % self.minor)
         parts.append("micro = %s" % self.micro)
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['major'] = self._read_primitive(0, ord(b'H'))
+        d['minor'] = self._read_primitive(2, ord(b'B'))
+        d['micro'] = self._read_primitive(3, ord(b'B'))
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"major":%d' % self._read_primitive(0, ord(b'H')))
+        parts.append('"minor":%d' % self._read_primitive(2, ord(b'B')))
+        parts.append('"micro":%d' % self._read_primitive(3, ord(b'B')))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        return None
 
 _CapnpVersion_list_item_type = _StructItemType(CapnpVersion)
 
@@ -3179,6 +5077,7 @@ class CodeGeneratorRequest_RequestedFile_Import(_Struct):
     __capnpy_id__ = 0xae504193122357e5
     __static_data_size__ = 1
     __static_ptrs_size__ = 1
+    __data_fields__ = (('id', 0, 'Q', 0),)
     
     
     @property
@@ -3203,7 +5102,7 @@ class CodeGeneratorRequest_RequestedFile_Import(_Struct):
     
     @staticmethod
     def __new(id=0, name=None):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(16 + _size_hint(name, 1))
         pos = builder.allocate(16)
         builder.write_uint64(pos + 0, id)
         builder.alloc_text(pos + 8, name)
@@ -3213,11 +5112,47 @@ class CodeGeneratorRequest_RequestedFile_Import(_Struct):
         _buf = CodeGeneratorRequest_RequestedFile_Import.__new(id, name)
         self._init_from_buffer(_buf, 0, 1, 1)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        _v_id = _d.get('id', 0)
+        builder.write_uint64(pos + 0, _v_id)
+        _v_name = _d.get('name', None)
+        builder.alloc_text(pos + 8, _v_name)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        _v_id = _d.get('id', 0)
+        _v_id = int(_v_id)
+        builder.write_uint64(pos + 0, _v_id)
+        _v_name = _d.get('name', None)
+        _v_name = _json_load_text(_v_name)
+        builder.alloc_text(pos + 8, _v_name)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(16)
+        CodeGeneratorRequest_RequestedFile_Import._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 1, 1)
+    
     def shortrepr(self):
         parts = []
         parts.append("id = %s" % self.id)
         if self.has_name(): parts.append("name = %s" % _text_bytes_repr(self.get_name()))
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['id'] = self._read_primitive(0, ord(b'Q'))
+        d['name'] = self.name
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"id":"%d"' % self._read_primitive(0, ord(b'Q')))
+        if self.has_name(): parts.append('"name":' + _json_dump_text(self.name))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        return None
 
 _CodeGeneratorRequest_RequestedFile_Import_list_item_type = _StructItemType(CodeGeneratorRequest_RequestedFile_Import)
 
@@ -3226,6 +5161,7 @@ class CodeGeneratorRequest_RequestedFile(_Struct):
     __capnpy_id__ = 0xcfea0eb02e810062
     __static_data_size__ = 1
     __static_ptrs_size__ = 2
+    __data_fields__ = (('id', 0, 'Q', 0),)
     
     Import = CodeGeneratorRequest_RequestedFile_Import
     
@@ -3266,7 +5202,7 @@ class CodeGeneratorRequest_RequestedFile(_Struct):
     
     @staticmethod
     def __new(id=0, filename=None, imports=None):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(24 + _size_hint(filename, 1) + _size_hint(imports, 16))
         pos = builder.allocate(24)
         builder.write_uint64(pos + 0, id)
         builder.alloc_text(pos + 8, filename)
@@ -3277,12 +5213,56 @@ class CodeGeneratorRequest_RequestedFile(_Struct):
         _buf = CodeGeneratorRequest_RequestedFile.__new(id, filename, imports)
         self._init_from_buffer(_buf, 0, 1, 2)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        _v_id = _d.get('id', 0)
+        builder.write_uint64(pos + 0, _v_id)
+        _v_filename = _d.get('filename', None)
+        builder.alloc_text(pos + 8, _v_filename)
+        _v_imports = _d.get('imports', None)
+        builder.copy_from_list(pos + 16, _CodeGeneratorRequest_RequestedFile_Import_list_item_type, _v_imports)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        _v_id = _d.get('id', 0)
+        _v_id = int(_v_id)
+        builder.write_uint64(pos + 0, _v_id)
+        _v_filename = _d.get('filename', None)
+        _v_filename = _json_load_text(_v_filename)
+        builder.alloc_text(pos + 8, _v_filename)
+        _v_imports = _d.get('imports', None)
+        _json_copy_list(builder, pos + 16, _CodeGeneratorRequest_RequestedFile_Import_list_item_type, _v_imports)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(24)
+        CodeGeneratorRequest_RequestedFile._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 1, 2)
+    
     def shortrepr(self):
         parts = []
         parts.append("id = %s" % self.id)
         if self.has_filename(): parts.append("filename = %s" % _text_bytes_repr(self.get_filename()))
         if self.has_imports(): parts.append("imports = %s" % self.get_imports().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        d['id'] = self._read_primitive(0, ord(b'Q'))
+        d['filename'] = self.filename
+        value = self.imports
+        d['imports'] = None if value is None else value.to_list()
+        return d
+    def _to_json(self):
+        parts = []
+        parts.append('"id":"%d"' % self._read_primitive(0, ord(b'Q')))
+        if self.has_filename(): parts.append('"filename":' + _json_dump_text(self.filename))
+        if self.has_imports(): parts.append('"imports":' + _json_dump_list(self.imports))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'imports': return _CodeGeneratorRequest_RequestedFile_Import_list_item_type
+        return None
 
 _CodeGeneratorRequest_RequestedFile_list_item_type = _StructItemType(CodeGeneratorRequest_RequestedFile)
 
@@ -3291,6 +5271,7 @@ class CodeGeneratorRequest(_Struct):
     __capnpy_id__ = 0xbfc546f6210ad7ce
     __static_data_size__ = 0
     __static_ptrs_size__ = 4
+    __data_fields__ = ()
     
     RequestedFile = CodeGeneratorRequest_RequestedFile
     
@@ -3366,7 +5347,7 @@ class CodeGeneratorRequest(_Struct):
     
     @staticmethod
     def __new(nodes=None, requestedFiles=None, capnpVersion=None, sourceInfo=None):
-        builder = _SegmentBuilder()
+        builder = _SegmentBuilder(32 + _size_hint(nodes, 88) + _size_hint(requestedFiles, 24) + _size_hint(sourceInfo, 24))
         pos = builder.allocate(32)
         builder.copy_from_list(pos + 0, _Node_list_item_type, nodes)
         builder.copy_from_list(pos + 8, _CodeGeneratorRequest_RequestedFile_list_item_type, requestedFiles)
@@ -3378,6 +5359,39 @@ class CodeGeneratorRequest(_Struct):
         _buf = CodeGeneratorRequest.__new(nodes, requestedFiles, capnpVersion, sourceInfo)
         self._init_from_buffer(_buf, 0, 0, 4)
     
+    @staticmethod
+    def _write_dict(builder, pos, _d):
+        _v_nodes = _d.get('nodes', None)
+        builder.copy_from_list(pos + 0, _Node_list_item_type, _v_nodes)
+        _v_requestedFiles = _d.get('requestedFiles', None)
+        builder.copy_from_list(pos + 8, _CodeGeneratorRequest_RequestedFile_list_item_type, _v_requestedFiles)
+        _v_capnpVersion = _d.get('capnpVersion', None)
+        if isinstance(_v_capnpVersion, dict):
+            CapnpVersion._write_dict(builder, builder.alloc_struct(pos + 16, 1, 0), _v_capnpVersion)
+        else:
+            builder.copy_from_struct(pos + 16, CapnpVersion, _v_capnpVersion)
+        _v_sourceInfo = _d.get('sourceInfo', None)
+        builder.copy_from_list(pos + 24, _Node_SourceInfo_list_item_type, _v_sourceInfo)
+    
+    @staticmethod
+    def _write_json(builder, pos, _d):
+        _v_nodes = _d.get('nodes', None)
+        _json_copy_list(builder, pos + 0, _Node_list_item_type, _v_nodes)
+        _v_requestedFiles = _d.get('requestedFiles', None)
+        _json_copy_list(builder, pos + 8, _CodeGeneratorRequest_RequestedFile_list_item_type, _v_requestedFiles)
+        _v_capnpVersion = _d.get('capnpVersion', None)
+        if _v_capnpVersion is not None:
+            CapnpVersion._write_json(builder, builder.alloc_struct(pos + 16, 1, 0), _v_capnpVersion)
+        _v_sourceInfo = _d.get('sourceInfo', None)
+        _json_copy_list(builder, pos + 24, _Node_SourceInfo_list_item_type, _v_sourceInfo)
+    
+    @classmethod
+    def from_dict(cls, d):
+        builder = _SegmentBuilder()
+        pos = builder.allocate(32)
+        CodeGeneratorRequest._write_dict(builder, pos, d)
+        return cls.from_buffer(builder.as_string(), 0, 0, 4)
+    
     def shortrepr(self):
         parts = []
         if self.has_nodes(): parts.append("nodes = %s" % self.get_nodes().shortrepr())
@@ -3385,6 +5399,31 @@ class CodeGeneratorRequest(_Struct):
         if self.has_capnpVersion(): parts.append("capnpVersion = %s" % self.get_capnpVersion().shortrepr())
         if self.has_sourceInfo(): parts.append("sourceInfo = %s" % self.get_sourceInfo().shortrepr())
         return "(%s)" % ", ".join(parts)
+    def to_dict(self):
+        d = {}
+        value = self.nodes
+        d['nodes'] = None if value is None else value.to_list()
+        value = self.requestedFiles
+        d['requestedFiles'] = None if value is None else value.to_list()
+        value = self.capnpVersion
+        d['capnpVersion'] = None if value is None else value.to_dict()
+        value = self.sourceInfo
+        d['sourceInfo'] = None if value is None else value.to_list()
+        return d
+    def _to_json(self):
+        parts = []
+        if self.has_nodes(): parts.append('"nodes":' + _json_dump_list(self.nodes))
+        if self.has_requestedFiles(): parts.append('"requestedFiles":' + _json_dump_list(self.requestedFiles))
+        if self.has_capnpVersion(): parts.append('"capnpVersion":' + self.capnpVersion._to_json())
+        if self.has_sourceInfo(): parts.append('"sourceInfo":' + _json_dump_list(self.sourceInfo))
+        return '{%s}' % ','.join(parts)
+    @staticmethod
+    def _builder_type(name):
+        if name == 'nodes': return _Node_list_item_type
+        if name == 'requestedFiles': return _CodeGeneratorRequest_RequestedFile_list_item_type
+        if name == 'capnpVersion': return CapnpVersion
+        if name == 'sourceInfo': return _Node_SourceInfo_list_item_type
+        return None
 
 _CodeGeneratorRequest_list_item_type = _StructItemType(CodeGeneratorRequest)
 
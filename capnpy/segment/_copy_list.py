@@ -2,6 +2,7 @@
 Look at the docstring of _copy_pointer.py for an explanation of why we
 need fakecython/cython.compiled/etc.
 """
+import sys
 from pypytools import fakecython
 from six import PY3
 
@@ -11,14 +12,86 @@ with fakecython:
 if not cython.compiled:
     from capnpy import ptr
     from capnpy.segment.builder import SegmentBuilder
-    from capnpy.list import ItemType, StructItemType
+    from capnpy.list import List, ItemType, PrimitiveItemType, StructItemType
     if PY3: long = int
 
+# the kind of each format character of the buffer protocol: two formats of
+# the same kind and itemsize are binary-compatible, even if they are spelled
+# differently (e.g., numpy uses 'l' for int64 on 64 bit Linux)
+_FORMAT_KINDS = {}
+for _c in 'bhilqn':
+    _FORMAT_KINDS[_c] = 'i'
+for _c in 'BHILQN':
+    _FORMAT_KINDS[_c] = 'u'
+for _c in 'efd':
+    _FORMAT_KINDS[_c] = 'f'
+_FORMAT_KINDS['?'] = '?'
+
+
+@cython.cfunc
+@cython.locals(item_length=long)
+def _as_raw_buffer(lst, kind, item_length):
+    """
+    If lst is a one-dimensional contiguous buffer (e.g. an array.array, a
+    memoryview or a numpy array) whose items are of the given kind and size
+    and stored in little-endian order, return a memoryview over it, so that
+    it can be copied verbatim into the message. Else, return None.
+    """
+    if isinstance(lst, (list, tuple)):
+        return None
+    try:
+        mv = memoryview(lst)
+    except TypeError:
+        return None
+    fmt = mv.format
+    if fmt[:1] == '<':
+        fmt = fmt[1:]
+    elif fmt[:1] in ('>', '!'):
+        return None
+    else:
+        if fmt[:1] in ('@', '='):
+            fmt = fmt[1:]
+        if sys.byteorder != 'little':
+            return None
+    if (len(fmt) != 1 or _FORMAT_KINDS.get(fmt) != kind or
+        mv.ndim != 1 or mv.itemsize != item_length or
+        mv.strides != (item_length,)):
+        return None
+    return mv
+
+
+@cython.cfunc
+@cython.locals(builder=SegmentBuilder, pos=long, item_count=long, i=long,
+               cur=long)
+def _copy_bool_list(builder, pos, lst, item_count):
+    pos = builder.alloc_list(pos, ptr.LIST_SIZE_BIT, item_count,
+                             (item_count + 7) // 8)
+    mv = _as_raw_buffer(lst, '?', 1)
+    if mv is not None:
+        # iterate over the raw bytes instead of creating a bool object for
+        # each item
+        lst = bytearray(mv.tobytes())
+    i = 0
+    cur = 0
+    for item in lst:
+        if item:
+            cur |= 1 << (i & 7)
+        i += 1
+        if i & 7 == 0:
+            builder.write_uint8(pos, cur)
+            pos += 1
+            cur = 0
+    if i & 7 != 0:
+        builder.write_uint8(pos, cur)
+
+
 @cython.ccall
 @cython.locals(builder=SegmentBuilder, pos=long, item_type=ItemType,
                item_length=long, size_tag=long, item_count=long, body_length=long,
                struct_item_type=StructItemType,
-               data_size=long, ptrs_size=long, total_words=long, tag=long)
+               primitive_item_type=PrimitiveItemType,
+               data_size=long, ptrs_size=long, total_words=long, tag=long,
+               src=List)
 def copy_from_list(builder, pos, item_type, lst):
     if lst is None:
         builder.write_int64(pos, 0)
@@ -27,10 +100,24 @@ def copy_from_list(builder, pos, item_type, lst):
     item_length = item_type.item_length
     size_tag = item_type.size_tag
     item_count = len(lst)
+    if size_tag == ptr.LIST_SIZE_BIT:
+        _copy_bool_list(builder, pos, lst, item_count)
+        return
     body_length = item_length * item_count
     if size_tag == ptr.LIST_SIZE_COMPOSITE:
-        # alloc the list and write the tag
         struct_item_type = item_type
+        if (isinstance(lst, List) and
+            lst._item_type.get_type() is struct_item_type.structcls):
+            # fast path: lst is a capnpy list of the same type, e.g. built by
+            # list_from_columns(): copy it at once, instead of item by item
+            src = lst
+            total_words = src._item_count * src._item_length // 8
+            builder.copy_from_pointer(
+                pos, src._seg,
+                ptr.new_list(0, ptr.LIST_SIZE_COMPOSITE, total_words),
+                src._offset - 8)
+            return
+        # alloc the list and write the tag
         data_size = struct_item_type.static_data_size
         ptrs_size = struct_item_type.static_ptrs_size
         total_words = (data_size+ptrs_size) * item_count
@@ -42,6 +129,16 @@ def copy_from_list(builder, pos, item_type, lst):
     else:
         # alloc the list, no tag
         pos = builder.alloc_list(pos, size_tag, item_count, body_length)
+        if (ptr.LIST_SIZE_8 <= size_tag <= ptr.LIST_SIZE_64 and
+            not isinstance(lst, (list, tuple))):
+            # fast path: if lst is a buffer with the right layout, copy it
+            # with a single memcpy instead of item by item
+            primitive_item_type = item_type
+            mv = _as_raw_buffer(lst, _FORMAT_KINDS[chr(primitive_item_type.ifmt)],
+                                item_length)
+            if mv is not None:
+                builder.write_buffer(pos, mv)
+                return
     #
     for item in lst:
         item_type.write_item(builder, pos, item)
@@ -6,8 +6,7 @@ static PyObject* RAISE_OUT_OF_BOUNDS(Py_ssize_t, Py_ssize_t);
 #define CHECK_BOUNDS(src, size, offset)                                 \
     (Py_INCREF(Py_None), Py_None);                                      \
     {                                                                   \
-        /* _PyString_GET_SIZE is included from _util.h */               \
-        if ((offset)+(size) > (_PyString_GET_SIZE(src->buf))) {         \
+        if ((offset)+(size) > (src->buflen)) {                          \
             /* raise and return error */                                \
             return RAISE_OUT_OF_BOUNDS(size, offset);                   \
         }                                                               \
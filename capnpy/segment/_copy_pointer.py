@@ -63,49 +63,82 @@ if not cython.compiled:
 @cython.ccall
 ##@cython.returns(long)
 ##@cython.except_(-1)
-@cython.locals(src=BaseSegment, p=long, src_pos=long, dst=SegmentBuilder, dst_pos=long,
-               kind=long)
+@cython.locals(src=BaseSegment, p=long, src_pos=long, dst=SegmentBuilder, dst_pos=long)
 def copy_pointer(src, p, src_pos, dst, dst_pos):
     """
     Copy from: BaseSegment src, pointer p living at the src_pos offset
            to: SegmentBuilder dst at position dst_pos
+
+    Raise ValueError if the object is bigger than src.traversal_limit words
+    or nested more deeply than src.nesting_limit: this protects against
+    malicious messages, e.g. containing cycles. A negative limit means that
+    there is no limit, which is the case for the objects built locally.
     """
+    dst._traversal_left = src.traversal_limit
+    return _copy_pointer(src, p, src_pos, dst, dst_pos, src.nesting_limit)
+
+
+@cython.cfunc
+@cython.locals(src=BaseSegment, dst=SegmentBuilder, words=long)
+def _charge_traversal_limit(src, dst, words):
+    if src.traversal_limit < 0:
+        return
+    dst._traversal_left -= words
+    if dst._traversal_left < 0:
+        raise ValueError("Exceeded the traversal limit of %d words: the message "
+                         "is too big, corrupted or malicious" % src.traversal_limit)
+
+
+@cython.cfunc
+##@cython.returns(long)
+##@cython.except_(-1)
+@cython.locals(src=BaseSegment, p=long, src_pos=long, dst=SegmentBuilder, dst_pos=long,
+               depth=long, kind=long)
+def _copy_pointer(src, p, src_pos, dst, dst_pos, depth):
+    # depth is the number of nesting levels which we are still allowed to
+    # traverse. If there is no limit, it starts negative and never reaches 0
+    if depth == 0:
+        raise ValueError("Exceeded the nesting limit of %d: the message is "
+                         "corrupted or malicious" % src.nesting_limit)
     kind = ptr.kind(p)
     if kind == ptr.STRUCT:
-        return _copy_struct(src, p, src_pos, dst, dst_pos)
+        return _copy_struct(src, p, src_pos, dst, dst_pos, depth)
     elif kind == ptr.LIST:
         item_size = ptr.list_size_tag(p)
         if item_size == ptr.LIST_SIZE_COMPOSITE:
-            return _copy_list_composite(src, p, src_pos, dst, dst_pos)
+            return _copy_list_composite(src, p, src_pos, dst, dst_pos, depth)
         elif item_size == ptr.LIST_SIZE_PTR:
-            return _copy_list_ptr(src, p, src_pos, dst, dst_pos)
+            return _copy_list_ptr(src, p, src_pos, dst, dst_pos, depth)
         else:
             return _copy_list_primitive(src, p, src_pos, dst, dst_pos)
     elif kind == ptr.FAR:
         src_pos, p = src.read_far_ptr(src_pos)
-        return copy_pointer(src, p, src_pos, dst, dst_pos)
+        # we count far pointers as a nesting level, else a landing pad which
+        # points to itself would loop forever
+        return _copy_pointer(src, p, src_pos, dst, dst_pos, depth-1)
 
 
 @cython.cfunc
 ##@cython.returns(long)
 ##@cython.except_(-1)
 @cython.locals(n=long, src=BaseSegment, src_pos=long, dst=SegmentBuilder, dst_pos=long,
-               i=long, p=long, offset=long)
-def _copy_many_ptrs(n, src, src_pos, dst, dst_pos):
+               depth=long, i=long, p=long, offset=long)
+def _copy_many_ptrs(n, src, src_pos, dst, dst_pos, depth):
     check_bounds(src, n*8, src_pos)
     for i in range(n):
         offset = i*8
         p = read_int64_fast(src, src_pos + offset)
         if p != 0:
-            copy_pointer(src, p, src_pos + offset, dst, dst_pos + offset)
+            _copy_pointer(src, p, src_pos + offset, dst, dst_pos + offset,
+                          depth-1)
 
 
 @cython.cfunc
 ##@cython.returns(long)
 ##@cython.except_(-1)
 @cython.locals(src=BaseSegment, p=long, src_pos=long, dst=SegmentBuilder, dst_pos=long,
-               data_size=long, ptrs_size=long, ds=long)
-def _copy_struct(src, p, src_pos, dst, dst_pos):
+               depth=long, data_size=long, ptrs_size=long, ds=long)
+def _copy_struct(src, p, src_pos, dst, dst_pos, depth):
     src_pos = ptr.deref(p, src_pos)
     data_size = ptr.struct_data_size(p)
     ptrs_size = ptr.struct_ptrs_size(p)
@@ -113,19 +146,22 @@ def _copy_struct(src, p, src_pos, dst, dst_pos):
         # "empty" struct, no need to allocate
         dst.write_int64(dst_pos, ptr.new_struct(-1, 0, 0))
         return
+    _charge_traversal_limit(src, dst, data_size + ptrs_size)
     ds = data_size*8
     dst_pos = dst.alloc_struct(dst_pos, data_size, ptrs_size)
     check_bounds(src, ds, src_pos)
     dst.write_slice(dst_pos, src, src_pos, ds) # copy data section
-    _copy_many_ptrs(ptrs_size, src, src_pos+ds, dst, dst_pos+ds)
+    _copy_many_ptrs(ptrs_size, src, src_pos+ds, dst, dst_pos+ds, depth)
 
 
 @cython.cfunc
 ##@cython.returns(long)
 ##@cython.except_(-1)
 @cython.locals(src=BaseSegment, p=long, src_pos=long, dst=SegmentBuilder, dst_pos=long,
+               dst_data_size=long, dst_ptrs_size=long,
                data_size=long, ptrs_size=long, ds=long)
-def _copy_struct_inline(src, p, src_pos, dst, dst_pos):
+def _copy_struct_inline(src, p, src_pos, dst, dst_pos, dst_data_size,
+                        dst_ptrs_size):
     # this does the same as _copy_struct, but instead of allocating space for
     # it, it fills an already-allocated space (useful e.g. for writing structs
     # into lists).
@@ -139,13 +175,24 @@ def _copy_struct_inline(src, p, src_pos, dst, dst_pos):
     # it's because this causes GCC not to inline it? Anyway, the only solution
     # I found, was to duplicate some of the code :(
     #
+    # Like copy_pointer, this is an entry point: so we need to reset the
+    # traversal limit.
+    #
+    # The already-allocated space is dst_data_size+dst_ptrs_size words, which
+    # can be different than the size of the source struct, e.g. if it was
+    # written by a newer or older version of the schema: the fields which do
+    # not fit are dropped, and the missing ones are left zeroed.
     src_pos = ptr.deref(p, src_pos)
     data_size = ptr.struct_data_size(p)
     ptrs_size = ptr.struct_ptrs_size(p)
+    dst._traversal_left = src.traversal_limit
+    _charge_traversal_limit(src, dst, data_size + ptrs_size)
     ds = data_size*8
     check_bounds(src, ds, src_pos)
-    dst.write_slice(dst_pos, src, src_pos, ds) # copy data section
-    _copy_many_ptrs(ptrs_size, src, src_pos+ds, dst, dst_pos+ds)
+    # copy data section
+    dst.write_slice(dst_pos, src, src_pos, min(data_size, dst_data_size)*8)
+    _copy_many_ptrs(min(ptrs_size, dst_ptrs_size), src, src_pos+ds,
+                    dst, dst_pos+dst_data_size*8, src.nesting_limit)
 
 
 @cython.cfunc
@@ -163,6 +210,11 @@ def _copy_list_primitive(src, p, src_pos, dst, dst_pos):
     else:
         body_length = count * ptr.list_item_length(size_tag)
     #
+    if size_tag == ptr.LIST_SIZE_VOID:
+        # each void item counts as one word, else a huge list would be "free"
+        _charge_traversal_limit(src, dst, count)
+    else:
+        _charge_traversal_limit(src, dst, (body_length + 8 - 1) // 8)
     dst_pos = dst.alloc_list(dst_pos, size_tag, count, body_length)
     check_bounds(src, body_length, src_pos)
     dst.write_slice(dst_pos, src, src_pos, body_length)
@@ -172,24 +224,25 @@ def _copy_list_primitive(src, p, src_pos, dst, dst_pos):
 ##@cython.returns(long)
 ##@cython.except_(-1)
 @cython.locals(src=BaseSegment, p=long, src_pos=long, dst=SegmentBuilder, dst_pos=long,
-               count=long, body_length=long)
-def _copy_list_ptr(src, p, src_pos, dst, dst_pos):
+               depth=long, count=long, body_length=long)
+def _copy_list_ptr(src, p, src_pos, dst, dst_pos, depth):
     src_pos = ptr.deref(p, src_pos)
     count = ptr.list_item_count(p)
     body_length = count*8
+    _charge_traversal_limit(src, dst, count)
     dst_pos = dst.alloc_list(dst_pos, ptr.LIST_SIZE_PTR, count, body_length)
     check_bounds(src, body_length, src_pos)
-    _copy_many_ptrs(count, src, src_pos, dst, dst_pos)
+    _copy_many_ptrs(count, src, src_pos, dst, dst_pos, depth)
 
 
 @cython.cfunc
 ##@cython.returns(long)
 ##@cython.except_(-1)
 @cython.locals(src=BaseSegment, p=long, src_pos=long, dst=SegmentBuilder, dst_pos=long,
-               total_words=long, body_length=long,
+               depth=long, total_words=long, body_length=long,
                tag=long, count=long, data_size=long, ptrs_size=long,
                i=long, item_length=long, ptrs_section_offset=long)
-def _copy_list_composite(src, p, src_pos, dst, dst_pos):
+def _copy_list_composite(src, p, src_pos, dst, dst_pos, depth):
     src_pos = ptr.deref(p, src_pos)
     total_words = ptr.list_item_count(p) # n of words NOT including the tag
     body_length = (total_words+1)*8      # total length INCLUDING the tag
@@ -202,6 +255,10 @@ def _copy_list_composite(src, p, src_pos, dst, dst_pos):
     data_size = ptr.struct_data_size(tag)
     ptrs_size = ptr.struct_ptrs_size(tag)
     #
+    # each item counts as at least one word, else a huge list of empty
+    # structs would be "free"
+    _charge_traversal_limit(src, dst, max(total_words, count))
+    #
     # allocate the list and copy the whole body at once
     dst_pos = dst.alloc_list(dst_pos, ptr.LIST_SIZE_COMPOSITE, total_words, body_length)
     dst.write_slice(dst_pos, src, src_pos, body_length)
@@ -215,4 +272,5 @@ def _copy_list_composite(src, p, src_pos, dst, dst_pos):
         _copy_many_ptrs(ptrs_size, src,
                         src_pos + ptrs_section_offset,
                         dst,
-                        dst_pos + ptrs_section_offset)
+                        dst_pos + ptrs_section_offset,
+                        depth)
@@ -1,12 +1,18 @@
 cimport cython
 from libc.stdint cimport (int8_t, uint8_t, int16_t, uint16_t,
                           uint32_t, int32_t, int64_t, uint64_t)
+from cpython.buffer cimport Py_buffer
 
 cpdef uint32_t unpack_uint32(bytes buf, Py_ssize_t offset) except? 0xffffffff
 
 cdef class BaseSegment(object):
-    cdef readonly bytes buf
+    cdef readonly object buf
     cdef const char* cbuf
+    cdef Py_ssize_t buflen
+    cdef Py_buffer view   # used only if buf is not bytes
+    cdef readonly bint writable
+    cdef public long traversal_limit  # in words, see base.py
+    cdef public long nesting_limit
 
     cdef inline check_bounds(self, Py_ssize_t size, Py_ssize_t offset)
     cdef object read_primitive(self, Py_ssize_t offset, char ifmt)
@@ -21,4 +27,6 @@ cdef class BaseSegment(object):
     cdef uint8_t read_uint8(self, Py_ssize_t offset) except? 0xff
     cdef double read_double(self, Py_ssize_t offset) except? -1
     cdef float read_float(self, Py_ssize_t offset) except? -1
+    cdef bytes read_bytes(self, Py_ssize_t start, Py_ssize_t end)
+    cdef object write_primitive(self, Py_ssize_t offset, char ifmt, object value)
     cdef object dump_message(self, long p, Py_ssize_t start, Py_ssize_t end)
@@ -23,6 +23,23 @@ else:
     mychr = int2byte
 
 
+# limits which protect against corrupted or malicious messages. They are
+# enforced only on the segments of the messages which are loaded, e.g. by
+# capnpy.load() and capnpy.loads(): the objects built locally are trusted, and
+# their segments have no limits (represented as -1). They can be modified at
+# runtime, and they are used by all the messages loaded afterwards.
+#
+#   - TRAVERSAL_LIMIT is the maximum number of words which can be traversed
+#     when copying an object (e.g. by compact() or dumps()): the default is
+#     64 MB, like the C++ implementation
+#
+#   - NESTING_LIMIT is the maximum depth of the nested objects which can be
+#     traversed when copying an object or computing its end
+TRAVERSAL_LIMIT = 8*1024*1024
+NESTING_LIMIT = 64
+NO_LIMIT = -1
+
+
 def unpack_uint32(buf, offset):
     if offset < 0 or offset + 4 > len(buf):
         raise IndexError('Offset out of bounds: %d' % offset)
@@ -34,6 +51,10 @@ class BaseSegment(object):
     def __init__(self, buf):
         assert buf is not None
         self.buf = buf
+        self.writable = (not isinstance(buf, bytes) and
+                         not memoryview(buf).readonly)
+        self.traversal_limit = NO_LIMIT
+        self.nesting_limit = NO_LIMIT
 
     def read_primitive(self, offset, ifmt):
         fmt = b'<' + mychr(ifmt)
@@ -74,6 +95,31 @@ class BaseSegment(object):
     def read_float(self, offset):
         return self.read_primitive(offset, ord('f'))
 
+    def read_bytes(self, start, end):
+        if end < start:
+            # this happens e.g. if we read a Text of length 0, i.e. without
+            # even the trailing \0
+            end = start
+        if start < 0 or end > len(self.buf):
+            raise IndexError('Offset out of bounds: %d' % end)
+        s = self.buf[start:end]
+        if isinstance(s, memoryview):
+            # e.g., slicing a memoryview returns another memoryview
+            s = s.tobytes()
+        elif not isinstance(s, bytes):
+            # e.g., slicing a bytearray returns another bytearray
+            s = bytes(s)
+        return s
+
+    def write_primitive(self, offset, ifmt, value):
+        if not self.writable:
+            raise TypeError("Cannot write into a read-only buffer of type %s" %
+                            type(self.buf).__name__)
+        fmt = b'<' + mychr(ifmt)
+        if offset < 0 or offset + struct.calcsize(fmt) > len(self.buf):
+            raise IndexError('Offset out of bounds: %d' % offset)
+        struct.pack_into(fmt, self.buf, offset, value)
+
     def dump_message(self, p, start, end):
         maxlen = len(self.buf)
         if start < 0 or start > end or end > maxlen:
@@ -82,7 +128,7 @@ class BaseSegment(object):
         segment_count = 1
         length = end-start
         header = struct.pack(b'IIq', (segment_count-1), length//8 + 1, p)
-        return header + self.buf[start:end]
+        return header + self.read_bytes(start, end)
 
 
 BaseSegmentForTests = BaseSegment
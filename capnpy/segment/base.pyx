@@ -1,5 +1,6 @@
 cimport cython
 from libc.string cimport memcpy
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release, PyBUF_SIMPLE
 from libc.stdint cimport (int8_t, uint8_t, int16_t, uint16_t,
                           uint32_t, int32_t, int64_t, uint64_t, INT64_MAX)
 
@@ -8,9 +9,16 @@ from capnpy cimport ptr
 cdef extern from "_util.h":
     cdef Py_ssize_t _PyString_GET_SIZE(object string)
     cdef char* _PyString_AS_STRING(object string)
+    cdef bint _PyString_CheckExact(object o)
     cdef bytes _PyString_FromStringAndSize(char *v, Py_ssize_t len)
 
 
+# see base.py for a description
+TRAVERSAL_LIMIT = 8*1024*1024
+NESTING_LIMIT = 64
+NO_LIMIT = -1
+
+
 cpdef uint32_t unpack_uint32(bytes buf, Py_ssize_t offset) except? 0xffffffff:
     cdef const char *cbuf = _PyString_AS_STRING(buf)
     cdef Py_ssize_t buflen = _PyString_GET_SIZE(buf)
@@ -21,12 +29,32 @@ cpdef uint32_t unpack_uint32(bytes buf, Py_ssize_t offset) except? 0xffffffff:
 
 cdef class BaseSegment(object):
 
-    # bah, we need to specify segment_offsets also here, even if it's used
-    # only by MultiSegment
-    def __cinit__(self, bytes buf, object segment_offsets=None):
+    # bah, we need to accept the extra arguments of the subclasses also here,
+    # e.g. segment_offsets for MultiSegment
+    def __cinit__(self, object buf, *args, **kwds):
         assert buf is not None
         self.buf = buf
-        self.cbuf = _PyString_AS_STRING(self.buf)
+        self.traversal_limit = NO_LIMIT
+        self.nesting_limit = NO_LIMIT
+        if _PyString_CheckExact(buf):
+            # fast path
+            self.cbuf = _PyString_AS_STRING(buf)
+            self.buflen = _PyString_GET_SIZE(buf)
+            self.writable = False
+        else:
+            # any other object which supports the buffer protocol, e.g. a
+            # memoryview over a mmap. We keep the buffer acquired for the
+            # whole lifetime of the segment, so that the memory cannot go
+            # away while we are pointing into it
+            PyObject_GetBuffer(buf, &self.view, PyBUF_SIMPLE)
+            self.cbuf = <const char*>self.view.buf
+            self.buflen = self.view.len
+            self.writable = not self.view.readonly
+
+    def __dealloc__(self):
+        # this is a no-op if we did not acquire the buffer, because view.obj
+        # is NULL
+        PyBuffer_Release(&self.view)
 
     def __init__(self, buf, segment_offsets=None):
         # we need this empty init to silence this warning:
@@ -40,8 +68,7 @@ cdef class BaseSegment(object):
         # relatively much higher if you call it from C. In case it's needed,
         # consider adding a read_int64_fast or similar method, which does
         # *not* do the check.
-        cdef Py_ssize_t buflen = _PyString_GET_SIZE(self.buf)
-        if offset < 0 or offset + size > buflen:
+        if offset < 0 or offset + size > self.buflen:
             raise IndexError('Offset out of bounds: %d' % (offset+size))
 
     @cython.final
@@ -131,9 +158,58 @@ cdef class BaseSegment(object):
         self.check_bounds(4, offset)
         return (<float*>(self.cbuf+offset))[0]
 
+    @cython.final
+    cdef bytes read_bytes(self, Py_ssize_t start, Py_ssize_t end):
+        if end < start:
+            # this happens e.g. if we read a Text of length 0, i.e. without
+            # even the trailing \0
+            end = start
+        self.check_bounds(end-start, start)
+        return _PyString_FromStringAndSize(<char*>self.cbuf+start, end-start)
+
+    @cython.final
+    cdef object write_primitive(self, Py_ssize_t offset, char ifmt, object value):
+        cdef char* addr
+        if not self.writable:
+            raise TypeError("Cannot write into a read-only buffer of type %s" %
+                            type(self.buf).__name__)
+        addr = <char*>self.cbuf + offset
+        if ifmt == 'q':
+            self.check_bounds(8, offset)
+            (<int64_t*>addr)[0] = value
+        elif ifmt == 'Q':
+            self.check_bounds(8, offset)
+            (<uint64_t*>addr)[0] = value
+        elif ifmt == 'd':
+            self.check_bounds(8, offset)
+            (<double*>addr)[0] = value
+        elif ifmt == 'f':
+            self.check_bounds(4, offset)
+            (<float*>addr)[0] = value
+        elif ifmt == 'i':
+            self.check_bounds(4, offset)
+            (<int32_t*>addr)[0] = value
+        elif ifmt == 'I':
+            self.check_bounds(4, offset)
+            (<uint32_t*>addr)[0] = value
+        elif ifmt == 'h':
+            self.check_bounds(2, offset)
+            (<int16_t*>addr)[0] = value
+        elif ifmt == 'H':
+            self.check_bounds(2, offset)
+            (<uint16_t*>addr)[0] = value
+        elif ifmt == 'b':
+            self.check_bounds(1, offset)
+            (<int8_t*>addr)[0] = value
+        elif ifmt == 'B':
+            self.check_bounds(1, offset)
+            (<uint8_t*>addr)[0] = value
+        else:
+            raise ValueError('unknown fmt %s' % chr(ifmt))
+
     @cython.final
     cdef object dump_message(self, long p, Py_ssize_t start, Py_ssize_t end):
-        cdef Py_ssize_t maxlen = _PyString_GET_SIZE(self.buf)
+        cdef Py_ssize_t maxlen = self.buflen
         if start < 0 or start > end or end > maxlen:
             raise ValueError("start:end values out of bounds: %s:%s" %
                              (start, end))
@@ -157,9 +233,21 @@ cdef class BaseSegmentForTests(object):
     """
     cdef BaseSegment s
 
-    def __cinit__(self, bytes buf):
+    def __cinit__(self, object buf):
         self.s = BaseSegment(buf)
 
+    @property
+    def writable(self):
+        return self.s.writable
+
+    @property
+    def traversal_limit(self):
+        return self.s.traversal_limit
+
+    @property
+    def nesting_limit(self):
+        return self.s.nesting_limit
+
     def read_primitive(self, Py_ssize_t offset, char ifmt):
         return self.s.read_primitive(offset, ifmt)
 
@@ -196,5 +284,11 @@ cdef class BaseSegmentForTests(object):
     def read_float(self, Py_ssize_t offset):
         return self.s.read_float(offset)
 
+    def read_bytes(self, Py_ssize_t start, Py_ssize_t end):
+        return self.s.read_bytes(start, end)
+
+    def write_primitive(self, Py_ssize_t offset, char ifmt, object value):
+        return self.s.write_primitive(offset, ifmt, value)
+
     def dump_message(self, long p, Py_ssize_t start, Py_ssize_t end):
         return self.s.dump_message(p, start, end)
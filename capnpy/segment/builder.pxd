@@ -5,6 +5,8 @@ from capnpy cimport ptr
 from capnpy.segment.base cimport BaseSegment
 from capnpy.struct_ cimport Struct
 
+cpdef long size_hint(object obj, long item_length) except -1
+
 @cython.final
 cdef class SegmentBuilder(object):
     cdef bytearray buf
@@ -13,10 +15,16 @@ cdef class SegmentBuilder(object):
     cdef readonly Py_ssize_t end     # index of the current end position of
                                      # cbuf; the next allocation will start at
                                      # this position
+    cdef readonly Py_ssize_t segment_size   # 0 means "a single segment"
+    cdef readonly Py_ssize_t segment_start  # start of the current segment
+    cdef readonly list segment_starts
+    cdef long _traversal_left        # used by copy_pointer
 
     cdef void _resize(self, Py_ssize_t minlen)
     cpdef Py_ssize_t get_length(self)
     cpdef as_string(self)
+    cpdef reset(self)
+    cpdef list get_segment_sizes(self)
 
     cpdef object write_generic(self, char ifmt, Py_ssize_t i, object value)
     cpdef void write_int8(self, Py_ssize_t i, int8_t value)
@@ -31,8 +39,12 @@ cdef class SegmentBuilder(object):
     cpdef void write_float64(self, Py_ssize_t i, double value)
     cpdef void write_bool(self, Py_ssize_t byteoffset, int bitoffset, bint value)
     cpdef void write_slice(self, Py_ssize_t i, BaseSegment src, Py_ssize_t start, Py_ssize_t n)
+    cpdef write_buffer(self, Py_ssize_t i, object buf)
 
     cpdef Py_ssize_t allocate(self, Py_ssize_t length)
+    cdef Py_ssize_t _far_pointer_maybe(self, Py_ssize_t pos,
+                                       Py_ssize_t length) except -1
+    cdef bint _fits(self, Py_ssize_t length)
     cpdef Py_ssize_t alloc_struct(self, Py_ssize_t pos, long data_size, long ptrs_size)
     cpdef Py_ssize_t alloc_list(self, Py_ssize_t pos, long size_tag, long item_count,
                                 long body_length)
@@ -42,5 +54,6 @@ cdef class SegmentBuilder(object):
                             Py_ssize_t src_pos)
     cpdef copy_from_struct(self, Py_ssize_t dst_pos, type structcls, Struct value)
     cpdef copy_inline_struct(self, Py_ssize_t dst_pos, BaseSegment src,
-                             long p, Py_ssize_t src_pos)
+                             long p, Py_ssize_t src_pos, long data_size,
+                             long ptrs_size)
     cpdef copy_from_list(self, Py_ssize_t pos, item_type, lst)
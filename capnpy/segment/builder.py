@@ -5,16 +5,75 @@ from capnpy import ptr
 from capnpy.packing import mychr
 from capnpy.printer import print_buffer
 
+def round_to_word(pos):
+    return (pos + (8 - 1)) & -8  # Round up to 8-byte boundary
+
+
+def size_hint(obj, item_length):
+    """
+    Estimate the number of bytes needed to store ``obj``, which is a text,
+    data or list argument of a constructor; ``item_length`` is the length of
+    each item. The generated constructors use it to preallocate the builder.
+    Objects whose length cannot be computed count as 0.
+    """
+    if obj is None:
+        return 0
+    try:
+        n = len(obj)
+    except TypeError:
+        return 0
+    # +1 for the trailing zero of texts
+    return round_to_word(n * item_length + 1)
+
+
 class SegmentBuilder(object):
 
-    def __init__(self, length=None):
-        self.buf = bytearray()
+    def __init__(self, length=None, segment_size=0):
+        if length is None:
+            length = 512
+        self.length = round_to_word(length) # length of the allocated buffer
+        self.buf = bytearray(self.length)
+        self.end = 0  # the next allocation will start at this position
+        # if segment_size is not 0, the objects are split into segments of
+        # (at most) segment_size bytes, which are laid out one after the
+        # other in buf: see _far_pointer_maybe
+        self.segment_size = round_to_word(segment_size)
+        self.segment_start = 0
+        self.segment_starts = [0]
+        # used by copy_pointer to enforce the traversal limit
+        self._traversal_left = 0
+
+    def _resize(self, minlen):
+        # exponential growth of the buffer, see the comment in builder.pyx
+        newlen = self.length + (self.length >> 1) + 512
+        newlen = round_to_word(max(minlen, newlen))
+        self.buf.extend(bytearray(newlen - self.length))
+        self.length = newlen
 
     def get_length(self):
-        return len(self.buf)
+        return self.end
 
     def as_string(self):
-        return binary_type(self.buf)
+        return binary_type(self.buf[:self.end])
+
+    def reset(self):
+        """
+        Discard the content of the buffer, so that the builder can be reused
+        """
+        # allocate() assumes that the memory is already zeroed, and we keep
+        # the allocated memory around
+        self.buf[:self.end] = bytearray(self.end)
+        self.end = 0
+        self.segment_start = 0
+        self.segment_starts = [0]
+
+    def get_segment_sizes(self):
+        """
+        Return the size of each segment, in words
+        """
+        ends = self.segment_starts[1:] + [self.end]
+        return [(end - start) // 8
+                for start, end in zip(self.segment_starts, ends)]
 
     def _print(self):
         print_buffer(self.as_string())
@@ -60,18 +119,57 @@ class SegmentBuilder(object):
     def write_slice(self, i, src, start, n):
         self.buf[i:i+n] = src.buf[start:start+n]
 
+    def write_buffer(self, i, buf):
+        data = memoryview(buf).tobytes()
+        self.buf[i:i+len(data)] = data
+
     def allocate(self, length):
-        # XXX: check whether there is a better method to zero-extend the array in PyPy
-        result = len(self.buf)
-        self.buf += b'\x00'*length
+        """
+        Allocate ``length`` bytes of memory inside the buffer. Return the start
+        position of the newly allocated space.
+        """
+        result = self.end
+        self.end += length
+        if self.end > self.length:
+            self._resize(self.end)
         return result
 
+    def _far_pointer_maybe(self, pos, length):
+        """
+        Called before allocating an object of the given length which is
+        pointed by the pointer at pos, in segmented mode.
+
+        If the object does not fit in the current segment, start a new one.
+        Then, if pos is in a different segment than the object, allocate a
+        landing pad just before the object and write a far pointer to it at
+        pos. Return the position where to write the near pointer to the
+        object, i.e. either pos or the landing pad.
+        """
+        if pos >= self.segment_start and self._fits(length):
+            return pos
+        if not self._fits(length + 8):
+            self.segment_start = self.end
+            self.segment_starts.append(self.end)
+        landing_pad = self.allocate(8)
+        offset = (landing_pad - self.segment_start) // 8
+        target = len(self.segment_starts) - 1
+        self.write_int64(pos, ptr.new_far(0, offset, target))
+        return landing_pad
+
+    def _fits(self, length):
+        # an object which is larger than segment_size gets a segment on its
+        # own
+        return (self.end == self.segment_start or
+                self.end + length - self.segment_start <= self.segment_size)
+
     def alloc_struct(self, pos, data_size, ptrs_size):
         """
         Allocate a new struct of the given size, and write the resulting pointer
         at position i. Return the newly allocated position.
         """
         length = (data_size+ptrs_size) * 8
+        if self.segment_size:
+            pos = self._far_pointer_maybe(pos, length)
         result = self.allocate(length)
         offet = result - (pos+8)
         p = ptr.new_struct(offet//8, data_size, ptrs_size)
@@ -84,6 +182,8 @@ class SegmentBuilder(object):
         at position i. Return the newly allocated position.
         """
         body_length = ptr.round_up_to_word(body_length)
+        if self.segment_size:
+            pos = self._far_pointer_maybe(pos, body_length)
         result = self.allocate(body_length)
         offet = result - (pos+8)
         p = ptr.new_list(offet//8, size_tag, item_count)
@@ -117,15 +217,18 @@ class SegmentBuilder(object):
     def copy_from_pointer(self, dst_pos, src, p, src_pos):
         return copy_pointer(src, p, src_pos, self, dst_pos)
 
-    def copy_inline_struct(self, dst_pos, src, p, src_pos):
+    def copy_inline_struct(self, dst_pos, src, p, src_pos, data_size,
+                           ptrs_size):
         """
         Similar to copy_from_pointer but:
           1. it assumes that p is a pointer to a struct
 
           2. it does NOT allocate a new struct in dst_pos: instead, it writes
-             the struct directly into dst_pos
+             the struct directly into dst_pos, which must have room for
+             data_size+ptrs_size words
         """
-        return _copy_struct_inline(src, p, src_pos, self, dst_pos)
+        return _copy_struct_inline(src, p, src_pos, self, dst_pos,
+                                   data_size, ptrs_size)
 
     def copy_from_list(self, pos, item_type, lst):
         return copy_from_list(self, pos, item_type, lst)
@@ -2,10 +2,11 @@ cimport cython
 from libc.stdint cimport (int8_t, uint8_t, int16_t, uint16_t,
                           uint32_t, int32_t, int64_t, uint64_t, INT64_MAX)
 from libc.string cimport memcpy, memset
+from cpython.buffer cimport PyObject_GetBuffer, PyBuffer_Release, PyBUF_SIMPLE
 
 from capnpy.segment.base cimport BaseSegment
 from capnpy.struct_ cimport Struct
-from capnpy.list cimport List, ItemType, StructItemType
+from capnpy.list cimport List, ItemType, PrimitiveItemType, StructItemType
 
 cdef extern from "Python.h":
     int PyByteArray_Resize(object o, Py_ssize_t len)
@@ -21,13 +22,37 @@ cdef long round_to_word(long pos):
     return (pos + (8 - 1)) & -8  # Round up to 8-byte boundary
 
 
+cpdef long size_hint(object obj, long item_length) except -1:
+    """
+    Estimate the number of bytes needed to store ``obj``, which is a text,
+    data or list argument of a constructor; ``item_length`` is the length of
+    each item. The generated constructors use it to preallocate the builder.
+    Objects whose length cannot be computed count as 0.
+    """
+    cdef Py_ssize_t n
+    if obj is None:
+        return 0
+    try:
+        n = len(obj)
+    except TypeError:
+        return 0
+    # +1 for the trailing zero of texts
+    return round_to_word(n * item_length + 1)
+
+
 cdef class SegmentBuilder(object):
 
-    def __cinit__(self, long length=512):
+    def __cinit__(self, long length=512, long segment_size=0):
         self.length = length
         self.buf = bytearray(self.length)
         self.cbuf = PyByteArray_AS_STRING(self.buf)
         self.end = 0
+        # if segment_size is not 0, the objects are split into segments of
+        # (at most) segment_size bytes, which are laid out one after the
+        # other in buf: see _far_pointer_maybe
+        self.segment_size = round_to_word(segment_size)
+        self.segment_start = 0
+        self.segment_starts = [0]
 
     cdef void _resize(self, Py_ssize_t minlen):
         # exponential growth of the buffer. By using this formula, we grow
@@ -54,6 +79,25 @@ cdef class SegmentBuilder(object):
     cpdef as_string(self):
         return _PyString_FromStringAndSize(self.cbuf, self.end)
 
+    cpdef reset(self):
+        """
+        Discard the content of the buffer, so that the builder can be reused
+        """
+        # allocate() assumes that the memory is already zeroed, and we keep
+        # the allocated memory around
+        memset(self.cbuf, 0, self.end)
+        self.end = 0
+        self.segment_start = 0
+        self.segment_starts = [0]
+
+    cpdef list get_segment_sizes(self):
+        """
+        Return the size of each segment, in words
+        """
+        ends = self.segment_starts[1:] + [self.end]
+        return [(end - start) // 8
+                for start, end in zip(self.segment_starts, ends)]
+
     cpdef object write_generic(self, char ifmt, Py_ssize_t i, object value):
         if ifmt == 'q':
             self.write_int64(i, value)
@@ -119,6 +163,16 @@ cdef class SegmentBuilder(object):
         cdef const void* psrc = src.cbuf + start
         memcpy(pdst, psrc, n)
 
+    cpdef write_buffer(self, Py_ssize_t i, object buf):
+        """
+        Copy the raw content of ``buf``, which must be a contiguous buffer, at
+        position i.
+        """
+        cdef Py_buffer view
+        PyObject_GetBuffer(buf, &view, PyBUF_SIMPLE)
+        memcpy(self.cbuf + i, view.buf, view.len)
+        PyBuffer_Release(&view)
+
     cpdef Py_ssize_t allocate(self, Py_ssize_t length):
         """
         Allocate ``length`` bytes of memory inside the buffer. Return the start
@@ -130,12 +184,45 @@ cdef class SegmentBuilder(object):
             self._resize(self.end)
         return result
 
+    cdef Py_ssize_t _far_pointer_maybe(self, Py_ssize_t pos,
+                                       Py_ssize_t length) except -1:
+        """
+        Called before allocating an object of the given length which is
+        pointed by the pointer at pos, in segmented mode.
+
+        If the object does not fit in the current segment, start a new one.
+        Then, if pos is in a different segment than the object, allocate a
+        landing pad just before the object and write a far pointer to it at
+        pos. Return the position where to write the near pointer to the
+        object, i.e. either pos or the landing pad.
+        """
+        cdef Py_ssize_t landing_pad
+        cdef long offset, target
+        if pos >= self.segment_start and self._fits(length):
+            return pos
+        if not self._fits(length + 8):
+            self.segment_start = self.end
+            self.segment_starts.append(self.end)
+        landing_pad = self.allocate(8)
+        offset = (landing_pad - self.segment_start) / 8
+        target = len(self.segment_starts) - 1
+        self.write_int64(pos, ptr.new_far(0, offset, target))
+        return landing_pad
+
+    cdef bint _fits(self, Py_ssize_t length):
+        # an object which is larger than segment_size gets a segment on its
+        # own
+        return (self.end == self.segment_start or
+                self.end + length - self.segment_start <= self.segment_size)
+
     cpdef Py_ssize_t alloc_struct(self, Py_ssize_t pos, long data_size, long ptrs_size):
         """
         Allocate a new struct of the given size, and write the resulting pointer
         at position i. Return the newly allocated position.
         """
         cdef long length = (data_size+ptrs_size) * 8
+        if self.segment_size:
+            pos = self._far_pointer_maybe(pos, length)
         cdef Py_ssize_t result = self.allocate(length)
         cdef long offet = result - (pos+8)
         cdef long p = ptr.new_struct(offet/8, data_size, ptrs_size)
@@ -149,6 +236,8 @@ cdef class SegmentBuilder(object):
         at position i. Return the newly allocated position.
         """
         body_length = round_to_word(body_length)
+        if self.segment_size:
+            pos = self._far_pointer_maybe(pos, body_length)
         cdef Py_ssize_t result = self.allocate(body_length)
         cdef long offet = result - (pos+8)
         cdef long p = ptr.new_list(offet/8, size_tag, item_count)
@@ -185,15 +274,18 @@ cdef class SegmentBuilder(object):
         return copy_pointer(src, p, src_pos, self, dst_pos)
 
     cpdef copy_inline_struct(self, Py_ssize_t dst_pos, BaseSegment src,
-                             long p, Py_ssize_t src_pos):
+                             long p, Py_ssize_t src_pos, long data_size,
+                             long ptrs_size):
         """
         Similar to copy_from_pointer but:
           1. it assumes that p is a pointer to a struct
 
           2. it does NOT allocate a new struct in dst_pos: instead, it writes
-             the struct directly into dst_pos
+             the struct directly into dst_pos, which must have room for
+             data_size+ptrs_size words
         """
-        return _copy_struct_inline(src, p, src_pos, self, dst_pos)
+        return _copy_struct_inline(src, p, src_pos, self, dst_pos,
+                                   data_size, ptrs_size)
 
     cpdef copy_from_list(self, Py_ssize_t pos, item_type, lst):
         return copy_from_list(self, pos, item_type, lst)
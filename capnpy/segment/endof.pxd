@@ -4,21 +4,24 @@ from capnpy.segment.segment cimport Segment
 
 cpdef long endof(Segment seg, long p, long offset) except -2
 
+cdef long _endof(Segment seg, long p, long offset, long depth) except -2
+
 @cython.locals(i=long, p_offset=long, p=long)
 cdef long _endof_ptrs(Segment seg, long offset, long ptrs_size,
-                     long current_end)
+                     long current_end, long depth) except -2
 
 @cython.locals(end=long)
 cdef long _endof_struct(Segment seg, long p, long offset,
-                       long data_size, long ptrs_size)
+                       long data_size, long ptrs_size, long depth) except -2
 
 @cython.locals(item_size=long, i=long)
 cdef long _endof_list_composite(Segment seg, long p, long offset,
-                               long count, long data_size, long ptrs_size)
+                               long count, long data_size, long ptrs_size,
+                               long depth) except -2
 
 @cython.locals(count=long, end=long)
 cdef long _endof_list_ptr(Segment seg, long p, long offset,
-                         long count)
+                         long count, long depth) except -2
 
 cdef long _endof_list_primitive(Segment seg, long p, long offset,
                                long item_size, long count)
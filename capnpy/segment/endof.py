@@ -14,13 +14,23 @@ def endof(seg, p, offset):
       3. its children are compact
 
       4. there are no FAR pointers
+
+    Raise ValueError if the object is nested more deeply than
+    seg.nesting_limit (if it is not negative).
     """
+    return _endof(seg, p, offset, seg.nesting_limit)
+
+def _endof(seg, p, offset, depth):
+    # if there is no limit, depth starts negative and never reaches 0
+    if depth == 0:
+        raise ValueError("Exceeded the nesting limit of %d: the message is "
+                         "corrupted or malicious" % seg.nesting_limit)
     kind = ptr.kind(p)
     offset = ptr.deref(p, offset)
     if kind == ptr.STRUCT:
         data_size = ptr.struct_data_size(p)
         ptrs_size = ptr.struct_ptrs_size(p)
-        return _endof_struct(seg, p, offset, data_size, ptrs_size)
+        return _endof_struct(seg, p, offset, data_size, ptrs_size, depth)
     elif kind == ptr.LIST:
         item_size = ptr.list_size_tag(p)
         count = ptr.list_item_count(p)
@@ -30,9 +40,9 @@ def endof(seg, p, offset):
             data_size = ptr.struct_data_size(tag)
             ptrs_size = ptr.struct_ptrs_size(tag)
             return _endof_list_composite(seg, p, offset,
-                                         count, data_size, ptrs_size)
+                                         count, data_size, ptrs_size, depth)
         elif item_size == ptr.LIST_SIZE_PTR:
-            return _endof_list_ptr(seg, p, offset, count)
+            return _endof_list_ptr(seg, p, offset, count, depth)
         elif item_size == ptr.LIST_SIZE_BIT:
             return _endof_list_bit(seg, p, offset, count)
         else:
@@ -42,7 +52,7 @@ def endof(seg, p, offset):
     else:
         assert False, 'unknown ptr kind'
 
-def _endof_ptrs(seg, offset, ptrs_size, current_end):
+def _endof_ptrs(seg, offset, ptrs_size, current_end, depth):
     i = 0
     while i < ptrs_size:
         p_offset = offset + i*8
@@ -53,16 +63,16 @@ def _endof_ptrs(seg, offset, ptrs_size, current_end):
         new_start = ptr.deref(p, p_offset)
         if new_start != current_end:
             return -1
-        current_end = endof(seg, p, p_offset)
+        current_end = _endof(seg, p, p_offset, depth-1)
     #
     return current_end
 
-def _endof_struct(seg, p, offset, data_size, ptrs_size):
+def _endof_struct(seg, p, offset, data_size, ptrs_size, depth):
     offset += data_size*8
     current_end = offset + (ptrs_size*8)
-    return _endof_ptrs(seg, offset, ptrs_size, current_end)
+    return _endof_ptrs(seg, offset, ptrs_size, current_end, depth)
 
-def _endof_list_composite(seg, p, offset, count, data_size, ptrs_size):
+def _endof_list_composite(seg, p, offset, count, data_size, ptrs_size, depth):
     item_size = (data_size+ptrs_size)*8
     offset += 8 # skip the tag
     end = offset + (item_size)*count
@@ -72,16 +82,16 @@ def _endof_list_composite(seg, p, offset, count, data_size, ptrs_size):
     i = 0
     while i < count:
         item_offset = offset + (item_size)*i + (data_size*8)
-        end = _endof_ptrs(seg, item_offset, ptrs_size, end)
+        end = _endof_ptrs(seg, item_offset, ptrs_size, end, depth)
         if end == -1:
             return -1
         i += 1
     #
     return end
 
-def _endof_list_ptr(seg, p, offset, count):
+def _endof_list_ptr(seg, p, offset, count, depth):
     end = offset + 8*count
-    return _endof_ptrs(seg, offset, count, end)
+    return _endof_ptrs(seg, offset, count, end, depth)
 
 def _endof_list_primitive(seg, p, offset, item_size, count):
     item_size = ptr.list_item_length(item_size)
@@ -7,6 +7,7 @@ from capnpy cimport _hash
 cdef class Segment(BaseSegment):
     cpdef long read_ptr(self, long offset)
     cpdef read_far_ptr(self, long offset)
+    cdef object _picklable_buf(self)
 
     @cython.locals(p=long, start=long, end=long)
     cpdef read_str(self, long p, long offset, default_, int additional_size)
@@ -17,3 +18,16 @@ cdef class Segment(BaseSegment):
 
 cdef class MultiSegment(Segment):
     cdef readonly object segment_offsets
+
+
+cdef class LazyMultiSegment(MultiSegment):
+    cdef readonly object f
+    cdef readonly long body_start
+    cdef readonly bytearray loaded
+
+    @cython.locals(start=long, end=long, pos=long)
+    cpdef load_segment(self, long i)
+    cpdef load_all_segments(self)
+
+    @cython.locals(p=long, offset2=long)
+    cpdef read_far_ptr(self, long offset)
@@ -12,7 +12,15 @@ class Segment(BaseSegment):
 
     def __reduce__(self):
         # pickle support
-        return Segment, (self.buf,)
+        return Segment, (self._picklable_buf(),)
+
+    def _picklable_buf(self):
+        # the buffer might be e.g. a memoryview over a mmap, which cannot be
+        # pickled: in that case, we pickle a copy of the data
+        buf = self.buf
+        if not isinstance(buf, bytes):
+            buf = self.read_bytes(0, len(buf))
+        return buf
 
     def read_ptr(self, offset):
         """
@@ -47,7 +55,7 @@ class Segment(BaseSegment):
         assert ptr.list_size_tag(p) == ptr.LIST_SIZE_8
         start = ptr.deref(p, offset)
         end = start + ptr.list_item_count(p) + additional_size
-        return self.buf[start:end]
+        return self.read_bytes(start, end)
 
     def hash_str(self, p, offset, default_, additional_size):
         if p == 0:
@@ -77,7 +85,7 @@ class MultiSegment(Segment):
 
     def __reduce__(self):
         # pickle support
-        return MultiSegment, (self.buf, self.segment_offsets)
+        return MultiSegment, (self._picklable_buf(), self.segment_offsets)
 
     def read_far_ptr(self, offset):
         """
@@ -115,3 +123,67 @@ class MultiSegment(Segment):
             # expects the object to start at offset+8. So here we return
             # offset-8, so that the object will be read at the expected place
             return offset-8, ptag
+
+
+class LazyMultiSegment(MultiSegment):
+    """
+    A MultiSegment whose segments are read from a file only when they are
+    needed. ``buf`` must be a writable buffer as large as the whole body of
+    the message, typically an anonymous mmap: the OS provides its pages only
+    when they are touched, so the segments which are never loaded cost
+    neither I/O nor memory.
+
+    ``body_start`` is the position in ``f`` at which the first segment
+    starts. Segment 0 is loaded immediately; the others are loaded the first
+    time that a far pointer targets them, and are kept afterwards.
+    """
+
+    def __init__(self, buf, segment_offsets, f, body_start):
+        super(LazyMultiSegment, self).__init__(buf, segment_offsets)
+        self.f = f
+        self.body_start = body_start
+        self.loaded = bytearray(len(segment_offsets))
+        self.load_segment(0)
+
+    def __reduce__(self):
+        # pickle support: we cannot pickle the file, so we load everything
+        # and pickle a plain MultiSegment
+        self.load_all_segments()
+        return MultiSegment, (self._picklable_buf(), self.segment_offsets)
+
+    def load_segment(self, i):
+        """
+        Read the i-th segment from the file, if it is not already loaded.
+        The current position of the file is preserved.
+        """
+        if self.loaded[i]:
+            return
+        start = self.segment_offsets[i]
+        if i+1 < len(self.segment_offsets):
+            end = self.segment_offsets[i+1]
+        else:
+            end = len(self.buf)
+        f = self.f
+        pos = f.tell()
+        f.seek(self.body_start + start)
+        data = f.read(end-start)
+        f.seek(pos)
+        if len(data) < end-start:
+            raise ValueError("Unexpected EOF when loading segment %d: expected "
+                             "%d bytes, got only %d" % (i, end-start, len(data)))
+        self.buf[start:end] = data
+        self.loaded[i] = 1
+
+    def load_all_segments(self):
+        for i in range(len(self.segment_offsets)):
+            self.load_segment(i)
+
+    def read_far_ptr(self, offset):
+        p = self.read_ptr(offset)
+        self.load_segment(ptr.far_target(p))
+        if ptr.far_landing_pad(p) != 0:
+            # the landing pad is another far pointer, which points to the
+            # segment containing the object: see MultiSegment.read_far_ptr
+            offset2 = self.segment_offsets[ptr.far_target(p)] + ptr.far_offset(p)*8
+            self.load_segment(ptr.far_target(self.read_ptr(offset2)))
+        return MultiSegment.read_far_ptr(self, offset)
@@ -3,6 +3,7 @@ from capnpy.blob cimport Blob
 from capnpy cimport ptr
 from capnpy.list cimport List, ItemType
 from capnpy.packing cimport pack_int64
+from capnpy.segment.base cimport BaseSegment
 from capnpy.segment.builder cimport SegmentBuilder
 from capnpy.segment.endof cimport endof
 
@@ -12,6 +13,10 @@ cpdef str check_tag(str curtag, str newtag)
 cpdef struct_from_buffer(type cls, object buf, long offset,
                          long data_size, long ptrs_size)
 
+@cython.locals(pos=Py_ssize_t, ifmt=char)
+cpdef _fill_column(BaseSegment seg, Py_ssize_t start, long item_length,
+                   long offset, object fmt, object default, object values)
+
 
 cdef class Struct(Blob):
     cdef public long _data_offset
@@ -24,6 +29,10 @@ cdef class Struct(Blob):
     cpdef _init_from_pointer(self, object buf, long offset, long p)
     cpdef _read_primitive(self, long offset, char ifmt)
     cpdef long _read_int16(self, long offset)
+    @cython.locals(val=long)
+    cpdef _write_bit(self, long offset, long bitmask, bint value)
+    cpdef _write_primitive(self, long offset, char ifmt, object value)
+    cpdef make_writable(self)
     cpdef long _read_fast_ptr(self, long offset)
     cpdef _read_far_ptr(self, long offset)
     cpdef long _as_pointer(self, long offset)
@@ -1,11 +1,12 @@
 from six import PY3
+import struct
 import marshal
 import warnings
 import capnpy
 from capnpy import ptr
 from capnpy.type import Types
 from capnpy.blob import Blob
-from capnpy.list import List
+from capnpy.list import List, StructItemType
 from capnpy.segment.segment import Segment, MultiSegment
 from capnpy.segment.endof import endof
 from capnpy.segment.builder import SegmentBuilder
@@ -32,6 +33,106 @@ def struct_from_buffer(cls, buf, offset, data_size, ptrs_size):
     self._init_from_buffer(buf, offset, data_size, ptrs_size)
     return self
 
+
+def list_from_columns(structcls, columns):
+    """
+    See Struct.list_from_columns
+    """
+    layout = {}
+    for field in getattr(structcls, '__data_fields__', ()):
+        layout[field[0]] = field
+    if not columns:
+        raise TypeError("list_from_columns() requires at least one column")
+    n = -1
+    for name, values in columns.items():
+        if name not in layout:
+            raise ValueError("%s has no primitive field %r" %
+                             (structcls.__name__, name))
+        if n == -1:
+            n = len(values)
+        elif len(values) != n:
+            raise ValueError("All the columns must have the same length")
+    #
+    data_size = structcls.__static_data_size__
+    ptrs_size = structcls.__static_ptrs_size__
+    item_length = (data_size + ptrs_size) * 8
+    # the message contains the pointer to the list, the tag and the items
+    buf = bytearray(16 + n*item_length)
+    struct.pack_into('<qq', buf, 0,
+                     ptr.new_list(0, ptr.LIST_SIZE_COMPOSITE,
+                                  (data_size + ptrs_size) * n),
+                     ptr.new_struct(n, data_size, ptrs_size))
+    seg = Segment(buf)
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+    for name, values in columns.items():
+        _, offset, fmt, default = layout[name]
+        if n == 0:
+            break
+        elif numpy is not None:
+            _fill_column_numpy(numpy, buf, 16, item_length, n, offset, fmt,
+                               default, values)
+        else:
+            _fill_column(seg, 16, item_length, offset, fmt, default, values)
+    return List.from_buffer(seg, 8, ptr.LIST_SIZE_COMPOSITE, n,
+                            StructItemType(structcls))
+
+def _fill_column_numpy(numpy, buf, start, item_length, n, offset, fmt,
+                       default, values):
+    if fmt == '?':
+        offset, bitoffset = divmod(offset, 8)
+        arr = numpy.ndarray((n,), numpy.uint8, buf, start + offset,
+                            (item_length,))
+        bits = numpy.asarray(values, numpy.bool_)
+        if default:
+            bits = ~bits
+        arr |= numpy.left_shift(bits.astype(numpy.uint8), numpy.uint8(bitoffset))
+        return
+    dtype = numpy.dtype('<' + fmt)
+    arr = numpy.ndarray((n,), dtype, buf, start + offset, (item_length,))
+    values = numpy.asarray(values, dtype)
+    if default:
+        # default values are stored XORed with the actual value
+        if dtype.kind == 'f':
+            udtype = numpy.dtype('<u%d' % dtype.itemsize)
+            bits = numpy.array(default, dtype).view(udtype)
+            values = (values.view(udtype) ^ bits).view(dtype)
+        else:
+            values = values ^ numpy.array(default, dtype)
+    arr[...] = values
+
+def _fill_column(seg, start, item_length, offset, fmt, default, values):
+    if fmt == '?':
+        offset, bitoffset = divmod(offset, 8)
+        pos = start + offset
+        ifmt = Types.uint8.ifmt
+        for value in values:
+            if bool(value) != bool(default):
+                seg.write_primitive(pos, ifmt, (seg.read_primitive(pos, ifmt) |
+                                                (1 << bitoffset)))
+            pos += item_length
+        return
+    pos = start + offset
+    if default and fmt in 'fd':
+        # XOR the bits of the float
+        ufmt = '<I' if fmt == 'f' else '<Q'
+        bits = struct.unpack(ufmt, struct.pack('<' + fmt, default))[0]
+        ifmt = ord(ufmt[1])
+        for value in values:
+            value = struct.unpack(ufmt, struct.pack('<' + fmt, value))[0]
+            seg.write_primitive(pos, ifmt, value ^ bits)
+            pos += item_length
+        return
+    ifmt = ord(fmt)
+    for value in values:
+        if default:
+            value ^= default
+        seg.write_primitive(pos, ifmt, value)
+        pos += item_length
+
+
 class Struct(Blob):
     """
     Abstract base class: a blob representing a struct.
@@ -76,6 +177,24 @@ class Struct(Blob):
     def from_buffer(cls, buf, offset, data_size, ptrs_size):
         return struct_from_buffer(cls, buf, offset, data_size, ptrs_size)
 
+    @classmethod
+    def builder(cls):
+        return StructBuilder(cls)
+
+    @classmethod
+    def list_from_columns(cls, **columns):
+        """
+        Build a list of structs from the given columns, i.e. one sequence of
+        values for each field: this is the opposite of List.to_columns(). Only
+        the primitive, enum and bool fields which are not part of a union can
+        be set, the others have their default value.
+
+        The data sections of all the items are filled field by field: if
+        numpy is available, each column is written with a single vectorized
+        assignment.
+        """
+        return list_from_columns(cls, columns)
+
     @classmethod
     def load(cls, f):
         return capnpy.message.load(f, cls)
@@ -88,6 +207,18 @@ class Struct(Blob):
     def load_all(cls, f):
         return capnpy.message.load_all(f, cls)
 
+    @classmethod
+    def load_packed(cls, f):
+        return capnpy.message.load_packed(f, cls)
+
+    @classmethod
+    def loads_packed(cls, s):
+        return capnpy.message.loads_packed(s, cls)
+
+    @classmethod
+    def load_all_packed(cls, f):
+        return capnpy.message.load_all_packed(f, cls)
+
     def _raw_dumps(self):
         """
         Do a raw dump of the currenct capnpy object to the specified file.
@@ -204,6 +335,44 @@ class Struct(Blob):
         val = self._read_primitive(offset, Types.uint8.ifmt)
         return bool(val & bitmask)
 
+    def _write_primitive(self, offset, ifmt, value):
+        if offset >= self._data_size*8:
+            # the field is not present in the buffer, e.g. because the
+            # message was written using an older version of the schema
+            raise ValueError("Cannot write a field which is outside the data "
+                             "section of the struct")
+        self._seg.write_primitive(self._data_offset+offset, ifmt, value)
+
+    def _write_bit(self, offset, bitmask, value):
+        val = self._read_primitive(offset, Types.uint8.ifmt)
+        if value:
+            val |= bitmask
+        else:
+            val &= ~bitmask
+        self._write_primitive(offset, Types.uint8.ifmt, val)
+
+    def make_writable(self):
+        """
+        Make sure that the fields of the struct can be modified in place by
+        the set_*() methods: if the underlying buffer is read-only (e.g., a
+        bytes object), it is copied into a bytearray.
+
+        Note that only the buffer of ``self`` is replaced: the objects which
+        have been read from it before calling make_writable() still point to
+        the old buffer.
+        """
+        seg = self._seg
+        if seg.writable:
+            return
+        buf = bytearray(seg.buf)
+        if isinstance(seg, MultiSegment):
+            newseg = MultiSegment(buf, seg.segment_offsets)
+        else:
+            newseg = Segment(buf)
+        newseg.traversal_limit = seg.traversal_limit
+        newseg.nesting_limit = seg.nesting_limit
+        self._init_blob(newseg)
+
     def _read_struct(self, offset, structcls):
         """
         Read and dereference a struct pointer at the given offset.  It returns an
@@ -329,6 +498,54 @@ class Struct(Blob):
         return self._richcmp(other, op)
 
 
+class StructBuilder(dict):
+    """
+    Build a struct and all its children in a single buffer.
+
+    The fields are set with set() or init(): init() creates the builder for
+    a child struct, group or list of structs, which is filled in place. The
+    whole tree is written in one pass when build() is called, by
+    cls.from_dict(): this avoids the copies done when building a tree
+    bottom-up by calling the constructors, where each level copies all its
+    children.
+    """
+
+    def __init__(self, structcls):
+        dict.__init__(self)
+        self.structcls = structcls
+
+    def set(self, **fields):
+        self.update(fields)
+        return self
+
+    def init(self, name, count=None):
+        """
+        Create the builder for the field ``name``, which must be a struct, a
+        group or a list of structs. For lists, ``count`` is the number of items
+        and a list of builders is returned.
+        """
+        t = self.structcls._builder_type(name)
+        if isinstance(t, type):
+            child = StructBuilder(t)
+        elif t is not None:
+            if count is None:
+                raise TypeError("init() of the list field %r requires count" %
+                                name)
+            child = [StructBuilder(t.structcls) for i in range(count)]
+        else:
+            raise TypeError("Cannot init() the field %r of %s: use set() "
+                            "instead" % (name, self.structcls.__name__))
+        self[name] = child
+        return child
+
+    def build(self):
+        return self.structcls.from_dict(self)
+
+    def __repr__(self):
+        return '<%s builder: %s>' % (self.structcls.__name__,
+                                     dict.__repr__(self))
+
+
 # Attach the dump[s] methods to Struct. This is the only way I found to make
 # sure that Struct.dumps is implemented in C (on CPython). The obvious
 # alternative is to implement dumps directly in the class body and to declare
@@ -338,3 +555,5 @@ class Struct(Blob):
 import capnpy.message
 magic_setattr(Struct, 'dump', capnpy.message.dump)
 magic_setattr(Struct, 'dumps', capnpy.message.dumps)
+magic_setattr(Struct, 'dump_packed', capnpy.message.dump_packed)
+magic_setattr(Struct, 'dumps_packed', capnpy.message.dumps_packed)
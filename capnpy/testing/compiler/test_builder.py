@@ -0,0 +1,59 @@
+import pytest
+
+from capnpy.struct_ import StructBuilder
+from capnpy.testing.compiler.support import CompilerTest
+
+
+class TestStructBuilder(CompilerTest):
+
+    SCHEMA = """
+    @0xbf5147cbbecf40c1;
+    struct Point {
+        x @0 :Int64;
+        y @1 :Int64;
+    }
+    struct Node {
+        name @0 :Text;
+        point @1 :Point;
+        children @2 :List(Node);
+        values @3 :List(Int64);
+        rect :group {
+            topLeft @4 :Point;
+            width @5 :Int64;
+        }
+    }
+    """
+
+    def test_nested(self):
+        mod = self.compile(self.SCHEMA)
+        root = mod.Node.builder()
+        assert isinstance(root, StructBuilder)
+        root.set(name=b'root', values=[1, 2, 3])
+        root.init('point').set(x=1, y=2)
+        children = root.init('children', 2)
+        for i, child in enumerate(children):
+            child.set(name=b'child%d' % i)
+            child.init('children', 1)[0].set(name=b'leaf%d' % i)
+        rect = root.init('rect')
+        rect.set(width=10)
+        rect.init('top_left').set(x=3)
+        #
+        node = root.build()
+        assert isinstance(node, mod.Node)
+        assert node.name == b'root'
+        assert node.point.x == 1
+        assert node.point.y == 2
+        assert list(node.values) == [1, 2, 3]
+        assert [c.name for c in node.children] == [b'child0', b'child1']
+        assert node.children[1].children[0].name == b'leaf1'
+        assert node.rect.width == 10
+        assert node.rect.top_left.x == 3
+        # the whole tree is written in a single pass, so it is compact
+        assert node._is_compact()
+
+    def test_init_errors(self):
+        mod = self.compile(self.SCHEMA)
+        root = mod.Node.builder()
+        pytest.raises(TypeError, root.init, 'name')
+        pytest.raises(TypeError, root.init, 'values', 2)
+        pytest.raises(TypeError, root.init, 'children')
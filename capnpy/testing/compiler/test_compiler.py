@@ -1,4 +1,5 @@
 import py
+import json
 import pytest
 from six import b
 
@@ -350,3 +351,177 @@ class TestDynamicCompiler(object):
         # basename is the same
         reqname = req.requestedFiles[0].filename.decode('utf-8')
         assert py.path.local(reqname).basename == filename.basename
+
+
+class TestSchemaCache(CompilerTest):
+
+    def load(self, cache_dir):
+        root = py.path.local(capnpy.__file__).dirpath('..')
+        comp = DynamicCompiler([root, self.tmpdir], cache_dir=cache_dir)
+        return comp.load_schema(importname='/foo.capnp', pyx=self.pyx)
+
+    def test_warm_start(self, monkeypatch):
+        self.write('foo.capnp', """
+        @0xbf5147cbbecf40c1;
+        struct Point {
+            x @0 :Int64;
+            y @1 :Int64;
+        }
+        """)
+        cache_dir = self.tmpdir.join('cache')
+        mod = self.load(cache_dir)
+        assert mod.Point(1, 2).x == 1
+        entry, = cache_dir.listdir()
+        assert entry.join('manifest.json').check(file=True)
+        #
+        # the second time, we do not invoke capnp at all, not even to check
+        # its version
+        def fail(*args):
+            assert False, 'capnp should not be called'
+        monkeypatch.setattr(DynamicCompiler, '_capnp_compile', fail)
+        monkeypatch.setattr(DynamicCompiler, '_exec', fail)
+        mod2 = self.load(cache_dir)
+        self.check_pyx(mod2)
+        assert mod2.Point(3, 4).y == 4
+        if not self.pyx:
+            assert mod2.__source__ == mod.__source__
+
+    def test_invalidation(self):
+        self.write('bar.capnp', """
+        @0xbf5147cbbecf40c2;
+        struct Point {
+            x @0 :Int64;
+        }
+        """)
+        self.write('foo.capnp', """
+        @0xbf5147cbbecf40c1;
+        using Bar = import "/bar.capnp";
+        struct Rectangle {
+            a @0 :Bar.Point;
+        }
+        """)
+        cache_dir = self.tmpdir.join('cache')
+        mod = self.load(cache_dir)
+        assert not hasattr(mod.Rectangle(a=None), 'b')
+        #
+        # changing an imported schema invalidates the entry
+        self.write('bar.capnp', """
+        @0xbf5147cbbecf40c2;
+        struct Point {
+            x @0 :Int64;
+            y @1 :Int64;
+        }
+        """)
+        mod = self.load(cache_dir)
+        r = mod.Rectangle.from_dict({'a': {'x': 1, 'y': 2}})
+        assert r.a.y == 2
+        foo_entry, = [entry for entry in cache_dir.listdir()
+                      if entry.listdir('foo-*.request')]
+        assert len(foo_entry.listdir('foo-*.request')) == 2
+        assert len(cache_dir.listdir()) == 3 # foo, bar and the new bar
+        #
+        # changing the schema itself creates a new entry
+        self.write('foo.capnp', """
+        @0xbf5147cbbecf40c1;
+        using Bar = import "/bar.capnp";
+        struct Rectangle {
+            a @0 :Bar.Point;
+            b @1 :Bar.Point;
+        }
+        """)
+        mod = self.load(cache_dir)
+        assert mod.Rectangle(a=None, b=None).b is None
+
+    def test_dependencies_transitive(self):
+        # a.capnp imports sub/b.capnp, which imports c.capnp relatively: we
+        # parse a.capnp by absolute filename, from another directory
+        self.tmpdir.join('sub').ensure(dir=True)
+        c = self.write('sub/c.capnp', """
+        @0xbf5147cbbecf40c3;
+        struct Point {
+            x @0 :Int64;
+        }
+        """)
+        b = self.write('sub/b.capnp', """
+        @0xbf5147cbbecf40c2;
+        using C = import "c.capnp";
+        struct Line {
+            p @0 :C.Point;
+        }
+        """)
+        a = self.write('a.capnp', """
+        @0xbf5147cbbecf40c1;
+        using B = import "sub/b.capnp";
+        struct Shape {
+            line @0 :B.Line;
+        }
+        """)
+        comp = DynamicCompiler([])
+        with py.path.local('/').as_cwd():
+            request = comp.parse_schema(filename=a)
+            deps = comp._get_dependencies(a, request)
+        assert sorted(deps) == [a, b, c]
+
+    def test_invalidation_transitive(self):
+        self.tmpdir.join('sub').ensure(dir=True)
+        self.write('sub/c.capnp', """
+        @0xbf5147cbbecf40c3;
+        struct Point {
+            x @0 :Int64;
+        }
+        """)
+        self.write('sub/b.capnp', """
+        @0xbf5147cbbecf40c2;
+        using C = import "/sub/c.capnp";
+        struct Line {
+            p @0 :C.Point;
+        }
+        """)
+        a = self.write('a.capnp', """
+        @0xbf5147cbbecf40c1;
+        using B = import "/sub/b.capnp";
+        struct Shape {
+            line @0 :B.Line;
+        }
+        """)
+        cache_dir = self.tmpdir.join('cache')
+        def load():
+            comp = DynamicCompiler([self.tmpdir], cache_dir=cache_dir)
+            with py.path.local('/').as_cwd():
+                return comp.load_schema(filename=a, pyx=self.pyx)
+        #
+        load()
+        a_entry, = [entry for entry in cache_dir.listdir()
+                    if entry.listdir('a-*.request')]
+        manifest = json.loads(a_entry.join('manifest.json').read())
+        deps = [path for path, digest in manifest['deps']]
+        assert str(self.tmpdir.join('sub', 'c.capnp')) in deps
+        #
+        # changing the schema imported by b.capnp invalidates the entry of
+        # a.capnp
+        self.write('sub/c.capnp', """
+        @0xbf5147cbbecf40c3;
+        struct Point {
+            x @0 :Int64;
+            y @1 :Int64;
+        }
+        """)
+        mod = load()
+        s = mod.Shape.from_dict({'line': {'p': {'x': 1, 'y': 2}}})
+        assert s.line.p.y == 2
+
+    def test_unresolved_dependency(self, monkeypatch):
+        self.write('foo.capnp', """
+        @0xbf5147cbbecf40c1;
+        struct Point {
+            x @0 :Int64;
+        }
+        """)
+        def fail(self, filename, request):
+            raise ValueError('cannot find it')
+        monkeypatch.setattr(DynamicCompiler, '_get_dependencies', fail)
+        cache_dir = self.tmpdir.join('cache')
+        mod = self.load(cache_dir)
+        assert mod.Point(1).x == 1
+        # we cannot tell when the entry becomes stale, so we don't store it
+        assert not cache_dir.check() or cache_dir.listdir() == []
@@ -169,6 +169,32 @@ class TestConstructors(CompilerTest):
         assert foo._seg.buf == b('\x01\x00\x00\x00\x22\x00\x00\x00'   # ptrlist
                                  '\x01\x02\x03\x04\x00\x00\x00\x00')  # 1,2,3,4 + padding
 
+    def test_list_of_bool(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        struct Foo {
+            x @0 :List(Bool);
+        }
+        """
+        mod = self.compile(schema)
+        foo = mod.Foo([True, False, True, True])
+        assert foo._seg.buf == b('\x01\x00\x00\x00\x21\x00\x00\x00'   # ptrlist
+                                 '\x0d\x00\x00\x00\x00\x00\x00\x00')  # 0b1101
+        assert list(foo.x) == [True, False, True, True]
+
+    def test_list_from_array(self):
+        import array
+        schema = """
+        @0xbf5147cbbecf40c1;
+        struct Foo {
+            x @0 :List(Int8);
+        }
+        """
+        mod = self.compile(schema)
+        foo = mod.Foo(array.array('b', [1, 2, 3, 4]))
+        assert foo._seg.buf == b('\x01\x00\x00\x00\x22\x00\x00\x00'   # ptrlist
+                                 '\x01\x02\x03\x04\x00\x00\x00\x00')  # 1,2,3,4 + padding
+
     def test_list_of_void(self):
         schema = """
         @0xbf5147cbbecf40c1;
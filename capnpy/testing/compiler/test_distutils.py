@@ -2,10 +2,12 @@ import py
 import pytest
 import sys
 import os
+import json
 import sysconfig
 
 from capnpy.testing.compiler.support import CompilerTest
 from capnpy.compiler.compiler import DistutilsCompiler
+from capnpy import annotate
 
 @pytest.fixture
 def ROOT():
@@ -42,7 +44,7 @@ class TestDistutilsCompiler(CompilerTest):
         else:
             assert outfile == self.tmpdir.join('example.py')
 
-    def test_dont_compile_if_newer(self):
+    def test_dont_compile_if_unchanged(self):
         self.write("example.capnp", """
         @0xbf5147cbbecf40c1;
         struct Point {
@@ -56,12 +58,232 @@ class TestDistutilsCompiler(CompilerTest):
         assert outfile == outfile2
         assert outfile2.mtime() == mtime
         #
+        # touching the schema is not enough to recompile it
         infile = self.tmpdir.join("example.capnp")
         infile.setmtime(mtime+1)
-        #
         outfile3 = self.compile("example.capnp")
-        assert outfile == outfile3
-        assert outfile3.mtime() > mtime
+        assert outfile3.mtime() == mtime
+        #
+        self.write("example.capnp", """
+        @0xbf5147cbbecf40c1;
+        struct Point {
+            x @0: Int64;
+            y @1: Int64;
+            z @2: Int64;
+        }
+        """)
+        outfile4 = self.compile("example.capnp")
+        assert outfile == outfile4
+        assert "'z'" in outfile4.read()
+        #
+        # the generated file is recompiled if it is deleted, or if the
+        # manifest is missing
+        outfile.remove()
+        assert self.compile("example.capnp").check(file=True)
+        outfile.new(basename=outfile.basename + '.deps.json').remove()
+        outfile.setmtime(mtime-10)
+        self.compile("example.capnp")
+        assert outfile.mtime() > mtime-10
+
+    def write_many(self):
+        self.write("a.capnp", """
+        @0xbf5147cbbecf40c1;
+        struct A {
+            x @0: Int64;
+        }
+        struct Unused {
+            y @0: Int64;
+        }
+        """)
+        self.write("b.capnp", """
+        @0xbf5147cbbecf40c2;
+        using import "/a.capnp".A;
+        struct B {
+            a @0: A;
+        }
+        """)
+        self.write("c.capnp", """
+        @0xbf5147cbbecf40c3;
+        struct C {
+            z @0: Int64;
+        }
+        """)
+        return ['a.capnp', 'b.capnp', 'c.capnp']
+
+    def test_parse_many(self, monkeypatch):
+        monkeypatch.chdir(self.tmpdir)
+        filenames = self.write_many()
+        compiler = DistutilsCompiler([self.tmpdir])
+        requests = compiler._parse_schema_files(filenames)
+        assert [req.requestedFiles[0].filename for req in requests] == [
+            b'a.capnp', b'b.capnp', b'c.capnp']
+        names = [sorted(node.displayName for node in req.nodes)
+                 for req in requests]
+        assert names == [
+            [b'a.capnp', b'a.capnp:A', b'a.capnp:Unused'],
+            [b'a.capnp', b'a.capnp:A', b'b.capnp', b'b.capnp:B'],
+            [b'c.capnp', b'c.capnp:C'],
+        ]
+
+    def test_compile_many(self, monkeypatch):
+        filenames = self.write_many()
+        infiles = [self.tmpdir.join(f) for f in filenames]
+        calls = []
+        def _exec(self, *cmd):
+            calls.append(cmd)
+            return orig_exec(self, *cmd)
+        orig_exec = DistutilsCompiler._exec
+        monkeypatch.setattr(DistutilsCompiler, '_exec', _exec)
+        compiler = DistutilsCompiler([self.tmpdir])
+        outfiles = compiler.compile_many(infiles, pyx=self.pyx)
+        ext = 'pyx' if self.pyx else 'py'
+        assert outfiles == [f.new(ext=ext) for f in infiles]
+        # all the files are compiled by a single call to capnp
+        assert len([cmd for cmd in calls if cmd[1] == 'compile']) == 1
+        src = outfiles[1].read()
+        assert 'class B(_Struct)' in src
+        assert 'class A(_Struct)' not in src
+        #
+        # up to date files are not compiled again
+        del calls[:]
+        infiles[2].write('\n', mode='a')
+        compiler.compile_many(infiles, pyx=self.pyx)
+        cmd, = [cmd for cmd in calls if cmd[1] == 'compile']
+        assert cmd[-1] == str(infiles[2])
+
+    def test_recompile_dependencies(self, monkeypatch):
+        filenames = self.write_many()
+        infiles = [self.tmpdir.join(f) for f in filenames]
+        compiler = DistutilsCompiler([self.tmpdir])
+        outfiles = compiler.compile_many(infiles, pyx=self.pyx)
+        manifest = json.loads(outfiles[1].new(
+            basename=outfiles[1].basename + '.deps.json').read())
+        assert [path for path, digest in manifest['deps']] == [
+            str(infiles[1]), str(infiles[0])]
+        #
+        compiled = []
+        def _compile_chunk(self, infiles, pyx, options):
+            compiled.extend(infiles)
+            return orig_compile_chunk(self, infiles, pyx, options)
+        orig_compile_chunk = DistutilsCompiler._compile_chunk
+        monkeypatch.setattr(DistutilsCompiler, '_compile_chunk',
+                            _compile_chunk)
+        #
+        # b.capnp imports a.capnp, so both are recompiled
+        infiles[0].write('\n', mode='a')
+        compiler.compile_many(infiles, pyx=self.pyx)
+        assert compiled == infiles[:2]
+        #
+        # everything is recompiled if the options change
+        del compiled[:]
+        options = annotate.Options(convert_case=False)
+        compiler.compile_many(infiles, pyx=self.pyx, options=options)
+        assert compiled == infiles
+        del compiled[:]
+        compiler.compile_many(infiles, pyx=self.pyx, options=options)
+        assert compiled == []
+
+    def test_recompile_transitive_dependencies(self, monkeypatch):
+        # a.capnp imports sub/b.capnp, which imports sub/c.capnp
+        self.tmpdir.join('sub').ensure(dir=True)
+        self.write("sub/c.capnp", """
+        @0xbf5147cbbecf40c3;
+        struct C {
+            z @0: Int64;
+        }
+        """)
+        self.write("sub/b.capnp", """
+        @0xbf5147cbbecf40c2;
+        using import "/sub/c.capnp".C;
+        struct B {
+            c @0: C;
+        }
+        """)
+        self.write("a.capnp", """
+        @0xbf5147cbbecf40c1;
+        using import "/sub/b.capnp".B;
+        struct A {
+            b @0: B;
+        }
+        """)
+        infile = self.tmpdir.join('a.capnp')
+        compiler = DistutilsCompiler([self.tmpdir])
+        # the result must not depend on the current directory
+        monkeypatch.chdir('/')
+        outfile, = compiler.compile_many([infile], pyx=self.pyx)
+        manifest = json.loads(outfile.new(
+            basename=outfile.basename + '.deps.json').read())
+        assert sorted(path for path, digest in manifest['deps']) == [
+            str(infile), str(self.tmpdir.join('sub', 'b.capnp')),
+            str(self.tmpdir.join('sub', 'c.capnp'))]
+        #
+        compiled = []
+        def _compile_chunk(self, infiles, pyx, options):
+            compiled.extend(infiles)
+            return orig_compile_chunk(self, infiles, pyx, options)
+        orig_compile_chunk = DistutilsCompiler._compile_chunk
+        monkeypatch.setattr(DistutilsCompiler, '_compile_chunk',
+                            _compile_chunk)
+        compiler.compile_many([infile], pyx=self.pyx)
+        assert compiled == []
+        #
+        # changing c.capnp recompiles a.capnp
+        self.tmpdir.join('sub', 'c.capnp').write('\n', mode='a')
+        compiler.compile_many([infile], pyx=self.pyx)
+        assert compiled == [infile]
+
+    def test_recompile_unresolved_dependencies(self, monkeypatch):
+        self.write_many()
+        infile = self.tmpdir.join('c.capnp')
+        compiler = DistutilsCompiler([self.tmpdir])
+        outfile, = compiler.compile_many([infile], pyx=self.pyx)
+        manifest = outfile.new(basename=outfile.basename + '.deps.json')
+        assert manifest.check(file=True)
+        #
+        # if we cannot find a dependency, we cannot tell whether the
+        # generated file is up to date: the stale manifest is removed and the
+        # schema is compiled every time
+        def _get_dependencies(self, filename, request):
+            raise ValueError('cannot find it')
+        monkeypatch.setattr(DistutilsCompiler, '_get_dependencies',
+                            _get_dependencies)
+        infile.write('\n', mode='a')
+        compiler.compile_many([infile], pyx=self.pyx)
+        assert not manifest.check()
+        outfile.setmtime(outfile.mtime() - 10)
+        mtime = outfile.mtime()
+        compiler.compile_many([infile], pyx=self.pyx)
+        assert outfile.mtime() > mtime
+
+    def test_compile_many_workers(self):
+        filenames = self.write_many()
+        infiles = [self.tmpdir.join(f) for f in filenames]
+        compiler = DistutilsCompiler([self.tmpdir])
+        outfiles = compiler.compile_many(infiles, pyx=self.pyx, workers=2)
+        for f in outfiles:
+            assert f.check(file=True)
+        assert 'class C(_Struct)' in outfiles[2].read()
+
+    def test_compile_many_same_id(self):
+        # capnp refuses to compile them together, so they are compiled one
+        # by one
+        self.write("a.capnp", """
+        @0xbf5147cbbecf40c1;
+        struct A {
+            x @0: Int64;
+        }
+        """)
+        self.write("b.capnp", """
+        @0xbf5147cbbecf40c1;
+        struct B {
+            x @0: Int64;
+        }
+        """)
+        infiles = [self.tmpdir.join('a.capnp'), self.tmpdir.join('b.capnp')]
+        compiler = DistutilsCompiler([self.tmpdir])
+        outfiles = compiler.compile_many(infiles, pyx=self.pyx)
+        assert 'class A(_Struct)' in outfiles[0].read()
+        assert 'class B(_Struct)' in outfiles[1].read()
 
 
 class TestSetup(CompilerTest):
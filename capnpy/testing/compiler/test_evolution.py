@@ -67,3 +67,45 @@ class TestEvolution(CompilerTest):
         assert obj._data_size == 0
         assert obj._ptrs_size == 2
         py.test.raises(AttributeError, "obj.p2")
+
+    def test_copy_into_list(self):
+        schema = """
+            @0xbf5147cbbecf40c1;
+            struct Old {
+                x @0 :Int64;
+                name @1 :Text;
+            }
+
+            struct New {
+                x @0 :Int64;
+                name @1 :Text;
+                y @2 :Int64;
+                other @3 :Text;
+            }
+
+            struct OldList {
+                items @0 :List(Old);
+            }
+
+            struct NewList {
+                items @0 :List(New);
+            }
+        """
+        mod = self.compile(schema)
+        # 1. put new objects into a list of the older schema
+        s = dumps(mod.New(x=1, name=b'foo', y=2, other=b'bar'))
+        obj = loads(s, mod.Old)
+        lst = mod.OldList(items=[obj, mod.Old(x=3, name=b'baz')])
+        assert lst.items[0].x == 1
+        assert lst.items[0].name == b'foo'
+        assert lst.items[1].x == 3
+        assert lst.items[1].name == b'baz'
+        #
+        # 2. put old objects into a list of the newer schema
+        s = dumps(mod.Old(x=1, name=b'foo'))
+        obj = loads(s, mod.New)
+        lst = mod.NewList(items=[obj])
+        assert lst.items[0].x == 1
+        assert lst.items[0].name == b'foo'
+        assert lst.items[0].y == 0
+        assert lst.items[0].other is None
@@ -1,5 +1,7 @@
 # -*- encoding: utf-8 -*-
+import sys
 import py
+import pytest
 from six import b, PY3
 
 from capnpy.testing.compiler.support import CompilerTest
@@ -556,3 +558,190 @@ class TestList(CompilerTest):
                        [4, 5],
                        [6, 7, 8, 9]]
 
+
+    def test_list_of_struct_to_columns(self):
+        numpy = py.test.importorskip('numpy')
+        schema = """
+        @0xbf5147cbbecf40c1;
+        struct Point {
+            x @0 :Int64;
+            y @1 :Int16 = 7;
+            visible @2 :Bool;
+            name @3 :Text;
+            union {
+                a @4 :Int8;
+                b @5 :Int16;
+            }
+        }
+        struct Foo {
+            points @0 :List(Point);
+        }
+        """
+        mod = self.compile(schema)
+        assert [f[0] for f in mod.Point.__data_fields__] == ['x', 'y', 'visible']
+        points = [mod.Point(x=1, y=2, visible=True, name=b'p1', a=0),
+                  mod.Point(x=2, y=7, visible=False, name=b'p2', a=0),
+                  mod.Point(x=3, y=-4, visible=True, name=b'p3', a=0)]
+        foo = mod.Foo(points)
+        cols = foo.points.to_columns()
+        assert list(cols) == ['x', 'y', 'visible']
+        assert cols['x'].tolist() == [1, 2, 3]
+        assert cols['y'].tolist() == [2, 7, -4]
+        assert cols['visible'].tolist() == [True, False, True]
+
+    @pytest.mark.parametrize('use_numpy', [True, False])
+    def test_list_from_columns(self, use_numpy, monkeypatch):
+        if use_numpy:
+            py.test.importorskip('numpy')
+        else:
+            monkeypatch.setitem(sys.modules, 'numpy', None)
+        schema = """
+        @0xbf5147cbbecf40c1;
+        struct Point {
+            x @0 :Int64;
+            y @1 :Int16 = 7;
+            visible @2 :Bool;
+            hidden @3 :Bool = true;
+            z @4 :Float64;
+            name @5 :Text;
+        }
+        struct Foo {
+            points @0 :List(Point);
+        }
+        """
+        mod = self.compile(schema)
+        lst = mod.Point.list_from_columns(x=[1, 2, 3], y=[2, 7, -4],
+                                          visible=[True, False, True],
+                                          hidden=[False, True, False],
+                                          z=[0.5, 1.5, 2.5])
+        assert len(lst) == 3
+        assert [p.x for p in lst] == [1, 2, 3]
+        assert [p.y for p in lst] == [2, 7, -4]
+        assert [p.visible for p in lst] == [True, False, True]
+        assert [p.hidden for p in lst] == [False, True, False]
+        assert [p.z for p in lst] == [0.5, 1.5, 2.5]
+        assert [p.name for p in lst] == [None, None, None]
+        #
+        # the fields which are not given get the default value
+        lst = mod.Point.list_from_columns(x=[1, 2])
+        assert [p.y for p in lst] == [7, 7]
+        assert [p.hidden for p in lst] == [True, True]
+        assert [p.z for p in lst] == [0.0, 0.0]
+        #
+        # the list can be passed to a ctor, which copies it at once
+        foo = mod.Foo(points=lst)
+        assert [p.x for p in foo.points] == [1, 2]
+        assert foo._is_compact()
+        #
+        assert len(mod.Point.list_from_columns(x=[])) == 0
+        py.test.raises(ValueError, mod.Point.list_from_columns, x=[1], y=[1, 2])
+        py.test.raises(ValueError, mod.Point.list_from_columns, name=[b'a'])
+        py.test.raises(TypeError, mod.Point.list_from_columns)
+
+    def test_setters(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        enum Color {
+            red @0;
+            green @1;
+            blue @2;
+        }
+        struct Foo {
+            x @0 :Int64;
+            y @1 :Int16 = 7;
+            flag @2 :Bool = true;
+            color @3 :Color;
+            name @4 :Text;
+            union {
+                a @5 :Int32;
+                b @6 :Float64;
+            }
+        }
+        """
+        mod = self.compile(schema, mutable=True)
+        foo = mod.Foo(x=1, y=2, flag=False, color=mod.Color.red, name=b'foo', a=3)
+        assert not hasattr(foo, 'set_name')
+        foo.make_writable()
+        foo.set_x(42)
+        foo.set_y(7)
+        foo.set_flag(True)
+        foo.set_color(mod.Color.blue)
+        foo.set_a(-5)
+        assert foo.x == 42
+        assert foo.y == 7
+        assert foo.flag is True
+        assert foo.color == mod.Color.blue
+        assert foo.a == -5
+        assert foo.name == b'foo'
+        pytest.raises(ValueError, foo.set_b, 1.5)
+        #
+        foo2 = mod.Foo.loads(foo.dumps())
+        assert foo2.x == 42
+        assert foo2.y == 7
+        assert foo2.flag is True
+        assert foo2.color == mod.Color.blue
+        assert foo2.a == -5
+
+    def test_setters_readonly_buffer(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        struct Point {
+            x @0 :Int64;
+            y @1 :Int64;
+        }
+        """
+        mod = self.compile(schema, mutable=True)
+        p = mod.Point.loads(mod.Point(x=1, y=2).dumps())
+        pytest.raises(TypeError, p.set_x, 42)
+        p.make_writable()
+        p.set_x(42)
+        assert p.x == 42
+        assert p.y == 2
+        #
+        # the setters are not generated unless you ask for them
+        mod = self.compile(schema)
+        assert not hasattr(mod.Point, 'set_x')
+
+    def test_cache(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        struct Point {
+            x @0 :Int64;
+            y @1 :Int64;
+        }
+        struct Foo {
+            p @0 :Point;
+            name @1 :Text;
+            data @2 :Data;
+            values @3 :List(Int64);
+            none @4 :Point;
+            position :group {
+                x @5 :Int64;
+            }
+        }
+        """
+        mod = self.compile(schema, cache=True)
+        foo = mod.Foo(p=mod.Point(1, 2), name=b'foo', data=b'bar',
+                      values=[1, 2, 3], none=None, position=(42,))
+        assert foo.p is foo.p
+        assert foo.p.x == 1
+        assert foo.name is foo.name
+        assert foo.name == b'foo'
+        assert foo.data is foo.data
+        assert foo.values is foo.values
+        assert list(foo.values) == [1, 2, 3]
+        assert foo.position is foo.position
+        assert foo.position.x == 42
+        assert foo.none is None
+        assert foo.get_p() is foo.p
+        #
+        # the cache is per-instance
+        foo2 = mod.Foo.loads(foo.dumps())
+        assert foo2.p is not foo.p
+        assert foo2.p.x == 1
+        #
+        # without the option, a new object is returned every time
+        mod = self.compile(schema)
+        foo = mod.Foo(p=mod.Point(1, 2), name=None, data=None,
+                      values=None, none=None, position=(42,))
+        assert foo.p is not foo.p
@@ -0,0 +1,197 @@
+import pytest
+import json
+from six import b, u
+
+from capnpy import json as capnpy_json
+from capnpy.testing.compiler.support import CompilerTest
+
+
+class TestJson(CompilerTest):
+
+    def roundtrip(self, obj):
+        s = capnpy_json.dumps(obj)
+        json.loads(s) # check that it is valid JSON
+        obj2 = capnpy_json.loads(s, type(obj))
+        assert obj2.to_dict() == obj.to_dict()
+        return s
+
+    def test_primitive(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        enum Color {
+            red @0;
+            lightGreen @1;
+        }
+        struct Point {
+            x @0 :Int32;
+            y @1 :Int64 = 3;
+            flag @2 :Bool = true;
+            z @3 :Float64;
+            color @4 :Color;
+            nothing @5 :Void;
+            fieldName @6 :UInt8;
+        }
+        """
+        mod = self.compile(schema)
+        p = mod.Point(x=1, y=2, flag=False, z=1.5, color=mod.Color.light_green,
+                      field_name=4)
+        s = self.roundtrip(p)
+        assert json.loads(s) == {'x': 1, 'y': '2', 'flag': False, 'z': 1.5,
+                                 'color': 'lightGreen', 'nothing': None,
+                                 'fieldName': 4}
+        #
+        p = capnpy_json.loads('{"y": 42, "color": 1}', mod.Point)
+        assert p.y == 42
+        assert p.flag is True
+        assert p.color == mod.Color.light_green
+        #
+        pytest.raises(ValueError, capnpy_json.loads, '{"color": "blue"}',
+                      mod.Point)
+        pytest.raises(ValueError, capnpy_json.loads, '[]', mod.Point)
+
+    def test_float(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        struct Foo {
+            a @0 :Float32;
+            b @1 :Float64;
+            c @2 :List(Float64);
+        }
+        """
+        mod = self.compile(schema)
+        inf = float('inf')
+        foo = mod.Foo(a=inf, b=-inf, c=[float('nan'), 0.5])
+        s = capnpy_json.dumps(foo)
+        assert json.loads(s)['a'] == 'Infinity'
+        assert json.loads(s)['b'] == '-Infinity'
+        assert json.loads(s)['c'][0] == 'NaN'
+        foo2 = capnpy_json.loads(s, mod.Foo)
+        assert foo2.a == inf
+        assert foo2.b == -inf
+        assert foo2.c[0] != foo2.c[0]
+        assert foo2.c[1] == 0.5
+
+    def test_pointers(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        enum Color {
+            red @0;
+            green @1;
+        }
+        struct Point {
+            x @0 :Int64;
+            y @1 :Int64;
+        }
+        struct Foo {
+            name @0 :Text;
+            data @1 :Data;
+            p @2 :Point;
+            points @3 :List(Point);
+            matrix @4 :List(List(Int64));
+            names @5 :List(Text);
+            colors @6 :List(Color);
+            flags @7 :List(Bool);
+            nested @8 :List(List(Point));
+        }
+        """
+        mod = self.compile(schema)
+        foo = mod.Foo(name=u('hell\xf2').encode('utf-8'), data=b'\x00\xff',
+                      p=mod.Point(1, 2),
+                      points=[mod.Point(3, 4), mod.Point(5, 6)],
+                      matrix=[[1, 2], [3]], names=[b'a', None],
+                      colors=[mod.Color.green, mod.Color.red],
+                      flags=[True, False], nested=[[mod.Point(7, 8)], []])
+        s = self.roundtrip(foo)
+        assert json.loads(s) == {
+            'name': u('hell\xf2'),
+            'data': [0, 255],
+            'p': {'x': '1', 'y': '2'},
+            'points': [{'x': '3', 'y': '4'}, {'x': '5', 'y': '6'}],
+            'matrix': [['1', '2'], ['3']],
+            'names': ['a', None],
+            'colors': ['green', 'red'],
+            'flags': [True, False],
+            'nested': [[{'x': '7', 'y': '8'}], []],
+        }
+        # null pointers are omitted
+        assert capnpy_json.dumps(mod.Foo()) == '{}'
+
+    def test_union(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        struct Shape {
+            area @0 :Int64;
+            union {
+                circle @1 :Int64;
+                empty @2 :Void;
+                rectangle :group {
+                    width @3 :Int64;
+                    height @4 :Int64;
+                }
+                name @5 :Text;
+            }
+        }
+        """
+        mod = self.compile(schema)
+        s = self.roundtrip(mod.Shape(area=1, circle=2))
+        assert json.loads(s) == {'area': '1', 'circle': '2'}
+        s = self.roundtrip(mod.Shape(area=1, empty=None))
+        assert json.loads(s) == {'area': '1', 'empty': None}
+        s = self.roundtrip(mod.Shape(area=1, rectangle=(3, 4)))
+        assert json.loads(s) == {'area': '1',
+                                 'rectangle': {'width': '3', 'height': '4'}}
+        s = self.roundtrip(mod.Shape(area=1, name=None))
+        assert json.loads(s) == {'area': '1', 'name': None}
+        assert capnpy_json.loads(s, mod.Shape).is_name()
+
+    def test_nullable(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        using Py = import "/capnpy/annotate.capnp";
+        struct Foo {
+            x :group $Py.nullable {
+                isNull @0 :Int8;
+                value @1 :Int64;
+            }
+        }
+        """
+        mod = self.compile(schema)
+        s = self.roundtrip(mod.Foo(x=None))
+        assert json.loads(s) == {'x': {'isNull': 1, 'value': '0'}}
+        s = self.roundtrip(mod.Foo(x=42))
+        assert json.loads(s) == {'x': {'isNull': 0, 'value': '42'}}
+
+    def test_dump_load(self, tmpdir):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        using Py = import "/capnpy/annotate.capnp";
+        struct Foo $Py.options(textType=unicode) {
+            name @0 :Text;
+        }
+        """
+        mod = self.compile(schema)
+        tmp = tmpdir.join('foo.json')
+        with tmp.open('w') as f:
+            capnpy_json.dump(mod.Foo(name=u('hello')), f)
+        with tmp.open('r') as f:
+            foo = capnpy_json.load(f, mod.Foo)
+        assert foo.name == u('hello')
+
+    def test_builtin_as_fieldname(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        struct P {
+            int @0 :Int64;
+            float @1 :Float64;
+            union {
+                void @2 :Int64;
+                bytes @3 :Data;
+            }
+        }
+        """
+        mod = self.compile(schema)
+        p = mod.P(int=1, float=2.5, void=3)
+        p2 = capnpy_json.loads(capnpy_json.dumps(p), mod.P)
+        assert p2.to_dict() == p.to_dict()
+        p2 = mod.P.from_dict(p.to_dict())
+        assert p2.to_dict() == {'int': 1, 'float': 2.5, 'void': 3}
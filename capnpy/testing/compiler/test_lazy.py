@@ -0,0 +1,101 @@
+import pytest
+import capnpy
+from capnpy.testing.compiler.support import CompilerTest
+
+
+class TestLazy(CompilerTest):
+
+    schema = """
+    @0xbf5147cbbecf40c1;
+    enum Color {
+        red @0;
+        green @1;
+    }
+    struct Point {
+        x @0 :Int64;
+        y @1 :Int64;
+        color @2 :Color;
+        struct Nested {
+            z @0 :Int64;
+        }
+    }
+    struct Line {
+        a @0 :Point;
+        b @1 :List(Point);
+    }
+    struct Unrelated {
+        x @0 :Int64;
+    }
+    const origin :Point = (x = 0, y = 0);
+    const numbers :List(Int64) = [1, 2, 3];
+    """
+
+    def is_defined(self, mod, name):
+        # in pyx mode, the lazy option is ignored and everything is defined
+        # at import time
+        return self.pyx or name in vars(mod)
+
+    def test_lazy_classes(self):
+        mod = self.compile(self.schema, lazy=True)
+        for name in ('Color', 'Point', 'Point_Nested', 'Line', 'Unrelated'):
+            assert self.is_defined(mod, name) == self.pyx
+        #
+        # Line uses Point, which uses Color: they are defined together
+        Line = mod.Line
+        assert self.is_defined(mod, 'Point')
+        assert self.is_defined(mod, 'Point_Nested')
+        assert self.is_defined(mod, 'Color')
+        assert self.is_defined(mod, 'Unrelated') == self.pyx
+        #
+        p = mod.Point(x=1, y=2, color=mod.Color.green)
+        line = Line(a=p, b=[p])
+        assert line.b[0].color == mod.Color.green
+        assert mod.Point.Nested is mod.Point_Nested
+        assert Line.__name__ == 'Line'
+        if not self.pyx:
+            assert Line.__qualname__ == 'Line'
+
+    def test_const(self):
+        mod = self.compile(self.schema, lazy=True)
+        assert self.is_defined(mod, 'origin') == self.pyx
+        assert mod.origin.x == 0
+        assert isinstance(mod.origin, mod.Point)
+        assert list(mod.numbers) == [1, 2, 3]
+
+    def test_reflection_data(self):
+        mod = self.compile(self.schema, lazy=True)
+        assert self.is_defined(mod, '_reflection_data') == self.pyx
+        reflection = capnpy.get_reflection_data(mod)
+        node = reflection.get_node(mod.Unrelated)
+        assert node.displayName.endswith(b'tmp.capnp:Unrelated')
+        #
+        mod = self.compile("""
+        @0xbf5147cbbecf40c1;
+        struct Point {
+            x @0 :Int64;
+        }
+        """, lazy=True, include_reflection_data=False)
+        assert mod.Point(x=1).x == 1
+        with pytest.raises(ValueError):
+            capnpy.get_reflection_data(mod)
+
+    def test_dir(self):
+        mod = self.compile(self.schema, lazy=True)
+        assert 'Unrelated' in dir(mod)
+        if not self.pyx:
+            # used by "from tmp import *"
+            assert 'Unrelated' in mod.__all__
+            assert 'Point_Nested' in mod.__all__
+        with pytest.raises(AttributeError) as exc:
+            mod.Foo
+        assert "has no attribute 'Foo'" in str(exc.value)
+
+    def test_extended(self):
+        self.write('tmp_extended.py', """
+        @Point.__extend__
+        class Point:
+            def norm(self):
+                return abs(self.x) + abs(self.y)
+        """)
+        mod = self.compile(self.schema, lazy=True)
+        assert mod.Point(x=3, y=-4, color=0).norm() == 7
@@ -110,3 +110,28 @@ class TestIntegration(CompilerTest):
         f1 = mod.Foo.from_buffer(buf, 0, 0, 1)
         f2 = mod.Foo.loads(f1.dumps())
         assert list(f1.items) == list(f2.items) == [True, True, False]
+
+    def test_big_object(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        struct Child {
+            items @0 :List(Int64);
+        }
+        struct Parent {
+            child @0 :Child;
+        }
+        """
+        mod = self.compile(schema)
+        # 72 MB, i.e. more than the default traversal limit: the objects
+        # built locally are trusted, so they can be copied and dumped
+        n = 9*1024*1024
+        c = mod.Child(items=range(n))
+        p = mod.Parent(child=c)
+        assert len(p.child.items) == n
+        buf = c.dumps(fastpath=False)
+        assert c.dumps(segment_size=1<<20) != buf
+        #
+        # but the limits are enforced on the loaded messages
+        c2 = mod.Child.loads(buf)
+        assert c2.items[n-1] == n-1
+        py.test.raises(ValueError, mod.Parent, child=c2)
@@ -0,0 +1,261 @@
+import py
+import pytest
+import textwrap
+
+import capnpy
+from capnpy.testing.compiler.support import CompilerTest
+from capnpy.compiler.compiler import CompilerError, DynamicCompiler
+from capnpy.compiler.parser import SchemaParser
+
+
+class TestSchemaParser(object):
+    """
+    Check that SchemaParser produces the same nodes as capnp compile
+    """
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmpdir):
+        self.tmpdir = tmpdir
+        root = py.path.local(capnpy.__file__).dirpath('..')
+        self.path = [root, tmpdir]
+
+    def write(self, filename, src):
+        f = self.tmpdir.join(filename)
+        f.write(textwrap.dedent(src), ensure=True)
+        return f
+
+    def parse(self, src):
+        f = self.write('tmp.capnp', src)
+        return SchemaParser(self.path).parse(f)
+
+    def compare(self, src):
+        f = self.write('tmp.capnp', src)
+        expected = DynamicCompiler(self.path).parse_schema(filename=f)
+        req = SchemaParser(self.path).parse(f)
+        nodes = dict((node.id, node) for node in req.nodes)
+        assert sorted(nodes) == sorted(node.id for node in expected.nodes)
+        for node in expected.nodes:
+            assert nodes[node.id].shortrepr() == node.shortrepr()
+        assert (req.requestedFiles[0].shortrepr() ==
+                expected.requestedFiles[0].shortrepr())
+        return req
+
+    def test_layout(self):
+        self.compare("""
+        @0xbf5147cbbecf40c1;
+        struct Foo {
+            a @0 :Int8;
+            b @1 :Int64;
+            c @2 :Bool;
+            d @3 :Int16;
+            e @4 :Text;
+            f @5 :Float32;
+            g @6 :List(Int32);
+            h @7 :Bool;
+            i @8 :UInt8;
+            j @9 :Void;
+        }
+        """)
+
+    def test_ids(self):
+        req = self.compare("""
+        @0xbf5147cbbecf40c1;
+        struct Foo {
+            struct Bar {
+                x @0 :Int64;
+            }
+            enum Color {
+                red @0;
+                green @1;
+            }
+            b @0 :Bar;
+            c @1 :Color;
+        }
+        struct Explicit @0xd5e8a7cfe1a5f0c3 {
+            x @0 :Int64;
+        }
+        """)
+        names = [node.displayName[node.displayNamePrefixLength:]
+                 for node in req.nodes]
+        assert names == [b'capnp', b'Foo', b'Bar', b'Color', b'Explicit']
+        assert req.nodes[4].id == 0xd5e8a7cfe1a5f0c3
+
+    def test_unions_and_groups(self):
+        self.compare("""
+        @0xbf5147cbbecf40c1;
+        struct Foo {
+            a @0 :Int32 = 5;
+            g :group {
+                c @1 :Bool;
+                d @2 :Text;
+            }
+            union {
+                e @3 :Void;
+                f @4 :Int16;
+                h :group {
+                    i @5 :Int8;
+                    j @6 :UInt64;
+                }
+                k @7 :Bool;
+            }
+            n :union {
+                x @8 :Int8;
+                y @9 :Void;
+                z :union {
+                    z1 @10 :Float64;
+                    z2 @11 :List(Text);
+                }
+            }
+        }
+        """)
+
+    def test_enum_const_annotation(self):
+        self.compare("""
+        @0xbf5147cbbecf40c1;
+        using Py = import "/capnpy/annotate.capnp";
+        annotation myann(struct, field, enumerant) :Text;
+        enum Color {
+            red @0;
+            green @1 $myann("g");
+            struct @2;
+        }
+        struct Point $Py.key("x, y") $myann("p") {
+            const origin :Int64 = -1;
+            x @0 :Int64 = .Point.origin;
+            y @1 :Float64 = -inf;
+            c @2 :Color = green $myann("c");
+            flag @3 :Bool = true;
+            p :group $Py.nullable {
+                isNull @4 :Int8;
+                value @5 :Int64;
+            }
+        }
+        const pi :Float64 = 3.14;
+        const name :Text = "hello\\n" " world";
+        const raw :Data = 0x"61 62 63";
+        const numbers :List(Int32) = [1, -2, 0x7f, 010];
+        const point :Point = (x = 1, y = 2.5, c = struct);
+        """)
+
+    def test_imports(self):
+        self.write('bar.capnp', """
+        @0xbf5147cbbecf40c2;
+        struct Bar {
+            x @0 :Int64;
+        }
+        struct Unused {
+            y @0 :Int64;
+        }
+        """)
+        self.write('sub/baz.capnp', """
+        @0xbf5147cbbecf40c3;
+        using import "/bar.capnp".Bar;
+        struct Baz {
+            b @0 :Bar;
+        }
+        """)
+        self.compare("""
+        @0xbf5147cbbecf40c1;
+        using Baz = import "sub/baz.capnp".Baz;
+        struct Foo {
+            a @0 :import "/bar.capnp".Bar;
+            b @1 :Baz;
+        }
+        """)
+
+    def test_errors(self):
+        def check(src, message):
+            exc = pytest.raises(CompilerError, self.parse, src)
+            assert message in str(exc.value)
+        #
+        check("""
+        struct Foo {}
+        """, 'File does not declare an ID')
+        check("""
+        @0xbf5147cbbecf40c1;
+        struct Foo {
+            x @0 :Int64;
+            y @2 :Int64;
+        }
+        """, 'tmp.capnp:5: error: Skipped or duplicate ordinal @1')
+        check("""
+        @0xbf5147cbbecf40c1;
+        struct Foo {
+            x @0 :Point;
+        }
+        """, 'Not defined: Point')
+        check("""
+        @0xbf5147cbbecf40c1;
+        using Py = import "/capnpy/annotate.capnp";
+        enum Foo $Py.key("x") {
+            x @0;
+        }
+        """, "'Py.key' cannot be applied to this kind of declaration")
+        check("""
+        @0xbf5147cbbecf40c1;
+        interface Foo {}
+        """, 'interfaces are not supported')
+        check("""
+        @0xbf5147cbbecf40c1;
+        struct Foo(T) {}
+        """, 'Parse error')
+        check("""
+        @0xbf5147cbbecf40c1;
+        struct Foo {
+            x @0 :Map(Text);
+        }
+        """, 'generics are not supported')
+        check("""
+        @0xbf5147cbbecf40c1;
+        struct Point {
+            x @0 :Int64;
+        }
+        const origin :Point = (x = 0);
+        struct Foo {
+            x @0 :AnyPointer = .origin;
+        }
+        """, 'tmp.capnp:8: error: values of type anyPointer are not '
+                'supported')
+
+
+class TestPythonParser(CompilerTest):
+
+    def compile(self, s):
+        root = py.path.local(capnpy.__file__).dirpath('..')
+        comp = DynamicCompiler([root, self.tmpdir], parser='python')
+        self.tmpdir.join('tmp.capnp').write(s)
+        return comp.load_schema(importname='/tmp.capnp', pyx=self.pyx)
+
+    def test_load_schema(self, monkeypatch):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        using Py = import "/capnpy/annotate.capnp";
+        enum Color {
+            red @0;
+            green @1;
+        }
+        struct Point $Py.key("x, y") {
+            x @0 :Int64 = 3;
+            y @1 :Float32;
+            color @2 :Color = green;
+            union {
+                empty @3 :Void;
+                name @4 :Text;
+            }
+        }
+        const origin :Point = (x = 0, y = 0.0, name = "origin");
+        """
+        def fail(*args):
+            assert False, 'capnp should not be called'
+        monkeypatch.setattr(DynamicCompiler, '_exec', fail)
+        mod = self.compile(schema)
+        self.check_pyx(mod)
+        p = mod.Point()
+        assert (p.x, p.y, p.color) == (3, 0.0, mod.Color.green)
+        assert p.is_empty()
+        assert mod.Point(x=1, y=2, name=b'p') == (1, 2)
+        assert mod.origin.x == 0
+        assert mod.origin.name == b'origin'
+
+    def test_invalid_parser(self):
+        pytest.raises(ValueError, DynamicCompiler, [], parser='foo')
@@ -0,0 +1,296 @@
+import py
+import pytest
+from six import b, u
+
+from capnpy.testing.compiler.support import CompilerTest
+
+
+class TestToDict(CompilerTest):
+
+    def test_primitive(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        enum Color {
+            red @0;
+            green @1;
+        }
+        struct Point {
+            x @0 :Int64;
+            y @1 :Int64 = 3;
+            flag @2 :Bool = true;
+            z @3 :Float64;
+            color @4 :Color;
+            nothing @5 :Void;
+        }
+        """
+        mod = self.compile(schema)
+        p = mod.Point(x=1, y=2, flag=False, z=1.5, color=mod.Color.green)
+        d = p.to_dict()
+        assert d == {'x': 1, 'y': 2, 'flag': False, 'z': 1.5, 'color': 1}
+        assert d['color'] == mod.Color.green
+        assert d['flag'] is False
+        #
+        p = mod.Point()
+        assert p.to_dict() == {'x': 0, 'y': 3, 'flag': True, 'z': 0.0,
+                               'color': 0}
+
+    def test_pointers(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        struct Point {
+            x @0 :Int64;
+            y @1 :Int64;
+        }
+        struct Foo {
+            name @0 :Text;
+            data @1 :Data;
+            p @2 :Point;
+            points @3 :List(Point);
+            matrix @4 :List(List(Int8));
+            names @5 :List(Text);
+        }
+        """
+        mod = self.compile(schema)
+        foo = mod.Foo(name=b'foo', data=b'bar', p=mod.Point(1, 2),
+                      points=[mod.Point(3, 4), mod.Point(5, 6)],
+                      matrix=[[1, 2], [3]], names=[b'a', b'b'])
+        assert foo.to_dict() == {
+            'name': b'foo',
+            'data': b'bar',
+            'p': {'x': 1, 'y': 2},
+            'points': [{'x': 3, 'y': 4}, {'x': 5, 'y': 6}],
+            'matrix': [[1, 2], [3]],
+            'names': [b'a', b'b'],
+        }
+        foo = mod.Foo()
+        assert foo.to_dict() == {'name': None, 'data': None, 'p': None,
+                                 'points': None, 'matrix': None,
+                                 'names': None}
+
+    def test_union(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        struct Shape {
+            area @0 :Int64;
+            union {
+                circle @1 :Int64;
+                empty @2 :Void;
+                rectangle :group {
+                    width @3 :Int64;
+                    height @4 :Int64;
+                }
+            }
+        }
+        """
+        mod = self.compile(schema)
+        s = mod.Shape(area=1, circle=2)
+        assert s.to_dict() == {'area': 1, 'circle': 2}
+        s = mod.Shape(area=1, empty=None)
+        assert s.to_dict() == {'area': 1, 'empty': None}
+        s = mod.Shape(area=1, rectangle=(3, 4))
+        assert s.to_dict() == {'area': 1,
+                               'rectangle': {'width': 3, 'height': 4}}
+
+    def test_nullable(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        using Py = import "/capnpy/annotate.capnp";
+        struct Foo {
+            x :group $Py.nullable {
+                isNull @0 :Int8;
+                value @1 :Int64;
+            }
+        }
+        """
+        mod = self.compile(schema)
+        assert mod.Foo(x=None).to_dict() == {'x': None}
+        assert mod.Foo(x=42).to_dict() == {'x': 42}
+
+    def test_text_unicode(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        using Py = import "/capnpy/annotate.capnp";
+        struct Foo $Py.options(textType=unicode) {
+            name @0 :Text;
+        }
+        """
+        mod = self.compile(schema)
+        foo = mod.Foo(name=u('hello'))
+        assert foo.to_dict() == {'name': u('hello')}
+
+
+class TestFromDict(CompilerTest):
+
+    def test_primitive(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        enum Color {
+            red @0;
+            green @1;
+        }
+        struct Point {
+            x @0 :Int64;
+            y @1 :Int64 = 3;
+            flag @2 :Bool = true;
+            z @3 :Float64;
+            color @4 :Color;
+        }
+        """
+        mod = self.compile(schema)
+        p = mod.Point.from_dict({'x': 1, 'y': 2, 'flag': False, 'z': 1.5,
+                                 'color': mod.Color.green})
+        assert p.x == 1
+        assert p.y == 2
+        assert p.flag is False
+        assert p.z == 1.5
+        assert p.color == mod.Color.green
+        #
+        # missing keys get the default value
+        p = mod.Point.from_dict({})
+        assert p.to_dict() == mod.Point().to_dict()
+
+    def test_pointers(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        struct Point {
+            x @0 :Int64;
+            y @1 :Int64;
+            name @2 :Text;
+        }
+        struct Foo {
+            name @0 :Text;
+            data @1 :Data;
+            p @2 :Point;
+            points @3 :List(Point);
+            matrix @4 :List(List(Int8));
+            names @5 :List(Text);
+            nested @6 :List(List(Point));
+        }
+        """
+        mod = self.compile(schema)
+        d = {
+            'name': b'foo',
+            'data': b'bar',
+            'p': {'x': 1, 'y': 2, 'name': b'p'},
+            'points': [{'x': 3, 'y': 4, 'name': None},
+                       {'x': 5, 'y': 6, 'name': b'q'}],
+            'matrix': [[1, 2], [3]],
+            'names': [b'a', b'b'],
+            'nested': [[{'x': 7, 'y': 8, 'name': b'r'}], []],
+        }
+        foo = mod.Foo.from_dict(d)
+        assert foo.p.name == b'p'
+        assert foo.points[1].name == b'q'
+        assert foo.nested[0][0].x == 7
+        assert foo.to_dict() == d
+        #
+        # struct instances are accepted as well
+        foo = mod.Foo.from_dict({'p': mod.Point(1, 2, b'p'),
+                                 'points': [mod.Point(3, 4, None)]})
+        assert foo.p.to_dict() == {'x': 1, 'y': 2, 'name': b'p'}
+        assert foo.points[0].x == 3
+        assert foo.name is None
+
+    def test_union(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        struct Shape {
+            area @0 :Int64;
+            union {
+                circle @1 :Int64;
+                empty @2 :Void;
+                rectangle :group {
+                    width @3 :Int64;
+                    height @4 :Int64;
+                }
+            }
+        }
+        """
+        mod = self.compile(schema)
+        for d in [{'area': 1, 'circle': 2},
+                  {'area': 1, 'empty': None},
+                  {'area': 1, 'rectangle': {'width': 3, 'height': 4}}]:
+            assert mod.Shape.from_dict(d).to_dict() == d
+        #
+        s = mod.Shape.from_dict({'rectangle': {'height': 4}})
+        assert s.is_rectangle()
+        assert s.rectangle.width == 0
+        assert s.rectangle.height == 4
+        #
+        pytest.raises(TypeError, mod.Shape.from_dict,
+                      {'circle': 2, 'empty': None})
+
+    def test_nested_union(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        struct Shape {
+            area @0 :Int64;
+            union {
+                circle @1 :Int64;
+                square @2 :Int64;
+            }
+        }
+        struct Drawing {
+            main @0 :Shape;
+            shapes @1 :List(Shape);
+        }
+        """
+        mod = self.compile(schema)
+        # the tag of the nested structs must be written at their own
+        # position, not at the start of the buffer
+        d = {'main': {'area': 1, 'square': 2},
+             'shapes': [{'area': 3, 'circle': 4}, {'area': 5, 'square': 6}]}
+        drawing = mod.Drawing.from_dict(d)
+        assert drawing.main.is_square()
+        assert drawing.shapes[0].is_circle()
+        assert drawing.shapes[1].is_square()
+        assert drawing.to_dict() == d
+
+    def test_builtin_names(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        struct Point {
+            x @0 :Int64;
+        }
+        struct Foo {
+            int @0 :Int64;
+            void @1 :Int64;
+            dict @2 :Text;
+            p @3 :Point;
+        }
+        """
+        mod = self.compile(schema)
+        # the generated code uses e.g. isinstance(p, dict): the local
+        # variables must not shadow it
+        d = {'int': 1, 'void': 2, 'dict': b'x', 'p': {'x': 3}}
+        assert mod.Foo.from_dict(d).to_dict() == d
+
+    def test_nullable(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        using Py = import "/capnpy/annotate.capnp";
+        struct Foo {
+            x :group $Py.nullable {
+                isNull @0 :Int8;
+                value @1 :Int64;
+            }
+            flag @2 :Bool;
+        }
+        """
+        mod = self.compile(schema)
+        assert mod.Foo.from_dict({'x': None}).x is None
+        assert mod.Foo.from_dict({'x': 42}).x == 42
+        foo = mod.Foo.from_dict({'x': 42, 'flag': True})
+        assert foo.to_dict() == {'x': 42, 'flag': True}
+
+    def test_text_unicode(self):
+        schema = """
+        @0xbf5147cbbecf40c1;
+        using Py = import "/capnpy/annotate.capnp";
+        struct Foo $Py.options(textType=unicode) {
+            name @0 :Text;
+        }
+        """
+        mod = self.compile(schema)
+        foo = mod.Foo.from_dict({'name': u('hello')})
+        assert foo.name == u('hello')
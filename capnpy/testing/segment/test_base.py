@@ -31,6 +31,23 @@ class TestBaseSegment(object):
         assert s.read_int64(8) == 43
         assert s.read_int64(16) == 44
 
+    def test_buffer_protocol(self):
+        buf = struct.pack('qqq', 42, 43, 44)
+        s = BaseSegment(bytearray(buf))
+        assert s.read_int64(0) == 42
+        s = BaseSegment(memoryview(buf)[8:])
+        assert s.read_int64(0) == 43
+        assert s.read_int64(8) == 44
+        pytest.raises(IndexError, s.read_int64, 16)
+
+    def test_read_bytes(self):
+        s = BaseSegment(memoryview(b'hello world'))
+        assert s.read_bytes(6, 11) == b'world'
+        assert type(s.read_bytes(6, 11)) is bytes
+        assert s.read_bytes(6, 5) == b''
+        pytest.raises(IndexError, s.read_bytes, 6, 12)
+        pytest.raises(IndexError, s.read_bytes, -1, 5)
+
     def test_read_ints(self):
         buf = b'garbage0' + b'\xff' * 8
         s = BaseSegment(buf)
@@ -86,6 +103,32 @@ class TestBaseSegment(object):
             val2 = struct.unpack_from(fmt, buf, 0)[0]
             assert val == val2
 
+    def test_write_primitive(self):
+        buf = bytearray(16)
+        s = BaseSegment(buf)
+        assert s.writable
+        for fmt, val in [('q', -42), ('Q', 2**63+1), ('i', -42), ('I', 2**31),
+                         ('h', -42), ('H', 2**15), ('b', -42), ('B', 200),
+                         ('d', 1.5), ('f', 2.25)]:
+            s.write_primitive(8, ord(fmt), val)
+            assert s.read_primitive(8, ord(fmt)) == val
+            assert struct.unpack_from('<'+fmt, buf, 8)[0] == val
+        pytest.raises(IndexError, s.write_primitive, 16, ord('b'), 0)
+        pytest.raises(IndexError, s.write_primitive, 12, ord('q'), 0)
+        pytest.raises(IndexError, s.write_primitive, -1, ord('b'), 0)
+
+    def test_write_readonly(self):
+        s = BaseSegment(b'\x00' * 8)
+        assert not s.writable
+        pytest.raises(TypeError, s.write_primitive, 0, ord('q'), 42)
+        s = BaseSegment(memoryview(b'\x00' * 8))
+        assert not s.writable
+        pytest.raises(TypeError, s.write_primitive, 0, ord('q'), 42)
+        s = BaseSegment(memoryview(bytearray(8)))
+        assert s.writable
+        s.write_primitive(0, ord('q'), 42)
+        assert s.read_int64(0) == 42
+
     def test_errors(self):
         buf = b'\xff' * 8
         s = BaseSegment(buf)
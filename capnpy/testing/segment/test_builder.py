@@ -7,9 +7,10 @@ from capnpy.blob import PYX
 from capnpy import ptr
 from capnpy.printer import print_buffer
 from capnpy.segment.segment import Segment
-from capnpy.segment.builder import SegmentBuilder
+from capnpy.segment.builder import SegmentBuilder, size_hint
 from capnpy.struct_ import Struct
-from capnpy.list import PrimitiveItemType, StructItemType, TextItemType
+from capnpy.list import (PrimitiveItemType, BoolItemType, StructItemType,
+                         TextItemType)
 from capnpy.type import Types
 
 class TestSegmentBuilder(object):
@@ -32,6 +33,63 @@ class TestSegmentBuilder(object):
         assert s[:8] == struct.pack('q', 42)
         assert s[8:] == b'\x00' * (64*64-8)
 
+    def test_capacity(self):
+        buf = SegmentBuilder(64)
+        assert buf.length == 64
+        buf.allocate(64)
+        assert buf.length == 64
+        assert buf.get_length() == 64
+        buf.allocate(8)
+        # the buffer grows geometrically, not by 8 bytes
+        assert buf.length > 128
+        assert buf.get_length() == 72
+        assert buf.as_string() == b'\x00' * 72
+
+    def test_size_hint(self):
+        import array
+        assert size_hint(None, 1) == 0
+        assert size_hint(b'hello', 1) == 8
+        assert size_hint(b'1234567', 1) == 8    # 7 chars + trailing zero
+        assert size_hint(b'12345678', 1) == 16
+        assert size_hint([1, 2, 3], 8) == 32
+        assert size_hint(array.array('b', [1, 2, 3]), 1) == 8
+        assert size_hint(object(), 8) == 0
+
+    def test_segments(self):
+        buf = SegmentBuilder(segment_size=32)
+        buf.allocate(8)                     # root pointer
+        pos = buf.alloc_struct(0, 0, 3)     # fits in segment 0
+        assert pos == 8
+        # this does not fit in segment 0: a new segment is started, and the
+        # landing pad is written just before the list
+        pos = buf.alloc_list(8, ptr.LIST_SIZE_64, 1, 8)
+        assert pos == 40
+        # this fits in segment 1, but the pointer is in segment 0
+        pos = buf.alloc_list(16, ptr.LIST_SIZE_64, 1, 8)
+        assert pos == 56
+        assert buf.get_segment_sizes() == [4, 4]
+        ptrs = struct.unpack('<8q', buf.as_string())
+        assert ptrs[0] == ptr.new_struct(0, 0, 3)
+        assert ptrs[1] == ptr.new_far(0, 0, 1)
+        assert ptrs[2] == ptr.new_far(0, 2, 1)
+        assert ptrs[3] == 0
+        assert ptrs[4] == ptr.new_list(0, ptr.LIST_SIZE_64, 1) # landing pad
+        assert ptrs[6] == ptr.new_list(0, ptr.LIST_SIZE_64, 1) # landing pad
+        #
+        buf.reset()
+        assert buf.get_segment_sizes() == [0]
+
+    def test_reset(self):
+        buf = SegmentBuilder()
+        buf.allocate(16)
+        buf.write_int64(0, 42)
+        buf.write_int64(8, 43)
+        buf.reset()
+        assert buf.get_length() == 0
+        assert buf.allocate(16) == 0
+        # the memory is zeroed again
+        assert buf.as_string() == b'\x00' * 16
+
     @pytest.mark.skipif(not PYX, reason='PYX only')
     def test_resize_big_allocation(self):
         buf = SegmentBuilder(32)
@@ -195,6 +253,67 @@ class TestSegmentBuilder(object):
             '\xd9\xce\xf7\x53\xe3\xa5\x0b\x40'   # 3.456
             '\xf8\x53\xe3\xa5\x9b\x44\x12\x40')  # 4.567
 
+    def test_copy_from_list_array(self):
+        import array
+        buf = SegmentBuilder()
+        pos = buf.allocate(8)
+        item_type = PrimitiveItemType(Types.int16)
+        buf.copy_from_list(pos, item_type, array.array('h', [1, 2, -1]))
+        s = buf.as_string()
+        assert s == b(
+            '\x01\x00\x00\x00\x1b\x00\x00\x00'   # ptrlist
+            '\x01\x00\x02\x00\xff\xff\x00\x00')  # 1,2,-1 + padding
+
+    def test_copy_from_list_memoryview(self):
+        import array
+        items = array.array('d', [1.234, 2.345, 3.456, 4.567])
+        buf1 = SegmentBuilder()
+        pos = buf1.allocate(8)
+        item_type = PrimitiveItemType(Types.float64)
+        buf1.copy_from_list(pos, item_type, memoryview(items))
+        buf2 = SegmentBuilder()
+        pos = buf2.allocate(8)
+        buf2.copy_from_list(pos, item_type, list(items))
+        assert buf1.as_string() == buf2.as_string()
+
+    def test_copy_from_list_numpy(self):
+        np = pytest.importorskip('numpy')
+        item_type = PrimitiveItemType(Types.int64)
+        expected = b(
+            '\x01\x00\x00\x00\x1d\x00\x00\x00'   # ptrlist
+            '\x01\x00\x00\x00\x00\x00\x00\x00'   # 1
+            '\x02\x00\x00\x00\x00\x00\x00\x00'   # 2
+            '\x03\x00\x00\x00\x00\x00\x00\x00')  # 3
+        arrays = [
+            np.array([1, 2, 3], dtype='<i8'),         # fast path
+            np.array([1, 2, 3], dtype='>i8'),         # big endian
+            np.array([1, 0, 2, 0, 3])[::2],           # not contiguous
+            np.array([1, 2, 3], dtype=np.int32),      # wrong item size
+        ]
+        for arr in arrays:
+            buf = SegmentBuilder()
+            pos = buf.allocate(8)
+            buf.copy_from_list(pos, item_type, arr)
+            assert buf.as_string() == expected
+
+    def test_copy_from_list_bool(self):
+        buf = SegmentBuilder()
+        pos = buf.allocate(8)
+        item_type = BoolItemType()
+        items = [True, False, True, True, False, False, False, False,
+                 False, True]
+        buf.copy_from_list(pos, item_type, items)
+        s = buf.as_string()
+        assert s == b(
+            '\x01\x00\x00\x00\x51\x00\x00\x00'   # ptrlist
+            '\x0d\x02\x00\x00\x00\x00\x00\x00')  # 0b1101, 0b10
+        #
+        np = pytest.importorskip('numpy')
+        buf = SegmentBuilder()
+        pos = buf.allocate(8)
+        buf.copy_from_list(pos, item_type, np.array(items))
+        assert buf.as_string() == s
+
     def test_copy_from_list_of_structs(self):
         class Point(Struct):
             __static_data_size__ = 2
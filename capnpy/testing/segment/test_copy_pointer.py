@@ -4,6 +4,7 @@ from six import b
 
 from capnpy import ptr
 from capnpy.printer import print_buffer
+from capnpy.segment import base
 from capnpy.segment.segment import Segment, MultiSegment
 from capnpy.segment.builder import SegmentBuilder, copy_pointer
 
@@ -16,6 +17,13 @@ class TestCopyPointer(object):
             bufsize = len(src)+8
         return self.copy_struct_segment(src_seg, offset, data_size, ptrs_size, bufsize)
 
+    def untrusted_segment(self, src):
+        # the segments of the loaded messages have the default limits
+        src_seg = Segment(src)
+        src_seg.traversal_limit = base.TRAVERSAL_LIMIT
+        src_seg.nesting_limit = base.NESTING_LIMIT
+        return src_seg
+
     def copy_struct_segment(self, src_seg, offset, data_size, ptrs_size, bufsize):
         dst = SegmentBuilder(bufsize)
         dst_pos = dst.allocate(8) # allocate the space to store the pointer p
@@ -320,3 +328,46 @@ class TestCopyPointer(object):
             '\x00\x00\x00\x00\x02\x00\x00\x00'    # ptr to B {x, y}
             '\x01\x00\x00\x00\x00\x00\x00\x00'    # x == 1
             '\x02\x00\x00\x00\x00\x00\x00\x00')   # y == 2
+
+    def test_nesting_limit(self):
+        # a struct whose only pointer points to itself
+        src = struct.pack('q', ptr.new_struct(-1, 0, 1))
+        src_seg = self.untrusted_segment(src)
+        with pytest.raises(ValueError) as exc:
+            self.copy_struct_segment(src_seg, offset=0, data_size=0,
+                                     ptrs_size=1, bufsize=16)
+        assert 'nesting limit of 64' in str(exc.value)
+        #
+        # a chain of 3 nested structs
+        src = struct.pack('qqq', ptr.new_struct(0, 0, 1),
+                          ptr.new_struct(0, 0, 1), 0)
+        self.copy_struct(src, offset=0, data_size=0, ptrs_size=1)
+        src_seg = Segment(src)
+        src_seg.nesting_limit = 2
+        pytest.raises(ValueError, self.copy_struct_segment, src_seg,
+                      offset=0, data_size=0, ptrs_size=1, bufsize=32)
+
+    def test_traversal_limit(self):
+        # a struct with 4 pointers to the same struct of 4 words: the copy is
+        # bigger than the original message
+        p = ptr.new_struct(3, 4, 0)
+        src = struct.pack('qqqqqqqq', p, p - (1 << 2), p - (2 << 2),
+                          p - (3 << 2), 1, 2, 3, 4)
+        src_seg = Segment(src)
+        src_seg.traversal_limit = 20
+        self.copy_struct_segment(src_seg, offset=0, data_size=0, ptrs_size=4,
+                                 bufsize=32)
+        src_seg.traversal_limit = 19
+        with pytest.raises(ValueError) as exc:
+            self.copy_struct_segment(src_seg, offset=0, data_size=0,
+                                     ptrs_size=4, bufsize=32)
+        assert 'traversal limit of 19 words' in str(exc.value)
+
+    def test_traversal_limit_empty_structs(self):
+        # a list of 2**29-1 empty structs takes no space
+        tag = ptr.new_struct(2**29-1, 0, 0)
+        src = struct.pack('qq', ptr.new_list(0, ptr.LIST_SIZE_COMPOSITE, 0),
+                          tag)
+        src_seg = self.untrusted_segment(src)
+        pytest.raises(ValueError, self.copy_struct_segment, src_seg, offset=0,
+                      data_size=0, ptrs_size=1, bufsize=24)
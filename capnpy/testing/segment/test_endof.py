@@ -1,3 +1,4 @@
+import pytest
 from six import b
 
 from capnpy import ptr
@@ -307,3 +308,15 @@ class TestEndOf(object):
         seg = MultiSegment(seg0+seg1, segment_offsets=(0, 8))
         end = self.endof(seg, offset=0, data_size=0, ptrs_size=1)
         assert end == -1
+
+    def test_nesting_limit(self):
+        # a chain of 3 nested structs
+        buf = b('\x00\x00\x00\x00\x00\x00\x01\x00'    # ptr (0, 1)
+                '\x00\x00\x00\x00\x00\x00\x01\x00'    # ptr (0, 1)
+                '\x00\x00\x00\x00\x00\x00\x00\x00')   # null ptr
+        seg = Segment(buf)
+        assert self.endof(seg, 0, data_size=0, ptrs_size=1) == 24
+        seg.nesting_limit = 2
+        with pytest.raises(ValueError) as exc:
+            self.endof(seg, 0, data_size=0, ptrs_size=1)
+        assert 'nesting limit of 2' in str(exc.value)
@@ -36,6 +36,23 @@ def test_read_str():
     s = bb.read_str(p, 0, "", additional_size=0)
     assert s == b"hello capnproto\0"
 
+def test_read_str_memoryview():
+    buf = b('garbage0'
+            'hello capnproto\0') # string
+    p = ptr.new_list(0, ptr.LIST_SIZE_8, 16)
+    bb = Segment(memoryview(buf))
+    s = bb.read_str(p, 0, "", additional_size=-1)
+    assert type(s) is bytes
+    assert s == b"hello capnproto"
+    h = bb.hash_str(p, 0, 0, additional_size=-1)
+    assert h == hash(b"hello capnproto")
+
+def test_Segment_pickle_memoryview():
+    import pickle
+    buf = Segment(memoryview(b'hello'))
+    buf2 = pickle.loads(pickle.dumps(buf))
+    assert buf2.buf == b'hello'
+
 def test_hash_str():
     buf = b('garbage0'
             'hello capnproto\0') # string
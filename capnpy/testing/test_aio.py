@@ -0,0 +1,115 @@
+import pytest
+from six import b, PY3
+from capnpy.struct_ import Struct
+from capnpy.type import Types
+if PY3:
+    import asyncio
+    from capnpy import aio
+
+pytestmark = pytest.mark.skipif(not PY3, reason='asyncio requires Python 3')
+
+ONE = b('\x00\x00\x00\x00\x03\x00\x00\x00'   # message header: 1 segment, size 3 words
+        '\x00\x00\x00\x00\x02\x00\x00\x00'   # ptr to payload (Point {x, y})
+        '\x01\x00\x00\x00\x00\x00\x00\x00'   # x == 1
+        '\x02\x00\x00\x00\x00\x00\x00\x00')  # y == 2
+
+TWO = b('\x00\x00\x00\x00\x03\x00\x00\x00'   # message header: 1 segment, size 3 words
+        '\x00\x00\x00\x00\x02\x00\x00\x00'   # ptr to payload (Point {x, y})
+        '\x03\x00\x00\x00\x00\x00\x00\x00'   # x == 3
+        '\x04\x00\x00\x00\x00\x00\x00\x00')  # y == 4
+
+
+@pytest.fixture
+def run():
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+def get_x(p):
+    return p._read_primitive(0, Types.int64.ifmt)
+
+def make_reader(buf):
+    reader = asyncio.StreamReader()
+    reader.feed_data(buf)
+    reader.feed_eof()
+    return reader
+
+
+def test_load(run):
+    reader = make_reader(ONE)
+    p = run(aio.load(reader, Struct))
+    assert isinstance(p, Struct)
+    assert get_x(p) == 1
+    with pytest.raises(EOFError):
+        run(aio.load(reader, Struct))
+
+def test_load_multiple_segments(run):
+    buf = b('\x01\x00\x00\x00'  # 1+1 segments
+            '\x01\x00\x00\x00'  # size0: 1
+            '\x02\x00\x00\x00'  # size1: 2
+            '\x00\x00\x00\x00'  # padding
+            '\x02\x00\x00\x00\x01\x00\x00\x00'  # far ptr: segment 1, offset 0
+            '\x00\x00\x00\x00\x01\x00\x00\x00'  # ptr to payload (Point {x})
+            '\x2a\x00\x00\x00\x00\x00\x00\x00') # x == 42
+    p = run(aio.load(make_reader(buf), Struct))
+    assert p._seg.segment_offsets == (0, 8)
+    assert get_x(p) == 42
+
+def test_load_errors(run):
+    with pytest.raises(ValueError) as exc:
+        run(aio.load(make_reader(b'\x03\x00\x00'), Struct))
+    assert str(exc.value) == 'Malformed header: expected 4 bytes, got 3'
+    #
+    with pytest.raises(ValueError) as exc:
+        run(aio.load(make_reader(b'hello'), Struct))
+    assert str(exc.value) == 'Unexpected EOF when reading the header'
+    #
+    with pytest.raises(ValueError) as exc:
+        run(aio.load(make_reader(ONE[:-8]), Struct))
+    assert str(exc.value) == ("Unexpected EOF: expected 24 bytes, got "
+                              "only 16. Segments size: [3]")
+
+def test_load_all(run):
+    reader = make_reader(ONE + TWO)
+    it = aio.load_all(reader, Struct)
+    assert it.__aiter__() is it
+    assert get_x(run(it.__anext__())) == 1
+    assert get_x(run(it.__anext__())) == 3
+    with pytest.raises(StopAsyncIteration):
+        run(it.__anext__())
+
+
+class FakeStreamWriter(object):
+
+    def __init__(self):
+        self.chunks = []
+        self.drained = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(data)
+
+    def drain(self):
+        self.drained += 1
+        return asyncio.sleep(0)
+
+    def close(self):
+        self.closed = True
+
+
+def test_MessageWriter(run):
+    p1 = Struct.loads(ONE)
+    p2 = Struct.loads(TWO)
+    writer = FakeStreamWriter()
+    w = aio.MessageWriter(writer, bufsize=64)
+    w.write(p1)
+    assert writer.chunks == []
+    w.write(p2)
+    assert writer.chunks == [ONE + TWO]
+    w.write(p1)
+    run(w.drain())
+    assert writer.chunks == [ONE + TWO, ONE]
+    assert writer.drained == 1
+    run(w.close())
+    assert writer.chunks == [ONE + TWO, ONE]
+    assert writer.closed
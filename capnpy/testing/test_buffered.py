@@ -1,5 +1,8 @@
 import pytest
-from capnpy.buffered import BufferedStream, BufferedSocket, StringBuffer
+from io import BytesIO
+from capnpy.buffered import (BufferedStream, BufferedSocket, StringBuffer,
+                             PackedStream)
+from capnpy.packing import pack_words
 
 class FakeSocket(object):
 
@@ -164,3 +167,23 @@ class TestStringBuffer(object):
         assert f.readline() == b'dddd'
         assert f.readline() == b''
         assert f.read(2) == b''
+
+
+class TestPackedStream(object):
+
+    def test_read(self):
+        unpacked = b'ABCDEFGH' + b'\x00'*16 + b'\x01\x00\x00\x00\x00\x00\x00\x00'
+        packed = pack_words(unpacked)
+        # use a tiny bufsize to exercise the incomplete words
+        for bufsize in range(1, len(packed)+1):
+            f = PackedStream(BytesIO(packed), bufsize=bufsize)
+            assert f.read(4) == b'ABCD'
+            assert f.read(12) == b'EFGH' + b'\x00'*8
+            assert f.read() == unpacked[16:]
+            assert f.read(1) == b''
+
+    def test_truncated(self):
+        packed = pack_words(b'ABCDEFGH')
+        f = PackedStream(BytesIO(packed[:-1]))
+        with pytest.raises(ValueError):
+            f.read(8)
@@ -0,0 +1,139 @@
+import py
+import os
+import struct
+from capnpy.struct_ import Struct
+from capnpy.type import Types
+from capnpy.index import (scan_messages, build_index, load_index,
+                          IndexedMessages, HEADER, ENTRY)
+
+
+def make_message(x):
+    # a single-segment message containing a Point {x, y=x+1}
+    return struct.pack('<IIqqq', 0, 3, 0x0000000200000000, x, x+1)
+
+def make_multisegment_message(x):
+    header = struct.pack('<IIII', 1, 1, 2, 0) # 2 segments, 1+2 words, padding
+    payload = struct.pack('<qqq',
+                          0x0000000100000002,   # far ptr: segment 1, offset 0
+                          0x0000000100000000,   # ptr to payload (Point {x})
+                          x)
+    return header + payload
+
+def write_messages(tmpdir, n):
+    myfile = tmpdir.join('messages.bin')
+    parts = []
+    for i in range(n):
+        if i % 3 == 0:
+            parts.append(make_multisegment_message(i))
+        else:
+            parts.append(make_message(i))
+    myfile.write(b''.join(parts), mode='wb')
+    return myfile, parts
+
+def read_x(p):
+    return p._read_primitive(0, Types.int64.ifmt)
+
+
+def test_scan_messages(tmpdir):
+    myfile, parts = write_messages(tmpdir, 5)
+    with myfile.open('rb') as f:
+        entries = list(scan_messages(f))
+    offset = 0
+    expected = []
+    for part in parts:
+        expected.append((offset, len(part)))
+        offset += len(part)
+    assert entries == expected
+
+def test_scan_messages_truncated(tmpdir):
+    myfile = tmpdir.join('messages.bin')
+    myfile.write(make_message(1) + make_message(2)[:-8], mode='wb')
+    with myfile.open('rb') as f:
+        entries = scan_messages(f)
+        assert next(entries) == (0, 32)
+        py.test.raises(ValueError, next, entries)
+
+def test_build_index(tmpdir):
+    myfile, parts = write_messages(tmpdir, 5)
+    index_path = build_index(str(myfile))
+    assert index_path == str(myfile) + '.idx'
+    msgs = IndexedMessages(str(myfile), Struct)
+    assert len(msgs) == 5
+    assert [read_x(p) for p in msgs] == [0, 1, 2, 3, 4]
+    assert msgs.get_entry(1) == (len(parts[0]), len(parts[1]))
+
+def test_getitem(tmpdir):
+    myfile, parts = write_messages(tmpdir, 10)
+    index_path = str(tmpdir.join('myindex'))
+    build_index(str(myfile), index_path)
+    msgs = IndexedMessages(str(myfile), Struct, index_path)
+    assert read_x(msgs[7]) == 7
+    assert read_x(msgs[-1]) == 9
+    assert [read_x(p) for p in msgs[2:8:3]] == [2, 5]
+    py.test.raises(IndexError, msgs.__getitem__, 10)
+    py.test.raises(IndexError, msgs.__getitem__, -11)
+
+def test_auto_build(tmpdir):
+    myfile, parts = write_messages(tmpdir, 3)
+    msgs = IndexedMessages(str(myfile), Struct)
+    assert tmpdir.join('messages.bin.idx').check()
+    assert len(msgs) == 3
+
+def test_empty(tmpdir):
+    myfile = tmpdir.join('messages.bin')
+    myfile.write(b'', mode='wb')
+    msgs = IndexedMessages(str(myfile), Struct)
+    assert len(msgs) == 0
+    assert list(msgs) == []
+
+def test_out_of_date(tmpdir):
+    myfile, parts = write_messages(tmpdir, 3)
+    build_index(str(myfile))
+    myfile.write(b''.join(parts) + make_message(42), mode='wb')
+    # the index is rebuilt automatically
+    msgs = IndexedMessages(str(myfile), Struct)
+    assert len(msgs) == 4
+    assert read_x(msgs[3]) == 42
+
+def test_out_of_date_same_size(tmpdir):
+    myfile, parts = write_messages(tmpdir, 3)
+    build_index(str(myfile))
+    # rewrite the file in place, with the same size but a different mtime
+    myfile.write(make_message(7) + b''.join(parts[1:]), mode='wb')
+    st = os.stat(str(myfile))
+    os.utime(str(myfile), (st.st_atime, st.st_mtime + 10))
+    msgs = IndexedMessages(str(myfile), Struct)
+    assert read_x(msgs[0]) == 7
+
+def test_invalid_index(tmpdir):
+    myfile, parts = write_messages(tmpdir, 3)
+    index = tmpdir.join('messages.bin.idx')
+    index.write(b'hello world', mode='wb')
+    py.test.raises(ValueError, load_index, str(index))
+    # the index is rebuilt automatically
+    msgs = IndexedMessages(str(myfile), Struct)
+    assert len(msgs) == 3
+    assert load_index(str(index))[1] == msgs._entries
+
+def test_interrupted_build(tmpdir):
+    myfile, parts = write_messages(tmpdir, 3)
+    index = tmpdir.join('messages.bin.idx')
+    # what build_index() leaves behind if it is interrupted: the header is
+    # still zeroed
+    index.write(b'\0' * HEADER.size + ENTRY.pack(0, 32), mode='wb')
+    py.test.raises(ValueError, load_index, str(index))
+    msgs = IndexedMessages(str(myfile), Struct)
+    assert len(msgs) == 3
+
+def test_build_index_missing_file(tmpdir):
+    # an existing index is not removed if we cannot read the file
+    index = tmpdir.join('messages.bin.idx')
+    index.write(b'hello world', mode='wb')
+    py.test.raises(IOError, build_index, str(tmpdir.join('messages.bin')))
+    assert index.read_binary() == b'hello world'
+
+def test_build_index_truncated(tmpdir):
+    myfile = tmpdir.join('messages.bin')
+    myfile.write(make_message(1) + make_message(2)[:-8], mode='wb')
+    py.test.raises(ValueError, build_index, str(myfile))
+    assert not tmpdir.join('messages.bin.idx').check()
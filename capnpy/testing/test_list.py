@@ -2,12 +2,13 @@
 
 import py
 import pytest
+import struct
 import six
 from six import b
 
 from capnpy.printer import print_buffer
 from capnpy.type import Types
-from capnpy.segment.segment import MultiSegment
+from capnpy.segment.segment import Segment, MultiSegment
 from capnpy import ptr
 from capnpy.list import (List, ItemType, VoidItemType, BoolItemType,
                          StructItemType, PrimitiveItemType, TextItemType,
@@ -289,6 +290,235 @@ def test_ListItem_far_pointer():
     assert list(ghij) == [ord('G'), ord('H'), ord('I'), ord('J'), 0]
 
 
+def test_traversal_limit():
+    seg = Segment(b'')
+    lst = List.from_buffer(seg, 0, ptr.LIST_SIZE_VOID, 100, VoidItemType())
+    assert len(lst) == 100
+    seg = Segment(b'')
+    seg.traversal_limit = 99
+    pytest.raises(ValueError, List.from_buffer, seg, 0, ptr.LIST_SIZE_VOID,
+                  100, VoidItemType())
+    #
+    # a list of empty structs
+    class Empty(Struct):
+        __static_data_size__ = 0
+        __static_ptrs_size__ = 0
+    buf = struct.pack('q', ptr.new_struct(100, 0, 0))
+    seg = Segment(buf)
+    seg.traversal_limit = 99
+    pytest.raises(ValueError, List.from_buffer, seg, 0,
+                  ptr.LIST_SIZE_COMPOSITE, 0, StructItemType(Empty))
+
+
+class TestAsArray(object):
+
+    @pytest.fixture(autouse=True)
+    def numpy(self):
+        return pytest.importorskip('numpy')
+
+    def test_int64(self, numpy):
+        buf = b('\x01\x00\x00\x00\x25\x00\x00\x00'   # ptrlist
+                '\x01\x00\x00\x00\x00\x00\x00\x00'   # 1
+                '\x02\x00\x00\x00\x00\x00\x00\x00'   # 2
+                '\x03\x00\x00\x00\x00\x00\x00\x00'   # 3
+                '\xff\xff\xff\xff\xff\xff\xff\xff')  # -1
+        blob = Struct.from_buffer(buf, 0, data_size=0, ptrs_size=1)
+        lst = blob._read_list(0, PrimitiveItemType(Types.int64))
+        arr = lst.as_array()
+        assert arr.dtype == numpy.dtype('<i8')
+        assert arr.tolist() == [1, 2, 3, -1]
+        assert not arr.flags.writeable
+        #
+        lst = blob._read_list(0, PrimitiveItemType(Types.uint64))
+        assert lst.as_array().tolist() == [1, 2, 3, 2**64-1]
+
+    def test_float(self, numpy):
+        buf = b('\x01\x00\x00\x00\x25\x00\x00\x00'   # ptrlist
+                '\x58\x39\xb4\xc8\x76\xbe\xf3\x3f'   # 1.234
+                '\xc3\xf5\x28\x5c\x8f\xc2\x02\x40'   # 2.345
+                '\xd9\xce\xf7\x53\xe3\xa5\x0b\x40'   # 3.456
+                '\xf8\x53\xe3\xa5\x9b\x44\x12\x40')  # 4.567
+        blob = Struct.from_buffer(buf, 0, data_size=0, ptrs_size=1)
+        lst = blob._read_list(0, PrimitiveItemType(Types.float64))
+        arr = lst.as_array()
+        assert arr.dtype == numpy.dtype('<f8')
+        assert arr.tolist() == [1.234, 2.345, 3.456, 4.567]
+
+    def test_small_ints(self, numpy):
+        buf = b('\x01\x00\x00\x00\x82\x00\x00\x00'   # ptrlist
+                'hello capnproto\0')                 # string
+        blob = Struct.from_buffer(buf, 0, data_size=0, ptrs_size=1)
+        lst = blob._read_list(0, PrimitiveItemType(Types.uint8))
+        assert lst.as_array().tobytes() == b'hello capnproto\0'
+        # the same memory, seen as a list of 16 bits ints
+        buf = b('\x01\x00\x00\x00\x43\x00\x00\x00'   # ptrlist
+                '\x01\x00\x02\x00\xff\xff\x00\x00'
+                '\x00\x00\x00\x00\x00\x00\x00\x00')
+        blob = Struct.from_buffer(buf, 0, data_size=0, ptrs_size=1)
+        lst = blob._read_list(0, PrimitiveItemType(Types.int16))
+        assert lst.as_array().tolist() == [1, 2, -1, 0, 0, 0, 0, 0]
+
+    def test_item_length(self, numpy):
+        buf = b('\x01\x00\x00\x00\x1d\x00\x00\x00'   # ptrlist
+                '\x01\x00\x00\x00\x00\x00\x00\x00'   # 1
+                '\x02\x00\x00\x00\x00\x00\x00\x00'   # 2
+                '\xff\xff\xff\xff\xff\xff\xff\xff')  # -1
+        blob = Struct.from_buffer(buf, 0, data_size=0, ptrs_size=1)
+        # a list of 64 bits ints, read as a list of 32 bits ints
+        lst = blob._read_list(0, PrimitiveItemType(Types.int32))
+        arr = lst.as_array()
+        assert arr.strides == (8,)
+        assert arr.tolist() == list(lst) == [1, 2, -1]
+        # a list of 64 bits ints, read as a list of bytes
+        lst = blob._read_list(0, BoolItemType())
+        py.test.raises(ValueError, lst.as_array)
+        #
+        # a list of bytes can't be read as a list of 64 bits ints
+        buf = b('\x01\x00\x00\x00\x42\x00\x00\x00'   # ptrlist
+                'abcdefgh')
+        blob = Struct.from_buffer(buf, 0, data_size=0, ptrs_size=1)
+        lst = blob._read_list(0, PrimitiveItemType(Types.int64))
+        py.test.raises(ValueError, lst.as_array)
+
+    def test_composite(self, numpy):
+        buf = b('\x01\x00\x00\x00\x27\x00\x00\x00'   # ptrlist
+                '\x08\x00\x00\x00\x02\x00\x00\x00'   # tag (2 items, 2 words)
+                '\x0a\x00\x00\x00\x00\x00\x00\x00'   # 10
+                '\x14\x00\x00\x00\x00\x00\x00\x00'   # 20
+                '\x1e\x00\x00\x00\x00\x00\x00\x00'   # 30
+                '\x28\x00\x00\x00\x00\x00\x00\x00')  # 40
+        blob = Struct.from_buffer(buf, 0, data_size=0, ptrs_size=1)
+        # a list of structs read as a list of ints: each item is the first
+        # word of the data section
+        lst = blob._read_list(0, PrimitiveItemType(Types.int64))
+        arr = lst.as_array()
+        assert arr.strides == (16,)
+        assert arr.tolist() == list(lst) == [10, 30]
+        #
+        # a list of structs with 1-word items
+        buf = b('\x01\x00\x00\x00\x17\x00\x00\x00'   # ptrlist
+                '\x08\x00\x00\x00\x01\x00\x00\x00'   # tag (2 items, 1 word)
+                '\x0a\x00\x00\x00\x00\x00\x00\x00'   # 10
+                '\x14\x00\x00\x00\x00\x00\x00\x00')  # 20
+        blob = Struct.from_buffer(buf, 0, data_size=0, ptrs_size=1)
+        lst = blob._read_list(0, PrimitiveItemType(Types.int64))
+        assert lst.as_array().tolist() == list(lst) == [10, 20]
+
+    def test_bool(self, numpy):
+        buf = b('\x01\x00\x00\x00\x51\x00\x00\x00'   # ptrlist, 10 bits
+                '\x05\x02\x00\x00\x00\x00\x00\x00')  # 1 0 1 0 0 0 0 0, 0 1
+        blob = Struct.from_buffer(buf, 0, data_size=0, ptrs_size=1)
+        lst = blob._read_list(0, BoolItemType())
+        arr = lst.as_array()
+        assert arr.dtype == numpy.bool_
+        assert arr.tolist() == list(lst)
+        assert arr.tolist() == [True, False, True] + [False]*5 + [False, True]
+
+    def test_empty(self, numpy):
+        buf = b('\x01\x00\x00\x00\x05\x00\x00\x00')  # ptrlist, 0 items
+        blob = Struct.from_buffer(buf, 0, data_size=0, ptrs_size=1)
+        lst = blob._read_list(0, PrimitiveItemType(Types.int64))
+        assert lst.as_array().tolist() == []
+
+    def test_unsupported(self, numpy):
+        buf = b('\x01\x00\x00\x00\x0e\x00\x00\x00'   # ptrlist
+                '\x01\x00\x00\x00\x1a\x00\x00\x00'   # ptr item 1
+                'hello\0\0\0')
+        blob = Struct.from_buffer(buf, 0, data_size=0, ptrs_size=1)
+        lst = blob._read_list(0, TextItemType(Types.text))
+        py.test.raises(TypeError, lst.as_array)
+
+
+class TestToColumns(object):
+
+    @pytest.fixture(autouse=True)
+    def numpy(self):
+        return pytest.importorskip('numpy')
+
+    class Point(Struct):
+        __static_data_size__ = 2
+        __static_ptrs_size__ = 0
+        # x :Int64; y :Int32; flag :Bool; z :Int16 = 5
+        __data_fields__ = (('x', 0, 'q', 0),
+                           ('y', 8, 'i', 0),
+                           ('flag', 96, '?', False),
+                           ('z', 14, 'h', 5))
+
+    def read_list(self, buf):
+        blob = Struct.from_buffer(buf, 0, data_size=0, ptrs_size=1)
+        return blob._read_list(0, StructItemType(self.Point))
+
+    def test_to_columns(self, numpy):
+        buf = b('\x01\x00\x00\x00\x37\x00\x00\x00'    # ptrlist
+                '\x0c\x00\x00\x00\x02\x00\x00\x00'    # list tag
+                '\x0a\x00\x00\x00\x00\x00\x00\x00'    # x=10
+                '\x64\x00\x00\x00\x01\x00\x05\x00'    # y=100, flag, z=0
+                '\x14\x00\x00\x00\x00\x00\x00\x00'    # x=20
+                '\xc8\x00\x00\x00\x00\x00\x00\x00'    # y=200, z=5
+                '\x1e\x00\x00\x00\x00\x00\x00\x00'    # x=30
+                '\x2c\x01\x00\x00\x01\x00\x03\x00')   # y=300, flag, z=6
+        lst = self.read_list(buf)
+        cols = lst.to_columns()
+        assert list(cols) == ['x', 'y', 'flag', 'z']
+        assert cols['x'].dtype == numpy.dtype('<i8')
+        assert cols['x'].tolist() == [10, 20, 30]
+        assert cols['y'].dtype == numpy.dtype('<i4')
+        assert cols['y'].tolist() == [100, 200, 300]
+        assert cols['flag'].tolist() == [True, False, True]
+        assert cols['z'].tolist() == [0, 5, 6]
+        for arr in cols.values():
+            assert not arr.flags.writeable
+        # x and y are views over the message
+        assert not cols['x'].flags.owndata
+        assert cols['x'].strides == (16,)
+        #
+        cols = lst.to_columns(['y'])
+        assert list(cols) == ['y']
+        with pytest.raises(ValueError):
+            lst.to_columns(['foo'])
+
+    def test_list_from_columns(self, numpy):
+        lst = self.Point.list_from_columns(x=[10, 20, 30],
+                                           y=numpy.array([100, 200, 300]),
+                                           flag=[True, False, True],
+                                           z=[0, 5, 6])
+        assert lst._seg.buf == b('\x01\x00\x00\x00\x37\x00\x00\x00'
+                                 '\x0c\x00\x00\x00\x02\x00\x00\x00'
+                                 '\x0a\x00\x00\x00\x00\x00\x00\x00'
+                                 '\x64\x00\x00\x00\x01\x00\x05\x00'
+                                 '\x14\x00\x00\x00\x00\x00\x00\x00'
+                                 '\xc8\x00\x00\x00\x00\x00\x00\x00'
+                                 '\x1e\x00\x00\x00\x00\x00\x00\x00'
+                                 '\x2c\x01\x00\x00\x01\x00\x03\x00')
+        cols = lst.to_columns()
+        assert cols['z'].tolist() == [0, 5, 6]
+
+    def test_old_schema(self, numpy):
+        # the list was written with an older schema which contains only x
+        buf = b('\x01\x00\x00\x00\x17\x00\x00\x00'    # ptrlist
+                '\x08\x00\x00\x00\x01\x00\x00\x00'    # list tag
+                '\x0a\x00\x00\x00\x00\x00\x00\x00'    # x=10
+                '\x14\x00\x00\x00\x00\x00\x00\x00')   # x=20
+        cols = self.read_list(buf).to_columns()
+        assert cols['x'].tolist() == [10, 20]
+        assert cols['y'].tolist() == [0, 0]
+        assert cols['flag'].tolist() == [False, False]
+        assert cols['z'].tolist() == [5, 5]
+
+    def test_empty(self, numpy):
+        buf = b('\x01\x00\x00\x00\x07\x00\x00\x00'    # ptrlist
+                '\x00\x00\x00\x00\x02\x00\x00\x00')   # list tag
+        cols = self.read_list(buf).to_columns()
+        assert cols['x'].tolist() == []
+
+    def test_unsupported(self, numpy):
+        buf = b('\x01\x00\x00\x00\x25\x00\x00\x00'   # ptrlist
+                '\x01\x00\x00\x00\x00\x00\x00\x00')  # 1
+        blob = Struct.from_buffer(buf, 0, data_size=0, ptrs_size=1)
+        lst = blob._read_list(0, PrimitiveItemType(Types.int64))
+        py.test.raises(TypeError, lst.to_columns)
+
+
 def test_ItemType_from_type():
     from capnpy.enum import enum
     def check(t, expected_cls, expected_t=None):
@@ -16,11 +16,15 @@ class TestParseOptions:
     def test_simple(self):
         args, options = self.parse('compile myschema.capnp')
         assert args['--pyx'] == 'auto'
+        assert args['--parser'] == 'capnp'
         expected = textwrap.dedent("""
             version_check: true
             convert_case: true
             text_type: bytes
             include_reflection_data: true
+            mutable: false
+            cache: false
+            lazy: false
         """).strip()
         assert self.dump(options) == expected
 
@@ -30,13 +34,21 @@ class TestParseOptions:
                                    '--text-type=unicode '
                                    '--no-pyx '
                                    '--no-version-check '
-                                   '--no-reflection ')
+                                   '--no-reflection '
+                                   '--mutable '
+                                   '--cache '
+                                   '--lazy '
+                                   '--parser=python')
         assert args['--pyx'] == False
+        assert args['--parser'] == 'python'
         expected = textwrap.dedent("""
             version_check: false
             convert_case: false
             text_type: unicode
             include_reflection_data: false
+            mutable: true
+            cache: true
+            lazy: true
         """).strip()
         assert self.dump(options) == expected
 
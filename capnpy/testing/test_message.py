@@ -2,6 +2,9 @@ import py.test
 from io import BytesIO
 from six import b, PY3
 from capnpy.message import load, loads, load_all, _load_message, dumps
+from capnpy.message import (load_packed, loads_packed, load_all_packed,
+                            dumps_packed, dump_packed)
+from capnpy.message import load_mmap, load_all_mmap, load_lazy, MessageWriter
 from capnpy.filelike import as_filelike
 from capnpy.type import Types
 from capnpy.struct_ import Struct
@@ -176,6 +179,54 @@ def test_dumps_not_compact():
     assert msg == exp
 
 
+def test_dumps_segment_size():
+    class Person(Struct):
+        pass
+
+    buf = b('\x20\x00\x00\x00\x00\x00\x00\x00'   # age=32
+            '\x01\x00\x00\x00\x2a\x00\x00\x00'   # name=ptr
+            'J' 'o' 'h' 'n' '\x00\x00\x00\x00')  # John
+    p = Person.from_buffer(buf, 0, data_size=1, ptrs_size=1)
+    # the object fits in a single segment
+    assert dumps(p, segment_size=64) == dumps(p)
+    #
+    msg = dumps(p, segment_size=16)
+    exp = b('\x02\x00\x00\x00\x01\x00\x00\x00'   # message header: 3 segments,
+            '\x03\x00\x00\x00\x02\x00\x00\x00'   # of 1, 3 and 2 words
+            # segment 0
+            '\x02\x00\x00\x00\x01\x00\x00\x00'   # far ptr to segment 1
+            # segment 1
+            '\x00\x00\x00\x00\x01\x00\x01\x00'   # landing pad: ptr to payload
+            '\x20\x00\x00\x00\x00\x00\x00\x00'   # age=32
+            '\x02\x00\x00\x00\x02\x00\x00\x00'   # name=far ptr to segment 2
+            # segment 2
+            '\x01\x00\x00\x00\x2a\x00\x00\x00'   # landing pad: ptr to text
+            'J' 'o' 'h' 'n' '\x00\x00\x00\x00')  # John
+    assert msg == exp
+    p2 = loads(msg, Person)
+    assert p2._read_primitive(0, Types.int64.ifmt) == 32
+    assert p2._read_text_bytes(0) == b'John'
+    assert dumps(p2) == dumps(p)
+
+def test_dumps_segment_size_padding():
+    class Point(Struct):
+        pass
+
+    buf = b('\x01\x00\x00\x00\x00\x00\x00\x00'   # x == 1
+            '\x02\x00\x00\x00\x00\x00\x00\x00')  # y == 2
+    p = Point.from_buffer(buf, 0, data_size=2, ptrs_size=0)
+    msg = dumps(p, segment_size=8)
+    exp = b('\x01\x00\x00\x00\x01\x00\x00\x00'   # message header: 2 segments,
+            '\x03\x00\x00\x00\x00\x00\x00\x00'   # of 1 and 3 words + padding
+            '\x02\x00\x00\x00\x01\x00\x00\x00'   # far ptr to segment 1
+            '\x00\x00\x00\x00\x02\x00\x00\x00'   # landing pad: ptr to payload
+            '\x01\x00\x00\x00\x00\x00\x00\x00'   # x == 1
+            '\x02\x00\x00\x00\x00\x00\x00\x00')  # y == 2
+    assert msg == exp
+    p2 = loads(msg, Point)
+    assert p2._read_primitive(8, Types.int64.ifmt) == 2
+
+
 def test_Struct_loads():
     class Point(Struct):
         pass
@@ -204,6 +255,175 @@ def test_Struct_dumps():
             '\x02\x00\x00\x00\x00\x00\x00\x00')  # y == 2
     assert msg == exp
 
+def test_dumps_packed():
+    class Point(Struct):
+        pass
+
+    buf = b('\x01\x00\x00\x00\x00\x00\x00\x00'   # x == 1
+            '\x02\x00\x00\x00\x00\x00\x00\x00')  # y == 2
+    p = Point.from_buffer(buf, 0, data_size=2, ptrs_size=0)
+    msg = dumps_packed(p)
+    exp = b('\x10\x03'                  # message header: 1 segment, size 3 words
+            '\x10\x02'                  # ptr to payload (Point {x, y})
+            '\x01\x01'                  # x == 1
+            '\x01\x02')                 # y == 2
+    assert msg == exp
+    assert p.dumps_packed() == exp
+    #
+    p2 = loads_packed(msg, Point)
+    assert p2._read_primitive(0, Types.int64.ifmt) == 1
+    assert p2._read_primitive(8, Types.int64.ifmt) == 2
+    p2 = Point.loads_packed(msg)
+    assert isinstance(p2, Point)
+    assert p2._read_primitive(8, Types.int64.ifmt) == 2
+
+def test_loads_packed_truncated():
+    with py.test.raises(ValueError):
+        loads_packed(b'\x10\x03\x10', Struct)
+
+def test_load_all_packed():
+    f = _get_many_messages()
+    messages = list(load_all(f, Struct))
+    f = BytesIO()
+    for msg in messages:
+        dump_packed(msg, f)
+    f.seek(0)
+    p1, p2 = load_all_packed(f, Struct)
+    assert p1._read_primitive(0, Types.int64.ifmt) == 1
+    assert p1._read_primitive(8, Types.int64.ifmt) == 2
+    assert p2._read_primitive(0, Types.int64.ifmt) == 3
+    assert p2._read_primitive(8, Types.int64.ifmt) == 4
+    #
+    f.seek(0)
+    p1 = load_packed(f, Struct)
+    assert p1._read_primitive(0, Types.int64.ifmt) == 1
+
+
+class TestMmap(object):
+
+    def write(self, tmpdir, buf):
+        myfile = tmpdir.join('myfile')
+        myfile.write(buf, mode='wb')
+        return myfile
+
+    def test_load_mmap(self, tmpdir):
+        myfile = self.write(tmpdir, _get_many_messages().getvalue()[:32])
+        with myfile.open('rb') as f:
+            p = load_mmap(f, Struct)
+        assert isinstance(p._seg.buf, memoryview)
+        assert p._read_primitive(0, Types.int64.ifmt) == 1
+        assert p._read_primitive(8, Types.int64.ifmt) == 2
+
+    def test_load_mmap_not_whole_file(self, tmpdir):
+        myfile = self.write(tmpdir, _get_many_messages().getvalue())
+        with myfile.open('rb') as f:
+            with py.test.raises(ValueError):
+                load_mmap(f, Struct)
+
+    def test_load_all_mmap(self, tmpdir):
+        myfile = self.write(tmpdir, _get_many_messages().getvalue())
+        with myfile.open('rb') as f:
+            p1, p2 = load_all_mmap(f, Struct)
+        assert p1._read_primitive(0, Types.int64.ifmt) == 1
+        assert p1._read_primitive(8, Types.int64.ifmt) == 2
+        assert p2._read_primitive(0, Types.int64.ifmt) == 3
+        assert p2._read_primitive(8, Types.int64.ifmt) == 4
+        # p1 and p2 are dumped without the rest of the map
+        assert p2.dumps() == _get_many_messages().getvalue()[32:]
+
+    def test_load_all_mmap_empty(self, tmpdir):
+        myfile = self.write(tmpdir, b'')
+        with myfile.open('rb') as f:
+            assert list(load_all_mmap(f, Struct)) == []
+
+    def test_load_all_mmap_truncated(self, tmpdir):
+        myfile = self.write(tmpdir, _get_many_messages().getvalue()[:-8])
+        with myfile.open('rb') as f:
+            msgs = load_all_mmap(f, Struct)
+            next(msgs)
+            with py.test.raises(ValueError):
+                next(msgs)
+
+    def test_segments(self, tmpdir):
+        header = b('\x01\x00\x00\x00'  # 1+1 segments
+                   '\x01\x00\x00\x00'  # size0: 1
+                   '\x02\x00\x00\x00'  # size1: 2
+                   '\x00\x00\x00\x00') # padding
+        payload = b('\x02\x00\x00\x00\x01\x00\x00\x00'  # far ptr: segment 1, offset 0
+                    '\x00\x00\x00\x00\x01\x00\x00\x00'  # ptr to payload (Point {x})
+                    '\x2a\x00\x00\x00\x00\x00\x00\x00') # x == 42
+        myfile = self.write(tmpdir, header + payload)
+        with myfile.open('rb') as f:
+            msg, = load_all_mmap(f, Struct)
+        assert msg._seg.segment_offsets == (0, 8)
+        assert msg._read_primitive(0, Types.int64.ifmt) == 42
+
+
+class TestLazy(object):
+
+    def write(self, tmpdir, buf):
+        myfile = tmpdir.join('myfile')
+        myfile.write(buf, mode='wb')
+        return myfile
+
+    def get_person(self):
+        class Person(Struct):
+            pass
+        buf = b('\x20\x00\x00\x00\x00\x00\x00\x00'   # age=32
+                '\x01\x00\x00\x00\x2a\x00\x00\x00'   # name=ptr
+                'J' 'o' 'h' 'n' '\x00\x00\x00\x00')  # John
+        return Person.from_buffer(buf, 0, data_size=1, ptrs_size=1)
+
+    def test_load_lazy(self, tmpdir):
+        p = self.get_person()
+        # 3 segments: the root pointer, the struct and the text, see
+        # test_dumps_segment_size
+        msg = dumps(p, segment_size=16)
+        myfile = self.write(tmpdir, msg + msg)
+        with myfile.open('rb') as f:
+            p1 = load_lazy(f, Struct)
+            assert f.tell() == len(msg)
+            seg = p1._seg
+            assert seg.segment_offsets == (0, 8, 32)
+            assert list(seg.loaded) == [1, 1, 0]
+            assert p1._read_primitive(0, Types.int64.ifmt) == 32
+            assert list(seg.loaded) == [1, 1, 0]
+            assert p1._read_text_bytes(0) == b'John'
+            assert list(seg.loaded) == [1, 1, 1]
+            assert f.tell() == len(msg)
+            #
+            p2 = load_lazy(f, Struct)
+            assert f.tell() == len(msg)*2
+            assert dumps(p2) == dumps(p)
+            py.test.raises(EOFError, load_lazy, f, Struct)
+
+    def test_single_segment(self, tmpdir):
+        p = self.get_person()
+        myfile = self.write(tmpdir, dumps(p))
+        with myfile.open('rb') as f:
+            p1 = load_lazy(f, Struct)
+        assert type(p1._seg).__name__ == 'Segment'
+        assert p1._read_text_bytes(0) == b'John'
+
+    def test_truncated(self, tmpdir):
+        msg = dumps(self.get_person(), segment_size=16)
+        myfile = self.write(tmpdir, msg[:-8])
+        with myfile.open('rb') as f:
+            exc = py.test.raises(ValueError, load_lazy, f, Struct)
+        assert str(exc.value) == ("Unexpected EOF: expected 48 bytes, got "
+                                  "only 40. Segments size: [1, 3, 2]")
+
+    def test_pickle(self, tmpdir):
+        import pickle
+        msg = dumps(self.get_person(), segment_size=16)
+        myfile = self.write(tmpdir, msg)
+        with myfile.open('rb') as f:
+            p1 = load_lazy(f, Struct)
+            seg = pickle.loads(pickle.dumps(p1._seg))
+        assert type(seg).__name__ == 'MultiSegment'
+        assert seg.buf == msg[16:]
+
+
 class TestFileLike(object):
     """
     Test that message.load work with various file-like objects
@@ -251,3 +471,41 @@ class TestFileLike(object):
         sock = FakeSocket(self.buf)
         buffered_sock = BufferedSocket(sock)
         self.check(buffered_sock)
+
+
+class TestMessageWriter(object):
+
+    def test_write(self):
+        f = BytesIO()
+        messages = list(load_all(_get_many_messages(), Struct))
+        w = MessageWriter(f)
+        for p in messages:
+            w.write(p)
+        assert f.getvalue() == b''
+        w.flush()
+        assert f.getvalue() == _get_many_messages().getvalue()
+
+    def test_bufsize(self):
+        f = BytesIO()
+        p1, p2 = load_all(_get_many_messages(), Struct)
+        with MessageWriter(f, bufsize=64) as w:
+            w.write(p1)
+            assert f.getvalue() == b''
+            w.write(p2)
+            assert f.getvalue() == _get_many_messages().getvalue()
+            w.write(p1)
+        assert f.getvalue() == _get_many_messages().getvalue() + dumps(p1)
+
+    def test_not_compact(self):
+        buf = b('\x20\x00\x00\x00\x00\x00\x00\x00'   # age=32
+                '\x05\x00\x00\x00\x2a\x00\x00\x00'   # name=ptr
+                'garbage1'
+                'J' 'o' 'h' 'n' '\x00\x00\x00\x00')  # John
+        p = Struct.from_buffer(buf, 0, data_size=1, ptrs_size=1)
+        assert p._get_end() == -1
+        f = BytesIO()
+        with MessageWriter(f) as w:
+            w.write(p)
+            w.write(p, fastpath=False)
+            w.write(p)
+        assert f.getvalue() == dumps(p) * 3
@@ -6,7 +6,8 @@ import math
 
 import six
 from pypytools import IS_PYPY
-from capnpy.packing import (unpack_primitive, pack_message_header, pack_into)
+from capnpy.packing import (unpack_primitive, pack_message_header, pack_into,
+                            pack_words, unpack_words)
 
 
 class TestUnpack(object):
@@ -100,3 +101,70 @@ def test_pack_message_header():
     assert header == six.b('\x00\x00\x00\x00'
                            '\xaa\x00\x00\x00'
                            '\xdd\xcc\xbb\x00\x00\x00\x00\x00')
+
+
+class TestPackedEncoding(object):
+
+    def check(self, unpacked, packed):
+        assert pack_words(unpacked) == packed
+        assert unpack_words(packed) == (unpacked, len(packed))
+
+    def test_simple(self):
+        # this is the example from the capnproto docs
+        self.check(six.b('\x08\x00\x00\x00\x03\x00\x02\x00'
+                         '\x19\x00\x00\x00\xaa\x01\x00\x00'),
+                   six.b('\x51\x08\x03\x02'
+                         '\x31\x19\xaa\x01'))
+
+    def test_zero_words(self):
+        self.check(b'\x00'*8, b'\x00\x00')
+        self.check(b'\x00'*8*3, b'\x00\x02')
+        # the count is a single byte, so it's capped at 255 additional words
+        self.check(b'\x00'*8*300, b'\x00\xff\x00\x2b')
+
+    def test_uncompressed_words(self):
+        w1 = b'ABCDEFGH'
+        w2 = b'IJKLMN\x00P'   # only one zero: still emitted verbatim
+        w3 = b'\x01\x00\x00\x00\x00\x00\x00\x00'
+        self.check(w1 + w2 + w3,
+                   b'\xff' + w1 + b'\x01' + w2 + b'\x01\x01')
+
+    def test_empty(self):
+        self.check(b'', b'')
+
+    def test_bad_length(self):
+        with pytest.raises(ValueError):
+            pack_words(b'1234')
+
+    def test_unpack_incomplete(self):
+        unpacked = b'ABCDEFGH' + b'\x00'*8 + b'\x01\x00\x00\x00\x00\x00\x00\x00'
+        packed = pack_words(unpacked)
+        assert packed == b'\xffABCDEFGH\x00\x00\x00\x01\x01'
+        # the raw run is not complete, nothing is unpacked
+        assert unpack_words(packed[:5]) == (b'', 0)
+        assert unpack_words(packed[:9]) == (b'', 0)
+        # the zero run is not complete
+        assert unpack_words(packed[:11]) == (b'ABCDEFGH', 10)
+        # the last word is not complete
+        assert unpack_words(packed[:13]) == (b'ABCDEFGH' + b'\x00'*8, 12)
+        # start in the middle
+        assert unpack_words(packed, 10) == (unpacked[8:], len(packed))
+
+    def test_roundtrip_random(self):
+        from random import Random
+        rnd = Random(42)
+        for i in range(50):
+            words = []
+            for j in range(rnd.randrange(100)):
+                kind = rnd.choice(['zero', 'full', 'mixed'])
+                if kind == 'zero':
+                    words.append(b'\x00'*8)
+                elif kind == 'full':
+                    words.append(b''.join(six.int2byte(rnd.randrange(1, 256))
+                                          for _ in range(8)))
+                else:
+                    words.append(b''.join(six.int2byte(rnd.choice([0, 42]))
+                                          for _ in range(8)))
+            buf = b''.join(words)
+            packed = pack_words(buf)
+            assert unpack_words(packed) == (buf, len(packed))
@@ -0,0 +1,59 @@
+import struct
+from capnpy.struct_ import Struct
+from capnpy.type import Types
+from capnpy.parallel import split_file, map_messages
+
+
+def make_message(x):
+    # a single-segment message containing a Point {x, y=x+1}
+    return struct.pack('<IIqqq', 0, 3, 0x0000000200000000, x, x+1)
+
+def write_messages(tmpdir, n):
+    myfile = tmpdir.join('messages.bin')
+    myfile.write(b''.join(make_message(i) for i in range(n)), mode='wb')
+    return myfile
+
+def get_x(p):
+    return p._read_primitive(0, Types.int64.ifmt)
+
+
+def test_split_file(tmpdir):
+    myfile = write_messages(tmpdir, 10)
+    with myfile.open('rb') as f:
+        chunks = split_file(f, 3)
+    assert chunks == [(0, 128), (128, 224), (224, 320)]
+    with myfile.open('rb') as f:
+        chunks = split_file(f, 100)
+    assert len(chunks) == 10
+    assert chunks[0] == (0, 32)
+
+def test_split_file_at_most_n(tmpdir):
+    # 11 empty messages of 8 bytes each: with n=10, a naive split into
+    # chunks of total//n bytes produces 11 chunks
+    empty = struct.pack('<II', 0, 0)
+    myfile = tmpdir.join('messages.bin')
+    myfile.write(empty * 11, mode='wb')
+    total = myfile.size()
+    for n in range(1, 20):
+        with myfile.open('rb') as f:
+            chunks = split_file(f, n)
+        assert 1 <= len(chunks) <= n
+        assert chunks[0][0] == 0
+        assert chunks[-1][1] == total
+        for (start1, end1), (start2, end2) in zip(chunks, chunks[1:]):
+            assert start1 < end1 == start2 < end2
+
+def test_split_file_empty(tmpdir):
+    myfile = write_messages(tmpdir, 0)
+    with myfile.open('rb') as f:
+        assert split_file(f, 4) == []
+
+def test_map_messages(tmpdir):
+    myfile = write_messages(tmpdir, 100)
+    res = map_messages(str(myfile), Struct, get_x, workers=2)
+    assert list(res) == list(range(100))
+
+def test_map_messages_unordered(tmpdir):
+    myfile = write_messages(tmpdir, 100)
+    res = map_messages(str(myfile), Struct, get_x, workers=2, ordered=False)
+    assert sorted(res) == list(range(100))
@@ -1,4 +1,5 @@
 import sys
+import threading
 import py
 import six
 
@@ -53,7 +54,7 @@ def find_module(path, modname, extension='.py'):
             return f
     return None
 
-def extend_module_maybe(globals, filename=None, modname=None):
+def extend_module_maybe(globals, filename=None, modname=None, lazy=None):
     if filename is not None:
         # /path/to/foo.py --> /path/to/foo_extended.py
         filename = py.path.local(filename)
@@ -69,10 +70,72 @@ def extend_module_maybe(globals, filename=None, modname=None):
     else:
         raise ValueError('You must pass either filename or modname')
     #
+    if lazy is not None:
+        # the extension module can refer to any name as a global
+        lazy.materialize_all()
     src = extmod.read()
     code = compile(src, str(extmod), 'exec')
     exec(code, globals)
 
+class LazyDefinitions(object):
+    """
+    Define lazily the names of a module compiled with the ``lazy`` option.
+
+    ``groups`` is a list of ``(func, names, deps)``: calling ``func()`` defines
+    ``names`` in ``globals``, and ``deps`` are the indexes of the groups whose
+    names are used by the code of ``func``. A group always comes after the
+    ones which it needs at definition time.
+    """
+
+    def __init__(self, globals, groups):
+        self.globals = globals
+        self.groups = groups
+        self.done = [False] * len(groups)
+        self.lock = threading.RLock()
+        self.index = {}
+        for i, (func, names, deps) in enumerate(groups):
+            for name in names:
+                self.index.setdefault(name, i)
+        if sys.version_info < (3, 7):
+            # no support for module-level __getattr__ (PEP 562), so we must
+            # define everything now
+            self.materialize_all()
+
+    def materialize(self, i):
+        with self.lock:
+            closure = set()
+            todo = [i]
+            while todo:
+                j = todo.pop()
+                if j in closure or self.done[j]:
+                    continue
+                closure.add(j)
+                todo += self.groups[j][2]
+            for j in sorted(closure):
+                func = self.groups[j][0]
+                func()
+                self.done[j] = True
+
+    def materialize_all(self):
+        for i in range(len(self.groups)):
+            self.materialize(i)
+
+    def getattr(self, name):
+        if name == '__all__':
+            # make "from ... import *" work as in the non-lazy case
+            return [key for key in self.dir() if not key.startswith('_')]
+        try:
+            i = self.index[name]
+        except KeyError:
+            raise AttributeError("module '%s' has no attribute '%s'" %
+                                 (self.globals['__name__'], name))
+        self.materialize(i)
+        return self.globals[name]
+
+    def dir(self):
+        return sorted(set(self.globals).union(self.index))
+
+
 def check_version(modname, version):
     if version != capnpy.__version__:
         # explicitly remove modname from sys.modules: apparently, CPython does